@@ -1,22 +1,66 @@
-from fastapi import FastAPI
+from src.startup import startup, init_sentry
+from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, Response
 from starlette.middleware.gzip import GZipMiddleware
 from fastapi.middleware.cors import CORSMiddleware
 from src.constants import Constants
+from src.exceptions import DatabaseError
 from src.routes import auth
+from src.routes import tab
+from src.routes import product
+from src.routes import catalog
+from src.routes import receiving
+from src.routes import customer
+from src.routes import address
+from src.routes import live
+from src.routes import sale
+from src.routes import sync
+from src.routes import admin
+from src.routes import health
+from src.routes import well_known
+from src.events import broker
+from src.pruner import pruner
+from src.health import prober
+from src.shutdown import coordinator, DrainMiddleware
+from src.db.db import db
+from src.db.replicas import ReadYourWritesMiddleware
+from src import metrics
+from src import log
 import contextlib
 
 
+log.setup_logging()
+logger = log.get_logger("main")
+startup.mark_imports()
+
+
 @contextlib.asynccontextmanager
 async def lifespan(app: FastAPI):
-    print(f"[Starting {Constants.API_NAME}]")    
+    logger.info("Starting %s", Constants.API_NAME)
+
+    with startup.phase("sentry"):
+        init_sentry()
+    with startup.phase("db_pool"):
+        await db.connect()
+    with startup.phase("migrations"):
+        await db.migrate()
+
+    broker.start()
+    pruner.start()
+    metrics.exporter.start()
+
+    await startup.warmup()
+    startup.finish()
+    await prober.start()
+    coordinator.install_signal_handlers()
 
-    print(f"[{Constants.API_NAME} STARTED]")
+    logger.info("%s STARTED", Constants.API_NAME)
 
     yield
 
-    print(f"[Shutting down {Constants.API_NAME}]")
+    logger.info("Shutting down %s", Constants.API_NAME)
+    await coordinator.shutdown()
 
     
 app = FastAPI(    
@@ -48,18 +92,47 @@ app.add_middleware(
 )
 
 
+@app.exception_handler(DatabaseError)
+async def database_error_handler(request: Request, exc: DatabaseError):
+    return JSONResponse(
+        status_code=exc.code or 500,
+        content={"detail": exc.detail}
+    )
+
+
 @app.get("/")
 def read_root():
     return {"Hello": "World"}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    return Response(content=await metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
 @app.get("/favicon.ico")
 async def favicon():
     return FileResponse("static/favicon/favicon.ico")
 
 
 app.include_router(auth.router, prefix='/api/v1/auth', tags=['auth'])
+app.include_router(tab.router, prefix='/api/v1/tabs', tags=['tabs'])
+app.include_router(product.router, prefix='/api/v1/products', tags=['products'])
+app.include_router(catalog.router, prefix=catalog.PREFIX, tags=['catalog'])
+app.include_router(receiving.router, prefix='/api/v1/receipts', tags=['receipts'])
+app.include_router(customer.router, prefix='/api/v1/customers', tags=['customers'])
+app.include_router(address.router, prefix='/api/v1/addresses', tags=['addresses'])
+app.include_router(live.router, prefix='/api/v1/live', tags=['live'])
+app.include_router(sale.router, prefix='/api/v1/sales', tags=['sales'])
+app.include_router(sync.router, prefix='/api/v1/sync', tags=['sync'])
+app.include_router(admin.router, prefix='/api/v1/admin', tags=['admin'])
+app.include_router(health.router, prefix='/health', tags=['health'])
+app.include_router(well_known.router, prefix='/.well-known', tags=['well-known'])
 
 ########################## MIDDLEWARES ##########################
 
-app.add_middleware(GZipMiddleware, minimum_size=1000)
\ No newline at end of file
+app.add_middleware(GZipMiddleware, minimum_size=1000)
+app.add_middleware(ReadYourWritesMiddleware)
+app.add_middleware(metrics.MetricsMiddleware)
+app.add_middleware(DrainMiddleware)
+app.add_middleware(log.RequestContextMiddleware)
\ No newline at end of file
@@ -0,0 +1,128 @@
+"""
+Contenção nas linhas quentes de estoque: --workers conexões baixam o
+estoque dos mesmos --hot produtos, cada uma na ordem do seu carrinho, e
+esbarram em deadlocks. Roda a mesma carga sem retentativa (db_safe_exec) e
+com src.db.transaction.run_transaction, e compara a taxa de sucesso. Cada
+carrinho roda dentro de uma transação desfeita no fim, como a transação da
+requisição, então o estoque não muda entre execuções.
+
+    python -m scripts.bench_contention --workers 16 --carts 50
+    python -m scripts.bench_contention --deadlock-timeout-ms 50
+"""
+from dotenv import load_dotenv
+from src.db.db import db_safe_exec
+from src.db.transaction import RetryBudget, run_transaction, budgets
+from src.constants import Constants
+from src.exceptions import DatabaseError
+from src.metrics import db_transaction_retries
+import argparse
+import asyncio
+import asyncpg
+import logging
+import random
+import json
+import time
+import os
+
+
+load_dotenv()
+
+# Cada deadlock vira um warning do tradutor de erros; aqui só o resumo interessa
+logging.getLogger("app").setLevel(logging.ERROR)
+
+
+async def load_products(pool: asyncpg.Pool, hot: int) -> list:
+    rows = await pool.fetch(
+        """
+            SELECT id FROM products
+            WHERE is_active
+            ORDER BY sku LIKE 'bench-%' DESC, id
+            LIMIT $1
+        """,
+        hot
+    )
+    if len(rows) < hot: raise SystemExit(f"Só {len(rows)} produtos. Rode scripts.bench_seed antes.")
+    return [r["id"] for r in rows]
+
+
+async def sell(cart: list, hold: float, conn: asyncpg.Connection) -> None:
+    for product_id in cart:
+        await conn.execute(
+            "UPDATE products SET stock_quantity = stock_quantity - 1 WHERE id = $1",
+            product_id
+        )
+        # Tempo entre os itens do carrinho: é o que abre a janela do deadlock
+        await asyncio.sleep(hold)
+
+
+async def worker(pool: asyncpg.Pool, products: list, carts: int, size: int, hold: float, retry: bool) -> int:
+    ok = 0
+    async with pool.acquire() as conn:
+        for _ in range(carts):
+            cart = random.sample(products, size)
+            tr = conn.transaction()
+            await tr.start()
+            try:
+                if retry:
+                    await run_transaction(lambda: sell(cart, hold, conn), conn, route="bench_contention")
+                else:
+                    async with conn.transaction():
+                        await db_safe_exec(sell(cart, hold, conn))
+                ok += 1
+            except DatabaseError:
+                pass
+            finally:
+                await tr.rollback()
+    return ok
+
+
+async def run(mode: str, args) -> dict:
+    settings = {"deadlock_timeout": f"{args.deadlock_timeout_ms}ms"} if args.deadlock_timeout_ms else {}
+    pool = await asyncpg.create_pool(
+        os.getenv("DATABASE_URL"),
+        min_size=args.workers,
+        max_size=args.workers,
+        server_settings=settings
+    )
+    try:
+        products = await load_products(pool, args.hot)
+        budgets.clear()
+        budgets["bench_contention"] = RetryBudget(args.budget_ratio, args.budget_capacity)
+        db_transaction_retries.values.clear()
+        start = time.perf_counter()
+        done = await asyncio.gather(*(
+            worker(pool, products, args.carts, args.cart_size, args.hold_ms / 1000, mode == "retry")
+            for _ in range(args.workers)
+        ))
+        elapsed = time.perf_counter() - start
+    finally:
+        await pool.close()
+
+    total = args.workers * args.carts
+    retries = {"/".join(k[1:]): int(v) for k, v in db_transaction_retries.values.items()}
+    return {
+        "mode": mode,
+        "carts": total,
+        "ok": sum(done),
+        "success_rate": round(sum(done) / total, 4),
+        "elapsed_s": round(elapsed, 2),
+        "retries": retries,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Taxa de sucesso sob deadlock, com e sem retentativa")
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--carts", type=int, default=50, help="Carrinhos por worker")
+    parser.add_argument("--hot", type=int, default=12, help="Produtos disputados")
+    parser.add_argument("--cart-size", type=int, default=3)
+    parser.add_argument("--hold-ms", type=float, default=2.0)
+    parser.add_argument("--budget-ratio", type=float, default=Constants.DB_RETRY_BUDGET_RATIO)
+    parser.add_argument("--budget-capacity", type=float, default=Constants.DB_RETRY_BUDGET_CAPACITY)
+    parser.add_argument("--deadlock-timeout-ms", type=int, default=None, help="Exige superusuário")
+    args = parser.parse_args()
+
+    results = [asyncio.run(run(mode, args)) for mode in ("no_retry", "retry")]
+    print(json.dumps(results, indent=2))
+    if results[1]["success_rate"] <= results[0]["success_rate"]:
+        raise SystemExit("A retentativa não melhorou a taxa de sucesso")
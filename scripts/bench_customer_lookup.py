@@ -0,0 +1,121 @@
+"""
+Benchmark do autocomplete de clientes (model.user.lookup_customers_*), sem
+o cache do worker. Popula --customers clientes sintéticos na primeira vez,
+com nome, apelido, telefone e CPF válido.
+
+    python -m scripts.bench_customer_lookup --customers 500000 --iterations 2000
+"""
+from dotenv import load_dotenv
+from src.model import user as user_model
+from src import validation
+from src import util
+import statistics
+import argparse
+import asyncio
+import asyncpg
+import random
+import json
+import time
+import os
+
+
+load_dotenv()
+
+FIRST_NAMES = [
+    "Maria", "José", "Ana", "João", "Antônio", "Francisca", "Carlos", "Paulo", "Adriana", "Lucas",
+    "Juliana", "Marcos", "Patrícia", "Pedro", "Aline", "Rafael", "Sandra", "Luiz", "Camila", "Bruno"
+]
+LAST_NAMES = [
+    "Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves", "Pereira", "Lima", "Gomes",
+    "Costa", "Ribeiro", "Martins", "Carvalho", "Araújo", "Melo", "Barbosa", "Cardoso", "Rocha", "Dias"
+]
+NICKNAMES = ["Zé", "Tonho", "Chico", "Dona Maria", "Nando", "Carlinhos", "Juju", "Peu", "Dedé", None, None, None]
+QUERIES = ["mar", "maria sil", "jose", "joão santos", "tonho", "ana c", "pereira", "dona", "camila roc", "olivera"]
+
+
+def fake_cpf(i: int) -> str:
+    # Sequencial nos 9 primeiros dígitos: sem colisão com o índice único
+    base = f"{100000000 + i:09d}"
+    for check in range(100):
+        cpf = f"{base}{check:02d}"
+        if validation.is_valid_cpf(cpf): return cpf
+    raise AssertionError(base)
+
+
+def fake_phone() -> str:
+    return f"{random.choice((11, 21, 41, 47, 48, 51))}9{random.randint(0, 99_999_999):08d}"
+
+
+async def seed(conn: asyncpg.Connection, total: int) -> None:
+    existing = await conn.fetchval("SELECT COUNT(*) FROM users WHERE email LIKE 'bench-cliente-%'")
+    if existing >= total: return
+
+    records = [
+        (
+            f"{random.choice(FIRST_NAMES)} {random.choice(LAST_NAMES)} {random.choice(LAST_NAMES)}",
+            random.choice(NICKNAMES),
+            f"bench-cliente-{i}@bench.example.com",
+            fake_phone(),
+            fake_cpf(i),
+            "CLIENTE"
+        )
+        for i in range(existing, total)
+    ]
+    await conn.copy_records_to_table(
+        "users",
+        records=records,
+        columns=["name", "nickname", "email", "phone", "cpf", "role"]
+    )
+    await conn.execute("ANALYZE users")
+    print(f"[SEED] {len(records)} clientes inseridos")
+
+
+async def lookup(query: str, conn: asyncpg.Connection) -> None:
+    if not any(c.isalpha() for c in query):
+        await user_model.lookup_customers_by_digits(validation.only_digits(query), 10, conn)
+        return
+    term = util.normalize_search_term(query)
+    await user_model.lookup_customers_by_text(term, util.escape_like(term) + '%', 10, conn)
+
+
+async def run(total: int, iterations: int) -> dict:
+    conn = await asyncpg.connect(
+        os.getenv("DATABASE_URL"),
+        # Dados sintéticos na loja padrão, criada por insertions.sql
+        server_settings={"pg_trgm.word_similarity_threshold": "0.4", "app.current_tenant_id": "1"}
+    )
+    try:
+        await seed(conn, total)
+        timings = []
+        for _ in range(iterations):
+            if random.random() < 0.3:
+                query = random.choice((fake_cpf(random.randrange(total))[:5], fake_phone()[:6], fake_phone()[3:8]))
+            else:
+                query = random.choice(QUERIES)
+            start = time.perf_counter()
+            await lookup(query, conn)
+            timings.append((time.perf_counter() - start) * 1000)
+    finally:
+        await conn.close()
+
+    quantiles = statistics.quantiles(timings, n=100)
+    return {
+        "customers": total,
+        "iterations": iterations,
+        "p50_ms": round(quantiles[49], 3),
+        "p95_ms": round(quantiles[94], 3),
+        "p99_ms": round(quantiles[98], 3),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark do autocomplete de clientes (sem cache)")
+    parser.add_argument("--customers", type=int, default=500_000)
+    parser.add_argument("--iterations", type=int, default=2_000)
+    parser.add_argument("--max-p99-ms", type=float, default=15.0)
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.customers, args.iterations))
+    print(json.dumps(result, indent=2))
+    if result["p99_ms"] > args.max_p99_ms:
+        raise SystemExit(f"p99 acima do limite de {args.max_p99_ms}ms")
@@ -0,0 +1,81 @@
+"""
+Benchmark da verificação de access tokens: HS256 com segredo (o caminho
+antigo, jwt.decode direto) contra o KeyRing com EdDSA e ES256, na primeira
+vez que o token aparece (assinatura conferida) e nas seguintes (cache de
+tokens verificados). Também mede o PEM parseado a cada chamada, o que o
+KeyRing evita ao carregar as chaves uma vez.
+
+    python -m scripts.bench_jwt --tokens 2000 --repeat 20
+"""
+from cryptography.hazmat.primitives import serialization
+from src.keys import KeyRing, verified_tokens
+from scripts.generate_jwt_key import generate
+import tempfile
+import argparse
+import json
+import time
+import uuid
+import jwt
+
+
+SECRET = "s" * 48
+
+
+def payloads(count: int) -> list[dict]:
+    exp = int(time.time()) + 3600
+    return [
+        {"sub": str(uuid.uuid4()), "exp": exp, "iat": time.time(), "sid": str(uuid.uuid4()), "role": "CAIXA", "type": "access"}
+        for _ in range(count)
+    ]
+
+
+def per_token_us(fn, tokens: list[str], repeat: int = 1) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for token in tokens:
+            fn(token)
+    return round((time.perf_counter() - start) / (len(tokens) * repeat) * 1e6, 2)
+
+
+def run(count: int, repeat: int) -> dict:
+    claims = payloads(count)
+    results = {"tokens": count, "repeat": repeat}
+
+    legacy = [jwt.encode(c, SECRET, algorithm="HS256") for c in claims]
+    results["hs256_jwt_decode_us"] = per_token_us(lambda t: jwt.decode(t, SECRET, algorithms=["HS256"]), legacy, repeat)
+
+    for algorithm in ("EdDSA", "ES256"):
+        with tempfile.TemporaryDirectory() as directory:
+            path = generate(directory, "bench", algorithm)
+            ring = KeyRing()
+            ring.load(directory, None, SECRET, "HS256")
+            tokens = [ring.sign(c) for c in claims]
+            if ring.verify(tokens[0])["sub"] != claims[0]["sub"]: raise SystemExit(f"{algorithm}: payload divergente")
+
+            with open(path, "rb") as f:
+                pem = f.read()
+            public_pem = serialization.load_pem_private_key(pem, None).public_key().public_bytes(
+                serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+            )
+            results[f"{algorithm}_pem_per_call_us"] = per_token_us(
+                lambda t: jwt.decode(t, public_pem, algorithms=[algorithm]), tokens
+            )
+
+            verified_tokens.clear()
+            results[f"{algorithm}_keyring_cold_us"] = per_token_us(ring.verify, tokens)
+            results[f"{algorithm}_keyring_warm_us"] = per_token_us(ring.verify, tokens, repeat)
+
+    # Tokens antigos (sem kid) seguem pelo HMAC dentro do KeyRing
+    verified_tokens.clear()
+    results["hs256_keyring_cold_us"] = per_token_us(ring.verify, legacy)
+    results["hs256_keyring_warm_us"] = per_token_us(ring.verify, legacy, repeat)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark da verificação de JWT (HS256 x EdDSA x ES256)")
+    parser.add_argument("--tokens", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(json.dumps(run(min(args.tokens, verified_tokens.maxsize), args.repeat), indent=2))
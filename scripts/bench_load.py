@@ -0,0 +1,239 @@
+"""
+Benchmark de carga dos fluxos do caixa contra um banco populado por
+scripts.bench_seed. Sobe a API com uvicorn (ou usa --url) e roda cada
+cenário com concorrência fixa durante --duration segundos.
+
+    python -m scripts.bench_load --concurrency 32 --duration 30 --output bench-baseline.json
+    python -m scripts.bench_load --compare bench-baseline.json --tolerance 0.15
+
+Com --compare sai com código 1 se algum cenário piorar além da tolerância.
+"""
+from dotenv import load_dotenv
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Optional
+from scripts.bench_seed import BENCH_PASSWORD, bench_users
+from scripts.bench_product_search import QUERIES
+import statistics
+import subprocess
+import argparse
+import asyncio
+import asyncpg
+import random
+import httpx
+import json
+import time
+import uuid
+import sys
+import os
+
+
+load_dotenv()
+
+Scenario = Callable[[httpx.AsyncClient, dict], Awaitable[httpx.Response]]
+
+
+async def login(client: httpx.AsyncClient, ctx: dict) -> httpx.Response:
+    email, _ = random.choice(ctx["users"])
+    return await client.post("/api/v1/auth/login", json={"identifier": email, "password": BENCH_PASSWORD})
+
+
+async def scan(client: httpx.AsyncClient, ctx: dict) -> httpx.Response:
+    return await client.get("/api/v1/products/search", params={"q": random.choice(QUERIES), "limit": 10})
+
+
+async def checkout(client: httpx.AsyncClient, ctx: dict) -> httpx.Response:
+    items = random.sample(ctx["products"], random.randint(1, 5))
+    total = sum(price for _, price in items)
+    sale = {
+        "id": str(uuid.uuid4()),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "items": [{"product_id": pid, "quantity": "1", "unit_sale_price": str(price)} for pid, price in items],
+        "payments": [{"method": "DINHEIRO", "total": str(total)}],
+    }
+    return await client.post("/api/v1/sync/sales", json={"sales": [sale]})
+
+
+async def reports(client: httpx.AsyncClient, ctx: dict) -> httpx.Response:
+    if random.random() < 0.5:
+        return await client.get("/api/v1/tabs/aging", params={"limit": 100})
+    return await client.get("/api/v1/live/snapshot")
+
+
+# cenário -> (função, perfil das sessões usadas)
+SCENARIOS: dict[str, tuple[Scenario, Optional[str]]] = {
+    "login": (login, None),
+    "scan": (scan, "CAIXA"),
+    "checkout": (checkout, "CAIXA"),
+    "reports": (reports, "GERENTE"),
+}
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict:
+    if len(latencies) < 2:
+        return {"requests": len(latencies), "errors": errors, "rps": 0.0}
+    q = statistics.quantiles(latencies, n=100)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "error_rate": round(errors / len(latencies), 4),
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(q[49], 2),
+        "p95_ms": round(q[94], 2),
+        "p99_ms": round(q[98], 2),
+    }
+
+
+async def run_scenario(scenario: Scenario, clients: list[httpx.AsyncClient], ctx: dict, concurrency: int, duration: float) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker(client: httpx.AsyncClient) -> None:
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                ok = (await scenario(client, ctx)).status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            latencies.append((time.perf_counter() - start) * 1000)
+            if not ok: errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(clients[i % len(clients)]) for i in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+async def open_sessions(
+    base_url: str,
+    users: list[tuple[str, str]],
+    role: str,
+    count: int,
+    transport: Optional[httpx.AsyncBaseTransport] = None
+) -> list[httpx.AsyncClient]:
+    clients = []
+    for email, _ in [u for u in users if u[1] == role][:count]:
+        client = httpx.AsyncClient(base_url=base_url, timeout=30, transport=transport)
+        response = await client.post("/api/v1/auth/login", json={"identifier": email, "password": BENCH_PASSWORD})
+        response.raise_for_status()
+        clients.append(client)
+    if not clients: raise SystemExit(f"Nenhum usuário {role} no banco. Rode scripts.bench_seed antes.")
+    return clients
+
+
+async def load_context(users: int) -> dict:
+    conn = await asyncpg.connect(os.getenv("DATABASE_URL"))
+    try:
+        rows = await conn.fetch(
+            "SELECT id, sale_price FROM products WHERE sku LIKE 'bench-%' AND sale_price > 0 LIMIT 2000"
+        )
+    finally:
+        await conn.close()
+    return {"users": bench_users(users), "products": [(str(r["id"]), r["sale_price"]) for r in rows]}
+
+
+async def run(args: argparse.Namespace, base_url: str) -> dict:
+    ctx = await load_context(args.users)
+    sessions: dict[Optional[str], list[httpx.AsyncClient]] = {
+        None: [httpx.AsyncClient(base_url=base_url, timeout=30) for _ in range(args.concurrency)],
+        "CAIXA": await open_sessions(base_url, ctx["users"], "CAIXA", args.concurrency),
+        "GERENTE": await open_sessions(base_url, ctx["users"], "GERENTE", args.concurrency),
+    }
+
+    results = {}
+    try:
+        for name in args.scenarios:
+            scenario, role = SCENARIOS[name]
+            results[name] = await run_scenario(scenario, sessions[role], ctx, args.concurrency, args.duration)
+            print(f"[BENCH] {name}: {json.dumps(results[name])}")
+    finally:
+        for clients in sessions.values():
+            for client in clients:
+                await client.aclose()
+    return results
+
+
+def start_server(port: int, workers: int) -> subprocess.Popen:
+    env = {**os.environ, "ACCESS_LOG_SAMPLE_RATE": "0"}
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        env=env
+    )
+
+
+def wait_until_up(base_url: str, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(base_url + "/", timeout=1).status_code == 200: return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise SystemExit(f"API não respondeu em {timeout:.0f}s")
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for name, result in current["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if not base or "p95_ms" not in base or "p95_ms" not in result: continue
+        if result["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {base['p95_ms']}ms -> {result['p95_ms']}ms")
+        if result["rps"] < base["rps"] * (1 - tolerance):
+            regressions.append(f"{name}: rps {base['rps']} -> {result['rps']}")
+        if result["error_rate"] > base["error_rate"] + 0.01:
+            regressions.append(f"{name}: erros {base['error_rate']:.2%} -> {result['error_rate']:.2%}")
+    return regressions
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de carga: login, leitura de produto, checkout e relatórios")
+    parser.add_argument("--url", help="API já em execução (não sobe o uvicorn)")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--users", type=int, default=50, help="Mesmo valor usado no bench_seed")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20.0, help="Segundos por cenário")
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=list(SCENARIOS))
+    parser.add_argument("--output", default="bench-results.json")
+    parser.add_argument("--compare", help="Baseline JSON para detectar regressões")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    args = parser.parse_args()
+
+    base_url = args.url or f"http://127.0.0.1:{args.port}"
+    server = None if args.url else start_server(args.port, args.workers)
+    try:
+        wait_until_up(base_url)
+        scenarios = asyncio.run(run(args, base_url))
+    finally:
+        if server:
+            server.terminate()
+            server.wait(timeout=30)
+
+    result = {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "workers": args.workers,
+        },
+        "scenarios": scenarios,
+    }
+    with open(args.output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"[BENCH] resultado salvo em {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(result, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"[REGRESSÃO] {line}")
+        if regressions: raise SystemExit(1)
@@ -0,0 +1,88 @@
+from dotenv import load_dotenv
+from src.model import product as product_model
+from src import util
+import statistics
+import argparse
+import asyncio
+import asyncpg
+import random
+import json
+import time
+import os
+
+
+load_dotenv()
+
+WORDS = [
+    "coca", "cola", "pao", "frances", "queijo", "presunto", "cerveja", "pilsen",
+    "agua", "mineral", "guarana", "suco", "laranja", "uva", "leite", "integral",
+    "cafe", "acucar", "arroz", "feijao", "carioca", "macarrao", "biscoito", "chocolate"
+]
+ACCENTED = {"pao": "pão", "frances": "francês", "agua": "água", "guarana": "guaraná", "acucar": "açúcar", "feijao": "feijão", "macarrao": "macarrão"}
+SIZES = ["2l", "1l", "350ml", "600ml", "500g", "1kg", "lata", "pet"]
+QUERIES = ["coca 2l", "pao frances", "pão", "cerveja lata", "agua min", "guarana 2", "leite int", "cafe 500g"]
+
+
+def fake_name(i: int) -> str:
+    words = random.sample(WORDS, 2)
+    words = [ACCENTED.get(w, w) for w in words]
+    return f"{' '.join(words).title()} {random.choice(SIZES)} #{i}"
+
+
+async def seed(conn: asyncpg.Connection, total: int) -> None:
+    existing = await conn.fetchval("SELECT COUNT(*) FROM products WHERE sku LIKE 'bench-%'")
+    if existing >= total:
+        return
+
+    category_id = await conn.fetchval("SELECT id FROM categories ORDER BY id LIMIT 1")
+    records = [
+        (fake_name(i), f"bench-{i}", category_id)
+        for i in range(existing, total)
+    ]
+    await conn.copy_records_to_table(
+        "products",
+        records=records,
+        columns=["name", "sku", "category_id"]
+    )
+    await conn.execute("ANALYZE products")
+    print(f"[SEED] {len(records)} produtos inseridos")
+
+
+async def run(total: int, iterations: int) -> dict:
+    conn = await asyncpg.connect(
+        os.getenv("DATABASE_URL"),
+        # Dados sintéticos na loja padrão, criada por insertions.sql
+        server_settings={"pg_trgm.word_similarity_threshold": "0.4", "app.current_tenant_id": "1"}
+    )
+    try:
+        await seed(conn, total)
+        timings = []
+        for _ in range(iterations):
+            term = util.normalize_search_term(random.choice(QUERIES))
+            start = time.perf_counter()
+            await product_model.search_products(term, util.escape_like(term) + '%', 20, conn)
+            timings.append((time.perf_counter() - start) * 1000)
+    finally:
+        await conn.close()
+
+    quantiles = statistics.quantiles(timings, n=100)
+    return {
+        "products": total,
+        "iterations": iterations,
+        "p50_ms": round(quantiles[49], 3),
+        "p95_ms": round(quantiles[94], 3),
+        "p99_ms": round(quantiles[98], 3),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark da busca de produtos (sem cache)")
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--iterations", type=int, default=2_000)
+    parser.add_argument("--max-p99-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.products, args.iterations))
+    print(json.dumps(result, indent=2))
+    if result["p99_ms"] > args.max_p99_ms:
+        raise SystemExit(f"p99 acima do limite de {args.max_p99_ms}ms")
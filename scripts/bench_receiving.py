@@ -0,0 +1,113 @@
+"""
+Benchmark do recebimento de nota (model.receiving.apply_receipt) com uma
+nota de --lines linhas sobre produtos do bench_seed. Cada iteração roda
+numa transação desfeita no fim, então o banco não muda entre execuções.
+
+    python -m scripts.bench_receiving --lines 300 --iterations 200
+"""
+from dotenv import load_dotenv
+from datetime import date, timedelta
+from decimal import Decimal
+from src.schemas.receiving import ReceivingCreate, ReceivingItem
+from src.model import receiving as receiving_model
+import statistics
+import argparse
+import asyncio
+import asyncpg
+import random
+import json
+import time
+import uuid
+import os
+
+
+load_dotenv()
+
+BENCH_SUPPLIER = "Fornecedor Bench"
+
+
+async def load_products(conn: asyncpg.Connection, lines: int) -> list[asyncpg.Record]:
+    rows = await conn.fetch(
+        """
+            SELECT id, purchase_price
+            FROM products
+            WHERE sku LIKE 'bench-%' AND purchase_price > 0 AND sale_price >= purchase_price
+            LIMIT $1
+        """,
+        lines
+    )
+    if len(rows) < lines:
+        raise SystemExit(f"Só {len(rows)} produtos com preço. Rode scripts.bench_seed com mais produtos.")
+    return rows
+
+
+def delivery(supplier_id: uuid.UUID, products: list[asyncpg.Record]) -> ReceivingCreate:
+    # Custo da nota até 10% abaixo do atual: o custo médio nunca passa do preço de venda
+    expiration = date.today() + timedelta(days=90)
+    return ReceivingCreate(
+        supplier_id=supplier_id,
+        invoice_number=f"bench-{uuid.uuid4().hex[:12]}",
+        items=[
+            ReceivingItem(
+                product_id=p["id"],
+                quantity=Decimal(random.randint(1, 48)),
+                unit_cost=(p["purchase_price"] * Decimal(random.uniform(0.9, 1.0))).quantize(Decimal("0.01")),
+                batch_code=f"L{i:04d}" if i % 2 else None,
+                expiration_date=expiration if i % 2 else None
+            )
+            for i, p in enumerate(products)
+        ]
+    )
+
+
+async def run(lines: int, iterations: int) -> dict:
+    # Dados sintéticos na loja padrão, criada por insertions.sql
+    conn = await asyncpg.connect(os.getenv("DATABASE_URL"), server_settings={"app.current_tenant_id": "1"})
+    try:
+        supplier_id = await conn.fetchval(
+            """
+                INSERT INTO suppliers (name) VALUES ($1)
+                ON CONFLICT (tenant_id, name) DO UPDATE SET name = EXCLUDED.name
+                RETURNING id
+            """,
+            BENCH_SUPPLIER
+        )
+        products = await load_products(conn, lines)
+
+        timings = []
+        for _ in range(iterations):
+            receipt = delivery(supplier_id, random.sample(products, lines))
+            tr = conn.transaction()
+            await tr.start()
+            try:
+                start = time.perf_counter()
+                row = await receiving_model.apply_receipt(receipt, None, conn)
+                timings.append((time.perf_counter() - start) * 1000)
+            finally:
+                await tr.rollback()
+            if row["receipt_id"] is None:
+                raise SystemExit(f"Nota recusada: {dict(row)}")
+    finally:
+        await conn.close()
+
+    quantiles = statistics.quantiles(timings, n=100)
+    return {
+        "lines": lines,
+        "iterations": iterations,
+        "p50_ms": round(quantiles[49], 3),
+        "p95_ms": round(quantiles[94], 3),
+        "p99_ms": round(quantiles[98], 3),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark do recebimento de nota de fornecedor")
+    parser.add_argument("--lines", type=int, default=300)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--max-p95-ms", type=float, default=100.0)
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.lines, args.iterations))
+    print(json.dumps(result, indent=2))
+    if result["p95_ms"] > args.max_p95_ms:
+        raise SystemExit(f"p95 acima do limite de {args.max_p95_ms}ms")
@@ -0,0 +1,167 @@
+"""
+Popula um Postgres local com dados sintéticos para o benchmark de carga.
+
+    python -m scripts.bench_seed --users 50 --products 100000 --sales 1000000
+
+Tudo entra via COPY (copy_records_to_table) em lotes gerados sob demanda.
+Rodar de novo só completa o que falta.
+"""
+from dotenv import load_dotenv
+from datetime import datetime, timedelta
+from decimal import Decimal
+from scripts.bench_product_search import fake_name
+from src.db.db import db, SQL_DIR, MIGRATION_FILES
+from src import security
+import argparse
+import asyncio
+import asyncpg
+import random
+import uuid
+import time
+import os
+
+
+load_dotenv()
+
+BENCH_PASSWORD = "bench-password"
+CHUNK = 50_000
+
+
+def bench_users(total: int) -> list[tuple[str, str]]:
+    """(email, perfil) dos usuários do benchmark: 1 gerente para cada 5 caixas."""
+    users = []
+    for i in range(total):
+        role = "GERENTE" if i % 6 == 0 else "CAIXA"
+        users.append((f"bench-{role.lower()}-{i}@bench.example.com", role))
+    return users
+
+
+async def init_schema(conn: asyncpg.Connection) -> None:
+    exists = await conn.fetchval("SELECT to_regclass('public.products') IS NOT NULL")
+    if exists: return
+    for name in MIGRATION_FILES:
+        await db.execute_sql_file(SQL_DIR / f"{name}.sql", conn)
+
+
+async def copy_chunked(conn: asyncpg.Connection, table: str, columns: list[str], records, total: int) -> None:
+    start = time.perf_counter()
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) == CHUNK:
+            await conn.copy_records_to_table(table, records=chunk, columns=columns)
+            chunk = []
+    if chunk:
+        await conn.copy_records_to_table(table, records=chunk, columns=columns)
+    print(f"[SEED] {table}: {total} linhas em {time.perf_counter() - start:.1f}s")
+
+
+async def seed_users(conn: asyncpg.Connection, total: int) -> None:
+    existing = await conn.fetchval("SELECT COUNT(*) FROM users WHERE email LIKE 'bench-%'")
+    if existing >= total: return
+
+    # Um único hash argon2 reaproveitado: o custo do hash não é o que estamos medindo aqui
+    password_hash = security.hash_password(BENCH_PASSWORD)
+    records = [
+        (f"Bench {i}", email, password_hash, role)
+        for i, (email, role) in enumerate(bench_users(total))
+        if i >= existing
+    ]
+    await copy_chunked(conn, "users", ["name", "email", "password_hash", "role"], records, len(records))
+
+
+async def seed_products(conn: asyncpg.Connection, total: int) -> None:
+    existing = await conn.fetchval("SELECT COUNT(*) FROM products WHERE sku LIKE 'bench-%'")
+    if existing >= total: return
+
+    category_id = await conn.fetchval("SELECT id FROM categories ORDER BY id LIMIT 1")
+
+    def records():
+        for i in range(existing, total):
+            cost = Decimal(random.randint(50, 5000)) / 100
+            yield (
+                fake_name(i),
+                f"bench-{i}",
+                f"{7890000000000 + i}",
+                category_id,
+                cost,
+                (cost * Decimal("1.4")).quantize(Decimal("0.01")),
+                Decimal(random.randint(0, 500))
+            )
+
+    await copy_chunked(
+        conn,
+        "products",
+        ["name", "sku", "gtin", "category_id", "purchase_price", "sale_price", "stock_quantity"],
+        records(),
+        total - existing
+    )
+
+
+async def seed_sales(conn: asyncpg.Connection, total: int) -> None:
+    existing = await conn.fetchval("SELECT COUNT(*) FROM sales")
+    if existing >= total: return
+
+    users = [r["id"] for r in await conn.fetch("SELECT id FROM users WHERE email LIKE 'bench-%'")]
+    products = await conn.fetch(
+        "SELECT id, purchase_price, sale_price FROM products WHERE sku LIKE 'bench-%'"
+    )
+    missing = total - existing
+    now = datetime.now()
+    started = time.perf_counter()
+
+    # Em lotes: venda, item e movimentação de estoque de cada lote apontam uns
+    # para os outros, sem manter 1M de linhas em memória
+    for offset in range(0, missing, CHUNK):
+        sales, items, movements = [], [], []
+        for _ in range(min(CHUNK, missing - offset)):
+            sale_id = uuid.uuid4()
+            product = random.choice(products)
+            quantity = Decimal(random.randint(1, 5))
+            amount = quantity * product["sale_price"]
+            created_at = now - timedelta(minutes=random.randint(0, 60 * 24 * 365))
+            salesperson = random.choice(users)
+            sales.append((sale_id, amount, Decimal("0"), amount, "CONCLUIDA", salesperson, created_at, created_at))
+            items.append((sale_id, product["id"], quantity, product["sale_price"], product["purchase_price"]))
+            movements.append((product["id"], "VENDA", -quantity, sale_id, salesperson, created_at))
+
+        await conn.copy_records_to_table(
+            "sales",
+            records=sales,
+            columns=["id", "subtotal", "total_discount", "total_amount", "status", "salesperson_id", "created_at", "finished_at"]
+        )
+        await conn.copy_records_to_table(
+            "sale_items",
+            records=items,
+            columns=["sale_id", "product_id", "quantity", "unit_sale_price", "unit_cost_price"]
+        )
+        await conn.copy_records_to_table(
+            "stock_movements",
+            records=movements,
+            columns=["product_id", "type", "quantity", "reference_id", "created_by", "created_at"]
+        )
+
+    print(f"[SEED] sales, sale_items, stock_movements: {missing} linhas cada em {time.perf_counter() - started:.1f}s")
+
+
+async def run(users: int, products: int, sales: int) -> None:
+    # Dados sintéticos na loja padrão, criada por insertions.sql
+    conn = await asyncpg.connect(os.getenv("DATABASE_URL"), server_settings={"app.current_tenant_id": "1"})
+    try:
+        await init_schema(conn)
+        await seed_users(conn, users)
+        await seed_products(conn, products)
+        await seed_sales(conn, sales)
+        await conn.execute("ANALYZE")
+    finally:
+        await conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Dados sintéticos para o benchmark de carga")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--sales", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.users, args.products, args.sales))
@@ -0,0 +1,109 @@
+"""
+Benchmark das validações de coluna (src.validation) com --count CPFs e
+CNPJs gerados, metade com máscara e uma parte inválida. Antes de medir,
+confere cada resultado contra uma implementação direta do módulo 11.
+
+    python -m scripts.bench_validation --count 1000000
+"""
+from src import validation
+import argparse
+import random
+import json
+import time
+import re
+
+
+def reference_check(digits: list[int], weights: list[int]) -> int:
+    rest = sum(d * w for d, w in zip(digits, weights)) % 11
+    return 0 if rest < 2 else 11 - rest
+
+
+def reference_cpf(value: str) -> bool:
+    digits = [int(c) for c in re.sub(r"\D", "", value)]
+    if len(digits) != 11 or len(set(digits)) == 1: return False
+    return (
+        digits[9] == reference_check(digits[:9], list(range(10, 1, -1))) and
+        digits[10] == reference_check(digits[:10], list(range(11, 1, -1)))
+    )
+
+
+def reference_cnpj(value: str) -> bool:
+    chars = re.sub(r"[^0-9A-Z]", "", value.upper())
+    if len(chars) != 14 or len(set(chars)) == 1 or not chars[12:].isdigit(): return False
+    digits = [ord(c) - 48 for c in chars]
+    first = [5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2]
+    return (
+        digits[12] == reference_check(digits[:12], first) and
+        digits[13] == reference_check(digits[:13], [6] + first)
+    )
+
+
+def fake_cpf() -> str:
+    digits = [random.randint(0, 9) for _ in range(9)]
+    digits.append(reference_check(digits, list(range(10, 1, -1))))
+    digits.append(reference_check(digits, list(range(11, 1, -1))))
+    if random.random() < 0.05: digits[10] = (digits[10] + 1) % 10
+    value = "".join(map(str, digits))
+    return validation.format_cpf(value) if random.random() < 0.5 else value
+
+
+def fake_cnpj() -> str:
+    alphabet = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ" if random.random() < 0.2 else "0123456789"
+    chars = [random.choice(alphabet) for _ in range(12)]
+    first = [5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2]
+    values = [ord(c) - 48 for c in chars]
+    values.append(reference_check(values, first))
+    values.append(reference_check(values, [6] + first))
+    if random.random() < 0.05: values[13] = (values[13] + 1) % 10
+    value = "".join(chars) + f"{values[12]}{values[13]}"
+    return validation.format_cnpj(value) if random.random() < 0.5 else value
+
+
+def legacy_cpf(value: str) -> bool:
+    # O que util.validate_cpf fazia antes: só tamanho e dígitos repetidos
+    digits = ''
+    for x in value:
+        if x.isdigit(): digits += x
+    return len(digits) == 11 and digits != digits[0] * 11
+
+
+def measure(fn, *args) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def run(count: int) -> dict:
+    cpfs = [fake_cpf() for _ in range(count)]
+    cnpjs = [fake_cnpj() for _ in range(count)]
+
+    column_cpf, (cleaned, errors) = measure(validation.clean_cpf_column, cpfs)
+    for i, value in enumerate(cpfs):
+        if reference_cpf(value) != (cleaned[i] is not None):
+            raise SystemExit(f"CPF divergente da referência: {value}")
+    column_cnpj, (cleaned_cnpj, cnpj_errors) = measure(validation.clean_cnpj_column, cnpjs)
+    for i, value in enumerate(cnpjs):
+        if reference_cnpj(value) != (cleaned_cnpj[i] is not None):
+            raise SystemExit(f"CNPJ divergente da referência: {value}")
+
+    single_cpf, _ = measure(lambda: [validation.is_valid_cpf(v) for v in cpfs])
+    legacy, _ = measure(lambda: [legacy_cpf(v) for v in cpfs])
+    return {
+        "count": count,
+        "cpf_invalid": len(errors),
+        "cnpj_invalid": len(cnpj_errors),
+        "cpf_column_s": round(column_cpf, 3),
+        "cnpj_column_s": round(column_cnpj, 3),
+        "cpf_per_value_s": round(single_cpf, 3),
+        "legacy_cpf_loop_s": round(legacy, 3),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark da validação de CPF/CNPJ em lote")
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    print(json.dumps(run(args.count), indent=2))
@@ -12,6 +12,7 @@ async def create_superuser():
     conn = await asyncpg.connect(os.getenv("DATABASE_URL"))
     try:
         print("[ADMIN]")
+        tenant_id = int(input("loja (id): ").strip())
         name = input("nome: ").strip()
         email = input("email: ").strip()
         phone = input("telefone: ").strip()
@@ -20,6 +21,7 @@ async def create_superuser():
         role = "ADMIN"  
         await conn.execute("""
             INSERT INTO users (
+                tenant_id,
                 name,
                 email,
                 password_hash,
@@ -30,12 +32,15 @@ async def create_superuser():
                 $1,
                 $2,
                 $3,
-                $4
+                $4,
+                $5,
+                $6
             )
             ON CONFLICT
                 (email)
             DO NOTHING
         """,
+        tenant_id,
         name,
         email,
         hashed,
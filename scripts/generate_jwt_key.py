@@ -0,0 +1,42 @@
+"""
+Gera uma chave de assinatura dos JWT em JWT_KEYS_DIR (ou --dir). O nome do
+arquivo é o kid; com a data como kid, a mais nova vira a ativa quando
+JWT_ACTIVE_KID não está definido.
+
+    python -m scripts.generate_jwt_key --kid 2026-10 --algorithm EdDSA
+"""
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+from dotenv import load_dotenv
+import argparse
+import os
+
+
+load_dotenv()
+
+
+def generate(directory: str, kid: str, algorithm: str) -> str:
+    key = ed25519.Ed25519PrivateKey.generate() if algorithm == "EdDSA" else ec.generate_private_key(ec.SECP256R1())
+    pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption()
+    )
+    path = os.path.join(directory, f"{kid}.pem")
+    os.makedirs(directory, exist_ok=True)
+    # O_EXCL: falha se o kid já existe; 0600: só o dono do processo lê a chave privada
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(pem)
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera uma chave privada Ed25519 ou P-256 para os JWT")
+    parser.add_argument("--dir", default=os.getenv("JWT_KEYS_DIR"))
+    parser.add_argument("--kid", required=True)
+    parser.add_argument("--algorithm", choices=["EdDSA", "ES256"], default="EdDSA")
+    args = parser.parse_args()
+
+    if not args.dir: raise SystemExit("Informe --dir ou defina JWT_KEYS_DIR")
+    print(generate(args.dir, args.kid, args.algorithm))
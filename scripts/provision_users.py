@@ -0,0 +1,87 @@
+"""
+Cadastro de funcionários em lote e troca de perfil, direto no banco.
+
+    python -m scripts.provision_users import equipe.csv --tenant 1
+    python -m scripts.provision_users import equipe.json --tenant 2 --dry-run
+    python -m scripts.provision_users role fulano@loja.com GERENTE
+
+O arquivo tem os campos de UserCreate (name, email, role, password, phone,
+cpf, ...). Passa pela mesma validação e pelo mesmo insert em lote do
+endpoint POST /api/v1/admin/users/provision.
+"""
+from dotenv import load_dotenv
+from pathlib import Path
+from src.controller import user_provision
+from src.model import user_provision as provision_model
+from src.schemas.enums import UserRole
+import contextlib
+import argparse
+import asyncio
+import asyncpg
+import sys
+import os
+
+
+load_dotenv()
+
+
+async def provision(path: Path, tenant_id: int, dry_run: bool) -> int:
+    rows = user_provision.parse_source(path.read_bytes(), path.name)
+    # Os usuários entram na loja informada (default de users.tenant_id)
+    conn = await asyncpg.connect(os.getenv("DATABASE_URL"), server_settings={"app.current_tenant_id": str(tenant_id)})
+
+    @contextlib.asynccontextmanager
+    async def connect():
+        tr = conn.transaction()
+        await tr.start()
+        try:
+            yield conn
+        except BaseException:
+            await tr.rollback()
+            raise
+        if dry_run: await tr.rollback()
+        else: await tr.commit()
+
+    try:
+        result = await user_provision.provision_users(rows, connect)
+    finally:
+        await conn.close()
+
+    for row in result.rows:
+        detail = row.user_id if row.user_id else row.message
+        print(f"[{row.status.value:8}] linha {row.line:>4} {row.email or '-'}: {detail}")
+    suffix = " (simulação, nada gravado)" if dry_run else ""
+    print(f"[PROVISIONAMENTO] {result.created} criados, {result.failed} com problema, {result.total} no total{suffix}")
+    return 1 if result.failed else 0
+
+
+async def set_role(email: str, role: UserRole) -> int:
+    conn = await asyncpg.connect(os.getenv("DATABASE_URL"))
+    try:
+        user_id = await provision_model.set_role(email, role.value, conn)
+    finally:
+        await conn.close()
+    if user_id is None:
+        print(f"Usuário não encontrado: {email}")
+        return 1
+    print(f"{email} agora é {role.value} ({user_id})")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Provisionamento de usuários em lote")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    load = commands.add_parser("import", help="Cria os usuários de um CSV ou JSON")
+    load.add_argument("file", type=Path)
+    load.add_argument("--tenant", type=int, required=True, help="Loja (tenants.id) dos usuários criados")
+    load.add_argument("--dry-run", action="store_true", help="Valida e mostra o resultado sem gravar")
+
+    role = commands.add_parser("role", help="Troca o perfil de um usuário")
+    role.add_argument("email")
+    role.add_argument("role", choices=[r.value for r in UserRole])
+
+    args = parser.parse_args()
+    if args.command == "import":
+        sys.exit(asyncio.run(provision(args.file, args.tenant, args.dry_run)))
+    sys.exit(asyncio.run(set_role(args.email, UserRole(args.role))))
@@ -0,0 +1,38 @@
+"""
+Gera o índice local de CEP a partir de um CSV de referência (faixas ou
+CEPs com city, ibge_city_code e state) e troca o arquivo de forma atômica.
+Os workers em execução percebem a troca em até CEP_RELOAD_INTERVAL segundos.
+
+    python -m scripts.refresh_cep_index --source base_cep.csv
+    python -m scripts.refresh_cep_index --check 88010000 01310100
+"""
+from dotenv import load_dotenv
+from pathlib import Path
+from src.constants import Constants
+from src import cep
+import argparse
+import time
+
+
+load_dotenv()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Atualiza o índice local de CEP")
+    parser.add_argument("--source", type=Path, default=cep.SAMPLE_PATH, help="CSV de referência (padrão: amostra do projeto)")
+    parser.add_argument("--output", type=Path, default=Path(Constants.CEP_INDEX_PATH))
+    parser.add_argument("--check", nargs="*", default=[], help="CEPs para conferir no índice gerado")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    with open(args.source, newline="", encoding="utf-8-sig") as f:
+        ranges = cep.read_source(f)
+    data = cep.build_index(ranges)
+    cep.write_index(args.output, data)
+    print(f"[CEP] {len(ranges)} linhas -> {args.output} ({len(data)} bytes) em {time.perf_counter() - start:.2f}s")
+
+    index = cep.CepIndex(args.output)
+    index.load()
+    for zip_code in args.check:
+        entry = index.lookup(zip_code)
+        print(f"[CEP] {zip_code}: " + (f"{entry.city}/{entry.state} ({entry.ibge_city_code})" if entry else "não encontrado"))
@@ -0,0 +1,166 @@
+"""
+Reinício gradual sob carga. Sobe --instances workers (uvicorn) e usa um
+balanceador no próprio cliente que só manda tráfego para instâncias com
+/health/ready 200, como o balanceador de produção. Com checkout e busca
+rodando, reinicia uma instância por vez (SIGTERM, espera sair, sobe de novo)
+e no fim exige zero requisições com erro.
+
+    python -m scripts.rolling_restart_check --instances 2 --concurrency 16 --rounds 2
+
+Precisa do banco populado por scripts.bench_seed.
+"""
+from dotenv import load_dotenv
+from typing import Optional
+from scripts.bench_load import checkout, scan, load_context, open_sessions
+import subprocess
+import argparse
+import asyncio
+import random
+import httpx
+import json
+import sys
+import os
+
+
+load_dotenv()
+
+
+class Instance:
+
+    def __init__(self, port: int, drain_delay: float):
+        self.port = port
+        self.drain_delay = drain_delay
+        self.process: Optional[subprocess.Popen] = None
+        self.ready = False
+
+    def start(self) -> None:
+        env = {**os.environ, "ACCESS_LOG_SAMPLE_RATE": "0", "SHUTDOWN_DRAIN_DELAY": str(self.drain_delay)}
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--port", str(self.port), "--log-level", "warning"],
+            env=env
+        )
+
+    async def stop(self) -> int:
+        self.process.terminate()
+        return await asyncio.to_thread(self.process.wait, 60)
+
+
+class BalancedTransport(httpx.AsyncBaseTransport):
+    """Reescreve a porta de cada requisição para uma instância pronta (round-robin)."""
+
+    def __init__(self, instances: list[Instance]):
+        self.instances = instances
+        self.inner = httpx.AsyncHTTPTransport()
+        self._next = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        for _ in range(200):
+            ready = [i for i in self.instances if i.ready]
+            if ready: break
+            await asyncio.sleep(0.05)
+        else:
+            raise httpx.ConnectError("Nenhuma instância pronta", request=request)
+
+        self._next += 1
+        instance = ready[self._next % len(ready)]
+        request.url = request.url.copy_with(port=instance.port)
+        return await self.inner.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+async def poll_readiness(instances: list[Instance], stop: asyncio.Event) -> None:
+    async with httpx.AsyncClient(timeout=0.5) as client:
+        while not stop.is_set():
+            for instance in instances:
+                try:
+                    response = await client.get(f"http://127.0.0.1:{instance.port}/health/ready")
+                    instance.ready = response.status_code == 200
+                except httpx.HTTPError:
+                    instance.ready = False
+            await asyncio.sleep(0.1)
+
+
+async def wait_ready(instance: Instance, timeout: float = 60.0) -> None:
+    for _ in range(int(timeout / 0.1)):
+        if instance.ready: return
+        await asyncio.sleep(0.1)
+    raise SystemExit(f"Instância :{instance.port} não ficou pronta em {timeout:.0f}s")
+
+
+async def run(args: argparse.Namespace) -> dict:
+    instances = [Instance(args.port + i, args.drain_delay) for i in range(args.instances)]
+    for instance in instances:
+        instance.start()
+
+    stop_polling = asyncio.Event()
+    poller = asyncio.create_task(poll_readiness(instances, stop_polling))
+    transport = BalancedTransport(instances)
+
+    stats = {"requests": 0, "failures": 0, "restarts": 0}
+    failures: list[str] = []
+    stop_load = asyncio.Event()
+
+    async def worker(client: httpx.AsyncClient, ctx: dict) -> None:
+        while not stop_load.is_set():
+            scenario = checkout if random.random() < 0.5 else scan
+            stats["requests"] += 1
+            try:
+                response = await scenario(client, ctx)
+                if response.status_code >= 400:
+                    stats["failures"] += 1
+                    failures.append(f"{scenario.__name__}: HTTP {response.status_code} {response.text[:200]}")
+            except httpx.HTTPError as e:
+                stats["failures"] += 1
+                failures.append(f"{scenario.__name__}: {type(e).__name__} {e}")
+
+    try:
+        for instance in instances:
+            await wait_ready(instance)
+
+        ctx = await load_context(args.users)
+        clients = await open_sessions("http://127.0.0.1", ctx["users"], "CAIXA", args.concurrency, transport)
+        load = [asyncio.create_task(worker(clients[i % len(clients)], ctx)) for i in range(args.concurrency)]
+
+        await asyncio.sleep(args.warmup)
+        for _ in range(args.rounds):
+            for instance in instances:
+                code = await instance.stop()
+                print(f"[ROLLING] :{instance.port} saiu com código {code}")
+                instance.ready = False
+                instance.start()
+                await wait_ready(instance)
+                stats["restarts"] += 1
+                await asyncio.sleep(args.pause)
+
+        stop_load.set()
+        await asyncio.gather(*load)
+        for client in clients:
+            await client.aclose()
+    finally:
+        stop_polling.set()
+        await poller
+        await transport.aclose()
+        for instance in instances:
+            if instance.process and instance.process.poll() is None:
+                await instance.stop()
+
+    return {**stats, "sample_failures": failures[:10]}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Confere que um reinício gradual não derruba requisições")
+    parser.add_argument("--instances", type=int, default=2)
+    parser.add_argument("--port", type=int, default=8920)
+    parser.add_argument("--users", type=int, default=50, help="Mesmo valor usado no bench_seed")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=1, help="Quantas vezes reiniciar cada instância")
+    parser.add_argument("--drain-delay", type=float, default=2.0, help="SHUTDOWN_DRAIN_DELAY das instâncias")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Segundos de carga antes do primeiro reinício")
+    parser.add_argument("--pause", type=float, default=2.0, help="Segundos entre reinícios")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    if result["failures"]: raise SystemExit(1)
@@ -0,0 +1,167 @@
+from typing import Iterable, Optional, TextIO
+from bisect import bisect_right
+from array import array
+from pathlib import Path
+from src.constants import Constants
+from src.log import get_logger
+from src import validation
+import struct
+import mmap
+import time
+import csv
+import os
+
+
+logger = get_logger("cep")
+
+# Cabeçalho: assinatura, número de faixas, número de cidades. Tudo na ordem de
+# bytes nativa: o índice é gerado na mesma arquitetura que vai lê-lo
+_MAGIC = b"CEP1"
+_HEADER = struct.Struct("=4sII")
+
+SAMPLE_PATH = Path(__file__).parent / "data" / "cep_sample.csv"
+
+
+class CepEntry:
+
+    __slots__ = ("city", "ibge_city_code", "state")
+
+    def __init__(self, city: str, ibge_city_code: str, state: str):
+        self.city = city
+        self.ibge_city_code = ibge_city_code
+        self.state = state
+
+
+def read_source(file: TextIO) -> list[tuple[int, int, CepEntry]]:
+    """
+    Lê a base de referência em CSV: uma linha por faixa (cep_start, cep_end)
+    ou por CEP (cep), mais city, ibge_city_code e state.
+    """
+    sample = file.read(4096)
+    file.seek(0)
+    try:
+        dialect = csv.Sniffer().sniff(sample.split("\n", 1)[0], delimiters=",;\t")
+    except csv.Error:
+        dialect = csv.excel
+
+    ranges = []
+    for row in csv.DictReader(file, dialect=dialect):
+        start = row.get("cep_start") or row.get("cep")
+        end = row.get("cep_end") or start
+        entry = CepEntry(row["city"].strip(), row["ibge_city_code"].strip(), row["state"].strip().upper())
+        ranges.append((int(validation.validate_cep(start)), int(validation.validate_cep(end)), entry))
+    return ranges
+
+
+def build_index(ranges: Iterable[tuple[int, int, CepEntry]]) -> bytes:
+    """
+    Serializa as faixas ordenadas em três vetores paralelos (início, fim,
+    cidade) mais a tabela de cidades. Faixas vizinhas da mesma cidade viram
+    uma só; sobreposição é erro na base de origem.
+    """
+    cities: dict[tuple[str, str, str], int] = {}
+    starts, ends, owners = array("I"), array("I"), array("H")
+    for start, end, entry in sorted(ranges, key=lambda r: r[0]):
+        if end < start: raise ValueError(f"Faixa invertida: {start:08d}-{end:08d}")
+        if ends and start <= ends[-1]: raise ValueError(f"Faixas sobrepostas em {start:08d}")
+        city = cities.setdefault((entry.ibge_city_code, entry.state, entry.city), len(cities))
+        if ends and start == ends[-1] + 1 and owners[-1] == city:
+            ends[-1] = end
+            continue
+        starts.append(start)
+        ends.append(end)
+        owners.append(city)
+
+    if len(owners) % 2: owners.append(0)  # mantém a tabela de cidades alinhada em 4 bytes
+    table = "\n".join(";".join(key) for key in cities).encode()
+    return b"".join((
+        _HEADER.pack(_MAGIC, len(starts), len(cities)),
+        starts.tobytes(), ends.tobytes(), owners.tobytes(), table
+    ))
+
+
+def write_index(path: Path, data: bytes) -> None:
+    # Troca atômica: workers com o arquivo antigo mapeado continuam lendo o antigo
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class CepIndex:
+    """
+    Base CEP -> (cidade, código IBGE, UF) local, para preencher e conferir
+    endereços sem consultar serviço externo. O arquivo gerado por
+    scripts.refresh_cep_index é mapeado em memória (as páginas são
+    compartilhadas entre os workers) e a busca é uma bisseção nas faixas.
+    Sem o arquivo, usa a amostra que vem com o projeto.
+    """
+
+    def __init__(self, path: str | Path = Constants.CEP_INDEX_PATH, reload_interval: float = Constants.CEP_RELOAD_INTERVAL):
+        self.path = Path(path)
+        self.reload_interval = reload_interval
+        self.starts: memoryview | array = array("I")
+        self.ends: memoryview | array = array("I")
+        self.owners: memoryview | array = array("H")
+        self.cities: list[CepEntry] = []
+        self._mtime: Optional[float] = None
+        self._checked_at: Optional[float] = None
+
+    def _open(self, buffer) -> None:
+        magic, count, _ = _HEADER.unpack_from(buffer)
+        if magic != _MAGIC: raise ValueError(f"{self.path} não é um índice de CEP")
+        view = memoryview(buffer)
+        offset = _HEADER.size
+        starts = view[offset:offset + 4 * count].cast("I")
+        offset += 4 * count
+        ends = view[offset:offset + 4 * count].cast("I")
+        offset += 4 * count
+        padded = count + count % 2
+        owners = view[offset:offset + 2 * padded].cast("H")
+        offset += 2 * padded
+        cities = []
+        for line in bytes(view[offset:]).decode().split("\n"):
+            ibge_city_code, state, city = line.split(";", 2)
+            cities.append(CepEntry(city, ibge_city_code, state))
+        self.starts, self.ends, self.owners, self.cities = starts, ends, owners, cities
+
+    def load(self) -> None:
+        try:
+            mtime = self.path.stat().st_mtime
+        except FileNotFoundError:
+            if self._mtime is None and not self.cities:
+                logger.warning("Índice de CEP não encontrado em %s; usando a amostra", self.path)
+                with open(SAMPLE_PATH, newline="", encoding="utf-8") as f:
+                    self._open(build_index(read_source(f)))
+            return
+
+        with open(self.path, "rb") as f:
+            # O mmap continua válido depois do close; some quando as views deixarem de existir
+            self._open(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        self._mtime = mtime
+        logger.info("Índice de CEP carregado: %d faixas, %d cidades", len(self.starts), len(self.cities))
+
+    def _maybe_reload(self) -> None:
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.reload_interval: return
+        self._checked_at = now
+        try:
+            changed = self.path.stat().st_mtime != self._mtime
+        except FileNotFoundError:
+            changed = self._mtime is None and not self.cities
+        if changed: self.load()
+
+    def lookup(self, zip_code: str) -> Optional[CepEntry]:
+        self._maybe_reload()
+        try:
+            cep = int(validation.validate_cep(zip_code))
+        except ValueError:
+            return None
+        i = bisect_right(self.starts, cep) - 1
+        if i < 0 or cep > self.ends[i]: return None
+        return self.cities[self.owners[i]]
+
+
+cep_index = CepIndex()
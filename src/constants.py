@@ -6,7 +6,7 @@ load_dotenv()
 
 class Constants:
 
-    API_NAME = "Armazem do Neca - API"
+    API_NAME = os.getenv("API_NAME", "Armazem do Neca - API")
     API_VERSION = "1.0.0"
     API_DESCR =  "API para gerenciamento do Armazem"
 
@@ -17,6 +17,60 @@ class Constants:
     SECRET_KEY = os.getenv("SECRET_KEY")
     ALGORITHM = os.getenv("ALGORITHM")
 
+    # Chaves EdDSA/ES256 (src.keys): <kid>.pem assina e verifica, <kid>.pub.pem só verifica.
+    # Sem diretório, assina com SECRET_KEY/ALGORITHM como antes
+    JWT_KEYS_DIR = os.getenv("JWT_KEYS_DIR")
+    JWT_ACTIVE_KID = os.getenv("JWT_ACTIVE_KID")
+    JWKS_MAX_AGE = int(os.getenv("JWKS_MAX_AGE", "300"))
+
+    IDEMPOTENCY_KEY_TTL_HOURS = 24
+
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+    LOG_QUEUE_SIZE = 10_000
+    ACCESS_LOG_SAMPLE_RATE = float(os.getenv("ACCESS_LOG_SAMPLE_RATE", "0.1"))
+    SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "500"))
+    SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+
+    PROFILER_EXPLAIN_MS = float(os.getenv("PROFILER_EXPLAIN_MS", "500"))
+    PROFILER_EXPLAIN_SAMPLE_RATE = float(os.getenv("PROFILER_EXPLAIN_SAMPLE_RATE", "0.1"))
+
+    DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "4"))
+    DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+
+    # Réplicas de leitura: DSNs separados por vírgula
+    DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+    DB_REPLICA_MAX_LAG_S = float(os.getenv("DB_REPLICA_MAX_LAG_S", "5"))
+    DB_REPLICA_CHECK_INTERVAL = 1.0
+    DB_REPLICA_ACQUIRE_TIMEOUT = 1.0
+    READ_YOUR_WRITES_S = 30
+
+    # Deadlock/serialização: src.db.transaction repete com backoff, limitado por rota
+    DB_RETRY_ATTEMPTS = int(os.getenv("DB_RETRY_ATTEMPTS", "4"))
+    DB_RETRY_BASE_DELAY = 0.01
+    DB_RETRY_MAX_DELAY = 0.2
+    DB_RETRY_BUDGET_RATIO = 0.2
+    DB_RETRY_BUDGET_CAPACITY = 10.0
+
+    HEALTH_PROBE_INTERVAL = 5.0
+    HEALTH_PROBE_TIMEOUT = 2.0
+    HEALTH_MAX_REPLICATION_LAG_S = float(os.getenv("HEALTH_MAX_REPLICATION_LAG_S", "30"))
+
+    SHUTDOWN_DRAIN_DELAY = float(os.getenv("SHUTDOWN_DRAIN_DELAY", "5" if IS_PRODUCTION else "0"))
+    SHUTDOWN_TIMEOUT = float(os.getenv("SHUTDOWN_TIMEOUT", "20"))
+
+    # Cache de respostas do catálogo: LRU por worker e, com REDIS_URL, um nível compartilhado
+    REDIS_URL = os.getenv("REDIS_URL")
+    REDIS_TIMEOUT = 0.25
+    RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "60"))
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "2048"))
+
+    # Base local de CEP (scripts.refresh_cep_index); os workers recarregam quando o arquivo muda
+    CEP_INDEX_PATH = os.getenv("CEP_INDEX_PATH", os.path.join(os.path.dirname(__file__), "data", "cep.idx"))
+    CEP_RELOAD_INTERVAL = 60.0
+
+    SENTRY_DSN = os.getenv("SENTRY_DSN")
+    SENTRY_TRACES_SAMPLE_RATE = float(os.getenv("SENTRY_TRACES_SAMPLE_RATE", "0.0"))
+
     MAX_BODY_SIZE = 20 * 1024 * 1024
     MAX_REQUESTS = 300 if os.getenv("ENV", "DEV") == "PROD" else 999_999_999
     WINDOW = 30
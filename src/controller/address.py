@@ -0,0 +1,22 @@
+from fastapi import status
+from fastapi.exceptions import HTTPException
+from src.schemas.address import CepLookupResponse
+from src.cep import cep_index
+from src import validation
+
+
+async def lookup_cep(zip_code: str) -> CepLookupResponse:
+    try:
+        zip_code = validation.validate_cep(zip_code)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_CONTENT, detail=str(e))
+
+    entry = cep_index.lookup(zip_code)
+    if entry is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="CEP não encontrado na base local.")
+    return CepLookupResponse(
+        zip_code=zip_code,
+        city=entry.city,
+        ibge_city_code=entry.ibge_city_code,
+        state=entry.state
+    )
@@ -0,0 +1,24 @@
+from src.schemas.profiler import QueryStatsResponse
+from src.profiler import profiler
+
+
+def get_query_report(order: str, limit: int, include_plans: bool) -> list[QueryStatsResponse]:
+    return [
+        QueryStatsResponse(
+            fingerprint=s.fingerprint,
+            query=s.query,
+            calls=s.calls,
+            total_ms=round(s.total * 1000, 3),
+            mean_ms=round(s.total * 1000 / s.calls, 3),
+            p95_ms=round(s.p95 * 1000, 3),
+            max_ms=round(s.max * 1000, 3),
+            rows=s.rows,
+            plan=s.plan if include_plans else None,
+            plan_captured_at=s.plan_captured_at
+        )
+        for s in profiler.report(order, limit)
+    ]
+
+
+def reset_query_report() -> None:
+    profiler.reset()
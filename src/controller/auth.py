@@ -1,12 +1,14 @@
-from fastapi import status, Response
+from fastapi import status, Request, Response
 from fastapi.exceptions import HTTPException
 from src.schemas.auth import LoginRequest
 from src.schemas.user import UserLoginData, UserResponse
 from src.model import user as user_model
 from src.model import refresh_token as refresh_token_model
+from src.constants import Constants
 from typing import Optional
 from asyncpg import Connection
 from src import security
+from src import util
 
 
 INVALID_CREDENTIALS = HTTPException(
@@ -16,6 +18,7 @@ INVALID_CREDENTIALS = HTTPException(
 
 async def login(
     login_req: LoginRequest, 
+    request: Request,
     response: Response, 
     conn: Connection
 ) -> UserResponse:
@@ -37,11 +40,15 @@ async def login(
             detail="Acesso não permitido para perfil Cliente."
         )
         
-    session_token = security.create_session_token(data.id, data.role)
+    session_token = security.create_session_token(data.id, data.role, data.tenant_id)
         
+    user_agent = request.headers.get("user-agent")
     await refresh_token_model.create_refresh_token(
         session_token.refresh_token.id,
         data.id,
+        Constants.REFRESH_TOKEN_EXPIRE_DAYS,
+        user_agent[:256] if user_agent else None,
+        util.get_client_identifier(request)[:64],
         conn
     )
         
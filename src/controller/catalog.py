@@ -0,0 +1,34 @@
+from pydantic import TypeAdapter
+from src.schemas.category import CategoryTreeResponse
+from src.schemas.supplier import SupplierResponse
+from src.schemas.tax_group import TaxGroupResponse
+from src.model import catalog as catalog_model
+from asyncpg import Connection
+
+
+CATEGORY_TREE = TypeAdapter(list[CategoryTreeResponse])
+SUPPLIERS = TypeAdapter(list[SupplierResponse])
+TAX_GROUPS = TypeAdapter(list[TaxGroupResponse])
+
+
+async def get_category_tree(conn: Connection) -> bytes:
+    categories = await catalog_model.get_categories(conn)
+    by_id = {c.id: c for c in categories}
+
+    roots: list[CategoryTreeResponse] = []
+    for category in categories:
+        parent = by_id.get(category.parent_category_id)
+        # Pai ausente (ex.: fora do alcance do RLS) vira raiz em vez de sumir
+        if parent is None or parent is category:
+            roots.append(category)
+        else:
+            parent.subcategories.append(category)
+    return CATEGORY_TREE.dump_json(roots)
+
+
+async def get_suppliers(conn: Connection) -> bytes:
+    return SUPPLIERS.dump_json(await catalog_model.get_suppliers(conn))
+
+
+async def get_tax_groups(conn: Connection) -> bytes:
+    return TAX_GROUPS.dump_json(await catalog_model.get_tax_groups(conn))
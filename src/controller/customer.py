@@ -0,0 +1,38 @@
+from fastapi import Request
+from src.schemas.user import CustomerLookupResult, UserPayload
+from src.model import user as user_model
+from src.cache import TTLCache
+from src import validation
+from src import security
+from src import util
+
+
+# Por worker. A chave leva o perfil porque o RLS decide quem aparece
+lookup_cache = TTLCache("customer_lookup", maxsize=2048, ttl=30)
+
+# Menos que isso casa com boa parte da base e não ajuda o caixa
+MIN_DIGITS = 3
+
+
+async def lookup_customers(
+    query: str,
+    limit: int,
+    request: Request,
+    user: UserPayload
+) -> list[CustomerLookupResult]:
+    # Sem letras: CPF ou telefone, com ou sem máscara
+    numeric = not any(c.isalpha() for c in query)
+    term = validation.only_digits(query) if numeric else util.normalize_search_term(query)
+    if not term or (numeric and len(term) < MIN_DIGITS): return []
+
+    key = (user.tenant_id, user.role, numeric, term, limit)
+    results = lookup_cache.get(key)
+    if results is None:
+        # Conexão só no miss: a maior parte das teclas digitadas repete buscas recentes
+        async with security.rls_read_connection(request, user) as conn:
+            if numeric:
+                results = await user_model.lookup_customers_by_digits(term, limit, conn)
+            else:
+                results = await user_model.lookup_customers_by_text(term, util.escape_like(term) + '%', limit, conn)
+        lookup_cache.set(key, results)
+    return results
@@ -0,0 +1,69 @@
+from fastapi import Request, WebSocket, status
+from fastapi.exceptions import HTTPException
+from src.schemas.live import LiveSnapshot
+from src.model import live as live_model
+from src.events import broker, allowed_channels, Subscription
+from asyncpg import Connection
+from typing import AsyncIterator, Optional
+
+
+HEARTBEAT_SECONDS = 15.0
+
+OVERFLOW_FRAME = b"event: overflow\ndata: {}\n\n"
+HEARTBEAT_FRAME = b": ping\n\n"
+
+
+def resolve_channels(role: str, channels: Optional[str]) -> frozenset[str]:
+    requested = [c.strip() for c in channels.split(",") if c.strip()] if channels else None
+    allowed = allowed_channels(role, requested)
+    if not allowed:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Nenhum canal disponível para este perfil."
+        )
+    return allowed
+
+
+async def get_snapshot(channels: frozenset[str], conn: Connection) -> LiveSnapshot:
+    last_event_id = await live_model.get_last_event_id(conn)
+    return LiveSnapshot(
+        last_event_id=last_event_id,
+        sales=await live_model.get_sales_board(conn) if "sales" in channels else [],
+        kitchen=await live_model.get_kitchen_queue(conn) if "kitchen" in channels else []
+    )
+
+
+async def sse_stream(request: Request, subscription: Subscription) -> AsyncIterator[bytes]:
+    try:
+        yield b"retry: 3000\n\n"
+        while True:
+            event = await subscription.next(HEARTBEAT_SECONDS)
+            if event is not None:
+                yield event.sse
+            elif await request.is_disconnected():
+                break
+            else:
+                yield HEARTBEAT_FRAME
+
+            if subscription.overflowed and subscription.queue.empty():
+                yield OVERFLOW_FRAME
+                break
+    finally:
+        broker.unsubscribe(subscription)
+
+
+async def websocket_stream(websocket: WebSocket, subscription: Subscription) -> None:
+    try:
+        while True:
+            event = await subscription.next(HEARTBEAT_SECONDS)
+            if event is not None:
+                await websocket.send_text(event.json)
+            else:
+                await websocket.send_text('{"channel":"ping"}')
+
+            if subscription.overflowed and subscription.queue.empty():
+                await websocket.send_text('{"channel":"overflow"}')
+                await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+                break
+    finally:
+        broker.unsubscribe(subscription)
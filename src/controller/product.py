@@ -0,0 +1,110 @@
+from fastapi import status
+from fastapi.exceptions import HTTPException
+from src.schemas.pricing import RepricingRequest, RepricingResponse
+from src.schemas.product import ProductSearchResult, ProductResponse
+from src.model import product as product_model
+from src.model import tenant as tenant_model
+from src.db.transaction import run_transaction
+from src.response_cache import response_cache
+from src.cache import TTLCache
+from src.startup import startup
+from src.db.db import db
+from pydantic import TypeAdapter
+from src import security
+from src import util
+from asyncpg import Connection
+from typing import Optional
+from uuid import UUID
+
+
+search_cache = TTLCache("product_search", maxsize=2048, ttl=30)
+
+DEFAULT_SEARCH_LIMIT = 20
+
+PRODUCT_LIST = TypeAdapter(list[ProductResponse])
+
+
+async def search_products(query: str, limit: int, tenant_id: int, conn: Connection) -> list[ProductSearchResult]:
+    term = util.normalize_search_term(query)
+    if not term: return []
+
+    # Cada loja tem o próprio catálogo
+    key = (tenant_id, term, limit)
+    results = search_cache.get(key)
+    if results is None:
+        results = await product_model.search_products(
+            term,
+            util.escape_like(term) + '%',
+            limit,
+            conn
+        )
+        search_cache.set(key, results)
+    return results
+
+
+async def warm_search_cache() -> None:
+    # Primeira letra digitada no PDV: as buscas mais comuns (e as mais amplas) logo após a subida
+    async with db.pool.acquire() as conn:
+        tenants = await tenant_model.get_active_tenant_ids(conn)
+    for tenant_id in tenants:
+        async with security.tenant_read_connection(tenant_id) as conn:
+            for initial in await product_model.get_name_initials(conn):
+                await search_products(initial, DEFAULT_SEARCH_LIMIT, tenant_id, conn)
+
+
+startup.register("product_search", warm_search_cache)
+
+
+async def get_product(product_id: UUID, conn: Connection) -> bytes:
+    item = await product_model.get_product(product_id, conn)
+    if item is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Produto não encontrado.")
+    return item.model_dump_json().encode()
+
+
+async def list_products(
+    category_id: Optional[int],
+    supplier_id: Optional[UUID],
+    include_inactive: bool,
+    limit: int,
+    offset: int,
+    conn: Connection
+) -> bytes:
+    items = await product_model.list_products(category_id, supplier_id, include_inactive, limit, offset, conn)
+    return PRODUCT_LIST.dump_json(items)
+
+
+async def reprice_products(
+    rule: RepricingRequest,
+    changed_by: Optional[UUID],
+    conn: Connection
+) -> RepricingResponse:
+    if rule.dry_run:
+        items = await product_model.preview_repricing(rule, conn)
+        return RepricingResponse(
+            dry_run=True,
+            total=len(items),
+            items=items,
+            violations=[i for i in items if i.new_sale_price < i.new_purchase_price]
+        )
+
+    result = await run_transaction(lambda: product_model.apply_repricing(rule, changed_by, conn), conn)
+
+    if result['violations'] > 0:
+        items = await product_model.preview_repricing(rule, conn)
+        violations = [i for i in items if i.new_sale_price < i.new_purchase_price]
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail={
+                "message": "O valor de venda não pode ser menor que o valor de compra.",
+                "violations": [v.model_dump(mode='json') for v in violations]
+            }
+        )
+
+    search_cache.clear()
+    await response_cache.invalidate("products")
+    return RepricingResponse(
+        dry_run=False,
+        total=result['total'],
+        applied=result['applied']
+    )
@@ -0,0 +1,256 @@
+from fastapi import UploadFile, status
+from fastapi.exceptions import HTTPException
+from pydantic import TypeAdapter, ValidationError
+from src.schemas.product import ProductCreate
+from src.schemas.product_import import ProductImportResponse
+from src.schemas.enums import ImportStatus
+from src.schemas.user import UserPayload
+from src.model import product_import as import_model
+from src.controller.product import search_cache
+from src.response_cache import response_cache
+from src.shutdown import coordinator
+from src.pruner import pruner
+from src.log import get_logger
+from src import security
+from asyncpg import Connection, PostgresError
+from decimal import Decimal
+from typing import Optional, TextIO
+from uuid import UUID
+import tempfile
+import asyncio
+import shutil
+import csv
+import os
+
+
+logger = get_logger("product_import")
+
+CHUNK_SIZE = 5000
+# Guardamos só as primeiras; o contador `failed` continua somando todas
+MAX_STORED_ERRORS = 1000
+
+PRODUCTS = TypeAdapter(list[ProductCreate])
+REQUIRED_COLUMNS = {name for name, field in ProductCreate.model_fields.items() if field.is_required()}
+DECIMAL_COLUMNS = {name for name, field in ProductCreate.model_fields.items() if field.annotation is Decimal}
+
+pruner.register("product_imports", "product_imports", "finished_at < now() - interval '30 days'")
+
+IMPORT_NOT_FOUND_EXCEPTION = HTTPException(
+    status_code=status.HTTP_404_NOT_FOUND,
+    detail="Importação não encontrada."
+)
+
+
+def _spool(source) -> tuple[str, int]:
+    """Copia o upload para disco (o do Starlette fecha com a requisição) e estima as linhas."""
+    with tempfile.NamedTemporaryFile(prefix="product-import-", suffix=".csv", delete=False) as target:
+        shutil.copyfileobj(source, target, 1024 * 1024)
+    lines = 0
+    with open(target.name, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            lines += block.count(b"\n")
+    return target.name, max(lines - 1, 0)
+
+
+def _open_csv(path: str) -> tuple[TextIO, csv.DictReader]:
+    with open(path, "rb") as f:
+        sample = f.read(64 * 1024)
+    try:
+        sample.decode("utf-8")
+        encoding = "utf-8-sig"
+    except UnicodeDecodeError:
+        # Planilhas exportadas pelo Excel em português costumam vir em Windows-1252
+        encoding = "cp1252"
+
+    file = open(path, newline="", encoding=encoding)
+    text = sample.decode(encoding, errors="ignore")
+    try:
+        dialect = csv.Sniffer().sniff(text.split("\n", 1)[0], delimiters=",;\t")
+    except csv.Error:
+        dialect = csv.excel
+    reader = csv.DictReader(file, dialect=dialect)
+
+    header = {(name or "").strip() for name in reader.fieldnames or ()}
+    missing = REQUIRED_COLUMNS - header
+    if missing:
+        file.close()
+        raise ValueError(f"Colunas obrigatórias ausentes: {', '.join(sorted(missing))}")
+    return file, reader
+
+
+def _clean_row(row: dict) -> dict:
+    cleaned = {}
+    for key, value in row.items():
+        if key is None or value is None: continue
+        key, value = key.strip(), value.strip()
+        if not value: continue
+        if key in DECIMAL_COLUMNS and "," in value:
+            # 1.234,56 -> 1234.56
+            value = value.replace(".", "").replace(",", ".")
+        cleaned[key] = value
+    return cleaned
+
+
+def _error(line: int, sku: Optional[str], message: str) -> dict:
+    return {"line": line, "sku": sku, "message": message}
+
+
+def _validate(lines: list[int], data: list[dict]) -> tuple[list[tuple[int, ProductCreate]], list[dict]]:
+    try:
+        return list(zip(lines, PRODUCTS.validate_python(data))), []
+    except ValidationError as e:
+        problems: dict[int, list[str]] = {}
+        for err in e.errors(include_url=False):
+            index, *field = err["loc"]
+            message = err["msg"]
+            if field: message = f"{'.'.join(map(str, field))}: {message}"
+            problems.setdefault(index, []).append(message)
+
+    # Valida de novo só as linhas boas: cada item é independente, então passa
+    keep = [i for i in range(len(data)) if i not in problems]
+    valid = PRODUCTS.validate_python([data[i] for i in keep])
+    errors = [_error(lines[i], data[i].get("sku"), "; ".join(messages)) for i, messages in problems.items()]
+    return list(zip((lines[i] for i in keep), valid)), errors
+
+
+def _dedupe(items: list[tuple[int, ProductCreate]]) -> tuple[list[tuple[int, ProductCreate]], list[dict]]:
+    """Um SKU por lote (vale a última linha); nome e GTIN não podem repetir entre SKUs diferentes."""
+    errors: list[dict] = []
+    by_sku: dict[str, tuple[int, ProductCreate]] = {}
+    for line, product in items:
+        key = product.sku.lower()
+        previous = by_sku.get(key)
+        if previous:
+            errors.append(_error(previous[0], product.sku, f"SKU repetido na linha {line}, que prevalece"))
+        by_sku[key] = (line, product)
+
+    kept: list[tuple[int, ProductCreate]] = []
+    names: dict[str, int] = {}
+    gtins: dict[str, int] = {}
+    for line, product in sorted(by_sku.values(), key=lambda item: item[0]):
+        name = product.name.lower()
+        if name in names:
+            errors.append(_error(line, product.sku, f"Nome repetido no arquivo (linha {names[name]})"))
+            continue
+        if product.gtin and product.gtin in gtins:
+            errors.append(_error(line, product.sku, f"GTIN repetido no arquivo (linha {gtins[product.gtin]})"))
+            continue
+        names[name] = line
+        if product.gtin: gtins[product.gtin] = line
+        kept.append((line, product))
+    return kept, errors
+
+
+def _read_chunk(reader: csv.DictReader) -> tuple[int, list[tuple[int, ProductCreate]], list[dict]]:
+    lines: list[int] = []
+    data: list[dict] = []
+    for row in reader:
+        lines.append(reader.line_num)
+        data.append(_clean_row(row))
+        if len(data) == CHUNK_SIZE: break
+    if not data: return 0, [], []
+
+    valid, errors = _validate(lines, data)
+    valid, duplicates = _dedupe(valid)
+    return len(data), valid, errors + duplicates
+
+
+def _record(line: int, product: ProductCreate) -> tuple:
+    values = [getattr(product, column) for column in import_model.IMPORT_COLUMNS]
+    values[import_model.IMPORT_COLUMNS.index("measure_unit")] = product.measure_unit.value
+    return (line, *values)
+
+
+async def _apply_chunk(items: list[tuple[int, ProductCreate]], user: UserPayload, conn: Connection) -> tuple[int, int, list[dict]]:
+    if not items: return 0, 0, []
+    await import_model.stage_rows([_record(line, product) for line, product in items], conn)
+    errors = [_error(r["line"], r["sku"], r["message"]) for r in await import_model.reject_staged(conn)]
+
+    try:
+        async with conn.transaction():
+            result = await import_model.upsert_staged(None, user.user_id, conn)
+        return result["inserted"], result["updated"], errors
+    except PostgresError:
+        # Alguém mexeu no catálogo entre a checagem e o upsert: repete linha a linha
+        pass
+
+    inserted = updated = 0
+    for staged in await import_model.get_staged_lines(conn):
+        try:
+            async with conn.transaction():
+                result = await import_model.upsert_staged(staged["line"], user.user_id, conn)
+            inserted += result["inserted"]
+            updated += result["updated"]
+        except PostgresError as e:
+            errors.append(_error(staged["line"], staged["sku"], str(e)))
+    return inserted, updated, errors
+
+
+async def _process(job_id: UUID, path: str, user: UserPayload) -> None:
+    file, reader = await asyncio.to_thread(_open_csv, path)
+    stored_errors = 0
+    try:
+        while True:
+            read, items, errors = await asyncio.to_thread(_read_chunk, reader)
+            if not read: break
+
+            # Um lote por transação: o progresso gravado sempre corresponde ao que foi confirmado
+            async with security.rls_connection(user) as conn:
+                inserted, updated, rejected = await _apply_chunk(items, user, conn)
+                errors += rejected
+                room = max(MAX_STORED_ERRORS - stored_errors, 0)
+                await import_model.add_progress(
+                    job_id, read, inserted, updated, len(errors),
+                    sorted(errors, key=lambda e: e["line"])[:room],
+                    conn
+                )
+            stored_errors += min(len(errors), room)
+    finally:
+        file.close()
+
+
+async def _run(job_id: UUID, path: str, user: UserPayload) -> None:
+    outcome, detail = ImportStatus.CONCLUIDA, None
+    try:
+        await _process(job_id, path, user)
+    except asyncio.CancelledError:
+        outcome, detail = ImportStatus.FALHOU, "Importação interrompida pelo encerramento do servidor."
+        raise
+    except (ValueError, UnicodeDecodeError, csv.Error) as e:
+        outcome, detail = ImportStatus.FALHOU, str(e)
+    except Exception as e:
+        logger.exception("Importação de produtos falhou", extra={"import_id": str(job_id)})
+        outcome, detail = ImportStatus.FALHOU, f"Erro inesperado: {type(e).__name__}"
+    finally:
+        os.unlink(path)
+        try:
+            async with security.rls_connection(user) as conn:
+                await import_model.finish_job(job_id, outcome, detail, conn)
+        except Exception:
+            logger.exception("Não foi possível registrar o fim da importação", extra={"import_id": str(job_id)})
+        search_cache.clear()
+        await response_cache.invalidate("products")
+        logger.info("Importação de produtos finalizada", extra={"import_id": str(job_id), "status": outcome.value})
+
+
+async def start_import(upload: UploadFile, user: UserPayload) -> ProductImportResponse:
+    if not (upload.filename or "").lower().endswith(".csv"):
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Envie a planilha em CSV (separado por vírgula, ponto e vírgula ou tab)."
+        )
+
+    path, estimated_rows = await asyncio.to_thread(_spool, upload.file)
+    # Conexão própria: o job precisa enxergar a linha já confirmada
+    async with security.rls_connection(user) as conn:
+        job_id = await import_model.create_job(upload.filename, estimated_rows, user.user_id, conn)
+        job = await import_model.get_job(job_id, conn)
+
+    coordinator.track(asyncio.create_task(_run(job_id, path, user)))
+    return job
+
+
+async def get_import(job_id: UUID, conn: Connection) -> ProductImportResponse:
+    job = await import_model.get_job(job_id, conn)
+    if job is None: raise IMPORT_NOT_FOUND_EXCEPTION
+    return job
@@ -0,0 +1,61 @@
+from fastapi import status
+from fastapi.exceptions import HTTPException
+from src.schemas.receiving import ReceivingCreate, ReceivingResponse, ReceivingCostChange
+from src.model import receiving as receiving_model
+from src.db.transaction import run_transaction
+from src.response_cache import response_cache
+from asyncpg import Connection
+from typing import Optional
+from uuid import UUID
+import json
+
+
+SUPPLIER_NOT_FOUND_EXCEPTION = HTTPException(
+    status_code=status.HTTP_404_NOT_FOUND,
+    detail="Fornecedor não encontrado."
+)
+
+DUPLICATE_INVOICE_EXCEPTION = HTTPException(
+    status_code=status.HTTP_409_CONFLICT,
+    detail="Esta nota fiscal já foi recebida para o fornecedor."
+)
+
+
+async def receive_delivery(receipt: ReceivingCreate, received_by: Optional[UUID], conn: Connection) -> ReceivingResponse:
+    row = await run_transaction(lambda: receiving_model.apply_receipt(receipt, received_by, conn), conn)
+
+    if not row['supplier_found']: raise SUPPLIER_NOT_FOUND_EXCEPTION
+
+    if row['missing_products']:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail={
+                "message": "Produto não encontrado no catálogo.",
+                "missing_products": [str(p) for p in row['missing_products']]
+            }
+        )
+
+    if row['violations']:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail={
+                "message": "O novo custo médio ficaria acima do preço de venda. Reajuste os preços antes de receber a nota.",
+                "violations": json.loads(row['violations'])
+            }
+        )
+
+    if row['receipt_id'] is None: raise DUPLICATE_INVOICE_EXCEPTION
+
+    # Custo alterado: o NOTIFY do trigger também invalida os outros workers após o commit
+    if row['cost_changes']: await response_cache.invalidate("products")
+
+    return ReceivingResponse(
+        id=row['receipt_id'],
+        supplier_id=receipt.supplier_id,
+        invoice_number=receipt.invoice_number,
+        total_cost=row['total_cost'],
+        movements=row['movements'],
+        batches=row['batches'],
+        cost_changes=[ReceivingCostChange(**c) for c in json.loads(row['cost_changes'] or "[]")],
+        received_at=row['received_at']
+    )
@@ -0,0 +1,11 @@
+from src.schemas.sales import SaleCreate, SaleResponse
+from src.model import sale as sale_model
+from src.db.transaction import run_transaction
+from src.util import coalesce
+from asyncpg import Connection
+from uuid import UUID
+
+
+async def create_sale(sale: SaleCreate, user_id: UUID, conn: Connection) -> SaleResponse:
+    salesperson_id = coalesce(sale.salesperson_id, user_id)
+    return await run_transaction(lambda: sale_model.create_sale(sale, salesperson_id, conn), conn)
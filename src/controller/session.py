@@ -0,0 +1,45 @@
+from fastapi import Response, status
+from fastapi.exceptions import HTTPException
+from src.schemas.session import SessionResponse, SessionRevokeResponse
+from src.schemas.user import UserPayload
+from src.model import refresh_token as refresh_token_model
+from src.constants import Constants
+from src import security
+from asyncpg import Connection
+from uuid import UUID
+import time
+
+
+SESSION_NOT_FOUND_EXCEPTION = HTTPException(
+    status_code=status.HTTP_404_NOT_FOUND,
+    detail="Sessão não encontrada ou já encerrada."
+)
+
+# A revogação só precisa durar até o último access token afetado expirar
+REVOCATION_HOURS = Constants.ACCESS_TOKEN_EXPIRE_HOURS
+
+
+async def list_sessions(user_id: UUID, user: UserPayload, conn: Connection) -> list[SessionResponse]:
+    sessions = await refresh_token_model.get_active_sessions(user_id, conn)
+    for session in sessions:
+        session.current = session.id == user.session_id
+    return sessions
+
+
+async def revoke_session(session_id: UUID, user: UserPayload, conn: Connection) -> None:
+    # ADMIN encerra a sessão de qualquer usuário; os demais, só as próprias
+    owner = None if user.role == 'ADMIN' else user.user_id
+    if not await refresh_token_model.revoke_session(session_id, owner, REVOCATION_HOURS, conn):
+        raise SESSION_NOT_FOUND_EXCEPTION
+
+
+async def revoke_all_sessions(user_id: UUID, conn: Connection) -> SessionRevokeResponse:
+    revoked = await refresh_token_model.revoke_all_sessions(user_id, time.time(), REVOCATION_HOURS, conn)
+    return SessionRevokeResponse(revoked=revoked)
+
+
+async def logout(user: UserPayload, response: Response, conn: Connection) -> None:
+    # Tokens anteriores ao controle de sessões não têm sid: só os cookies são apagados
+    if user.session_id is not None:
+        await refresh_token_model.revoke_session(user.session_id, user.user_id, REVOCATION_HOURS, conn)
+    security.unset_session_token_cookie(response)
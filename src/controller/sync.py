@@ -0,0 +1,100 @@
+from fastapi.exceptions import HTTPException
+from src.schemas.sync import (
+    OfflineSale,
+    SyncSalesRequest,
+    SyncSaleResult,
+    SyncSalesResponse
+)
+from src.schemas.enums import SyncSaleStatus
+from src.schemas.user import UserPayload
+from src.model import sync as sync_model
+from src.exceptions import DatabaseError
+from src.db.transaction import run_transaction
+from src.util import coalesce
+from src import security
+from asyncpg import Connection
+import heapq
+
+
+MISSING_PRODUCTS = "Produto não encontrado no catálogo: {}"
+
+
+def _ndjson_line(kind: str, op: str, version: int, data: str) -> str:
+    return f'{{"type":"{kind}","op":"{op}","version":{version},"data":{data}}}\n'
+
+
+async def get_catalog_delta(since: int, limit: int, conn: Connection) -> tuple[bytes, int]:
+    """
+    Alterações do catálogo depois do watermark `since`, em NDJSON e em
+    ordem de versão. A última linha traz o novo watermark e se há mais
+    páginas; o caixa repete a chamada até more=false.
+    """
+    # Cada consulta traz as `limit` menores versões da sua tabela, então o
+    # merge das quatro listas cortado em `limit` é o prefixo global correto.
+    # Vale porque `conn` é de leitura em repeatable read: as quatro veem o mesmo
+    # snapshot e um commit no meio não fica abaixo do watermark devolvido
+    categories = await sync_model.get_category_changes(since, limit, conn)
+    tax_groups = await sync_model.get_tax_group_changes(since, limit, conn)
+    products = await sync_model.get_product_changes(since, limit, conn)
+    tombstones = await sync_model.get_tombstones(since, limit, conn)
+
+    changes = heapq.merge(
+        ((c.row_version, "category", c) for c in categories),
+        ((t.row_version, "tax_group", t) for t in tax_groups),
+        ((p.row_version, "product", p) for p in products),
+        ((t.row_version, "delete", t) for t in tombstones),
+        key=lambda change: change[0]
+    )
+
+    lines: list[str] = []
+    watermark = since
+    for version, kind, record in changes:
+        if len(lines) == limit: break
+        watermark = version
+        if kind == "delete":
+            lines.append(_ndjson_line(record.entity, "delete", version, f'"{record.entity_id}"'))
+        else:
+            lines.append(_ndjson_line(kind, "upsert", version, record.model_dump_json(exclude={"row_version"})))
+
+    total = len(categories) + len(tax_groups) + len(products) + len(tombstones)
+    more = "true" if total > len(lines) else "false"
+    lines.append(f'{{"type":"watermark","version":{watermark},"more":{more}}}\n')
+    return "".join(lines).encode(), watermark
+
+
+async def _apply_sale(sale: OfflineSale, user: UserPayload) -> SyncSaleResult:
+    salesperson_id = coalesce(sale.salesperson_id, user.user_id)
+    try:
+        # Transação própria por venda: um conflito não desfaz as anteriores do lote e
+        # o retry não colide de novo com as travas que elas seguravam
+        async with security.rls_connection(user) as conn:
+            row = await run_transaction(lambda: sync_model.apply_offline_sale(sale, salesperson_id, conn), conn)
+    except (DatabaseError, HTTPException) as e:
+        return SyncSaleResult(sale_id=sale.id, status=SyncSaleStatus.CONFLITO, detail=e.detail)
+
+    if row['missing_products']:
+        missing = ", ".join(str(p) for p in row['missing_products'])
+        return SyncSaleResult(
+            sale_id=sale.id,
+            status=SyncSaleStatus.CONFLITO,
+            detail=MISSING_PRODUCTS.format(missing)
+        )
+
+    if row['sale_id'] is None:
+        return SyncSaleResult(sale_id=sale.id, status=SyncSaleStatus.DUPLICADA)
+
+    return SyncSaleResult(
+        sale_id=sale.id,
+        status=SyncSaleStatus.APLICADA,
+        price_mismatches=row['price_mismatches']
+    )
+
+
+async def apply_offline_sales(batch: SyncSalesRequest, user: UserPayload) -> SyncSalesResponse:
+    results = [await _apply_sale(sale, user) for sale in batch.sales]
+    return SyncSalesResponse(
+        applied=sum(r.status == SyncSaleStatus.APLICADA for r in results),
+        duplicates=sum(r.status == SyncSaleStatus.DUPLICADA for r in results),
+        conflicts=sum(r.status == SyncSaleStatus.CONFLITO for r in results),
+        results=results
+    )
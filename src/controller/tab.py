@@ -0,0 +1,77 @@
+from fastapi import status
+from fastapi.exceptions import HTTPException
+from src.schemas.tab_payment import (
+    TabPaymentCreate,
+    TabPaymentAllocate,
+    TabPaymentResponse,
+    CustomerTabResponse,
+    CustomerCreditResponse,
+    TabAgingResponse
+)
+from src.model import tab as tab_model
+from src.db.transaction import run_transaction
+from asyncpg import Connection
+from decimal import Decimal
+from uuid import UUID
+
+
+CUSTOMER_NOT_FOUND = HTTPException(
+    status_code=status.HTTP_404_NOT_FOUND,
+    detail="Cliente não encontrado."
+)
+
+TAB_NOT_FOUND = HTTPException(
+    status_code=status.HTTP_404_NOT_FOUND,
+    detail="Venda fiado em aberto não encontrada."
+)
+
+
+async def get_customer_credit(customer_id: UUID, conn: Connection) -> CustomerCreditResponse:
+    credit = await tab_model.get_customer_credit(customer_id, conn)
+    if not credit: raise CUSTOMER_NOT_FOUND
+    return credit
+
+
+async def get_open_tabs(customer_id: UUID, conn: Connection) -> list[CustomerTabResponse]:
+    return await tab_model.get_open_tabs(customer_id, conn)
+
+
+async def pay_sale_tab(
+    payment: TabPaymentCreate,
+    received_by: UUID,
+    conn: Connection
+) -> TabPaymentResponse:
+    result = await run_transaction(lambda: tab_model.pay_sale_tab(payment, received_by, conn), conn)
+    if not result: raise TAB_NOT_FOUND
+    return result
+
+
+async def allocate_customer_payment(
+    customer_id: UUID,
+    payment: TabPaymentAllocate,
+    received_by: UUID,
+    conn: Connection
+) -> list[TabPaymentResponse]:
+    credit = await get_customer_credit(customer_id, conn)
+    if payment.amount_paid > credit.invoice_amount:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Valor pago excede a dívida do cliente ({credit.invoice_amount})."
+        )
+
+    async def allocate() -> list[TabPaymentResponse]:
+        payments = await tab_model.allocate_customer_payment(customer_id, payment, received_by, conn)
+        allocated = sum((p.amount_paid for p in payments), Decimal('0.00'))
+        if allocated != payment.amount_paid:
+            # Saldo mudou entre a leitura e o travamento das contas
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Saldo do cliente foi alterado. Tente novamente."
+            )
+        return payments
+
+    return await run_transaction(allocate, conn)
+
+
+async def get_tab_aging(conn: Connection, limit: int, offset: int) -> list[TabAgingResponse]:
+    return await tab_model.get_tab_aging(conn, limit, offset)
@@ -0,0 +1,186 @@
+from fastapi import UploadFile, status
+from fastapi.exceptions import HTTPException
+from pydantic import TypeAdapter, ValidationError
+from src.schemas.user import UserCreate, UserPayload
+from src.schemas.user_provision import UserProvisionResponse, UserProvisionRow
+from src.schemas.enums import ProvisionStatus
+from src.model import user_provision as provision_model
+from src.db.db import ERROR_MAP
+from src.log import get_logger
+from src import security
+from asyncpg import Connection, PostgresError
+from typing import AsyncContextManager, Callable, Optional
+import uuid
+import json
+import csv
+import io
+
+
+logger = get_logger("user_provision")
+
+# Uma loja nova tem dezenas de funcionários; acima disso é migração, não cadastro
+MAX_ROWS = 1000
+
+USERS = TypeAdapter(list[UserCreate])
+
+
+def _row(line: int, email: Optional[str], outcome: ProvisionStatus, message: Optional[str] = None, user_id=None) -> UserProvisionRow:
+    return UserProvisionRow(line=line, email=email, status=outcome, user_id=user_id, message=message)
+
+
+def parse_source(data: bytes, filename: str) -> list[tuple[int, dict]]:
+    """(linha, campos de UserCreate) de um CSV com cabeçalho ou de uma lista JSON."""
+    try:
+        text = data.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        text = data.decode("cp1252")
+
+    name = filename.lower()
+    if name.endswith(".json"):
+        items = json.loads(text)
+        if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+            raise ValueError("O JSON deve ser uma lista de usuários.")
+        return [(i + 1, item) for i, item in enumerate(items)]
+
+    if not name.endswith(".csv"):
+        raise ValueError("Envie um arquivo .csv ou .json.")
+    try:
+        dialect = csv.Sniffer().sniff(text.split("\n", 1)[0], delimiters=",;\t")
+    except csv.Error:
+        dialect = csv.excel
+    reader = csv.DictReader(io.StringIO(text, newline=""), dialect=dialect)
+    rows = []
+    for row in reader:
+        cleaned = {k.strip(): v.strip() for k, v in row.items() if k and v and v.strip()}
+        rows.append((reader.line_num, cleaned))
+    return rows
+
+
+def _validate(rows: list[tuple[int, dict]]) -> tuple[list[tuple[int, UserCreate]], list[UserProvisionRow]]:
+    data = [fields for _, fields in rows]
+    problems: dict[int, list[str]] = {}
+    try:
+        users = USERS.validate_python(data)
+    except ValidationError as e:
+        for err in e.errors(include_url=False):
+            index, *field = err["loc"]
+            message = err["msg"]
+            if field: message = f"{'.'.join(map(str, field))}: {message}"
+            problems.setdefault(index, []).append(message)
+        # Cada item é independente: as linhas boas passam de novo sozinhas
+        keep = [i for i in range(len(data)) if i not in problems]
+        users = dict(zip(keep, USERS.validate_python([data[i] for i in keep])))
+    else:
+        users = dict(enumerate(users))
+
+    valid = []
+    for i, user in users.items():
+        # UserCreate aceita 6 caracteres; o hash exige 8
+        if user.password is not None and len(user.password) < 8:
+            problems[i] = [security.INVALID_PASSWORD_EXCEPTION.detail]
+            continue
+        valid.append((rows[i][0], user))
+
+    errors = [
+        _row(rows[i][0], str(data[i].get("email") or "") or None, ProvisionStatus.INVALIDO, "; ".join(messages))
+        for i, messages in problems.items()
+    ]
+    return valid, errors
+
+
+def _dedupe(users: list[tuple[int, UserCreate]]) -> tuple[list[tuple[int, UserCreate]], list[UserProvisionRow]]:
+    """Email e CPF repetidos dentro do arquivo: vale a primeira linha."""
+    kept, errors = [], []
+    emails: dict[str, int] = {}
+    cpfs: dict[str, int] = {}
+    for line, user in users:
+        email = user.email.lower() if user.email else None
+        if email and email in emails:
+            errors.append(_row(line, user.email, ProvisionStatus.CONFLITO, f"Email repetido no arquivo (linha {emails[email]})"))
+            continue
+        if user.cpf and user.cpf in cpfs:
+            errors.append(_row(line, user.email, ProvisionStatus.CONFLITO, f"CPF repetido no arquivo (linha {cpfs[user.cpf]})"))
+            continue
+        if email: emails[email] = line
+        if user.cpf: cpfs[user.cpf] = line
+        kept.append((line, user))
+    return kept, errors
+
+
+def _record(line: int, user_id: uuid.UUID, user: UserCreate, password_hash: Optional[str]) -> tuple:
+    return (
+        line, user_id, user.name, user.nickname, user.email, user.phone, user.cpf, user.notes,
+        password_hash, user.role.value, user.credit_limit, user.state_tax_indicator
+    )
+
+
+def _outcome(result, user: UserCreate) -> UserProvisionRow:
+    if result["inserted"]:
+        return _row(result["line"], user.email, ProvisionStatus.CRIADO, user_id=result["user_id"])
+    message = ERROR_MAP.get(result["constraint_name"], "Conflito de dados únicos.")
+    return _row(result["line"], user.email, ProvisionStatus.CONFLITO, message)
+
+
+async def _insert(records: list[tuple], by_line: dict[int, UserCreate], conn: Connection) -> list[UserProvisionRow]:
+    await provision_model.stage_users(records, conn)
+    try:
+        async with conn.transaction():
+            results = await provision_model.insert_staged(None, conn)
+        return [_outcome(r, by_line[r["line"]]) for r in results]
+    except PostgresError:
+        # Alguma linha quebrou uma constraint que a validação não cobre: repete linha a linha
+        pass
+
+    rows = []
+    for line in await provision_model.get_staged_lines(conn):
+        user = by_line[line]
+        try:
+            async with conn.transaction():
+                results = await provision_model.insert_staged(line, conn)
+            rows.append(_outcome(results[0], user))
+        except PostgresError as e:
+            message = ERROR_MAP.get(getattr(e, "constraint_name", None), "Dados inválidos")
+            rows.append(_row(line, user.email, ProvisionStatus.INVALIDO, message))
+    return rows
+
+
+async def provision_users(
+    rows: list[tuple[int, dict]],
+    connect: Callable[[], AsyncContextManager[Connection]]
+) -> UserProvisionResponse:
+    """
+    Valida, gera os hashes em paralelo e grava tudo num COPY + INSERT. A
+    conexão (`connect`) só é aberta depois dos hashes, que levam segundos.
+    """
+    valid, invalid = _validate(rows)
+    valid, duplicated = _dedupe(valid)
+
+    passwords = [user.password for _, user in valid if user.password]
+    hashes = iter(await security.hash_passwords(passwords))
+    records = [
+        _record(line, uuid.uuid4(), user, next(hashes) if user.password else None)
+        for line, user in valid
+    ]
+
+    created: list[UserProvisionRow] = []
+    if records:
+        async with connect() as conn:
+            created = await _insert(records, dict(valid), conn)
+
+    result = sorted(created + invalid + duplicated, key=lambda r: r.line)
+    ok = sum(1 for r in result if r.status == ProvisionStatus.CRIADO)
+    logger.info("Provisionamento de usuários", extra={"rows": len(result), "users_created": ok})
+    return UserProvisionResponse(total=len(result), created=ok, failed=len(result) - ok, rows=result)
+
+
+async def provision_upload(upload: UploadFile, user: UserPayload) -> UserProvisionResponse:
+    try:
+        rows = parse_source(await upload.read(), upload.filename or "")
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_CONTENT, detail=str(e))
+    if len(rows) > MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+            detail=f"No máximo {MAX_ROWS} usuários por arquivo."
+        )
+    return await provision_users(rows, lambda: security.rls_connection(user))
@@ -4,65 +4,204 @@ from dotenv import load_dotenv
 from pathlib import Path
 from typing import TypeVar, Awaitable, Optional
 from src.exceptions import DatabaseError
+from src.metrics import instrument_connection, db_reads_routed, db_errors
+from src.db.replicas import Replica
+from src.profiler import ProfiledConnection
+from src.startup import startup
+from src.constants import Constants
+from src.log import get_logger
 import asyncpg
+import asyncio
+import hashlib
 import os
 
 
 load_dotenv()
 
+logger = get_logger("db")
+
+SQL_DIR = Path(__file__).parent
+MIGRATION_FILES = ["schema", "views", "insertions", "index", "rls"]
+
+# Chave do pg_advisory_lock da migração (workers sobem ao mesmo tempo)
+MIGRATION_LOCK_KEY = 7_240_001
+
+
+def schema_version() -> str:
+    digest = hashlib.sha256()
+    for name in MIGRATION_FILES:
+        path = SQL_DIR / f"{name}.sql"
+        if path.exists(): digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
 
 class Database:
     def __init__(self):
         self.pool: Optional[asyncpg.Pool] = None    
+        self.replicas: list[Replica] = [
+            Replica(f"replica-{i}", dsn) for i, dsn in enumerate(Constants.DATABASE_REPLICA_URLS)
+        ]
+        self._monitor: Optional[asyncio.Task] = None
 
-    async def execute_sql_file(self, path: Path, conn: asyncpg.Connection) -> None:
+    def _create_pool(self, dsn: str, min_size: int) -> Awaitable[asyncpg.Pool]:
+        return asyncpg.create_pool(
+            dsn=dsn,
+            # min_size conexões abertas em paralelo já na subida do worker
+            min_size=min_size,
+            max_size=Constants.DB_POOL_MAX_SIZE,
+            command_timeout=60,
+            statement_cache_size=0,
+            init=instrument_connection,
+            connection_class=ProfiledConnection,
+            # Busca de produtos: aceita termos parciais como "coca 2l"
+            server_settings={"pg_trgm.word_similarity_threshold": "0.4"}
+        )
+
+    async def execute_sql_file(self, path: Path, conn: asyncpg.Connection) -> bool:
         try:
             if not path.exists():
-                print(f"[WARN] Schema file not found: {path}")
-                return
+                logger.warning("Schema file not found: %s", path)
+                return False
             
             with open(path, "r", encoding="utf-8") as f:
                 sql_commands = f.read()
             await conn.execute(sql_commands)
-            print(f"[INFO] Schema executado com sucesso: {path}")
-        except Exception as e:
-            print(f"[ERROR] Falha ao executar schema [{path}] | {e}")
+            logger.info("Schema executado com sucesso: %s", path)
+            return True
+        except Exception:
+            logger.exception("Falha ao executar schema [%s]", path)
+            return False
 
     async def connect(self):
-        print("Iniciando conexão com o Banco de Dados...")
+        logger.info("Iniciando conexão com o Banco de Dados...")
         try:
-            self.pool = await asyncpg.create_pool(
-                dsn=os.getenv("DATABASE_URL"),
-                min_size=1,
-                max_size=10,
-                command_timeout=60,
-                statement_cache_size=0 
-            )
+            self.pool = await self._create_pool(os.getenv("DATABASE_URL"), Constants.DB_POOL_MIN_SIZE)
                     
             async with self.pool.acquire() as conn:
                 version = await conn.fetchval("SELECT version()")
-                print(f"Conectado ao Postgres: {version}")
-                
-                # Migração [Alembic ou dbmate em produção]
-                await self.execute_sql_file(Path("db/schema.sql"), conn)
-                await self.execute_sql_file(Path("db/views.sql"), conn)
-                await self.execute_sql_file(Path("db/insertions.sql"), conn)
-                await self.execute_sql_file(Path("db/index.sql"), conn)
-                await self.execute_sql_file(Path("db/rls.sql"), conn)
+                logger.info("Conectado ao Postgres: %s", version)
+
+            logger.info("DB Pool conectado com sucesso (Supabase Mode)")
 
-            print("DB Pool conectado com sucesso (Supabase Mode)")
+            await self._connect_replicas()
             
         except Exception as e:
-            print(f"Erro CRÍTICO ao conectar no banco: {e}")
+            logger.critical("Erro CRÍTICO ao conectar no banco: %s", e)
             raise e
 
-    async def disconnect(self):
+    async def _connect_replicas(self) -> None:
+        # Réplica fora do ar não impede a subida: as leituras vão para o primário
+        for replica in self.replicas:
+            try:
+                replica.pool = await self._create_pool(replica.dsn, 1)
+                await replica.check()
+                logger.info("Réplica %s conectada (atraso %ss)", replica.name, replica.lag)
+            except Exception as e:
+                logger.error("Réplica %s indisponível na subida | %s", replica.name, e)
+        if self.replicas:
+            self._monitor = asyncio.create_task(self._monitor_replicas())
+
+    async def _monitor_replicas(self) -> None:
+        while True:
+            await asyncio.sleep(Constants.DB_REPLICA_CHECK_INTERVAL)
+            for replica in self.replicas:
+                if replica.pool is None:
+                    try:
+                        replica.pool = await self._create_pool(replica.dsn, 1)
+                    except Exception:
+                        continue
+                await replica.check()
+
+    def pick_replica(self, min_lsn: Optional[int] = None) -> Optional[Replica]:
+        """A réplica menos ocupada entre as que estão em dia e já aplicaram min_lsn."""
+        candidates = [r for r in self.replicas if r.pool is not None and r.usable and r.has_applied(min_lsn)]
+        if not candidates: return None
+        return min(candidates, key=lambda r: r.busy)
+
+    async def acquire_read(self, min_lsn: Optional[int] = None) -> tuple[asyncpg.Pool, asyncpg.Connection]:
+        replica = self.pick_replica(min_lsn)
+        if replica is not None:
+            try:
+                conn = await replica.pool.acquire(timeout=Constants.DB_REPLICA_ACQUIRE_TIMEOUT)
+                db_reads_routed.inc("replica")
+                return replica.pool, conn
+            except (OSError, asyncio.TimeoutError, asyncpg.PostgresError) as e:
+                replica.healthy = False
+                logger.warning("Réplica %s falhou, lendo do primário | %s", replica.name, e)
+
+        db_reads_routed.inc("primary")
+        return self.pool, await self.pool.acquire()
+
+    async def migrate(self) -> str:
+        """
+        Aplica os arquivos SQL só quando o conteúdo mudou. Com vários workers
+        subindo juntos, o primeiro aplica sob a trava e os demais só conferem
+        a versão, em vez de cada um reexecutar todo o DDL.
+        """
+        version = schema_version()
+        async with self.pool.acquire() as conn:
+            await conn.execute("SELECT pg_advisory_lock($1)", MIGRATION_LOCK_KEY)
+            try:
+                applied = (
+                    await conn.fetchval("SELECT to_regclass('public.schema_migrations') IS NOT NULL")
+                    and await conn.fetchval("SELECT EXISTS (SELECT 1 FROM schema_migrations WHERE version = $1)", version)
+                )
+                if applied:
+                    logger.info("Schema já na versão %s, migração ignorada", version)
+                    return version
+
+                # Migração [Alembic ou dbmate em produção]
+                ok = True
+                for name in MIGRATION_FILES:
+                    ok = await self.execute_sql_file(SQL_DIR / f"{name}.sql", conn) and ok
+
+                # Com falha a versão não é gravada e a próxima subida tenta de novo
+                if ok:
+                    await conn.execute(
+                        "INSERT INTO schema_migrations (version) VALUES ($1) ON CONFLICT DO NOTHING",
+                        version
+                    )
+                    logger.info("Schema migrado para a versão %s", version)
+            finally:
+                await conn.execute("SELECT pg_advisory_unlock($1)", MIGRATION_LOCK_KEY)
+        return version
+
+    async def warm(self) -> None:
+        # Um round-trip em cada conexão mínima: se o banco sumiu, falha aqui e não na 1ª requisição
+        conns = [await self.pool.acquire() for _ in range(self.pool.get_min_size())]
+        try:
+            await asyncio.gather(*(conn.fetchval("SELECT 1") for conn in conns))
+        finally:
+            for conn in conns:
+                await self.pool.release(conn)
+
+    async def disconnect(self, timeout: float = 10.0):
+        if self._monitor:
+            self._monitor.cancel()
+            try:
+                await self._monitor
+            except asyncio.CancelledError:
+                pass
+            self._monitor = None
+
+        # Réplicas primeiro: o primário é o último a sair
+        for replica in self.replicas:
+            if replica.pool: await self._close_pool(replica.pool, timeout)
         if self.pool:
-            await self.pool.close()
-            print("DB Pool encerrado corretamente")
+            await self._close_pool(self.pool, timeout)
+            logger.info("DB Pool encerrado corretamente")
+
+    async def _close_pool(self, pool: asyncpg.Pool, timeout: float) -> None:
+        # close() espera as conexões voltarem; uma presa não segura o encerramento
+        try:
+            await asyncio.wait_for(pool.close(), timeout)
+        except asyncio.TimeoutError:
+            logger.error("Pool não fechou em %.0fs, encerrando conexões à força", timeout)
+            pool.terminate()
 
 
 db = Database()
+startup.register("db_pool", db.warm)
 
 
 async def get_db_pool():
@@ -74,38 +213,91 @@ async def get_db_pool():
 T = TypeVar("T")
 
 ERROR_MAP = {
-    "users_unique_email": "Email já cadastrado.",
-    "users_unique_cpf": "CPF já cadastrado.",
-    "products_sku_key": "SKU já existe.",
-    "product_barcodes_pkey": "Código de barras já existe.",
-
-    "users_name_length": "Nome deve ter entre 3 e 256 caracteres.",
-    "users_nickname_length": "Apelido deve ter entre 3 e 256 caracteres.",
-    "users_note_length": "Anotação deve ter no máximo 512 caracteres.",
-    "users_cpf_format": "CPF inválido.",
-    "users_phone_format": "Número de telefone inválido",
-
-    "sale_items_greater_than_zero": "Um item pertencente a compra não pode ter quantidade zero."
+    "categories_name_unique_cstr": "Categoria já cadastrada.",
+    "categories_name_length_cstr": "Nome da categoria deve ter entre 3 e 64 caracteres.",
+
+    "suppliers_name_unique": "Fornecedor já cadastrado.",
+    "suppliers_cnpj_unique": "CNPJ já cadastrado.",
+    "suppliers_cnpj_length_check": "CNPJ inválido.",
+    "suppliers_phone_length_check": "Telefone do fornecedor deve ter 11 dígitos.",
+    "supplier_receipts_invoice_unique": "Esta nota fiscal já foi recebida para o fornecedor.",
+
+    "products_name_unique_cstr": "Já existe um produto com este nome.",
+    "products_gtin_unique_cstr": "Código de barras já cadastrado em outro produto.",
+    "products_sku_unique_cstr": "SKU já cadastrado em outro produto.",
+    "products_sku_chk": "SKU deve ter entre 2 e 128 caracteres.",
+    "products_sale_price_valid_cstr": "O valor de venda não pode ser menor que o valor de compra.",
+    "recipes_quantity_valid": "Quantidade do ingrediente não pode ser negativa.",
+    "batches_batch_code_length_cstr": "Código do lote deve ter no máximo 64 caracteres.",
+    "batches_quantity_valid": "Quantidade do lote não pode ser negativa.",
+
+    "users_email_unique_cstr": "Email já cadastrado.",
+    "users_cpf_unique_cstr": "CPF já cadastrado.",
+    "users_name_length_cstr": "Nome deve ter entre 2 e 256 caracteres.",
+    "users_nickname_length_check": "Apelido deve ter entre 2 e 256 caracteres.",
+    "users_notes_length_check": "Anotação deve ter entre 2 e 512 caracteres.",
+    "users_valid_cpf_cstr": "CPF inválido.",
+    "users_valid_phone_cstr": "Número de telefone inválido",
+
+    "sale_items_greater_than_zero_cstr": "Um item pertencente a compra não pode ter quantidade zero.",
+
+    "positive_amount": "Valor pago deve ser maior que zero.",
+    "customer_tabs_amount_due_cstr": "Valor da venda fiada deve ser maior que zero.",
+    "customer_tabs_amount_paid_cstr": "Valor pago excede o saldo em aberto da venda.",
+    "customer_tabs_customer_required_cstr": "Venda fiado exige um cliente vinculado.",
+    "customer_tabs_credit_limit_cstr": "Limite de crédito do cliente excedido."
+}
+
+CONCURRENCY_CONFLICT = "Conflito com outra operação simultânea. Tente novamente."
+
+# SQLSTATE -> (status HTTP, mensagem quando a constraint não está no ERROR_MAP).
+# Uma consulta ao dict em vez de uma cadeia de except por classe de erro
+SQLSTATE_MAP = {
+    "23505": (status.HTTP_409_CONFLICT, "Conflito de dados únicos."),
+    "23514": (status.HTTP_400_BAD_REQUEST, "Dados inválidos"),
+    "23503": (status.HTTP_409_CONFLICT, "Registro relacionado não existe ou ainda está em uso."),
+    "23502": (status.HTTP_400_BAD_REQUEST, "Campo obrigatório não informado."),
+    "22001": (status.HTTP_400_BAD_REQUEST, "Texto maior que o permitido."),
+    "22003": (status.HTTP_400_BAD_REQUEST, "Valor fora do intervalo permitido."),
+    "42501": (status.HTTP_403_FORBIDDEN, "Operação não permitida para o seu perfil."),
+    "40001": (status.HTTP_409_CONFLICT, CONCURRENCY_CONFLICT),
+    "40P01": (status.HTTP_409_CONFLICT, CONCURRENCY_CONFLICT),
+    "55P03": (status.HTTP_409_CONFLICT, CONCURRENCY_CONFLICT),
+    "57014": (status.HTTP_503_SERVICE_UNAVAILABLE, "Operação excedeu o tempo limite. Tente novamente."),
 }
 
+# serialization_failure e deadlock_detected: repetir resolve quando o que foi
+# desfeito (a transação, ou o savepoint de run_transaction) segurava todas as
+# travas do conflito e o snapshot é novo a cada tentativa
+RETRYABLE_SQLSTATES = frozenset({"40001", "40P01"})
+
+INTERNAL_ERROR = "Erro interno ao processar operação."
+
+
+def translate_error(e: asyncpg.PostgresError) -> DatabaseError:
+    sqlstate = e.sqlstate
+    constraint = getattr(e, "constraint_name", None)
+    db_errors.inc(sqlstate or "")
+    mapped = SQLSTATE_MAP.get(sqlstate)
+    if mapped is None:
+        logger.error("Erro do banco sem tradução | %s", e, extra={"sqlstate": sqlstate, "constraint": constraint})
+        return DatabaseError(code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=INTERNAL_ERROR, sqlstate=sqlstate)
+
+    code, detail = mapped
+    logger.warning("Erro do banco | %s", e, extra={"sqlstate": sqlstate, "constraint": constraint})
+    return DatabaseError(code=code, detail=ERROR_MAP.get(constraint, detail), sqlstate=sqlstate)
+
+
 async def db_safe_exec(operation: Awaitable[T]) -> T:
     try:
         return await operation
-    except asyncpg.exceptions.UniqueViolationError as e:
-        detail = ERROR_MAP.get(e.constraint_name, "Conflito de dados únicos.")
-        raise DatabaseError(
-            code=status.HTTP_409_CONFLICT,
-            detail=detail
-        )
-    except asyncpg.exceptions.CheckViolationError as e:
-        detail = ERROR_MAP.get(e.constraint_name, "Dados inválidos")        
-        raise DatabaseError(
-            code=status.HTTP_400_BAD_REQUEST,
-            detail=detail
-        )
+    except asyncpg.PostgresError as e:
+        raise translate_error(e) from e
+    except (HTTPException, DatabaseError):
+        raise
     except Exception as e:
-        if isinstance(e, HTTPException): raise e
+        logger.exception("Falha inesperada na operação")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, 
-            detail="Erro interno ao processar operação."
-        )
\ No newline at end of file
+            detail=INTERNAL_ERROR
+        ) from e
@@ -5,11 +5,21 @@ CREATE INDEX IF NOT EXISTS idx_products_name ON products USING gin(name gin_trgm
 CREATE INDEX IF NOT EXISTS idx_products_sku ON products(sku);
 CREATE INDEX IF NOT EXISTS idx_products_gtin ON products(gtin);
 CREATE INDEX IF NOT EXISTS idx_products_category ON products(category_id);
+CREATE INDEX IF NOT EXISTS idx_products_supplier ON products(supplier_id);
 CREATE INDEX IF NOT EXISTS idx_products_active ON products(is_active) WHERE is_active = TRUE;
 CREATE INDEX IF NOT EXISTS idx_products_low_stock ON products(stock_quantity, min_stock_quantity) 
     WHERE stock_quantity <= min_stock_quantity AND is_active = TRUE;
 
+CREATE INDEX IF NOT EXISTS idx_products_search_name ON products 
+    USING gin(f_search_normalize(name::text) gin_trgm_ops) WHERE is_active = TRUE;
+CREATE INDEX IF NOT EXISTS idx_products_search_name_prefix ON products 
+    (f_search_normalize(name::text) text_pattern_ops) WHERE is_active = TRUE;
+CREATE INDEX IF NOT EXISTS idx_products_search_description ON products 
+    USING gin(f_search_normalize(description) gin_trgm_ops) WHERE is_active = TRUE;
+
 COMMENT ON INDEX idx_products_name IS 'Busca textual rápida por nome de produto (trigram)';
+COMMENT ON INDEX idx_products_search_name IS 'Busca aproximada por nome sem acentos (trigram)';
+COMMENT ON INDEX idx_products_search_name_prefix IS 'Busca por prefixo enquanto o caixa digita';
 COMMENT ON INDEX idx_products_low_stock IS 'Identifica produtos com estoque baixo';
 
 -- === USUÁRIOS ===
@@ -22,6 +32,25 @@ CREATE INDEX IF NOT EXISTS idx_users_customers_with_debt ON users(invoice_amount
 
 COMMENT ON INDEX idx_users_customers_with_debt IS 'Clientes com dívidas pendentes';
 
+-- Autocomplete de clientes no caixa: só clientes ativos entram nos índices
+CREATE INDEX IF NOT EXISTS idx_users_lookup_name ON users
+    USING gin(f_search_normalize(name) gin_trgm_ops) WHERE role = 'CLIENTE' AND is_active = TRUE;
+CREATE INDEX IF NOT EXISTS idx_users_lookup_nickname ON users
+    USING gin(f_search_normalize(nickname) gin_trgm_ops) WHERE role = 'CLIENTE' AND is_active = TRUE;
+CREATE INDEX IF NOT EXISTS idx_users_lookup_name_prefix ON users
+    (f_search_normalize(name) text_pattern_ops) WHERE role = 'CLIENTE' AND is_active = TRUE;
+CREATE INDEX IF NOT EXISTS idx_users_lookup_nickname_prefix ON users
+    (f_search_normalize(nickname) text_pattern_ops) WHERE role = 'CLIENTE' AND is_active = TRUE;
+CREATE INDEX IF NOT EXISTS idx_users_lookup_cpf ON users
+    (f_only_digits(cpf) text_pattern_ops) WHERE role = 'CLIENTE' AND is_active = TRUE;
+CREATE INDEX IF NOT EXISTS idx_users_lookup_phone ON users
+    (f_only_digits(phone) text_pattern_ops) WHERE role = 'CLIENTE' AND is_active = TRUE;
+CREATE INDEX IF NOT EXISTS idx_users_lookup_phone_local ON users
+    (substr(f_only_digits(phone), 3) text_pattern_ops) WHERE role = 'CLIENTE' AND is_active = TRUE;
+
+COMMENT ON INDEX idx_users_lookup_name_prefix IS 'Autocomplete de clientes por prefixo do nome';
+COMMENT ON INDEX idx_users_lookup_phone_local IS 'Autocomplete por telefone digitado sem o DDD';
+
 -- === VENDAS ===
 CREATE INDEX IF NOT EXISTS idx_sales_status ON sales(status);
 CREATE INDEX IF NOT EXISTS idx_sales_customer ON sales(customer_id);
@@ -50,10 +79,9 @@ CREATE INDEX IF NOT EXISTS idx_stock_movements_reference ON stock_movements(refe
 -- === LOTES ===
 CREATE INDEX IF NOT EXISTS idx_batches_product ON batches(product_id);
 CREATE INDEX IF NOT EXISTS idx_batches_expiration ON batches(expiration_date);
-CREATE INDEX IF NOT EXISTS idx_batches_expired ON batches(expiration_date) 
-    WHERE expiration_date < CURRENT_DATE;
-
-COMMENT ON INDEX idx_batches_expired IS 'Lotes vencidos ou próximos ao vencimento';
+-- Predicado com CURRENT_DATE não é aceito em índice parcial (não é IMMUTABLE):
+-- lotes vencidos usam idx_batches_expiration
+DROP INDEX IF EXISTS idx_batches_expired;
 
 -- === CATEGORIAS ===
 CREATE INDEX IF NOT EXISTS idx_categories_parent ON categories(parent_category_id);
@@ -69,4 +97,40 @@ CREATE INDEX IF NOT EXISTS idx_logs_metadata ON logs USING gin(metadata);
 
 -- === PAGAMENTOS FIADO ===
 CREATE INDEX IF NOT EXISTS idx_tab_payments_sale ON tab_payments(sale_id);
-CREATE INDEX IF NOT EXISTS idx_tab_payments_created ON tab_payments(created_at DESC);
\ No newline at end of file
+CREATE INDEX IF NOT EXISTS idx_tab_payments_created ON tab_payments(created_at DESC);
+-- === CONTAS FIADO ===
+CREATE INDEX IF NOT EXISTS idx_customer_tabs_open ON customer_tabs(customer_id, created_at, sale_id)
+    INCLUDE (amount_due, amount_paid)
+    WHERE status <> 'FIADO-QUITADO';
+CREATE INDEX IF NOT EXISTS idx_customer_tabs_open_created ON customer_tabs(created_at)
+    INCLUDE (customer_id, amount_due, amount_paid)
+    WHERE status <> 'FIADO-QUITADO';
+
+COMMENT ON INDEX idx_customer_tabs_open IS 'Contas em aberto por cliente na ordem de abatimento (mais antiga primeiro)';
+COMMENT ON INDEX idx_customer_tabs_open_created IS 'Relatório de envelhecimento (aging) das contas em aberto';
+
+
+-- === EVENTOS AO VIVO ===
+CREATE INDEX IF NOT EXISTS idx_live_events_created_at ON live_events(created_at);
+CREATE INDEX IF NOT EXISTS idx_sales_live_board ON sales(created_at) 
+    WHERE status IN ('ABERTA', 'EM_ENTREGA');
+
+COMMENT ON INDEX idx_sales_live_board IS 'Painel ao vivo: vendas abertas ou em entrega';
+
+-- === IDEMPOTÊNCIA ===
+CREATE INDEX IF NOT EXISTS idx_idempotency_keys_expires_at ON idempotency_keys(expires_at);
+-- === SINCRONIZAÇÃO DO CATÁLOGO ===
+CREATE INDEX IF NOT EXISTS idx_categories_row_version ON categories(row_version);
+CREATE INDEX IF NOT EXISTS idx_tax_groups_row_version ON tax_groups(row_version);
+CREATE INDEX IF NOT EXISTS idx_products_row_version ON products(row_version);
+CREATE INDEX IF NOT EXISTS idx_catalog_tombstones_row_version ON catalog_tombstones(row_version);
+
+COMMENT ON INDEX idx_products_row_version IS 'Delta do catálogo para os caixas (row_version > watermark)';
+
+-- === SESSÕES ===
+CREATE INDEX IF NOT EXISTS idx_refresh_tokens_user_active ON refresh_tokens(user_id, created_at DESC)
+    WHERE NOT revoked;
+CREATE INDEX IF NOT EXISTS idx_refresh_tokens_expires_at ON refresh_tokens(expires_at);
+CREATE INDEX IF NOT EXISTS idx_session_revocations_expires_at ON session_revocations(expires_at);
+
+COMMENT ON INDEX idx_refresh_tokens_user_active IS 'Lista de sessões abertas do usuário (dispositivos)';
@@ -1,4 +1,12 @@
+-- Loja padrão: a única numa instalação sem multi-loja
+INSERT INTO tenants (id, slug, name) VALUES (1, 'default', 'Armazém do Neca')
+ON CONFLICT (id) DO NOTHING;
 
+-- O id 1 entrou explícito: a próxima loja criada não pode receber o mesmo
+SELECT setval(pg_get_serial_sequence('tenants', 'id'), (SELECT MAX(id) FROM tenants));
+
+-- As categorias abaixo são da loja padrão (o arquivo roda numa transação só)
+SELECT set_config('app.current_tenant_id', '1', true);
 
 INSERT INTO categories (name, parent_category_id) VALUES 
     ('Lanchonete & Cozinha', NULL),
@@ -9,56 +17,56 @@ INSERT INTO categories (name, parent_category_id) VALUES
     ('Hortifruti', NULL),
     ('Higiene e Limpeza', NULL),
     ('Conveniência', NULL)
-ON CONFLICT (name) DO NOTHING;
+ON CONFLICT (tenant_id, name) DO NOTHING;
 
 -- Subcategorias de Lanchonete
 INSERT INTO categories (name, parent_category_id) VALUES 
-    ('Lanches Tradicionais', (SELECT id FROM categories WHERE name = 'Lanchonete & Cozinha')),
-    ('Salgados e Assados',   (SELECT id FROM categories WHERE name = 'Lanchonete & Cozinha')),
-    ('Cafeteria',            (SELECT id FROM categories WHERE name = 'Lanchonete & Cozinha'))
-ON CONFLICT (name) DO NOTHING;
+    ('Lanches Tradicionais', (SELECT id FROM categories WHERE tenant_id = 1 AND name = 'Lanchonete & Cozinha')),
+    ('Salgados e Assados',   (SELECT id FROM categories WHERE tenant_id = 1 AND name = 'Lanchonete & Cozinha')),
+    ('Cafeteria',            (SELECT id FROM categories WHERE tenant_id = 1 AND name = 'Lanchonete & Cozinha'))
+ON CONFLICT (tenant_id, name) DO NOTHING;
 
 -- Subcategorias de Bar
 INSERT INTO categories (name, parent_category_id) VALUES 
-    ('Cervejas (Geladas/Consumo)', (SELECT id FROM categories WHERE name = 'Bar & Drinks')),
-    ('Drinks e Coquetéis',         (SELECT id FROM categories WHERE name = 'Bar & Drinks')),
-    ('Doses',                      (SELECT id FROM categories WHERE name = 'Bar & Drinks')),
-    ('Porções e Petiscos',         (SELECT id FROM categories WHERE name = 'Bar & Drinks'))
-ON CONFLICT (name) DO NOTHING;
+    ('Cervejas (Geladas/Consumo)', (SELECT id FROM categories WHERE tenant_id = 1 AND name = 'Bar & Drinks')),
+    ('Drinks e Coquetéis',         (SELECT id FROM categories WHERE tenant_id = 1 AND name = 'Bar & Drinks')),
+    ('Doses',                      (SELECT id FROM categories WHERE tenant_id = 1 AND name = 'Bar & Drinks')),
+    ('Porções e Petiscos',         (SELECT id FROM categories WHERE tenant_id = 1 AND name = 'Bar & Drinks'))
+ON CONFLICT (tenant_id, name) DO NOTHING;
 
 -- Subcategorias de Bebidas (Varejo)
 INSERT INTO categories (name, parent_category_id) VALUES 
-    ('Cervejas (Packs/Fardos)', (SELECT id FROM categories WHERE name = 'Bebidas (Varejo)')),
-    ('Refrigerantes e Sucos',   (SELECT id FROM categories WHERE name = 'Bebidas (Varejo)')),
-    ('Destilados (Garrafas)',   (SELECT id FROM categories WHERE name = 'Bebidas (Varejo)')),
-    ('Águas',                   (SELECT id FROM categories WHERE name = 'Bebidas (Varejo)')),
-    ('Águas (Galões/Retornáveis)', (SELECT id FROM categories WHERE name = 'Bebidas (Varejo)'))
-ON CONFLICT (name) DO NOTHING;
+    ('Cervejas (Packs/Fardos)', (SELECT id FROM categories WHERE tenant_id = 1 AND name = 'Bebidas (Varejo)')),
+    ('Refrigerantes e Sucos',   (SELECT id FROM categories WHERE tenant_id = 1 AND name = 'Bebidas (Varejo)')),
+    ('Destilados (Garrafas)',   (SELECT id FROM categories WHERE tenant_id = 1 AND name = 'Bebidas (Varejo)')),
+    ('Águas',                   (SELECT id FROM categories WHERE tenant_id = 1 AND name = 'Bebidas (Varejo)')),
+    ('Águas (Galões/Retornáveis)', (SELECT id FROM categories WHERE tenant_id = 1 AND name = 'Bebidas (Varejo)'))
+ON CONFLICT (tenant_id, name) DO NOTHING;
 
 -- Subcategorias de Mercearia
 INSERT INTO categories (name, parent_category_id) VALUES 
-    ('Alimentos Básicos',     (SELECT id FROM categories WHERE name = 'Mercearia')),
-    ('Matinais',              (SELECT id FROM categories WHERE name = 'Mercearia')),
-    ('Biscoitos e Doces',     (SELECT id FROM categories WHERE name = 'Mercearia')),
-    ('Condimentos e Molhos',  (SELECT id FROM categories WHERE name = 'Mercearia'))
-ON CONFLICT (name) DO NOTHING;
+    ('Alimentos Básicos',     (SELECT id FROM categories WHERE tenant_id = 1 AND name = 'Mercearia')),
+    ('Matinais',              (SELECT id FROM categories WHERE tenant_id = 1 AND name = 'Mercearia')),
+    ('Biscoitos e Doces',     (SELECT id FROM categories WHERE tenant_id = 1 AND name = 'Mercearia')),
+    ('Condimentos e Molhos',  (SELECT id FROM categories WHERE tenant_id = 1 AND name = 'Mercearia'))
+ON CONFLICT (tenant_id, name) DO NOTHING;
 
 -- Subcategorias de Frios
 INSERT INTO categories (name, parent_category_id) VALUES 
-    ('Fatiados',   (SELECT id FROM categories WHERE name = 'Frios e Laticínios')),
-    ('Laticínios', (SELECT id FROM categories WHERE name = 'Frios e Laticínios')),
-    ('Embutidos',  (SELECT id FROM categories WHERE name = 'Frios e Laticínios'))
-ON CONFLICT (name) DO NOTHING;
+    ('Fatiados',   (SELECT id FROM categories WHERE tenant_id = 1 AND name = 'Frios e Laticínios')),
+    ('Laticínios', (SELECT id FROM categories WHERE tenant_id = 1 AND name = 'Frios e Laticínios')),
+    ('Embutidos',  (SELECT id FROM categories WHERE tenant_id = 1 AND name = 'Frios e Laticínios'))
+ON CONFLICT (tenant_id, name) DO NOTHING;
 
 -- Subcategorias de Hortifruti
 INSERT INTO categories (name, parent_category_id) VALUES 
-    ('Frutas',   (SELECT id FROM categories WHERE name = 'Hortifruti')),
-    ('Legumes',  (SELECT id FROM categories WHERE name = 'Hortifruti')),
-    ('Verduras', (SELECT id FROM categories WHERE name = 'Hortifruti'))
-ON CONFLICT (name) DO NOTHING;
+    ('Frutas',   (SELECT id FROM categories WHERE tenant_id = 1 AND name = 'Hortifruti')),
+    ('Legumes',  (SELECT id FROM categories WHERE tenant_id = 1 AND name = 'Hortifruti')),
+    ('Verduras', (SELECT id FROM categories WHERE tenant_id = 1 AND name = 'Hortifruti'))
+ON CONFLICT (tenant_id, name) DO NOTHING;
 
 -- Subcategorias de Limpeza
 INSERT INTO categories (name, parent_category_id) VALUES 
-    ('Limpeza Casa',    (SELECT id FROM categories WHERE name = 'Higiene e Limpeza')),
-    ('Higiene Pessoal', (SELECT id FROM categories WHERE name = 'Higiene e Limpeza'))
-ON CONFLICT (name) DO NOTHING;
\ No newline at end of file
+    ('Limpeza Casa',    (SELECT id FROM categories WHERE tenant_id = 1 AND name = 'Higiene e Limpeza')),
+    ('Higiene Pessoal', (SELECT id FROM categories WHERE tenant_id = 1 AND name = 'Higiene e Limpeza'))
+ON CONFLICT (tenant_id, name) DO NOTHING;
\ No newline at end of file
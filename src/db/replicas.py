@@ -0,0 +1,102 @@
+from starlette.types import ASGIApp, Receive, Scope, Send
+from typing import Optional
+from src.constants import Constants
+from src.log import get_logger
+import asyncpg
+
+
+logger = get_logger("db.replicas")
+
+LSN_COOKIE = "db_lsn"
+
+# Réplica: posição já aplicada e atraso (zero quando aplicou tudo o que recebeu).
+# Apontada para um primário (ambiente local), usa a posição atual do WAL.
+STATUS_QUERY = """
+    SELECT
+        (CASE WHEN pg_is_in_recovery() THEN pg_last_wal_replay_lsn() ELSE pg_current_wal_lsn() END)::text AS lsn,
+        CASE
+            WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+            ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+        END AS lag
+"""
+
+
+def parse_lsn(value: Optional[str]) -> Optional[int]:
+    """'16/B374D848' -> inteiro comparável; None se ausente ou inválido."""
+    if not value: return None
+    try:
+        high, low = value.split("/")
+        return (int(high, 16) << 32) | int(low, 16)
+    except ValueError:
+        return None
+
+
+class Replica:
+
+    def __init__(self, name: str, dsn: str):
+        self.name = name
+        self.dsn = dsn
+        self.pool: Optional[asyncpg.Pool] = None
+        self.healthy = False
+        self.lag: Optional[float] = None
+        self.lsn: Optional[int] = None
+
+    @property
+    def usable(self) -> bool:
+        return self.healthy and self.lag is not None and self.lag <= Constants.DB_REPLICA_MAX_LAG_S
+
+    def has_applied(self, lsn: Optional[int]) -> bool:
+        return lsn is None or (self.lsn is not None and self.lsn >= lsn)
+
+    @property
+    def busy(self) -> int:
+        return self.pool.get_size() - self.pool.get_idle_size()
+
+    async def check(self) -> None:
+        try:
+            async with self.pool.acquire(timeout=Constants.DB_REPLICA_ACQUIRE_TIMEOUT) as conn:
+                row = await conn.fetchrow(STATUS_QUERY, timeout=Constants.DB_REPLICA_ACQUIRE_TIMEOUT)
+        except Exception as e:
+            if self.healthy: logger.warning("Réplica %s indisponível | %s", self.name, e)
+            self.healthy = False
+            return
+
+        self.lsn = parse_lsn(row["lsn"])
+        self.lag = float(row["lag"]) if row["lag"] is not None else None
+        self.healthy = True
+
+    def status(self) -> dict:
+        return {"name": self.name, "healthy": self.healthy, "usable": self.usable, "lag_s": self.lag}
+
+
+def _lsn_cookie(lsn: str) -> bytes:
+    attributes = f"{LSN_COOKIE}={lsn}; Max-Age={Constants.READ_YOUR_WRITES_S}; Path=/; HttpOnly"
+    if Constants.IS_PRODUCTION:
+        attributes += "; Secure; SameSite=none"
+    else:
+        attributes += "; SameSite=lax"
+    return attributes.encode("latin-1")
+
+
+class ReadYourWritesMiddleware:
+    """
+    Requisições que escreveram no primário deixam o LSN do commit em
+    scope["state"]; aqui ele vira um cookie curto. Enquanto o cookie existir,
+    as leituras só vão para réplicas que já aplicaram aquela posição.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message) -> None:
+            if message["type"] == "http.response.start":
+                lsn = scope.get("state", {}).get("db_write_lsn")
+                if lsn: message["headers"] = [*message.get("headers", ()), (b"set-cookie", _lsn_cookie(lsn))]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
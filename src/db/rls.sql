@@ -2,333 +2,128 @@
 -- RLS - ARMAZÉM DO NECA
 -- ============================================================================
 
--- ============================================================================
--- 1. TAX_GROUPS
--- ============================================================================
-
-CREATE POLICY tax_groups_select ON tax_groups FOR SELECT TO PUBLIC
-USING (auth_role() IN ('ADMIN', 'GERENTE', 'CONTADOR', 'ESTOQUISTA'));
-
-CREATE POLICY tax_groups_modify ON tax_groups FOR ALL TO PUBLIC
-USING (auth_role() IN ('ADMIN', 'CONTADOR'))
-WITH CHECK (auth_role() IN ('ADMIN', 'CONTADOR'));
-
--- ============================================================================
--- 2. SUPPLIERS
--- ============================================================================
-
-CREATE POLICY suppliers_select ON suppliers FOR SELECT TO PUBLIC
-USING (auth_role() IN ('ADMIN', 'GERENTE', 'ESTOQUISTA', 'CONTADOR'));
-
-CREATE POLICY suppliers_modify ON suppliers FOR ALL TO PUBLIC
-USING (auth_role() IN ('ADMIN', 'GERENTE'))
-WITH CHECK (auth_role() IN ('ADMIN', 'GERENTE'));
-
--- ============================================================================
--- 3. RECIPES
--- ============================================================================
-
-CREATE POLICY recipes_select ON recipes FOR SELECT TO PUBLIC
-USING (auth_role() IN ('ADMIN', 'GERENTE', 'CAIXA', 'ESTOQUISTA'));
-
-CREATE POLICY recipes_modify ON recipes FOR ALL TO PUBLIC
-USING (auth_role() IN ('ADMIN', 'GERENTE'))
-WITH CHECK (auth_role() IN ('ADMIN', 'GERENTE'));
-
--- ============================================================================
--- 4. USER_ADDRESSES
--- ============================================================================
-
-CREATE POLICY addresses_select ON user_addresses FOR SELECT TO PUBLIC
-USING (
-    auth_role() IN ('ADMIN', 'GERENTE', 'CAIXA', 'CONTADOR')
-    OR user_id = auth_uid()
-);
-
-CREATE POLICY addresses_modify ON user_addresses FOR ALL TO PUBLIC
-USING (
-    auth_role() IN ('ADMIN', 'GERENTE')
-    OR user_id = auth_uid()
-)
-WITH CHECK (
-    auth_role() IN ('ADMIN', 'GERENTE')
-    OR user_id = auth_uid()
-);
-
--- ============================================================================
--- 5. SALE_PAYMENTS
--- ============================================================================
-
-CREATE POLICY sale_payments_select ON sale_payments FOR SELECT TO PUBLIC
-USING (
-    auth_role() IN ('ADMIN', 'GERENTE', 'CONTADOR')
-    OR EXISTS (
-        SELECT 1 FROM sales s 
-        WHERE s.id = sale_payments.sale_id 
-        AND (s.salesperson_id = auth_uid() OR s.customer_id = auth_uid())
-    )
-);
-
-CREATE POLICY sale_payments_insert ON sale_payments FOR INSERT TO PUBLIC
-WITH CHECK (auth_role() IN ('ADMIN', 'GERENTE', 'CAIXA'));
-
--- Pagamentos não devem ser editados ou deletados após criados (auditoria)
-CREATE POLICY sale_payments_no_modify ON sale_payments FOR UPDATE TO PUBLIC
-USING (auth_role() = 'ADMIN');
-
-CREATE POLICY sale_payments_no_delete ON sale_payments FOR DELETE TO PUBLIC
-USING (auth_role() = 'ADMIN');
-
--- ============================================================================
--- 6. TAB_PAYMENTS
--- ============================================================================
-
-CREATE POLICY tab_payments_select ON tab_payments FOR SELECT TO PUBLIC
-USING (
-    auth_role() IN ('ADMIN', 'GERENTE', 'CONTADOR')
-    OR EXISTS (
-        SELECT 1 FROM sales s 
-        WHERE s.id = tab_payments.sale_id 
-        AND (s.customer_id = auth_uid() OR s.salesperson_id = auth_uid())
-    )
-);
-
-CREATE POLICY tab_payments_insert ON tab_payments FOR INSERT TO PUBLIC
-WITH CHECK (auth_role() IN ('ADMIN', 'GERENTE', 'CAIXA'));
-
--- Pagamentos de fiado não devem ser editados após registro
-CREATE POLICY tab_payments_no_modify ON tab_payments FOR UPDATE TO PUBLIC
-USING (auth_role() = 'ADMIN');
-
-CREATE POLICY tab_payments_no_delete ON tab_payments FOR DELETE TO PUBLIC
-USING (auth_role() = 'ADMIN');
-
--- ============================================================================
--- 7. BATCHES
--- ============================================================================
-
-CREATE POLICY batches_select ON batches FOR SELECT TO PUBLIC
-USING (auth_role() IN ('ADMIN', 'GERENTE', 'ESTOQUISTA', 'CONTADOR'));
-
-CREATE POLICY batches_modify ON batches FOR ALL TO PUBLIC
-USING (auth_role() IN ('ADMIN', 'GERENTE', 'ESTOQUISTA'))
-WITH CHECK (auth_role() IN ('ADMIN', 'GERENTE', 'ESTOQUISTA'));
-
--- ============================================================================
--- 8. USERS
--- ============================================================================
-
--- READ - Mantém a mesma lógica
-CREATE POLICY users_select ON users FOR SELECT TO PUBLIC
-USING (
-    auth_role() IN ('ADMIN', 'GERENTE', 'CAIXA', 'CONTADOR')
-    OR id = auth_uid()
-);
-
--- INSERT - Apenas staff pode criar usuários
-CREATE POLICY users_insert ON users FOR INSERT TO PUBLIC
-WITH CHECK (auth_role() IN ('ADMIN', 'GERENTE', 'CAIXA'));
-
--- UPDATE - Usuários podem editar apenas campos não-sensíveis
-CREATE POLICY users_update ON users FOR UPDATE TO PUBLIC
-USING (
-    auth_role() IN ('ADMIN', 'GERENTE')
-    OR id = auth_uid()
-)
-WITH CHECK (
-    -- ADMIN e GERENTE podem alterar tudo
-    auth_role() IN ('ADMIN', 'GERENTE')
-    OR (
-        -- Usuário só pode alterar seu próprio perfil E
-        id = auth_uid() 
-        AND role = OLD.role  -- NÃO pode mudar o próprio role
-        AND credit_limit = OLD.credit_limit -- NÃO pode aumentar crédito
-        AND invoice_amount = OLD.invoice_amount -- NÃO pode zerar dívida
-    )
-);
-
--- DELETE - Apenas ADMIN
-CREATE POLICY users_delete ON users FOR DELETE TO PUBLIC
-USING (auth_role() = 'ADMIN');
-
--- ============================================================================
--- 9. SALES
--- ============================================================================
-
-CREATE POLICY sales_update ON sales FOR UPDATE TO PUBLIC
-USING (
-    auth_role() IN ('ADMIN', 'GERENTE') 
-    OR (auth_role() = 'CAIXA' AND salesperson_id = auth_uid() AND status = 'ABERTA')
-)
-WITH CHECK (
-    auth_role() IN ('ADMIN', 'GERENTE') 
-    OR (auth_role() = 'CAIXA' AND salesperson_id = auth_uid() AND status = 'ABERTA')
-);
-
--- Apenas ADMIN pode deletar vendas concluídas
-CREATE POLICY sales_delete ON sales FOR DELETE TO PUBLIC
-USING (
-    auth_role() = 'ADMIN'
-    OR (auth_role() IN ('GERENTE', 'CAIXA') AND status = 'ABERTA')
-);
-
--- ============================================================================
--- 10. STOCK_MOVEMENTS
--- ============================================================================
-
-CREATE POLICY stock_insert ON stock_movements FOR INSERT TO PUBLIC
-WITH CHECK (auth_role() IN ('ADMIN', 'GERENTE', 'ESTOQUISTA'));
-
--- Movimentações não devem ser editadas (auditoria)
-CREATE POLICY stock_no_update ON stock_movements FOR UPDATE TO PUBLIC
-USING (auth_role() = 'ADMIN');
-
--- Movimentações não devem ser deletadas (auditoria)
-CREATE POLICY stock_no_delete ON stock_movements FOR DELETE TO PUBLIC
-USING (auth_role() = 'ADMIN');
-
--- ============================================================================
--- 11. PRICE_AUDITS
--- ============================================================================
-
-CREATE POLICY audit_insert ON price_audits FOR INSERT TO PUBLIC
-WITH CHECK (auth_role() IN ('ADMIN', 'GERENTE'));
-
-CREATE POLICY audit_no_modify ON price_audits FOR UPDATE TO PUBLIC
-USING (auth_role() = 'ADMIN');
-
-CREATE POLICY audit_no_delete ON price_audits FOR DELETE TO PUBLIC
-USING (auth_role() = 'ADMIN');
-
--- ============================================================================
--- 12. REFRESH_TOKENS2
--- ============================================================================
-
+-- CREATE POLICY não aceita IF NOT EXISTS: as políticas são recriadas do zero.
+-- O arquivo roda numa única transação, então não há janela sem política.
+DO $$
+DECLARE p RECORD;
+BEGIN
+    FOR p IN SELECT policyname, tablename FROM pg_policies WHERE schemaname = 'public' LOOP
+        EXECUTE format('DROP POLICY %I ON %I', p.policyname, p.tablename);
+    END LOOP;
+END $$;
+
+-- As requisições rodam como tenant_user (set_config('role') em security.py): o
+-- dono das tabelas passa por cima do RLS, o papel sem tabelas próprias não.
+-- O GRANT explícito dá ao dono o SET no papel, que o criador sem superusuário
+-- não recebe sozinho (PostgreSQL 16+).
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'tenant_user') THEN
+        CREATE ROLE tenant_user NOLOGIN;
+    END IF;
+    EXECUTE format('GRANT tenant_user TO %I', current_user);
+END $$;
+
+GRANT USAGE ON SCHEMA public TO tenant_user;
+GRANT SELECT, INSERT, UPDATE, DELETE ON ALL TABLES IN SCHEMA public TO tenant_user;
+GRANT USAGE, SELECT, UPDATE ON ALL SEQUENCES IN SCHEMA public TO tenant_user;
+REVOKE ALL ON schema_migrations FROM tenant_user;
+
+-- ============================================================================
+-- 1. LOJAS
+-- ============================================================================
+
+ALTER TABLE tenants ENABLE ROW LEVEL SECURITY;
+
+-- O login confere se a loja está ativa antes de haver sessão; lojas só são
+-- criadas e alteradas pelo dono do schema (scripts e migrações)
+CREATE POLICY tenants_select ON tenants FOR SELECT TO PUBLIC
+USING (true);
+
+-- ============================================================================
+-- 2. ISOLAMENTO POR LOJA
+-- ============================================================================
+
+-- A loja é o único filtro de linha: o perfil é conferido na rota
+-- (require_roles, ou os canais por perfil do painel ao vivo). Sem loja na
+-- sessão, auth_tenant() é NULL e nenhuma linha passa.
+DO $$
+DECLARE t TEXT;
+BEGIN
+    FOREACH t IN ARRAY ARRAY[
+        'categories', 'suppliers', 'tax_groups', 'products', 'recipes', 'batches',
+        'users', 'user_addresses', 'price_audits', 'stock_movements', 'supplier_receipts',
+        'sales', 'sale_items', 'sale_payments', 'tab_payments', 'customer_tabs', 'logs',
+        'product_imports', 'idempotency_keys', 'live_events', 'catalog_tombstones'
+    ] LOOP
+        EXECUTE format('ALTER TABLE %I ENABLE ROW LEVEL SECURITY', t);
+        EXECUTE format(
+            'CREATE POLICY %I ON %I FOR ALL TO PUBLIC '
+            'USING (tenant_id = auth_tenant()) WITH CHECK (tenant_id = auth_tenant())',
+            t || '_tenant_isolation', t
+        );
+    END LOOP;
+END $$;
+
+-- Sessões não têm loja própria: valem as do usuário dono
 ALTER TABLE refresh_tokens ENABLE ROW LEVEL SECURITY;
+ALTER TABLE session_revocations ENABLE ROW LEVEL SECURITY;
 
--- Usuários só veem seus próprios tokens
-CREATE POLICY tokens_select ON refresh_tokens FOR SELECT TO PUBLIC
-USING (
-    auth_role() = 'ADMIN'
-    OR user_id = auth_uid()
-);
-
--- Apenas o sistema pode criar tokens (via backend, não direto)
-CREATE POLICY tokens_insert ON refresh_tokens FOR INSERT TO PUBLIC
-WITH CHECK (auth_role() = 'ADMIN');
-
--- Usuários podem revogar seus próprios tokens (logout)
-CREATE POLICY tokens_update ON refresh_tokens FOR UPDATE TO PUBLIC
-USING (
-    auth_role() = 'ADMIN'
-    OR user_id = auth_uid()
-)
-WITH CHECK (
-    auth_role() = 'ADMIN'
-    OR (user_id = auth_uid() AND revoked = true) -- Só permite revogar
-);
-
--- Apenas ADMIN pode deletar tokens
-CREATE POLICY tokens_delete ON refresh_tokens FOR DELETE TO PUBLIC
-USING (auth_role() = 'ADMIN');
-
--- ============================================================================
--- 13. LOGS
--- ============================================================================
-
-ALTER TABLE logs ENABLE ROW LEVEL SECURITY;
-
--- Apenas staff técnico pode ler logs
-CREATE POLICY logs_select ON logs FOR SELECT TO PUBLIC
-USING (auth_role() IN ('ADMIN', 'GERENTE'));
-
--- Sistema pode inserir logs (geralmente via backend service account)
-CREATE POLICY logs_insert ON logs FOR INSERT TO PUBLIC
-WITH CHECK (true); -- Permite inserção, mas leitura é restrita
-
--- Logs não devem ser editados ou deletados
-CREATE POLICY logs_no_modify ON logs FOR UPDATE TO PUBLIC
-USING (auth_role() = 'ADMIN');
+CREATE POLICY refresh_tokens_tenant_isolation ON refresh_tokens FOR ALL TO PUBLIC
+USING (EXISTS (SELECT 1 FROM users u WHERE u.id = refresh_tokens.user_id AND u.tenant_id = auth_tenant()))
+WITH CHECK (EXISTS (SELECT 1 FROM users u WHERE u.id = refresh_tokens.user_id AND u.tenant_id = auth_tenant()));
 
-CREATE POLICY logs_no_delete ON logs FOR DELETE TO PUBLIC
-USING (auth_role() = 'ADMIN');
+CREATE POLICY session_revocations_tenant_isolation ON session_revocations FOR ALL TO PUBLIC
+USING (EXISTS (SELECT 1 FROM users u WHERE u.id = session_revocations.user_id AND u.tenant_id = auth_tenant()))
+WITH CHECK (EXISTS (SELECT 1 FROM users u WHERE u.id = session_revocations.user_id AND u.tenant_id = auth_tenant()));
 
 -- ============================================================================
--- 14. PRODUCTS
+-- 3. INVARIANTES - RESTRICTIVE, valem para qualquer perfil
 -- ============================================================================
 
-CREATE POLICY products_insert ON products FOR INSERT TO PUBLIC
-WITH CHECK (auth_role() IN ('ADMIN', 'GERENTE', 'ESTOQUISTA'));
+-- Trilhas de auditoria só recebem linhas: nem ADMIN edita ou apaga pela API.
+-- O dono (expurgo, migrações) e as FKs em cascata passam por cima do RLS.
+DO $$
+DECLARE t TEXT;
+BEGIN
+    FOREACH t IN ARRAY ARRAY['price_audits', 'stock_movements', 'tab_payments', 'logs'] LOOP
+        EXECUTE format('CREATE POLICY %I ON %I AS RESTRICTIVE FOR UPDATE TO PUBLIC USING (false)', t || '_no_update', t);
+        EXECUTE format('CREATE POLICY %I ON %I AS RESTRICTIVE FOR DELETE TO PUBLIC USING (false)', t || '_no_delete', t);
+    END LOOP;
+END $$;
 
-CREATE POLICY products_update ON products FOR UPDATE TO PUBLIC
-USING (auth_role() IN ('ADMIN', 'GERENTE', 'ESTOQUISTA'))
-WITH CHECK (auth_role() IN ('ADMIN', 'GERENTE', 'ESTOQUISTA'));
-
-CREATE POLICY products_delete ON products FOR DELETE TO PUBLIC
-USING (auth_role() IN ('ADMIN', 'GERENTE'));
-
--- ============================================================================
--- 15. CATEGORIES - Melhorar separação
--- ============================================================================
-
-CREATE POLICY categories_insert ON categories FOR INSERT TO PUBLIC
-WITH CHECK (auth_role() IN ('ADMIN', 'GERENTE', 'ESTOQUISTA'));
-
-CREATE POLICY categories_update ON categories FOR UPDATE TO PUBLIC
-USING (auth_role() IN ('ADMIN', 'GERENTE', 'ESTOQUISTA'))
-WITH CHECK (auth_role() IN ('ADMIN', 'GERENTE', 'ESTOQUISTA'));
-
-CREATE POLICY categories_delete ON categories FOR DELETE TO PUBLIC
-USING (auth_role() IN ('ADMIN', 'GERENTE'));
-
--- ============================================================================
--- 16. SALE_ITEMS
--- ============================================================================
+-- Refresh token só muda para revogado (logout, sair de todos os dispositivos)
+CREATE POLICY tokens_revoke_only ON refresh_tokens AS RESTRICTIVE FOR UPDATE TO PUBLIC
+USING (true)
+WITH CHECK (revoked);
 
-CREATE POLICY sale_items_insert ON sale_items FOR INSERT TO PUBLIC
-WITH CHECK (auth_role() IN ('ADMIN', 'GERENTE', 'CAIXA'));
+-- A chave de idempotência só vale para quem a criou
+CREATE POLICY idempotency_keys_owner ON idempotency_keys AS RESTRICTIVE FOR ALL TO PUBLIC
+USING (user_id = auth_uid())
+WITH CHECK (user_id = auth_uid());
 
-CREATE POLICY sale_items_update ON sale_items FOR UPDATE TO PUBLIC
-USING (
-    auth_role() IN ('ADMIN', 'GERENTE')
-    OR EXISTS (
-        SELECT 1 FROM sales s 
-        WHERE s.id = sale_items.sale_id 
-        AND s.status = 'ABERTA'
-        AND auth_role() = 'CAIXA'
-    )
-)
-WITH CHECK (
-    auth_role() IN ('ADMIN', 'GERENTE')
-    OR EXISTS (
-        SELECT 1 FROM sales s 
-        WHERE s.id = sale_items.sale_id 
-        AND s.status = 'ABERTA'
-        AND auth_role() = 'CAIXA'
-    )
-);
+-- Autoelevação em users (perfil, crédito, saldo) é barrada pelo trigger
+-- trg_users_prevent_self_escalation: política não compara com o valor antigo.
 
-CREATE POLICY sale_items_delete ON sale_items FOR DELETE TO PUBLIC
-USING (
-    auth_role() IN ('ADMIN', 'GERENTE')
-    OR EXISTS (
-        SELECT 1 FROM sales s 
-        WHERE s.id = sale_items.sale_id 
-        AND s.status = 'ABERTA'
-        AND auth_role() = 'CAIXA'
-    )
-);
+-- Views rodam com as permissões do dono e passariam por cima do RLS (e das
+-- lojas): com security_invoker, valem as políticas de quem consulta
+DO $$
+DECLARE v RECORD;
+BEGIN
+    FOR v IN SELECT viewname FROM pg_views WHERE schemaname = 'public' LOOP
+        EXECUTE format('ALTER VIEW %I SET (security_invoker = true)', v.viewname);
+    END LOOP;
+END $$;
 
 -- ============================================================================
 -- COMENTÁRIOS FINAIS
 -- ============================================================================
 
-COMMENT ON POLICY users_update ON users IS 
-'Usuários podem editar apenas campos não-sensíveis do próprio perfil. 
-CRÍTICO: Previne autoelevação de privilégios verificando OLD.role';
+COMMENT ON POLICY price_audits_no_update ON price_audits IS
+'Histórico de preços só recebe linhas; alterações e exclusões ficam com o dono do schema';
 
-COMMENT ON POLICY tokens_update ON refresh_tokens IS 
-'Usuários podem apenas revogar (logout) seus próprios tokens, não criar novos';
+COMMENT ON POLICY tokens_revoke_only ON refresh_tokens IS
+'Pela API o refresh token só pode ser revogado, nunca reativado';
 
-COMMENT ON POLICY logs_insert ON logs IS 
-'Permite inserção de logs mas restringe leitura a staff autorizado';
\ No newline at end of file
+COMMENT ON POLICY idempotency_keys_owner ON idempotency_keys IS
+'Uma chave de idempotência não devolve a resposta guardada para outro usuário';
@@ -6,6 +6,18 @@
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
 CREATE EXTENSION IF NOT EXISTS "pg_trgm";
 CREATE EXTENSION IF NOT EXISTS "citext";
+CREATE EXTENSION IF NOT EXISTS "unaccent";
+
+-- ============================================================================
+-- MIGRAÇÕES - Versão dos arquivos SQL já aplicados
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version VARCHAR(64) PRIMARY KEY,
+    applied_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+COMMENT ON TABLE schema_migrations IS 'Hash dos arquivos SQL aplicados: os workers pulam a migração quando a versão já existe';
 
 -- ============================================================================
 -- ENUMS - Tipos enumerados para padronização de dados
@@ -78,23 +90,201 @@ BEGIN
 END;
 $$ language 'plpgsql';
 
+-- Normaliza texto para busca (minúsculo e sem acentos).
+-- unaccent() não é IMMUTABLE, este wrapper permite usá-lo em índices.
+CREATE OR REPLACE FUNCTION f_search_normalize(TEXT)
+RETURNS TEXT AS $$
+    SELECT lower(public.unaccent('public.unaccent'::regdictionary, $1));
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT;
+
+-- Só os dígitos: CPF e telefone aceitam máscara na tabela, a busca compara sem ela.
+CREATE OR REPLACE FUNCTION f_only_digits(TEXT)
+RETURNS TEXT AS $$
+    SELECT regexp_replace($1, '[^0-9]', '', 'g');
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT;
+
+-- ============================================================================
+-- LOJAS (TENANTS) - Várias lojas atendidas pela mesma instalação
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS tenants (
+    id INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    slug VARCHAR(64) NOT NULL,
+    name TEXT NOT NULL,
+    is_active BOOLEAN NOT NULL DEFAULT TRUE,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT tenants_slug_unique_cstr UNIQUE (slug)
+);
+
+COMMENT ON TABLE tenants IS 'Lojas atendidas por esta instalação; cada registro de negócio pertence a uma delas';
+COMMENT ON COLUMN tenants.slug IS 'Identificador curto da loja (ex: centro, praia)';
+
+-- Loja da sessão, definida pela API junto com app.current_user_id (NULL fora de uma requisição)
+CREATE OR REPLACE FUNCTION auth_tenant()
+RETURNS INTEGER AS $$
+    SELECT NULLIF(current_setting('app.current_tenant_id', true), '')::integer;
+$$ LANGUAGE sql STABLE;
+
+-- Usuário e perfil da sessão, definidos pela API junto com a loja (NULL fora de uma requisição)
+CREATE OR REPLACE FUNCTION auth_uid()
+RETURNS UUID AS $$
+    SELECT NULLIF(current_setting('app.current_user_id', true), '')::uuid;
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION auth_role()
+RETURNS TEXT AS $$
+    SELECT NULLIF(current_setting('app.current_user_role', true), '');
+$$ LANGUAGE sql STABLE;
+
+-- As tabelas de negócio usam DEFAULT auth_tenant(): inserts das requisições
+-- caem na loja do usuário. Sem loja na sessão o default é NULL e o insert
+-- falha (NOT NULL): scripts informam a loja (app.current_tenant_id) ou
+-- gravam tenant_id explícito.
+
+-- Migração única de bancos anteriores ao multi-loja: o que já existia é da
+-- loja 1. É o único ponto que supõe uma loja; depois dele a coluna fica com
+-- o default acima.
+DO $$
+DECLARE
+    missing TEXT[];
+    t TEXT;
+BEGIN
+    SELECT array_agg(c.relname::text) INTO missing
+    FROM pg_class c
+    WHERE c.relnamespace = 'public'::regnamespace AND c.relkind = 'r'
+      AND c.relname = ANY(ARRAY[
+        'catalog_tombstones', 'categories', 'suppliers', 'tax_groups', 'products', 'recipes',
+        'batches', 'users', 'user_addresses', 'price_audits', 'stock_movements', 'supplier_receipts',
+        'sales', 'sale_items', 'sale_payments', 'tab_payments', 'customer_tabs', 'logs',
+        'product_imports', 'idempotency_keys', 'live_events'
+      ])
+      AND NOT EXISTS (
+        SELECT 1 FROM pg_attribute a
+        WHERE a.attrelid = c.oid AND a.attname = 'tenant_id' AND NOT a.attisdropped
+      );
+    IF missing IS NULL THEN RETURN; END IF;
+
+    INSERT INTO tenants (id, slug, name) VALUES (1, 'default', 'Armazém do Neca')
+    ON CONFLICT (id) DO NOTHING;
+    PERFORM setval(pg_get_serial_sequence('tenants', 'id'), (SELECT MAX(id) FROM tenants));
+
+    FOREACH t IN ARRAY missing LOOP
+        EXECUTE format('ALTER TABLE %I ADD COLUMN tenant_id INTEGER NOT NULL DEFAULT 1 REFERENCES tenants(id)', t);
+        EXECUTE format('ALTER TABLE %I ALTER COLUMN tenant_id SET DEFAULT auth_tenant()', t);
+    END LOOP;
+
+    -- Chaves únicas do catálogo passam a valer por loja
+    IF 'categories' = ANY(missing) THEN
+        ALTER TABLE categories
+            DROP CONSTRAINT IF EXISTS categories_name_unique_cstr,
+            ADD CONSTRAINT categories_name_unique_cstr UNIQUE (tenant_id, name);
+    END IF;
+    IF 'suppliers' = ANY(missing) THEN
+        ALTER TABLE suppliers
+            DROP CONSTRAINT IF EXISTS suppliers_cnpj_unique,
+            DROP CONSTRAINT IF EXISTS suppliers_name_unique,
+            ADD CONSTRAINT suppliers_cnpj_unique UNIQUE (tenant_id, cnpj),
+            ADD CONSTRAINT suppliers_name_unique UNIQUE (tenant_id, name);
+    END IF;
+    IF 'products' = ANY(missing) THEN
+        ALTER TABLE products
+            DROP CONSTRAINT IF EXISTS products_sku_key,
+            DROP CONSTRAINT IF EXISTS products_name_unique_cstr,
+            DROP CONSTRAINT IF EXISTS products_gtin_unique_cstr,
+            ADD CONSTRAINT products_name_unique_cstr UNIQUE (tenant_id, name),
+            ADD CONSTRAINT products_sku_unique_cstr UNIQUE (tenant_id, sku),
+            ADD CONSTRAINT products_gtin_unique_cstr UNIQUE (tenant_id, gtin);
+    END IF;
+END $$;
+
+-- ============================================================================
+-- VERSIONAMENTO DO CATÁLOGO - Sincronização incremental dos caixas
+-- ============================================================================
+
+-- Cada alteração em categorias, grupos fiscais ou produtos recebe um número
+-- desta sequência. O caixa guarda o maior número recebido (watermark) e
+-- pede apenas o que mudou depois dele.
+CREATE SEQUENCE IF NOT EXISTS catalog_version_seq;
+
+CREATE TABLE IF NOT EXISTS catalog_tombstones (
+    tenant_id INTEGER NOT NULL DEFAULT auth_tenant() REFERENCES tenants(id),
+    entity VARCHAR(16) NOT NULL,
+    entity_id TEXT NOT NULL,
+    row_version BIGINT NOT NULL DEFAULT nextval('catalog_version_seq'),
+    deleted_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (entity, entity_id)
+);
+
+COMMENT ON TABLE catalog_tombstones IS 'Registros do catálogo apagados, para que os caixas removam da cópia local';
+COMMENT ON COLUMN catalog_tombstones.entity IS 'Tipo do registro: category, tax_group ou product';
+
+-- Nova versão apenas quando algo que o caixa usa mudou (estoque não é sincronizado;
+-- colunas geradas ainda são NULL em NEW num trigger BEFORE).
+-- A trava serializa os escritores do catálogo de cada loja: versões da loja são
+-- confirmadas em ordem, então nenhum caixa avança o watermark por cima de uma
+-- transação ainda aberta. Lojas diferentes não esperam uma pela outra.
+CREATE OR REPLACE FUNCTION bump_catalog_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND
+       to_jsonb(NEW) - '{stock_quantity,profit_margin,updated_at,row_version}'::text[]
+       IS NOT DISTINCT FROM
+       to_jsonb(OLD) - '{stock_quantity,profit_margin,updated_at,row_version}'::text[] THEN
+        RETURN NEW;
+    END IF;
+    PERFORM pg_advisory_xact_lock(hashtext('catalog_version_seq'), NEW.tenant_id);
+    NEW.row_version = nextval('catalog_version_seq');
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+CREATE OR REPLACE FUNCTION record_catalog_tombstone()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('catalog_version_seq'), OLD.tenant_id);
+    INSERT INTO catalog_tombstones (tenant_id, entity, entity_id)
+    VALUES (OLD.tenant_id, TG_ARGV[0], OLD.id::text)
+    ON CONFLICT (entity, entity_id) DO UPDATE SET
+        row_version = nextval('catalog_version_seq'),
+        deleted_at = CURRENT_TIMESTAMP;
+    RETURN OLD;
+END;
+$$ language 'plpgsql';
+
+-- Avisa os workers (cache de respostas do catálogo) com o nome da tabela alterada.
+-- O NOTIFY só sai no commit, e avisos iguais na mesma transação chegam uma vez só.
+CREATE OR REPLACE FUNCTION notify_catalog_change()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify('catalog_changes', TG_TABLE_NAME);
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
 -- ============================================================================
 -- CATEGORIAS - Organização hierárquica de produtos
 -- ============================================================================
 
 CREATE TABLE IF NOT EXISTS categories (
     id SERIAL PRIMARY KEY,
+    tenant_id INTEGER NOT NULL DEFAULT auth_tenant() REFERENCES tenants(id),
     name CITEXT NOT NULL,
     parent_category_id INTEGER,    
+    row_version BIGINT NOT NULL DEFAULT 0,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     CONSTRAINT categories_name_length_cstr CHECK ((length(name)) <= 64 AND length(name) >= 3),
-    CONSTRAINT categories_name_unique_cstr UNIQUE (name),
+    CONSTRAINT categories_name_unique_cstr UNIQUE (tenant_id, name),
     FOREIGN KEY (parent_category_id) REFERENCES categories(id) ON DELETE SET NULL ON UPDATE CASCADE
 );
 
+-- CREATE TABLE IF NOT EXISTS não altera tabela que já existe: colunas criadas
+-- depois da primeira versão chegam por ADD COLUMN (num banco novo, nada a fazer)
+ALTER TABLE categories ADD COLUMN IF NOT EXISTS row_version BIGINT NOT NULL DEFAULT 0;
+
 COMMENT ON TABLE categories IS 'Categorias e subcategorias de produtos (ex: Bebidas, Frios, Lanchonete)';
 COMMENT ON COLUMN categories.name IS 'Nome da categoria (case-insensitive)';
 COMMENT ON COLUMN categories.parent_category_id IS 'Categoria pai para criar hierarquia (NULL = categoria raiz)';
+COMMENT ON COLUMN categories.row_version IS 'Versão da última alteração (catalog_version_seq), usada na sincronização dos caixas';
 
 -- ============================================================================
 -- FORNECEDORES - Cadastro de fornecedores de produtos
@@ -102,6 +292,7 @@ COMMENT ON COLUMN categories.parent_category_id IS 'Categoria pai para criar hie
 
 CREATE TABLE IF NOT EXISTS suppliers (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    tenant_id INTEGER NOT NULL DEFAULT auth_tenant() REFERENCES tenants(id),
     name CITEXT NOT NULL,
     cnpj TEXT,
     phone TEXT,
@@ -110,8 +301,8 @@ CREATE TABLE IF NOT EXISTS suppliers (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     CONSTRAINT suppliers_cnpj_length_check CHECK ((length(cnpj) <= 20)),
     CONSTRAINT suppliers_phone_length_check CHECK ((length(phone) = 11)),
-    CONSTRAINT suppliers_cnpj_unique UNIQUE (cnpj),
-    CONSTRAINT suppliers_name_unique UNIQUE (name)
+    CONSTRAINT suppliers_cnpj_unique UNIQUE (tenant_id, cnpj),
+    CONSTRAINT suppliers_name_unique UNIQUE (tenant_id, name)
 );
 
 COMMENT ON TABLE suppliers IS 'Cadastro de fornecedores de mercadorias';
@@ -125,18 +316,23 @@ COMMENT ON COLUMN suppliers.contact_name IS 'Nome da pessoa de contato no fornec
 
 CREATE TABLE IF NOT EXISTS tax_groups (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    tenant_id INTEGER NOT NULL DEFAULT auth_tenant() REFERENCES tenants(id),
     description VARCHAR(100) NOT NULL,
     icms_cst VARCHAR(3) NOT NULL,
     pis_cofins_cst VARCHAR(2) NOT NULL,
     icms_rate NUMERIC(5,2) DEFAULT 0,
     pis_rate NUMERIC(5,2) DEFAULT 0,
-    cofins_rate NUMERIC(5,2) DEFAULT 0
+    cofins_rate NUMERIC(5,2) DEFAULT 0,
+    row_version BIGINT NOT NULL DEFAULT 0
 );
 
+ALTER TABLE tax_groups ADD COLUMN IF NOT EXISTS row_version BIGINT NOT NULL DEFAULT 0;
+
 COMMENT ON TABLE tax_groups IS 'Grupos de tributação para facilitar a gestão fiscal de produtos similares';
 COMMENT ON COLUMN tax_groups.description IS 'Descrição do grupo (ex: "Bebidas Frias - Monofásico")';
 COMMENT ON COLUMN tax_groups.icms_cst IS 'Código de Situação Tributária do ICMS (ex: 060 = cobrado anteriormente)';
 COMMENT ON COLUMN tax_groups.pis_cofins_cst IS 'CST para PIS/COFINS (ex: 04 = Monofásico com alíquota zero)';
+COMMENT ON COLUMN tax_groups.row_version IS 'Versão da última alteração (catalog_version_seq), usada na sincronização dos caixas';
 
 -- ============================================================================
 -- PRODUTOS - Cadastro principal de mercadorias
@@ -145,8 +341,9 @@ COMMENT ON COLUMN tax_groups.pis_cofins_cst IS 'CST para PIS/COFINS (ex: 04 = Mo
 CREATE TABLE IF NOT EXISTS products (
     -- Identificação
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    tenant_id INTEGER NOT NULL DEFAULT auth_tenant() REFERENCES tenants(id),
     name CITEXT NOT NULL,
-    sku CITEXT UNIQUE NOT NULL,
+    sku CITEXT NOT NULL,
     description TEXT,
     category_id INTEGER NOT NULL,
     image_url TEXT,
@@ -158,6 +355,7 @@ CREATE TABLE IF NOT EXISTS products (
     cfop_default VARCHAR(4) NOT NULL DEFAULT '5102',
     origin CHAR(1) NOT NULL DEFAULT '0',
     tax_group_id UUID,
+    supplier_id UUID,
 
     -- Estoque
     stock_quantity NUMERIC(10, 3) NOT NULL DEFAULT 0,
@@ -179,26 +377,33 @@ CREATE TABLE IF NOT EXISTS products (
     is_active BOOLEAN NOT NULL DEFAULT TRUE,
     needs_preparation BOOLEAN NOT NULL DEFAULT FALSE,
 
+    row_version BIGINT NOT NULL DEFAULT 0,
     created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
 
     FOREIGN KEY (category_id) REFERENCES categories(id) ON UPDATE CASCADE,
     FOREIGN KEY (tax_group_id) REFERENCES tax_groups(id) ON DELETE SET NULL ON UPDATE CASCADE,
+    FOREIGN KEY (supplier_id) REFERENCES suppliers(id) ON DELETE SET NULL ON UPDATE CASCADE,
 
-    CONSTRAINT products_name_unique_cstr UNIQUE (name),
-    CONSTRAINT products_gtin_unique_cstr UNIQUE (gtin),
+    CONSTRAINT products_name_unique_cstr UNIQUE (tenant_id, name),
+    CONSTRAINT products_sku_unique_cstr UNIQUE (tenant_id, sku),
+    CONSTRAINT products_gtin_unique_cstr UNIQUE (tenant_id, gtin),
     CONSTRAINT products_sale_price_valid_cstr CHECK (sale_price >= purchase_price),
     CONSTRAINT products_sku_chk CHECK ((length(sku) >= 2 AND length(sku) <= 128))
 );
 
+ALTER TABLE products ADD COLUMN IF NOT EXISTS supplier_id UUID REFERENCES suppliers(id) ON DELETE SET NULL ON UPDATE CASCADE;
+ALTER TABLE products ADD COLUMN IF NOT EXISTS row_version BIGINT NOT NULL DEFAULT 0;
+
 COMMENT ON TABLE products IS 'Cadastro principal de produtos do estabelecimento';
-COMMENT ON COLUMN products.name IS 'Nome comercial do produto (único no sistema)';
+COMMENT ON COLUMN products.name IS 'Nome comercial do produto (único na loja)';
 COMMENT ON COLUMN products.sku IS 'Código interno de identificação (Stock Keeping Unit)';
 COMMENT ON COLUMN products.gtin IS 'Código de barras EAN-13 ou similar';
 COMMENT ON COLUMN products.ncm IS 'Nomenclatura Comum do Mercosul (obrigatório para emissão de NF-e)';
 COMMENT ON COLUMN products.cest IS 'Código Especificador da Substituição Tributária (obrigatório para alguns produtos)';
 COMMENT ON COLUMN products.cfop_default IS 'CFOP padrão (5102 = Venda de mercadoria adquirida para revenda)';
 COMMENT ON COLUMN products.origin IS 'Origem da mercadoria (0=Nacional, 1=Estrangeira-Importação direta, etc)';
+COMMENT ON COLUMN products.supplier_id IS 'Fornecedor principal (usado no reajuste de preços por fornecedor)';
 COMMENT ON COLUMN products.stock_quantity IS 'Quantidade atual em estoque';
 COMMENT ON COLUMN products.min_stock_quantity IS 'Estoque mínimo para alerta de reposição';
 COMMENT ON COLUMN products.max_stock_quantity IS 'Estoque máximo recomendado';
@@ -206,12 +411,14 @@ COMMENT ON COLUMN products.average_weight IS 'Peso médio para produtos vendidos
 COMMENT ON COLUMN products.profit_margin IS 'Margem de lucro calculada automaticamente em percentual';
 COMMENT ON COLUMN products.is_active IS 'Se FALSE, produto não está mais disponível para venda';
 COMMENT ON COLUMN products.needs_preparation IS 'TRUE para produtos preparados (receitas), como caipirinhas ou lanches';
+COMMENT ON COLUMN products.row_version IS 'Versão da última alteração (catalog_version_seq), usada na sincronização dos caixas';
 
 -- ============================================================================
 -- RECEITAS - Composição de produtos preparados
 -- ============================================================================
 
 CREATE TABLE IF NOT EXISTS recipes (
+    tenant_id INTEGER NOT NULL DEFAULT auth_tenant() REFERENCES tenants(id),
     product_id UUID NOT NULL,
     ingredient_id UUID NOT NULL,
     measure_unit measure_unit_enum NOT NULL DEFAULT 'UN',
@@ -233,6 +440,7 @@ COMMENT ON COLUMN recipes.quantity IS 'Quantidade do ingrediente necessária por
 
 CREATE TABLE IF NOT EXISTS batches (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    tenant_id INTEGER NOT NULL DEFAULT auth_tenant() REFERENCES tenants(id),
     product_id UUID NOT NULL,
     batch_code TEXT,
     expiration_date DATE NOT NULL,
@@ -254,6 +462,7 @@ COMMENT ON COLUMN batches.quantity IS 'Quantidade de unidades neste lote';
 
 CREATE TABLE IF NOT EXISTS users (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    tenant_id INTEGER NOT NULL DEFAULT auth_tenant() REFERENCES tenants(id),
     name TEXT NOT NULL,
     nickname TEXT,
     email TEXT,
@@ -268,6 +477,7 @@ CREATE TABLE IF NOT EXISTS users (
     invoice_amount NUMERIC(10, 2) NOT NULL DEFAULT 0,
 
     state_tax_indicator SMALLINT DEFAULT 9,
+    is_active BOOLEAN NOT NULL DEFAULT TRUE,
 
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -281,11 +491,14 @@ CREATE TABLE IF NOT EXISTS users (
     CONSTRAINT users_notes_length_check CHECK ((length(notes) <= 512 AND length(notes) >= 2))
 );
 
+ALTER TABLE users ADD COLUMN IF NOT EXISTS is_active BOOLEAN NOT NULL DEFAULT TRUE;
+
 COMMENT ON TABLE users IS 'Cadastro de usuários do sistema (funcionários e clientes)';
 COMMENT ON COLUMN users.role IS 'Papel do usuário (ADMIN, CAIXA, GERENTE, CLIENTE, ESTOQUISTA, CONTADOR)';
 COMMENT ON COLUMN users.password_hash IS 'Hash da senha (apenas para funcionários que acessam o sistema)';
 COMMENT ON COLUMN users.credit_limit IS 'Limite de crédito para compras fiadas';
 COMMENT ON COLUMN users.invoice_amount IS 'Valor total em aberto (dívidas não pagas)';
+COMMENT ON COLUMN users.is_active IS 'Se FALSE, o usuário não consegue mais fazer login';
 COMMENT ON COLUMN users.state_tax_indicator IS 'Indicador fiscal: 1=Contribuinte ICMS, 2=Isento, 9=Não Contribuinte';
 COMMENT ON COLUMN users.notes IS 'Observações sobre o usuário (ex: "Sempre paga em dia", "Preferência por cerveja X")';
 
@@ -294,6 +507,7 @@ COMMENT ON COLUMN users.notes IS 'Observações sobre o usuário (ex: "Sempre pa
 -- ============================================================================
 
 CREATE TABLE IF NOT EXISTS user_addresses (
+    tenant_id INTEGER NOT NULL DEFAULT auth_tenant() REFERENCES tenants(id),
     user_id UUID NOT NULL,
     ibge_city_code VARCHAR(7),
     street TEXT,
@@ -315,12 +529,58 @@ CREATE TABLE IF NOT EXISTS refresh_tokens (
     id UUID PRIMARY KEY,
     user_id UUID NOT NULL,
     created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    expires_at TIMESTAMP,
     revoked BOOLEAN NOT NULL DEFAULT FALSE,
+    revoked_at TIMESTAMP,
+    user_agent VARCHAR(256),
+    ip_address VARCHAR(64),
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE ON UPDATE CASCADE
 );
 
+ALTER TABLE refresh_tokens ADD COLUMN IF NOT EXISTS expires_at TIMESTAMP;
+ALTER TABLE refresh_tokens ADD COLUMN IF NOT EXISTS revoked_at TIMESTAMP;
+ALTER TABLE refresh_tokens ADD COLUMN IF NOT EXISTS user_agent VARCHAR(256);
+ALTER TABLE refresh_tokens ADD COLUMN IF NOT EXISTS ip_address VARCHAR(64);
+
 COMMENT ON TABLE refresh_tokens IS 'Tokens de refresh para manter sessões de login ativas';
+COMMENT ON COLUMN refresh_tokens.id IS 'Também é o id da sessão (claim sid dos access tokens emitidos com ele)';
 COMMENT ON COLUMN refresh_tokens.revoked IS 'TRUE quando o token é invalidado (logout)';
+COMMENT ON COLUMN refresh_tokens.user_agent IS 'Navegador/dispositivo do login, exibido na lista de sessões';
+
+-- Revogações que os workers mantêm em memória (src/sessions.py). Uma linha
+-- com session_id derruba aquela sessão; sem session_id, os tokens sem sid do
+-- usuário emitidos antes de revoked_at (gravado com o relógio da API, o do
+-- iat). Depois de expires_at nenhum access token afetado continua válido e a
+-- linha pode sair
+CREATE TABLE IF NOT EXISTS session_revocations (
+    id BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    user_id UUID NOT NULL,
+    session_id UUID,
+    revoked_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    expires_at TIMESTAMPTZ NOT NULL,
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE ON UPDATE CASCADE
+);
+
+COMMENT ON TABLE session_revocations IS 'Sessões revogadas (logout, sair de todos os dispositivos) enquanto os access tokens não expiram';
+COMMENT ON COLUMN session_revocations.session_id IS 'NULL: revoga os access tokens sem sid do usuário emitidos antes de revoked_at';
+
+-- Avisa os workers no commit; a linha vai inteira no payload
+CREATE OR REPLACE FUNCTION notify_session_revocation()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify(
+        'session_revocations',
+        json_build_object(
+            'id', NEW.id,
+            'user_id', NEW.user_id,
+            'session_id', NEW.session_id,
+            'revoked_at', extract(epoch FROM NEW.revoked_at),
+            'expires_at', extract(epoch FROM NEW.expires_at)
+        )::text
+    );
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
 
 -- ============================================================================
 -- AUDITORIA DE PREÇOS - Histórico de alterações de preços
@@ -328,6 +588,7 @@ COMMENT ON COLUMN refresh_tokens.revoked IS 'TRUE quando o token é invalidado (
 
 CREATE TABLE IF NOT EXISTS price_audits (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    tenant_id INTEGER NOT NULL DEFAULT auth_tenant() REFERENCES tenants(id),
     product_id UUID NOT NULL,
     old_purchase_price NUMERIC(10, 2),
     new_purchase_price NUMERIC(10, 2),
@@ -348,6 +609,7 @@ COMMENT ON COLUMN price_audits.changed_by IS 'Usuário que realizou a alteraçã
 
 CREATE TABLE IF NOT EXISTS stock_movements (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    tenant_id INTEGER NOT NULL DEFAULT auth_tenant() REFERENCES tenants(id),
     product_id UUID NOT NULL,
     type stock_movement_enum NOT NULL,
     quantity NUMERIC(10, 3) NOT NULL,
@@ -365,12 +627,33 @@ COMMENT ON COLUMN stock_movements.quantity IS 'Quantidade movimentada (positivo=
 COMMENT ON COLUMN stock_movements.reference_id IS 'ID da venda/compra relacionada (se aplicável)';
 COMMENT ON COLUMN stock_movements.reason IS 'Motivo da movimentação (ex: "Venda #123", "Produto vencido")';
 
+-- ============================================================================
+-- RECEBIMENTO - Notas de entrada de fornecedores
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS supplier_receipts (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    tenant_id INTEGER NOT NULL DEFAULT auth_tenant() REFERENCES tenants(id),
+    supplier_id UUID NOT NULL,
+    invoice_number VARCHAR(64) NOT NULL,
+    total_cost NUMERIC(12, 2) NOT NULL,
+    received_by UUID,
+    received_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (supplier_id) REFERENCES suppliers(id) ON UPDATE CASCADE,
+    FOREIGN KEY (received_by) REFERENCES users(id) ON UPDATE CASCADE ON DELETE SET NULL,
+    CONSTRAINT supplier_receipts_invoice_unique UNIQUE (supplier_id, invoice_number)
+);
+
+COMMENT ON TABLE supplier_receipts IS 'Notas de compra recebidas; stock_movements (COMPRA) apontam para cá em reference_id';
+COMMENT ON COLUMN supplier_receipts.invoice_number IS 'Número da nota fiscal do fornecedor (única por fornecedor)';
+
 -- ============================================================================
 -- VENDAS - Cabeçalho das vendas
 -- ============================================================================
 
 CREATE TABLE IF NOT EXISTS sales (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    tenant_id INTEGER NOT NULL DEFAULT auth_tenant() REFERENCES tenants(id),
     subtotal NUMERIC(10, 2) NOT NULL DEFAULT 0,
     total_discount NUMERIC(10, 2) DEFAULT 0,
     total_amount NUMERIC(10, 2) NOT NULL DEFAULT 0,
@@ -405,6 +688,7 @@ COMMENT ON COLUMN sales.finished_at IS 'Data/hora da conclusão da venda';
 
 CREATE TABLE IF NOT EXISTS sale_items (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    tenant_id INTEGER NOT NULL DEFAULT auth_tenant() REFERENCES tenants(id),
     sale_id UUID NOT NULL,
     product_id UUID NOT NULL,
     quantity NUMERIC(10, 3) NOT NULL,
@@ -427,6 +711,7 @@ COMMENT ON COLUMN sale_items.subtotal IS 'Valor total do item (quantidade × pre
 
 CREATE TABLE IF NOT EXISTS sale_payments (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    tenant_id INTEGER NOT NULL DEFAULT auth_tenant() REFERENCES tenants(id),
     sale_id UUID NOT NULL,
     method payment_method_enum NOT NULL,
     total NUMERIC(10, 2) NOT NULL,
@@ -444,6 +729,7 @@ COMMENT ON COLUMN sale_payments.total IS 'Valor pago através deste método';
 
 CREATE TABLE IF NOT EXISTS tab_payments (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    tenant_id INTEGER NOT NULL DEFAULT auth_tenant() REFERENCES tenants(id),
     sale_id UUID NOT NULL,
     amount_paid NUMERIC(10, 2) NOT NULL,
     payment_method payment_method_enum NOT NULL,
@@ -460,12 +746,129 @@ COMMENT ON COLUMN tab_payments.amount_paid IS 'Valor pago neste pagamento parcia
 COMMENT ON COLUMN tab_payments.payment_method IS 'Forma de pagamento utilizada na quitação';
 COMMENT ON COLUMN tab_payments.received_by IS 'Funcionário que recebeu o pagamento';
 
+-- ============================================================================
+-- CONTAS FIADO - Saldo em aberto de cada venda fiada
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS customer_tabs (
+    sale_id UUID PRIMARY KEY,
+    tenant_id INTEGER NOT NULL DEFAULT auth_tenant() REFERENCES tenants(id),
+    customer_id UUID NOT NULL,
+    amount_due NUMERIC(10, 2) NOT NULL,
+    amount_paid NUMERIC(10, 2) NOT NULL DEFAULT 0,
+    status payment_method_enum NOT NULL DEFAULT 'FIADO-EM-ABERTO',
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    settled_at TIMESTAMP,
+    FOREIGN KEY (sale_id) REFERENCES sales(id) ON DELETE CASCADE ON UPDATE CASCADE,
+    FOREIGN KEY (customer_id) REFERENCES users(id) ON UPDATE CASCADE,
+    CONSTRAINT customer_tabs_amount_due_cstr CHECK (amount_due > 0),
+    CONSTRAINT customer_tabs_amount_paid_cstr CHECK (amount_paid >= 0 AND amount_paid <= amount_due),
+    CONSTRAINT customer_tabs_status_cstr CHECK (
+        status IN ('FIADO-EM-ABERTO', 'FIADO-PAGO-PARCIAL', 'FIADO-QUITADO')
+    )
+);
+
+COMMENT ON TABLE customer_tabs IS 'Razão de fiado: uma linha por venda fiada com o saldo devedor';
+COMMENT ON COLUMN customer_tabs.amount_due IS 'Valor total vendido no fiado';
+COMMENT ON COLUMN customer_tabs.amount_paid IS 'Valor já abatido através de tab_payments';
+COMMENT ON COLUMN customer_tabs.status IS 'FIADO-EM-ABERTO -> FIADO-PAGO-PARCIAL -> FIADO-QUITADO';
+
+-- Abre (ou incrementa) a conta fiado quando a venda recebe um pagamento FIADO.
+-- Valida o limite de crédito do cliente lendo apenas users.invoice_amount.
+CREATE OR REPLACE FUNCTION open_customer_tab()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_customer_id UUID;
+    v_credit_limit NUMERIC(10, 2);
+    v_invoice_amount NUMERIC(10, 2);
+BEGIN
+    SELECT s.customer_id INTO v_customer_id FROM sales s WHERE s.id = NEW.sale_id;
+
+    IF v_customer_id IS NULL THEN
+        RAISE EXCEPTION USING
+            ERRCODE = 'check_violation',
+            CONSTRAINT = 'customer_tabs_customer_required_cstr',
+            MESSAGE = 'Venda fiado exige um cliente vinculado.';
+    END IF;
+
+    SELECT credit_limit, invoice_amount INTO v_credit_limit, v_invoice_amount
+    FROM users WHERE id = v_customer_id FOR UPDATE;
+
+    IF v_invoice_amount + NEW.total > v_credit_limit THEN
+        RAISE EXCEPTION USING
+            ERRCODE = 'check_violation',
+            CONSTRAINT = 'customer_tabs_credit_limit_cstr',
+            MESSAGE = 'Limite de crédito do cliente excedido.';
+    END IF;
+
+    INSERT INTO customer_tabs (sale_id, customer_id, amount_due)
+    VALUES (NEW.sale_id, v_customer_id, NEW.total)
+    ON CONFLICT (sale_id) DO UPDATE
+        SET amount_due = customer_tabs.amount_due + EXCLUDED.amount_due;
+
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+-- Deriva o status da conta a partir dos valores pagos
+CREATE OR REPLACE FUNCTION set_customer_tab_status()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.amount_paid >= NEW.amount_due THEN
+        NEW.status = 'FIADO-QUITADO';
+        NEW.settled_at = COALESCE(NEW.settled_at, CURRENT_TIMESTAMP);
+    ELSIF NEW.amount_paid > 0 THEN
+        NEW.status = 'FIADO-PAGO-PARCIAL';
+        NEW.settled_at = NULL;
+    ELSE
+        NEW.status = 'FIADO-EM-ABERTO';
+        NEW.settled_at = NULL;
+    END IF;
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+-- Mantém users.invoice_amount igual à soma dos saldos em aberto (leitura O(1))
+-- e replica o status da conta no pagamento FIADO da venda.
+CREATE OR REPLACE FUNCTION sync_customer_tab_balance()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_old_open NUMERIC(10, 2) := 0;
+    v_new_open NUMERIC(10, 2) := 0;
+BEGIN
+    IF TG_OP <> 'INSERT' THEN
+        v_old_open := OLD.amount_due - OLD.amount_paid;
+    END IF;
+    IF TG_OP <> 'DELETE' THEN
+        v_new_open := NEW.amount_due - NEW.amount_paid;
+    END IF;
+
+    IF TG_OP = 'UPDATE' AND OLD.customer_id <> NEW.customer_id THEN
+        UPDATE users SET invoice_amount = invoice_amount - v_old_open WHERE id = OLD.customer_id;
+        UPDATE users SET invoice_amount = invoice_amount + v_new_open WHERE id = NEW.customer_id;
+    ELSIF v_new_open <> v_old_open THEN
+        UPDATE users
+        SET invoice_amount = invoice_amount + (v_new_open - v_old_open)
+        WHERE id = COALESCE(NEW.customer_id, OLD.customer_id);
+    END IF;
+
+    IF TG_OP = 'UPDATE' AND OLD.status <> NEW.status THEN
+        UPDATE sale_payments
+        SET method = NEW.status
+        WHERE sale_id = NEW.sale_id AND method::text LIKE 'FIADO%';
+    END IF;
+
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
 -- ============================================================================
 -- LOGS - Registro de eventos do sistema
 -- ============================================================================
 
 CREATE TABLE IF NOT EXISTS logs (
     id BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    tenant_id INTEGER NOT NULL DEFAULT auth_tenant() REFERENCES tenants(id),
     level VARCHAR(50) NOT NULL,
     message TEXT NOT NULL,
     path TEXT,
@@ -481,6 +884,156 @@ COMMENT ON TABLE logs IS 'Registro de logs do sistema para auditoria e debugging
 COMMENT ON COLUMN logs.level IS 'Nível de severidade do log';
 COMMENT ON COLUMN logs.metadata IS 'Dados adicionais em formato JSON';
 
+-- ============================================================================
+-- IMPORTAÇÃO DE CATÁLOGO - Planilhas de fornecedores processadas em segundo plano
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS product_imports (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    tenant_id INTEGER NOT NULL DEFAULT auth_tenant() REFERENCES tenants(id),
+    file_name TEXT NOT NULL,
+    status VARCHAR(16) NOT NULL DEFAULT 'PENDENTE',
+    total_rows INT NOT NULL DEFAULT 0,
+    processed_rows INT NOT NULL DEFAULT 0,
+    inserted INT NOT NULL DEFAULT 0,
+    updated INT NOT NULL DEFAULT 0,
+    failed INT NOT NULL DEFAULT 0,
+    errors JSONB NOT NULL DEFAULT '[]',
+    detail TEXT,
+    created_by UUID,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    finished_at TIMESTAMPTZ,
+    FOREIGN KEY (created_by) REFERENCES users(id) ON DELETE SET NULL,
+    CONSTRAINT chk_product_imports_status CHECK (status IN ('PENDENTE', 'PROCESSANDO', 'CONCLUIDA', 'FALHOU'))
+);
+
+COMMENT ON TABLE product_imports IS 'Importações de catálogo via CSV e o seu progresso';
+COMMENT ON COLUMN product_imports.total_rows IS 'Estimativa (linhas do arquivo) até terminar; depois, o total lido';
+COMMENT ON COLUMN product_imports.errors IS 'Primeiras linhas rejeitadas: [{line, sku, message}]';
+
+-- ============================================================================
+-- IDEMPOTÊNCIA - Respostas de requisições repetidas pelo caixa
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    tenant_id INTEGER NOT NULL DEFAULT auth_tenant() REFERENCES tenants(id),
+    user_id UUID NOT NULL,
+    key VARCHAR(128) NOT NULL,
+    fingerprint BYTEA NOT NULL,
+    status_code SMALLINT NOT NULL,
+    response BYTEA NOT NULL,
+    expires_at TIMESTAMPTZ NOT NULL,
+    PRIMARY KEY (user_id, key)
+);
+
+COMMENT ON TABLE idempotency_keys IS 'Resposta gravada para cada Idempotency-Key (reenvios retornam a mesma resposta)';
+COMMENT ON COLUMN idempotency_keys.fingerprint IS 'SHA-256 de método + rota + corpo da requisição original';
+COMMENT ON COLUMN idempotency_keys.response IS 'Corpo JSON da resposta original';
+
+-- ============================================================================
+-- EVENTOS AO VIVO - Painel de vendas e fila da cozinha
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS live_events (
+    id BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    tenant_id INTEGER NOT NULL DEFAULT auth_tenant() REFERENCES tenants(id),
+    channel VARCHAR(32) NOT NULL,
+    payload JSONB NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+COMMENT ON TABLE live_events IS 'Eventos publicados via NOTIFY, mantidos por pouco tempo para retomada (Last-Event-ID)';
+COMMENT ON COLUMN live_events.channel IS 'Canal lógico: sales (painel de vendas) ou kitchen (fila de preparo)';
+
+-- Grava o evento e notifica os workers (canal live_events) com o id gerado.
+-- O id sai no INSERT e o NOTIFY no commit: a trava por loja (até o commit) faz
+-- os eventos de uma loja serem confirmados, e entregues, em ordem de id, então
+-- retomar por Last-Event-ID (id > último visto) não pula nenhum.
+CREATE OR REPLACE FUNCTION publish_live_event(p_channel TEXT, p_payload JSONB)
+RETURNS BIGINT AS $$
+DECLARE
+    v_id BIGINT;
+    v_tenant_id INTEGER;
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('live_events'), auth_tenant());
+    INSERT INTO live_events (channel, payload) VALUES (p_channel, p_payload) RETURNING id, tenant_id INTO v_id, v_tenant_id;
+    PERFORM pg_notify(
+        'live_events',
+        json_build_object('id', v_id, 'tenant_id', v_tenant_id, 'channel', p_channel, 'data', p_payload)::text
+    );
+    RETURN v_id;
+END;
+$$ language 'plpgsql';
+
+-- Vendas entrando ou saindo de ABERTA / EM_ENTREGA
+CREATE OR REPLACE FUNCTION notify_sale_status()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.status IS NOT DISTINCT FROM NEW.status THEN
+        RETURN NULL;
+    END IF;
+
+    IF NEW.status IN ('ABERTA', 'EM_ENTREGA')
+       OR (TG_OP = 'UPDATE' AND OLD.status IN ('ABERTA', 'EM_ENTREGA')) THEN
+        PERFORM publish_live_event('sales', jsonb_build_object(
+            'sale_id', NEW.id,
+            'status', NEW.status,
+            'old_status', CASE WHEN TG_OP = 'UPDATE' THEN OLD.status END,
+            'total_amount', NEW.total_amount,
+            'customer_id', NEW.customer_id,
+            'salesperson_id', NEW.salesperson_id
+        ));
+    END IF;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+-- Itens que precisam de preparo entram/saem da fila da cozinha
+CREATE OR REPLACE FUNCTION notify_kitchen_item()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_item sale_items%ROWTYPE;
+    v_product_name TEXT;
+BEGIN
+    IF TG_OP = 'DELETE' THEN v_item := OLD; ELSE v_item := NEW; END IF;
+
+    SELECT p.name INTO v_product_name
+    FROM products p
+    WHERE p.id = v_item.product_id AND p.needs_preparation = TRUE;
+
+    IF FOUND THEN
+        PERFORM publish_live_event('kitchen', jsonb_build_object(
+            'event', CASE WHEN TG_OP = 'DELETE' THEN 'item_removed' ELSE 'item_added' END,
+            'sale_id', v_item.sale_id,
+            'sale_item_id', v_item.id,
+            'product_id', v_item.product_id,
+            'product_name', v_product_name,
+            'quantity', v_item.quantity
+        ));
+    END IF;
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+-- Ninguém altera o próprio perfil, limite de crédito ou saldo devedor pela API
+-- (política não enxerga OLD). O saldo muda pelo trigger do fiado, que roda
+-- aninhado (pg_trigger_depth() > 1); scripts e migrações não têm auth_uid().
+CREATE OR REPLACE FUNCTION prevent_self_escalation()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.id = auth_uid() AND pg_trigger_depth() = 1 AND (
+        NEW.role IS DISTINCT FROM OLD.role
+        OR NEW.credit_limit IS DISTINCT FROM OLD.credit_limit
+        OR NEW.invoice_amount IS DISTINCT FROM OLD.invoice_amount
+    ) THEN
+        RAISE EXCEPTION USING
+            ERRCODE = 'insufficient_privilege',
+            MESSAGE = 'Perfil, limite de crédito e saldo não podem ser alterados pelo próprio usuário.';
+    END IF;
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
 -- ============================================================================
 -- TRIGGERS
 -- ============================================================================
@@ -493,3 +1046,79 @@ CREATE OR REPLACE TRIGGER trg_users_updated_at
 BEFORE UPDATE ON users
 FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
+CREATE OR REPLACE TRIGGER trg_users_prevent_self_escalation
+BEFORE UPDATE OF role, credit_limit, invoice_amount ON users
+FOR EACH ROW EXECUTE FUNCTION prevent_self_escalation();
+
+CREATE OR REPLACE TRIGGER trg_sale_payments_open_tab
+AFTER INSERT ON sale_payments
+FOR EACH ROW WHEN (NEW.method = 'FIADO-EM-ABERTO')
+EXECUTE FUNCTION open_customer_tab();
+
+CREATE OR REPLACE TRIGGER trg_customer_tabs_status
+BEFORE INSERT OR UPDATE OF amount_due, amount_paid ON customer_tabs
+FOR EACH ROW EXECUTE FUNCTION set_customer_tab_status();
+
+CREATE OR REPLACE TRIGGER trg_customer_tabs_balance
+AFTER INSERT OR UPDATE OR DELETE ON customer_tabs
+FOR EACH ROW EXECUTE FUNCTION sync_customer_tab_balance();
+
+
+
+CREATE OR REPLACE TRIGGER trg_categories_catalog_version
+BEFORE INSERT OR UPDATE ON categories
+FOR EACH ROW EXECUTE FUNCTION bump_catalog_version();
+
+CREATE OR REPLACE TRIGGER trg_categories_catalog_tombstone
+AFTER DELETE ON categories
+FOR EACH ROW EXECUTE FUNCTION record_catalog_tombstone('category');
+
+CREATE OR REPLACE TRIGGER trg_tax_groups_catalog_version
+BEFORE INSERT OR UPDATE ON tax_groups
+FOR EACH ROW EXECUTE FUNCTION bump_catalog_version();
+
+CREATE OR REPLACE TRIGGER trg_tax_groups_catalog_tombstone
+AFTER DELETE ON tax_groups
+FOR EACH ROW EXECUTE FUNCTION record_catalog_tombstone('tax_group');
+
+CREATE OR REPLACE TRIGGER trg_products_catalog_version
+BEFORE INSERT OR UPDATE ON products
+FOR EACH ROW EXECUTE FUNCTION bump_catalog_version();
+
+CREATE OR REPLACE TRIGGER trg_products_catalog_tombstone
+AFTER DELETE ON products
+FOR EACH ROW EXECUTE FUNCTION record_catalog_tombstone('product');
+
+CREATE OR REPLACE TRIGGER trg_categories_catalog_change
+AFTER INSERT OR UPDATE OR DELETE ON categories
+FOR EACH STATEMENT EXECUTE FUNCTION notify_catalog_change();
+
+CREATE OR REPLACE TRIGGER trg_suppliers_catalog_change
+AFTER INSERT OR UPDATE OR DELETE ON suppliers
+FOR EACH STATEMENT EXECUTE FUNCTION notify_catalog_change();
+
+CREATE OR REPLACE TRIGGER trg_tax_groups_catalog_change
+AFTER INSERT OR UPDATE OR DELETE ON tax_groups
+FOR EACH STATEMENT EXECUTE FUNCTION notify_catalog_change();
+
+CREATE OR REPLACE TRIGGER trg_products_catalog_change
+AFTER INSERT OR DELETE ON products
+FOR EACH STATEMENT EXECUTE FUNCTION notify_catalog_change();
+
+-- Baixa de estoque não muda row_version (bump_catalog_version), então vendas não invalidam o cache
+CREATE OR REPLACE TRIGGER trg_products_catalog_change_update
+AFTER UPDATE ON products
+FOR EACH ROW WHEN (OLD.row_version IS DISTINCT FROM NEW.row_version)
+EXECUTE FUNCTION notify_catalog_change();
+
+CREATE OR REPLACE TRIGGER trg_sales_live_event
+AFTER INSERT OR UPDATE OF status ON sales
+FOR EACH ROW EXECUTE FUNCTION notify_sale_status();
+
+CREATE OR REPLACE TRIGGER trg_sale_items_kitchen_event
+AFTER INSERT OR DELETE ON sale_items
+FOR EACH ROW EXECUTE FUNCTION notify_kitchen_item();
+
+CREATE OR REPLACE TRIGGER trg_session_revocations_notify
+AFTER INSERT ON session_revocations
+FOR EACH ROW EXECUTE FUNCTION notify_session_revocation();
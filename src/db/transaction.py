@@ -0,0 +1,100 @@
+from typing import Awaitable, Callable, Optional, TypeVar
+from src.db.db import RETRYABLE_SQLSTATES, translate_error
+from src.metrics import db_transaction_retries
+from src.constants import Constants
+from src.log import get_logger, route_var
+from asyncpg import Connection, PostgresError
+import asyncio
+import random
+
+
+logger = get_logger("db.transaction")
+
+T = TypeVar("T")
+
+
+class RetryBudget:
+    """
+    Limita as retentativas de uma rota a uma fração das chamadas: cada
+    chamada deposita `ratio` fichas (até `capacity`) e cada retentativa gasta
+    uma. Numa rajada de deadlocks nas mesmas linhas de estoque as
+    retentativas não multiplicam a carga sobre o banco.
+    """
+
+    def __init__(
+        self,
+        ratio: float = Constants.DB_RETRY_BUDGET_RATIO,
+        capacity: float = Constants.DB_RETRY_BUDGET_CAPACITY
+    ):
+        self.ratio = ratio
+        self.capacity = capacity
+        self.balance = capacity
+
+    def deposit(self) -> None:
+        self.balance = min(self.capacity, self.balance + self.ratio)
+
+    def withdraw(self) -> bool:
+        if self.balance < 1: return False
+        self.balance -= 1
+        return True
+
+
+# Um orçamento por template de rota (o mesmo rótulo das métricas HTTP)
+budgets: dict[str, RetryBudget] = {}
+
+
+def budget_for(route: str) -> RetryBudget:
+    budget = budgets.get(route)
+    if budget is None: budget = budgets[route] = RetryBudget()
+    return budget
+
+
+def backoff(attempt: int) -> float:
+    # Full jitter: quem colidiu na mesma linha não volta no mesmo instante
+    cap = min(Constants.DB_RETRY_MAX_DELAY, Constants.DB_RETRY_BASE_DELAY * 2 ** attempt)
+    return random.uniform(0, cap)
+
+
+async def run_transaction(
+    operation: Callable[[], Awaitable[T]],
+    conn: Connection,
+    route: Optional[str] = None,
+    attempts: int = Constants.DB_RETRY_ATTEMPTS
+) -> T:
+    """
+    Executa `operation` numa transação (um savepoint, se `conn` já estiver
+    na transação da requisição) e a repete com backoff exponencial em
+    deadlock ou falha de serialização, enquanto houver tentativas e
+    orçamento na rota. Os demais erros do Postgres viram DatabaseError pelo
+    SQLSTATE. `operation` roda de novo a cada tentativa: não pode ter efeito
+    fora do banco.
+
+    O rollback do savepoint só solta as travas tomadas dentro dele. Chame no
+    início de uma transação READ COMMITTED (como a da requisição, que só
+    configurou o RLS): com travas de antes, a tentativa seguinte colide com o
+    mesmo deadlock, e sob REPEATABLE READ o snapshot antigo repete o 40001.
+    Vários passos com retry numa requisição pedem uma transação para cada um
+    (veja apply_offline_sales).
+    """
+    route = route or route_var.get() or "background"
+    budget = budget_for(route)
+    budget.deposit()
+
+    attempt = 0
+    while True:
+        try:
+            async with conn.transaction():
+                return await operation()
+        except PostgresError as e:
+            sqlstate = e.sqlstate
+            if sqlstate not in RETRYABLE_SQLSTATES: raise translate_error(e) from e
+
+            attempt += 1
+            if attempt >= attempts: outcome = "exhausted"
+            elif not budget.withdraw(): outcome = "budget"
+            else: outcome = "retried"
+            db_transaction_retries.inc(route, sqlstate, outcome)
+            if outcome != "retried": raise translate_error(e) from e
+            logger.info("Transação repetida (%s, tentativa %d)", sqlstate, attempt + 1, extra={"sqlstate": sqlstate})
+
+        await asyncio.sleep(backoff(attempt))
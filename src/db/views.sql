@@ -261,13 +261,13 @@ COMMENT ON VIEW vw_cancelled_sales IS
 CREATE OR REPLACE VIEW vw_daily_cashflow AS
 SELECT 
     payment_date,
-    SUM(CASE WHEN method = 'DINHEIRO' THEN total ELSE 0 END) as cash,
-    SUM(CASE WHEN method = 'CREDITO' THEN total ELSE 0 END) as credit_card,
-    SUM(CASE WHEN method = 'DEBITO' THEN total ELSE 0 END) as debit_card,
-    SUM(CASE WHEN method = 'PIX' THEN total ELSE 0 END) as pix,
-    SUM(CASE WHEN method LIKE 'FIADO%' THEN total ELSE 0 END) as tab,
-    SUM(CASE WHEN method = 'VALE_ALIMENTACAO' THEN total ELSE 0 END) as meal_voucher,
-    SUM(total) as total_received
+    SUM(CASE WHEN method = 'DINHEIRO' THEN total_amount ELSE 0 END) as cash,
+    SUM(CASE WHEN method = 'CREDITO' THEN total_amount ELSE 0 END) as credit_card,
+    SUM(CASE WHEN method = 'DEBITO' THEN total_amount ELSE 0 END) as debit_card,
+    SUM(CASE WHEN method = 'PIX' THEN total_amount ELSE 0 END) as pix,
+    SUM(CASE WHEN method::text LIKE 'FIADO%' THEN total_amount ELSE 0 END) as tab,
+    SUM(CASE WHEN method = 'VALE_ALIMENTACAO' THEN total_amount ELSE 0 END) as meal_voucher,
+    SUM(total_amount) as total_received
 FROM 
     vw_sales_by_payment_method
 GROUP BY 
@@ -303,3 +303,77 @@ ORDER BY
 
 COMMENT ON VIEW vw_recipe_costs IS 'Custo de produção e margem de lucro de produtos preparados (receitas)';
 
+
+-- === VIEW: Envelhecimento das contas fiado ===
+CREATE OR REPLACE VIEW vw_tab_aging AS
+SELECT 
+    t.customer_id,
+    u.name as customer_name,
+    u.credit_limit,
+    SUM(t.amount_due - t.amount_paid) as total_open,
+    SUM(CASE WHEN t.created_at >= CURRENT_DATE - 30 
+        THEN t.amount_due - t.amount_paid ELSE 0 END) as days_0_30,
+    SUM(CASE WHEN t.created_at < CURRENT_DATE - 30 AND t.created_at >= CURRENT_DATE - 60 
+        THEN t.amount_due - t.amount_paid ELSE 0 END) as days_31_60,
+    SUM(CASE WHEN t.created_at < CURRENT_DATE - 60 AND t.created_at >= CURRENT_DATE - 90 
+        THEN t.amount_due - t.amount_paid ELSE 0 END) as days_61_90,
+    SUM(CASE WHEN t.created_at < CURRENT_DATE - 90 
+        THEN t.amount_due - t.amount_paid ELSE 0 END) as days_over_90,
+    MIN(t.created_at) as oldest_open_at
+FROM 
+    customer_tabs t
+    INNER JOIN users u ON t.customer_id = u.id
+WHERE 
+    t.status <> 'FIADO-QUITADO'
+GROUP BY 
+    t.customer_id, u.name, u.credit_limit
+ORDER BY 
+    days_over_90 DESC, total_open DESC;
+
+COMMENT ON VIEW vw_tab_aging IS 
+'Saldo fiado em aberto por cliente separado em faixas de 30/60/90 dias';
+
+
+-- === VIEW: Painel de vendas em andamento ===
+CREATE OR REPLACE VIEW vw_live_sales_board AS
+SELECT 
+    s.id as sale_id,
+    s.status,
+    s.total_amount,
+    s.customer_id,
+    u_customer.name as customer_name,
+    s.salesperson_id,
+    s.created_at
+FROM 
+    sales s
+    LEFT JOIN users u_customer ON s.customer_id = u_customer.id
+WHERE 
+    s.status IN ('ABERTA', 'EM_ENTREGA')
+ORDER BY 
+    s.created_at ASC;
+
+COMMENT ON VIEW vw_live_sales_board IS 
+'Estado inicial do painel ao vivo de vendas abertas e em entrega';
+
+-- === VIEW: Fila da cozinha ===
+CREATE OR REPLACE VIEW vw_kitchen_queue AS
+SELECT 
+    si.id as sale_item_id,
+    si.sale_id,
+    si.product_id,
+    p.name as product_name,
+    si.quantity,
+    s.status as sale_status,
+    s.created_at
+FROM 
+    sale_items si
+    INNER JOIN sales s ON si.sale_id = s.id
+    INNER JOIN products p ON si.product_id = p.id
+WHERE 
+    p.needs_preparation = TRUE
+    AND s.status IN ('ABERTA', 'EM_ENTREGA')
+ORDER BY 
+    s.created_at ASC;
+
+COMMENT ON VIEW vw_kitchen_queue IS 
+'Estado inicial da fila de preparo (itens com needs_preparation de vendas em andamento)';
\ No newline at end of file
@@ -0,0 +1,251 @@
+from collections import deque
+from typing import Any, Awaitable, Callable, Optional
+from dotenv import load_dotenv
+from src.db.db import db
+from src.pruner import pruner
+from src.log import get_logger
+import asyncpg
+import asyncio
+import json
+import os
+
+
+load_dotenv()
+
+logger = get_logger("events")
+
+LIVE_EVENTS_CHANNEL = "live_events"
+
+# Canais lógicos publicados por publish_live_event() e quem pode assiná-los
+CHANNEL_ROLES: dict[str, frozenset[str]] = {
+    "sales": frozenset({"ADMIN", "GERENTE", "CAIXA"}),
+    "kitchen": frozenset({"ADMIN", "GERENTE", "CAIXA"}),
+}
+
+pruner.register("live_events", "live_events", "created_at < now() - interval '1 day'")
+
+
+class LiveEvent:
+
+    __slots__ = ("id", "tenant_id", "channel", "data", "_sse", "_json")
+
+    def __init__(self, id: int, tenant_id: int, channel: str, data: Any):
+        self.id = id
+        self.tenant_id = tenant_id
+        self.channel = channel
+        self.data = data
+        self._sse: Optional[bytes] = None
+        self._json: Optional[str] = None
+
+    @property
+    def json(self) -> str:
+        # Serializado uma única vez e compartilhado entre todos os assinantes
+        if self._json is None:
+            self._json = json.dumps(
+                {"id": self.id, "channel": self.channel, "data": self.data},
+                separators=(",", ":")
+            )
+        return self._json
+
+    @property
+    def sse(self) -> bytes:
+        if self._sse is None:
+            data = json.dumps(self.data, separators=(",", ":"))
+            self._sse = f"id: {self.id}\nevent: {self.channel}\ndata: {data}\n\n".encode()
+        return self._sse
+
+
+class Subscription:
+
+    def __init__(self, channels: frozenset[str], tenant_id: int, queue_size: int):
+        self.channels = channels
+        self.tenant_id = tenant_id
+        self.queue: asyncio.Queue[Optional[LiveEvent]] = asyncio.Queue(maxsize=queue_size)
+        self.overflowed = False
+        # Eventos ao vivo recebidos enquanto o replay ainda está sendo montado
+        self.pending: Optional[list[LiveEvent]] = None
+
+    def offer(self, event: LiveEvent) -> None:
+        # Um worker atende todas as lojas: cada assinante só recebe as da sua
+        if self.overflowed or event.channel not in self.channels or event.tenant_id != self.tenant_id: return
+        if self.pending is not None:
+            self.pending.append(event)
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Cliente lento: encerramos o stream e ele retoma pelo Last-Event-ID
+            self.overflowed = True
+
+    async def next(self, timeout: float) -> Optional[LiveEvent]:
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventBroker:
+    """
+    Uma única conexão LISTEN por worker. Cada NOTIFY é decodificado uma
+    vez e distribuído para todos os assinantes em memória.
+    """
+
+    def __init__(self, buffer_size: int = 2048, queue_size: int = 256):
+        self.queue_size = queue_size
+        self.buffer: deque[LiveEvent] = deque(maxlen=buffer_size)
+        self.subscribers: set[Subscription] = set()
+        self.handlers: dict[str, list[Callable[[str], Any]]] = {
+            LIVE_EVENTS_CHANNEL: [self._on_live_event]
+        }
+        self.resyncs: list[Callable[[], Awaitable[None]]] = []
+        self._conn: Optional[asyncpg.Connection] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+
+    def listen(
+        self,
+        channel: str,
+        handler: Callable[[str], Any],
+        resync: Optional[Callable[[], Awaitable[None]]] = None
+    ) -> None:
+        """
+        Registra um handler para outro canal NOTIFY na mesma conexão. O
+        NOTIFY emitido enquanto a conexão estava caída se perde: `resync`
+        roda a cada (re)conexão para o assinante reler o estado do banco.
+        """
+        self.handlers.setdefault(channel, []).append(handler)
+        if resync is not None: self.resyncs.append(resync)
+
+    async def _resync(self) -> None:
+        for resync in self.resyncs:
+            try:
+                await resync()
+            except Exception:
+                logger.exception("Ressincronização após reconexão falhou")
+
+    def _dispatch(self, conn, pid, channel: str, payload: str) -> None:
+        for handler in self.handlers.get(channel, ()):
+            try:
+                handler(payload)
+            except Exception:
+                logger.exception("Handler do canal %s falhou", channel)
+
+    def _on_live_event(self, payload: str) -> None:
+        raw = json.loads(payload)
+        self.publish(LiveEvent(raw["id"], raw["tenant_id"], raw["channel"], raw["data"]))
+
+    def publish(self, event: LiveEvent) -> None:
+        self.buffer.append(event)
+        for subscription in self.subscribers:
+            subscription.offer(event)
+
+    async def _connect(self) -> None:
+        conn = await asyncpg.connect(os.getenv("DATABASE_URL"))
+        for channel in self.handlers:
+            await conn.add_listener(channel, self._dispatch)
+        conn.add_termination_listener(lambda _: self._reconnect())
+        self._conn = conn
+
+    def _reconnect(self) -> None:
+        self._conn = None
+        # O que foi publicado com a conexão caída não chegou: o buffer teria um buraco
+        self.buffer.clear()
+        if not self._closing:
+            self._task = asyncio.get_event_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        delay = 1.0
+        while not self._closing:
+            try:
+                await self._connect()
+                logger.info("EventBroker escutando NOTIFY")
+                if self.resyncs: await self._resync()
+                return
+            except Exception as e:
+                logger.warning("EventBroker sem conexão, tentando em %.0fs | %s", delay, e)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+
+    def start(self) -> None:
+        self._closing = False
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        self._closing = True
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        if self._conn:
+            await self._conn.close()
+            self._conn = None
+
+    async def _replay(self, channels: frozenset[str], tenant_id: int, last_event_id: int) -> list[LiveEvent]:
+        # Os eventos de uma loja chegam em ordem de id (trava em publish_live_event):
+        # se o último que o cliente viu ainda está no buffer, todos os seguintes também estão
+        events = list(self.buffer)
+        for i in range(len(events) - 1, -1, -1):
+            if events[i].id == last_event_id and events[i].tenant_id == tenant_id:
+                return [e for e in events[i + 1:] if e.channel in channels and e.tenant_id == tenant_id]
+
+        # Fora da janela em memória: busca no banco (retenção do pruner)
+        if db.pool is None: return []
+        async with db.pool.acquire() as conn:
+            rows = await conn.fetch(
+                """
+                    SELECT id, channel, payload::text AS payload
+                    FROM live_events
+                    WHERE id > $1 AND channel = ANY($2::text[]) AND tenant_id = $3
+                    ORDER BY id
+                    LIMIT $4
+                """,
+                last_event_id,
+                list(channels),
+                tenant_id,
+                self.buffer.maxlen
+            )
+        return [LiveEvent(r["id"], tenant_id, r["channel"], json.loads(r["payload"])) for r in rows]
+
+    async def subscribe(self, channels: frozenset[str], tenant_id: int, last_event_id: Optional[int] = None) -> Subscription:
+        subscription = Subscription(channels, tenant_id, self.queue_size)
+        if last_event_id is None:
+            self.subscribers.add(subscription)
+            return subscription
+
+        subscription.pending = []
+        self.subscribers.add(subscription)
+        try:
+            replayed = await self._replay(channels, tenant_id, last_event_id)
+        finally:
+            pending, subscription.pending = subscription.pending, None
+
+        seen = {e.id for e in replayed}
+        for event in replayed:
+            subscription.offer(event)
+        for event in pending:
+            if event.id not in seen: subscription.offer(event)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self.subscribers.discard(subscription)
+
+    def close_subscriptions(self) -> None:
+        """
+        Encerramento do worker: os streams terminam como num overflow e os
+        clientes reconectam em outro worker, retomando pelo Last-Event-ID.
+        """
+        for subscription in self.subscribers:
+            subscription.overflowed = True
+            try:
+                # Acorda quem está esperando o heartbeat
+                subscription.queue.put_nowait(None)
+            except asyncio.QueueFull:
+                pass
+
+
+def allowed_channels(role: str, requested: Optional[list[str]] = None) -> frozenset[str]:
+    channels = requested or list(CHANNEL_ROLES)
+    return frozenset(c for c in channels if role in CHANNEL_ROLES.get(c, ()))
+
+
+broker = EventBroker()
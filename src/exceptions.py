@@ -2,10 +2,11 @@
 
 class DatabaseError(Exception):
     
-    def __init__(self, detail: str, code: int = None):
+    def __init__(self, detail: str, code: int = None, sqlstate: str = None):
         super().__init__(detail)
         self.detail = detail
         self.code = code
+        self.sqlstate = sqlstate
 
     def __str__(self):
         base = f"[DatabaseError] {self.detail}"
@@ -0,0 +1,126 @@
+from datetime import datetime, timezone
+from typing import Optional
+from src.constants import Constants
+from src.db.db import db, schema_version
+from src.startup import startup
+from src.log import get_logger
+import asyncio
+import time
+import json
+
+
+logger = get_logger("health")
+
+PROBE_QUERY = """
+    SELECT
+        pg_is_in_recovery() AS in_recovery,
+        CASE WHEN pg_is_in_recovery()
+            THEN EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+        END AS replica_lag,
+        (SELECT MAX(EXTRACT(EPOCH FROM replay_lag)) FROM pg_stat_replication) AS standby_lag,
+        EXISTS (SELECT 1 FROM schema_migrations WHERE version = $1) AS migrated
+"""
+
+
+class HealthProber:
+    """
+    Verifica as dependências em segundo plano e guarda o resultado já
+    serializado: /health/ready só devolve os bytes prontos, sem tocar no
+    banco, por mais que o balanceador chame. Responde 503 enquanto o worker
+    sobe, quando uma verificação falha e durante o encerramento.
+    """
+
+    def __init__(self, interval: float = Constants.HEALTH_PROBE_INTERVAL):
+        self.interval = interval
+        self.expected_version = schema_version()
+        self.draining = False
+        self.checks: dict[str, dict] = {}
+        self.checked_at: Optional[datetime] = None
+        self.status_code = 503
+        self.body = b""
+        self._task: Optional[asyncio.Task] = None
+        self._render()
+
+    async def _probe_database(self) -> None:
+        start = time.perf_counter()
+        try:
+            async with db.pool.acquire(timeout=Constants.HEALTH_PROBE_TIMEOUT) as conn:
+                row = await conn.fetchrow(PROBE_QUERY, self.expected_version, timeout=Constants.HEALTH_PROBE_TIMEOUT)
+        except Exception as e:
+            error = {"ok": False, "detail": f"{type(e).__name__}: {e}"[:200]}
+            self.checks["database"] = error
+            self.checks["replication"] = error
+            self.checks["migrations"] = error
+            return
+
+        self.checks["database"] = {"ok": True, "latency_ms": round((time.perf_counter() - start) * 1000, 2)}
+
+        # Réplica: atraso dela mesma. Primário: informa o atraso das réplicas, mas segue pronto
+        if row["in_recovery"]:
+            lag = row["replica_lag"]
+            ok = lag is not None and lag <= Constants.HEALTH_MAX_REPLICATION_LAG_S
+            self.checks["replication"] = {"ok": ok, "role": "replica", "lag_s": lag and round(float(lag), 3)}
+        else:
+            lag = row["standby_lag"]
+            self.checks["replication"] = {"ok": True, "role": "primary", "standby_lag_s": lag and round(float(lag), 3)}
+
+        self.checks["migrations"] = {"ok": row["migrated"], "version": self.expected_version}
+
+    async def probe(self) -> None:
+        if db.pool is None:
+            self.checks["database"] = {"ok": False, "detail": "pool não inicializado"}
+        else:
+            await self._probe_database()
+        self.checks["warmup"] = {"ok": startup.ready, "warmers": list(startup.warmers), "failed": sorted(startup.failed)}
+        if db.replicas:
+            # Informativo: sem réplica em dia as leituras vão para o primário
+            self.checks["replicas"] = {"ok": True, "replicas": [r.status() for r in db.replicas]}
+        self.checked_at = datetime.now(timezone.utc)
+        self._render()
+
+    def _render(self) -> None:
+        if self.draining:
+            status = "draining"
+        elif not startup.ready:
+            status = "starting"
+        elif all(check["ok"] for check in self.checks.values()):
+            status = "ready"
+        else:
+            status = "unavailable"
+
+        self.status_code = 200 if status == "ready" else 503
+        self.body = json.dumps({
+            "status": status,
+            "checked_at": self.checked_at.isoformat() if self.checked_at else None,
+            "checks": self.checks
+        }, default=str).encode()
+
+    def drain(self) -> None:
+        """Passa a responder 503 na hora, sem esperar a próxima verificação."""
+        self.draining = True
+        self._render()
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.probe()
+            except Exception:
+                logger.exception("Verificação de saúde falhou")
+
+    async def start(self) -> None:
+        if self._task is None:
+            await self.probe()
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+prober = HealthProber()
@@ -0,0 +1,88 @@
+from fastapi import Request, Response, status
+from fastapi.exceptions import HTTPException
+from fastapi.encoders import jsonable_encoder
+from typing import Any, Awaitable, Callable, Optional
+from src.model import idempotency as idempotency_model
+from src.constants import Constants
+from src.cache import TTLCache
+from src.pruner import pruner
+from asyncpg import Connection
+from uuid import UUID
+import hashlib
+import json
+
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+KEY_REUSED_EXCEPTION = HTTPException(
+    status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+    detail="Idempotency-Key já utilizada com uma requisição diferente."
+)
+
+# Só guarda respostas já confirmadas no banco (lidas de idempotency_keys)
+replay_cache = TTLCache("idempotency", maxsize=4096, ttl=300)
+
+pruner.register("idempotency_keys", "idempotency_keys", "expires_at < now()")
+
+
+async def request_fingerprint(request: Request) -> bytes:
+    digest = hashlib.sha256()
+    digest.update(request.method.encode())
+    digest.update(request.url.path.encode())
+    digest.update(await request.body())
+    return digest.digest()
+
+
+def _replay(fingerprint: bytes, stored: tuple[bytes, int, bytes]) -> Response:
+    stored_fingerprint, status_code, body = stored
+    if stored_fingerprint != fingerprint: raise KEY_REUSED_EXCEPTION
+    return Response(
+        content=body,
+        status_code=status_code,
+        media_type="application/json",
+        headers={REPLAYED_HEADER: "true"}
+    )
+
+
+async def run_idempotent(
+    key: Optional[str],
+    user_id: UUID,
+    request: Request,
+    conn: Connection,
+    handler: Callable[[], Awaitable[Any]],
+    status_code: int = status.HTTP_201_CREATED
+) -> Any:
+    """
+    Executa handler no máximo uma vez por (usuário, Idempotency-Key).
+    A resposta é gravada na mesma transação da operação, então um retry
+    só é reexecutado se a primeira tentativa não foi confirmada.
+    """
+    if key is None: return await handler()
+
+    fingerprint = await request_fingerprint(request)
+    cache_key = (user_id, key)
+
+    stored = replay_cache.get(cache_key)
+    if stored is not None: return _replay(fingerprint, stored)
+
+    await idempotency_model.lock_key(user_id, key, conn)
+
+    row = await idempotency_model.get_key(user_id, key, conn)
+    if row is not None:
+        stored = (bytes(row['fingerprint']), row['status_code'], bytes(row['response']))
+        replay_cache.set(cache_key, stored)
+        return _replay(fingerprint, stored)
+
+    result = await handler()
+    body = json.dumps(jsonable_encoder(result), separators=(",", ":")).encode()
+    await idempotency_model.save_key(
+        user_id,
+        key,
+        fingerprint,
+        status_code,
+        body,
+        Constants.IDEMPOTENCY_KEY_TTL_HOURS,
+        conn
+    )
+    return Response(content=body, status_code=status_code, media_type="application/json")
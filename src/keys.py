@@ -0,0 +1,129 @@
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+from jwt.algorithms import ECAlgorithm, OKPAlgorithm
+from typing import Any, Optional
+from src.constants import Constants
+from src.cache import TTLCache
+from src.log import get_logger
+import hashlib
+import base64
+import json
+import time
+import jwt
+import os
+
+
+logger = get_logger("keys")
+
+# Tokens sem "kid" são do esquema antigo (segredo compartilhado)
+LEGACY_KID = None
+
+# Tokens já verificados, até o próximo minuto: a mesma sessão manda o mesmo
+# access token em toda requisição e a assinatura só é conferida uma vez
+verified_tokens = TTLCache("verified_tokens", maxsize=4096, ttl=60.0)
+
+
+def _algorithm_for(key: Any) -> str:
+    if isinstance(key, (ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey)): return "EdDSA"
+    if isinstance(key, (ec.EllipticCurvePrivateKey, ec.EllipticCurvePublicKey)) and key.curve.name == "secp256r1": return "ES256"
+    raise ValueError(f"Tipo de chave não suportado para JWT: {type(key).__name__} (use Ed25519 ou EC P-256)")
+
+
+def _kid(token: str) -> Optional[str]:
+    # jwt.get_unverified_header decodifica e valida o token inteiro; aqui só o header
+    header = token.partition(".")[0]
+    try:
+        return json.loads(base64.urlsafe_b64decode(header + "=" * (-len(header) % 4))).get("kid")
+    except (ValueError, AttributeError):
+        raise jwt.DecodeError("Header do token inválido")
+
+
+def _public_jwk(kid: str, algorithm: str, public_key: Any) -> dict:
+    exporter = OKPAlgorithm if algorithm == "EdDSA" else ECAlgorithm
+    jwk = exporter.to_jwk(public_key, as_dict=True)
+    jwk.update(kid=kid, alg=algorithm, use="sig")
+    return jwk
+
+
+class KeyRing:
+    """
+    Chaves de assinatura dos JWT, carregadas uma vez por worker. Assina com
+    a chave ativa e verifica com qualquer chave do anel pelo "kid" do
+    header, já com a chave pública parseada: nada de PEM por requisição.
+
+    Rotação sem derrubar ninguém: publicar a chave nova (ela entra no JWKS e
+    passa a ser aceita), depois trocar JWT_ACTIVE_KID e, passado o prazo do
+    refresh token, rebaixar a antiga para <kid>.pub.pem e por fim removê-la.
+    Com SECRET_KEY definido, tokens sem "kid" continuam valendo pelo HMAC
+    antigo; sem nenhuma chave no diretório, o HMAC também assina.
+    """
+
+    def __init__(self):
+        # kid -> (algoritmo, chave de verificação)
+        self.keys: dict[Optional[str], tuple[str, Any]] = {}
+        self.active_kid: Optional[str] = None
+        self.signing_key: Any = None
+        self.algorithm: Optional[str] = None
+        self.jwks = b'{"keys":[]}'
+        self.jwks_etag = ""
+
+    def load(self, directory: Optional[str], active_kid: Optional[str], secret: Optional[str], algorithm: Optional[str]) -> None:
+        keys: dict[Optional[str], tuple[str, Any]] = {}
+        private: dict[str, Any] = {}
+        jwks = []
+        for name in sorted(os.listdir(directory)) if directory else ():
+            if not name.endswith(".pem"): continue
+            with open(os.path.join(directory, name), "rb") as f:
+                data = f.read()
+            if name.endswith(".pub.pem"):
+                kid, public_key = name[:-len(".pub.pem")], serialization.load_pem_public_key(data)
+            else:
+                kid = name[:-len(".pem")]
+                private[kid] = serialization.load_pem_private_key(data, password=None)
+                public_key = private[kid].public_key()
+            keys[kid] = (_algorithm_for(public_key), public_key)
+            jwks.append(_public_jwk(kid, keys[kid][0], public_key))
+
+        if secret and algorithm: keys[LEGACY_KID] = (algorithm, secret)
+
+        if private:
+            # Sem JWT_ACTIVE_KID, a mais recente em ordem de nome (ex.: 2026-10.pem)
+            self.active_kid = active_kid or max(private)
+            if self.active_kid not in private:
+                raise RuntimeError(f"JWT_ACTIVE_KID={self.active_kid} não tem chave privada em {directory}")
+            self.signing_key = private[self.active_kid]
+            self.algorithm = keys[self.active_kid][0]
+        elif LEGACY_KID in keys:
+            self.active_kid, self.signing_key, self.algorithm = LEGACY_KID, secret, algorithm
+        else:
+            logger.warning("Nenhuma chave de assinatura JWT configurada (JWT_KEYS_DIR ou SECRET_KEY)")
+
+        self.keys = keys
+        self.jwks = json.dumps({"keys": jwks}, separators=(",", ":")).encode()
+        self.jwks_etag = '"' + hashlib.blake2b(self.jwks, digest_size=12).hexdigest() + '"'
+        verified_tokens.clear()
+        logger.info("Chaves JWT carregadas", extra={"kids": [k for k in keys if k], "active_kid": self.active_kid})
+
+    def sign(self, payload: dict) -> str:
+        if self.signing_key is None: raise RuntimeError("Nenhuma chave de assinatura JWT configurada")
+        headers = {"kid": self.active_kid} if self.active_kid else None
+        return jwt.encode(payload, self.signing_key, algorithm=self.algorithm, headers=headers)
+
+    def verify(self, token: str) -> dict:
+        """Payload do token; jwt.InvalidTokenError se a assinatura, o kid ou o exp não conferirem."""
+        payload = verified_tokens.get(token)
+        if payload is not None:
+            if payload["exp"] <= time.time(): raise jwt.ExpiredSignatureError("Signature has expired")
+            return payload
+
+        kid = _kid(token)
+        key = self.keys.get(kid)
+        if key is None: raise jwt.InvalidTokenError(f"kid desconhecido: {kid}")
+        # O algoritmo vem da chave, nunca do header: impede trocar EdDSA por HS256
+        payload = jwt.decode(token, key[1], algorithms=[key[0]], options={"require": ["exp"]})
+        verified_tokens.set(token, payload)
+        return payload
+
+
+keyring = KeyRing()
+keyring.load(Constants.JWT_KEYS_DIR, Constants.JWT_ACTIVE_KID, Constants.SECRET_KEY, Constants.ALGORITHM)
@@ -0,0 +1,179 @@
+from logging.handlers import QueueHandler, QueueListener
+from starlette.types import ASGIApp, Receive, Scope, Send
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Optional
+from src.constants import Constants
+from src.util import route_template
+import logging
+import random
+import queue
+import json
+import time
+import copy
+import uuid
+import sys
+import re
+
+
+REQUEST_ID_HEADER = b"x-request-id"
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+user_id_var: ContextVar[Optional[str]] = ContextVar("user_id", default=None)
+tenant_id_var: ContextVar[Optional[int]] = ContextVar("tenant_id", default=None)
+route_var: ContextVar[Optional[str]] = ContextVar("route", default=None)
+
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+# Atributos padrão do LogRecord; o resto veio de extra={...} e vai para o JSON
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+def get_logger(name: str) -> logging.Logger:
+    return logging.getLogger(f"app.{name}")
+
+
+class JsonFormatter(logging.Formatter):
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+            "user_id": getattr(record, "user_id", None),
+            "tenant_id": getattr(record, "tenant_id", None),
+            "route": getattr(record, "route", None),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and key not in entry: entry[key] = value
+        if record.exc_text: entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False, separators=(",", ":"))
+
+
+class ContextQueueHandler(QueueHandler):
+    """
+    Só enfileira: formatação e escrita no stdout acontecem na thread do
+    QueueListener, então um pipe lento não trava o event loop. Com a fila
+    cheia o registro é descartado e contado em `dropped`.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        # Contexto lido aqui, na task da requisição, e não na thread do listener
+        record.request_id = request_id_var.get()
+        record.user_id = user_id_var.get()
+        record.tenant_id = tenant_id_var.get()
+        record.route = route_var.get()
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class SamplingFilter(logging.Filter):
+    """Deixa passar só uma fração dos registros INFO/DEBUG; avisos e erros passam sempre."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or random.random() < self.rate
+
+
+_listener: Optional[QueueListener] = None
+handler: Optional[ContextQueueHandler] = None
+
+access_logger = get_logger("access")
+
+
+def setup_logging() -> None:
+    global _listener, handler
+    if _listener is not None: return
+
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(JsonFormatter())
+
+    handler = ContextQueueHandler(queue.Queue(maxsize=Constants.LOG_QUEUE_SIZE))
+    _listener = QueueListener(handler.queue, stream, respect_handler_level=False)
+    _listener.start()
+
+    root = logging.getLogger("app")
+    root.setLevel(Constants.LOG_LEVEL)
+    root.addHandler(handler)
+    root.propagate = False
+
+    access_logger.addFilter(SamplingFilter(Constants.ACCESS_LOG_SAMPLE_RATE))
+
+
+def shutdown_logging() -> None:
+    """Esvazia a fila e para a thread de escrita (chamado no encerramento)."""
+    global _listener
+    if _listener is None: return
+    _listener.stop()
+    _listener = None
+
+
+class RequestContextMiddleware:
+    """
+    Define request id, rota e (depois da autenticação) usuário para todos os
+    logs da requisição, e grava o log de acesso com os limites de lentidão.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == REQUEST_ID_HEADER:
+                request_id = value.decode("latin-1")
+                break
+        if request_id is None or not _VALID_REQUEST_ID.match(request_id):
+            request_id = uuid.uuid4().hex
+
+        route = route_template(scope)
+        request_id_var.set(request_id)
+        route_var.set(route)
+        user_id_var.set(None)
+        tenant_id_var.set(None)
+
+        status_code = 500
+
+        async def send_wrapper(message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = [*message.get("headers", ()), (REQUEST_ID_HEADER, request_id.encode())]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed_ms = round((time.perf_counter() - start) * 1000, 2)
+            fields = {"method": scope["method"], "status": status_code, "elapsed_ms": elapsed_ms}
+            if status_code >= 500:
+                access_logger.error("request", extra=fields)
+            elif elapsed_ms >= Constants.SLOW_REQUEST_MS:
+                access_logger.warning("slow_request", extra=fields)
+            else:
+                access_logger.info("request", extra=fields)
@@ -0,0 +1,492 @@
+from starlette.types import ASGIApp, Receive, Scope, Send
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Callable, Iterable, Optional
+from bisect import bisect_left
+from dotenv import load_dotenv
+from pathlib import Path
+from src.constants import Constants
+from src.log import get_logger, tenant_id_var
+from src.util import route_template
+import asyncio
+import psutil
+import fcntl
+import json
+import time
+import os
+import re
+
+
+load_dotenv()
+
+logger = get_logger("metrics")
+slow_query_logger = get_logger("db.slow_query")
+
+# Com vários workers (uvicorn --workers N) cada processo grava o seu
+# snapshot neste diretório e o /metrics de qualquer worker soma todos.
+# Limpe o diretório a cada deploy: os contadores de workers que saíram
+# ficam acumulados nele.
+METRICS_DIR = os.getenv("METRICS_DIR")
+ACCUMULATED = "accumulated.json"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0, 5.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Metric:
+    """
+    Métricas são atualizadas só pela thread do event loop do worker, então
+    um dict simples basta: nenhuma trava no caminho quente.
+    """
+
+    type = ""
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.values: dict[tuple[str, ...], object] = {}
+
+    def samples(self) -> list:
+        return [[list(k), v] for k, v in self.values.items()]
+
+
+class Counter(Metric):
+
+    type = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) + amount
+
+
+class Gauge(Metric):
+
+    type = "gauge"
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) - amount
+
+    def set(self, value: float, *labels: str) -> None:
+        self.values[labels] = value
+
+
+class Histogram(Metric):
+
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = buckets
+
+    def observe(self, value: float, *labels: str) -> None:
+        state = self.values.get(labels)
+        if state is None:
+            # [contagem por bucket (+Inf no fim), soma]
+            state = self.values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        state[0][bisect_left(self.buckets, value)] += 1
+        state[1] += value
+
+    def samples(self) -> list:
+        # Cópia: o snapshot é somado numa thread enquanto o event loop segue observando
+        return [[list(k), [list(v[0]), v[1]]] for k, v in self.values.items()]
+
+
+class Registry:
+
+    def __init__(self):
+        self.metrics: dict[str, Metric] = {}
+        # Chamados antes de cada coleta para atualizar gauges derivados (pool, caches)
+        self.collectors: list[Callable[[], None]] = []
+
+    def _add(self, metric: Metric) -> Metric:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labels: tuple[str, ...] = ()) -> Counter:
+        return self._add(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: tuple[str, ...] = ()) -> Gauge:
+        return self._add(Gauge(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: tuple[str, ...] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help, labels, buckets))
+
+    def collector(self, func: Callable[[], None]) -> Callable[[], None]:
+        self.collectors.append(func)
+        return func
+
+    def snapshot(self) -> dict:
+        for collect in self.collectors:
+            try:
+                collect()
+            except Exception:
+                logger.exception("Coletor de métricas falhou")
+        return {
+            m.name: {
+                "type": m.type,
+                "help": m.help,
+                "labels": list(m.labels),
+                "buckets": list(getattr(m, "buckets", ())),
+                "samples": m.samples(),
+            }
+            for m in self.metrics.values()
+        }
+
+
+registry = Registry()
+
+http_requests = registry.counter(
+    "http_requests_total", "Requisições HTTP finalizadas", ("method", "route", "status", "tenant")
+)
+http_duration = registry.histogram(
+    "http_request_duration_seconds", "Duração das requisições HTTP", ("method", "route", "tenant")
+)
+http_in_flight = registry.gauge(
+    "http_requests_in_flight", "Requisições HTTP em andamento", ("method", "route")
+)
+db_query_duration = registry.histogram(
+    "db_query_duration_seconds", "Duração das consultas no Postgres por instrução", ("statement",), DB_BUCKETS
+)
+db_query_errors = registry.counter(
+    "db_query_errors_total", "Consultas que terminaram em erro", ("statement",)
+)
+db_pool_acquire = registry.histogram(
+    "db_pool_acquire_seconds", "Espera para obter uma conexão do pool", (), DB_BUCKETS
+)
+db_pool_connections = registry.gauge(
+    "db_pool_connections", "Conexões do pool por estado", ("state",)
+)
+db_reads_routed = registry.counter(
+    "db_reads_routed_total", "Conexões de leitura por destino", ("target",)
+)
+db_errors = registry.counter(
+    "db_errors_total", "Erros do Postgres traduzidos para a API, por SQLSTATE", ("sqlstate",)
+)
+db_transaction_retries = registry.counter(
+    "db_transaction_retries_total", "Deadlocks e falhas de serialização por rota e desfecho", ("route", "sqlstate", "outcome")
+)
+password_hash_duration = registry.histogram(
+    "password_hash_duration_seconds", "Duração do argon2 (hash e verificação)", ("operation",)
+)
+startup_phase_seconds = registry.gauge(
+    "startup_phase_seconds", "Duração de cada fase da subida do worker", ("phase",)
+)
+cache_hits = registry.counter("cache_hits_total", "Acertos dos caches em memória", ("cache",))
+cache_misses = registry.counter("cache_misses_total", "Faltas dos caches em memória", ("cache",))
+cache_size = registry.gauge("cache_entries", "Itens guardados em cada cache", ("cache",))
+response_cache_results = registry.counter(
+    "response_cache_results_total", "Respostas do cache do catálogo por origem", ("result",)
+)
+revoked_sessions = registry.gauge(
+    "revoked_sessions", "Revogações de sessão ainda vigentes na memória do worker"
+)
+
+
+@registry.collector
+def _collect_caches() -> None:
+    from src.cache import CACHES
+    for name, cache in CACHES.items():
+        cache_hits.values[(name,)] = float(cache.hits)
+        cache_misses.values[(name,)] = float(cache.misses)
+        cache_size.set(float(len(cache)), name)
+
+
+@registry.collector
+def _collect_revocations() -> None:
+    from src.sessions import revocations
+    revoked_sessions.set(float(len(revocations)))
+
+
+@registry.collector
+def _collect_pool() -> None:
+    from src.db.db import db
+    if db.pool is None: return
+    size = db.pool.get_size()
+    idle = db.pool.get_idle_size()
+    db_pool_connections.set(float(size - idle), "busy")
+    db_pool_connections.set(float(idle), "idle")
+
+
+# ============================================================================
+# Postgres
+# ============================================================================
+
+_TABLE_RE = re.compile(r"\b(?:FROM|INTO|UPDATE|JOIN)\s+([a-z_][\w.]*)", re.IGNORECASE)
+
+
+@lru_cache(maxsize=1024)
+def statement_name(query: str) -> str:
+    """Nome curto e de baixa cardinalidade: verbo + primeira tabela."""
+    words = query.split(None, 1)
+    if not words: return "EMPTY"
+    verb = words[0].upper()
+    table = _TABLE_RE.search(query)
+    return f"{verb} {table.group(1).lower()}" if table else verb
+
+
+def observe_query(record) -> None:
+    name = statement_name(record.query)
+    db_query_duration.observe(record.elapsed, name)
+    if record.exception is not None: db_query_errors.inc(name)
+
+    elapsed_ms = record.elapsed * 1000
+    if elapsed_ms >= Constants.SLOW_QUERY_MS:
+        # Sem os parâmetros: podem conter CPF, senha, etc
+        slow_query_logger.warning(
+            "slow_query",
+            extra={"statement": name, "elapsed_ms": round(elapsed_ms, 2), "query": " ".join(record.query.split())[:500]}
+        )
+
+
+async def instrument_connection(conn) -> None:
+    """Usado como init= do pool: cada conexão nova reporta suas consultas."""
+    conn.add_query_logger(observe_query)
+
+
+# ============================================================================
+# HTTP
+# ============================================================================
+
+class MetricsMiddleware:
+    """Middleware ASGI puro (sem BaseHTTPMiddleware) para não copiar o corpo."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = route_template(scope)
+        status_code = "500"
+
+        async def send_wrapper(message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = str(message["status"])
+            await send(message)
+
+        http_in_flight.inc(method, route)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Loja conhecida só depois da autenticação (vazia nas rotas públicas)
+            tenant = tenant_id_var.get()
+            tenant = "" if tenant is None else str(tenant)
+            http_duration.observe(time.perf_counter() - start, method, route, tenant)
+            http_requests.inc(method, route, status_code, tenant)
+            http_in_flight.dec(method, route)
+
+
+# ============================================================================
+# Multi-worker (arquivos em METRICS_DIR)
+# ============================================================================
+
+def _process_key(pid: int) -> Optional[str]:
+    """pid + horário de início: um pid reaproveitado por outro processo não herda o arquivo."""
+    try:
+        return f"{pid}-{int(psutil.Process(pid).create_time() * 1000)}"
+    except psutil.Error:
+        return None
+
+
+def _write_snapshot(path: Path, snapshot: dict) -> None:
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(snapshot, separators=(",", ":")))
+    os.replace(tmp, path)
+
+
+@contextmanager
+def _locked(directory: Path):
+    """Trava entre workers: a leitura não vê um worker somado e ainda no próprio arquivo."""
+    with open(directory / ".lock", "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _retire(directory: Path, path: Path, snapshot: dict) -> None:
+    """
+    Soma contadores e histogramas do worker que saiu em ACCUMULATED e apaga
+    o arquivo dele; os gauges (em andamento, pool) morrem com o processo.
+    Chamar com _locked(directory).
+    """
+    accumulated = directory / ACCUMULATED
+    parts = [{n: m for n, m in snapshot.items() if m["type"] != "gauge"}]
+    if accumulated.exists(): parts.append(json.loads(accumulated.read_text()))
+    _write_snapshot(accumulated, _as_snapshot(_merge(parts)))
+    path.unlink(missing_ok=True)
+
+
+def _read_snapshots(directory: Path, own: Path) -> Iterable[dict]:
+    accumulated = directory / ACCUMULATED
+    for path in directory.glob("*.json"):
+        if path in (own, accumulated): continue
+        try:
+            snapshot = json.loads(path.read_text())
+            # Worker que morreu sem apagar o arquivo (kill -9, OOM): entra no acumulado
+            if _process_key(int(path.stem.split("-")[0])) != path.stem:
+                _retire(directory, path, snapshot)
+                continue
+            yield snapshot
+        except (ValueError, OSError):
+            continue
+    # Por último: já com os mortos encontrados nesta leitura
+    try:
+        if accumulated.exists(): yield json.loads(accumulated.read_text())
+    except (ValueError, OSError):
+        pass
+
+
+def _merge(snapshots: Iterable[dict]) -> dict:
+    merged: dict = {}
+    for snapshot in snapshots:
+        for name, metric in snapshot.items():
+            target = merged.setdefault(name, {**metric, "samples": {}})
+            samples = target["samples"]
+            for labels, value in metric["samples"]:
+                key = tuple(labels)
+                if metric["type"] == "histogram":
+                    current = samples.get(key)
+                    if current is None:
+                        samples[key] = [list(value[0]), value[1]]
+                    else:
+                        current[0] = [a + b for a, b in zip(current[0], value[0])]
+                        current[1] += value[1]
+                else:
+                    samples[key] = samples.get(key, 0.0) + value
+    return merged
+
+
+def _as_snapshot(merged: dict) -> dict:
+    """Volta ao formato de registry.snapshot() (rótulos em lista) para gravar em JSON."""
+    return {
+        name: {**metric, "samples": [[list(k), v] for k, v in metric["samples"].items()]}
+        for name, metric in merged.items()
+    }
+
+
+class MetricsExporter:
+    """
+    Grava periodicamente o snapshot deste worker quando METRICS_DIR está
+    definido. Ao encerrar (ou quando outro worker o encontra morto) os
+    contadores e histogramas do worker vão para ACCUMULATED, como no modo
+    multiprocesso do prometheus_client: a soma nunca diminui e o Prometheus
+    não vê reset. Só os gauges saem junto com o worker.
+    """
+
+    def __init__(self, interval: float = 5.0):
+        self.interval = interval
+        self.directory = Path(METRICS_DIR) if METRICS_DIR else None
+        self.path = self.directory / f"{_process_key(os.getpid())}.json" if self.directory else None
+        self._task: Optional[asyncio.Task] = None
+
+    def flush(self) -> None:
+        if self.path is None: return
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            _write_snapshot(self.path, registry.snapshot())
+        except OSError as e:
+            logger.warning("Falha ao gravar métricas em %s | %s", self.directory, e)
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            self.flush()
+
+    def start(self) -> None:
+        if self.directory is not None and self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.path is None: return
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with _locked(self.directory):
+                _retire(self.directory, self.path, registry.snapshot())
+        except (ValueError, OSError) as e:
+            logger.warning("Falha ao acumular métricas em %s | %s", self.directory, e)
+
+    def collect(self, snapshot: dict) -> dict:
+        """Soma `snapshot` (deste worker) com os arquivos dos demais. Faz I/O: fora do event loop."""
+        if self.directory is None or not self.directory.is_dir():
+            return _merge([snapshot])
+        with _locked(self.directory):
+            return _merge([snapshot, *_read_snapshots(self.directory, self.path)])
+
+
+exporter = MetricsExporter()
+
+
+# ============================================================================
+# Formato texto do Prometheus
+# ============================================================================
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: list[str], values: Iterable[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra: pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_bucket(bound: float) -> str:
+    return repr(bound) if bound != int(bound) else f"{bound:.1f}"
+
+
+async def render() -> str:
+    # Só o snapshot deste worker sai do event loop (as métricas não têm trava);
+    # a leitura dos arquivos dos outros workers e a formatação vão para uma thread
+    return await asyncio.to_thread(_render, registry.snapshot())
+
+
+def _render(snapshot: dict) -> str:
+    merged = exporter.collect(snapshot)
+    lines: list[str] = []
+    for name, metric in merged.items():
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        names = metric["labels"]
+        for labels, value in metric["samples"].items():
+            if metric["type"] != "histogram":
+                lines.append(f"{name}{_labels(names, labels)} {value}")
+                continue
+            counts, total = value
+            cumulative = 0
+            bounds = [_format_bucket(b) for b in metric["buckets"]] + ["+Inf"]
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                le = 'le="' + bound + '"'
+                lines.append(f"{name}_bucket{_labels(names, labels, le)} {cumulative}")
+            lines.append(f"{name}_sum{_labels(names, labels)} {total}")
+            lines.append(f"{name}_count{_labels(names, labels)} {cumulative}")
+
+    hits = merged.get("cache_hits_total", {}).get("samples", {})
+    misses = merged.get("cache_misses_total", {}).get("samples", {})
+    if hits:
+        lines.append("# HELP cache_hit_ratio Taxa de acerto dos caches (soma de todos os workers)")
+        lines.append("# TYPE cache_hit_ratio gauge")
+        for labels, hit in hits.items():
+            total = hit + misses.get(labels, 0.0)
+            ratio = hit / total if total else 0.0
+            lines.append(f"cache_hit_ratio{_labels(['cache'], labels)} {ratio}")
+    return "\n".join(lines) + "\n"
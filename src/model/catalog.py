@@ -0,0 +1,47 @@
+from src.schemas.category import CategoryTreeResponse
+from src.schemas.supplier import SupplierResponse
+from src.schemas.tax_group import TaxGroupResponse
+from asyncpg import Connection
+
+
+async def get_categories(conn: Connection) -> list[CategoryTreeResponse]:
+    rows = await conn.fetch(
+        """
+            SELECT
+                id, name, parent_category_id, created_at
+            FROM
+                categories
+            ORDER BY
+                name
+        """
+    )
+    return [CategoryTreeResponse(**dict(row)) for row in rows]
+
+
+async def get_suppliers(conn: Connection) -> list[SupplierResponse]:
+    rows = await conn.fetch(
+        """
+            SELECT
+                id, name, cnpj, phone, contact_name, address, created_at
+            FROM
+                suppliers
+            ORDER BY
+                name
+        """
+    )
+    return [SupplierResponse(**dict(row)) for row in rows]
+
+
+async def get_tax_groups(conn: Connection) -> list[TaxGroupResponse]:
+    rows = await conn.fetch(
+        """
+            SELECT
+                id, description, icms_cst, pis_cofins_cst,
+                icms_rate, pis_rate, cofins_rate
+            FROM
+                tax_groups
+            ORDER BY
+                description
+        """
+    )
+    return [TaxGroupResponse(**dict(row)) for row in rows]
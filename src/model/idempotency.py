@@ -0,0 +1,66 @@
+from asyncpg import Connection, Record
+from typing import Optional
+from uuid import UUID
+
+
+async def lock_key(user_id: UUID, key: str, conn: Connection) -> None:
+    # Duplicatas concorrentes esperam aqui até a primeira transação terminar
+    await conn.execute(
+        "SELECT pg_advisory_xact_lock(hashtextextended($1, 0))",
+        f"{user_id}:{key}"
+    )
+
+
+async def get_key(user_id: UUID, key: str, conn: Connection) -> Optional[Record]:
+    return await conn.fetchrow(
+        """
+            SELECT
+                fingerprint,
+                status_code,
+                response
+            FROM
+                idempotency_keys
+            WHERE
+                user_id = $1 AND
+                key = $2 AND
+                expires_at > now()
+        """,
+        user_id,
+        key
+    )
+
+
+async def save_key(
+    user_id: UUID,
+    key: str,
+    fingerprint: bytes,
+    status_code: int,
+    response: bytes,
+    ttl_hours: int,
+    conn: Connection
+) -> None:
+    await conn.execute(
+        """
+            INSERT INTO idempotency_keys (
+                user_id,
+                key,
+                fingerprint,
+                status_code,
+                response,
+                expires_at
+            )
+            VALUES
+                ($1, $2, $3, $4, $5, now() + make_interval(hours => $6))
+            ON CONFLICT (user_id, key) DO UPDATE SET
+                fingerprint = EXCLUDED.fingerprint,
+                status_code = EXCLUDED.status_code,
+                response = EXCLUDED.response,
+                expires_at = EXCLUDED.expires_at
+        """,
+        user_id,
+        key,
+        fingerprint,
+        status_code,
+        response,
+        ttl_hours
+    )
@@ -0,0 +1,32 @@
+from src.schemas.live import LiveSaleBoardItem, KitchenQueueItem
+from asyncpg import Connection
+
+
+async def get_last_event_id(conn: Connection) -> int:
+    return await conn.fetchval("SELECT COALESCE(MAX(id), 0) FROM live_events")
+
+
+async def get_sales_board(conn: Connection) -> list[LiveSaleBoardItem]:
+    rows = await conn.fetch(
+        """
+            SELECT
+                sale_id, status, total_amount, customer_id,
+                customer_name, salesperson_id, created_at
+            FROM
+                vw_live_sales_board
+        """
+    )
+    return [LiveSaleBoardItem(**dict(row)) for row in rows]
+
+
+async def get_kitchen_queue(conn: Connection) -> list[KitchenQueueItem]:
+    rows = await conn.fetch(
+        """
+            SELECT
+                sale_item_id, sale_id, product_id, product_name,
+                quantity, sale_status, created_at
+            FROM
+                vw_kitchen_queue
+        """
+    )
+    return [KitchenQueueItem(**dict(row)) for row in rows]
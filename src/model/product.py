@@ -0,0 +1,217 @@
+from src.schemas.pricing import RepricingRequest, RepricingItem
+from src.schemas.product import ProductSearchResult, ProductResponse
+from asyncpg import Connection, Record
+from typing import Optional
+from uuid import UUID
+
+
+# Calcula os novos preços de todos os produtos alcançados pela regra.
+# $1 = modo, $2 = percentual, $3 = categoria (com subcategorias), $4 = fornecedor
+REPRICING_TARGETS_CTE = """
+    WITH RECURSIVE category_tree AS (
+        SELECT id FROM categories WHERE id = $3::int
+        UNION ALL
+        SELECT c.id FROM categories c
+        INNER JOIN category_tree ct ON c.parent_category_id = ct.id
+    ),
+    targets AS (
+        SELECT
+            p.id AS product_id,
+            p.name,
+            p.sku,
+            p.purchase_price AS old_purchase_price,
+            p.sale_price AS old_sale_price,
+            ROUND(
+                CASE WHEN $1::text = 'COST_INCREASE'
+                    THEN p.purchase_price * (1 + $2::numeric / 100)
+                    ELSE p.purchase_price
+                END, 2
+            ) AS new_purchase_price,
+            ROUND(
+                CASE $1::text
+                    WHEN 'TARGET_MARGIN' THEN p.purchase_price * (1 + $2::numeric / 100)
+                    ELSE p.sale_price * (1 + $2::numeric / 100)
+                END, 2
+            ) AS new_sale_price
+        FROM
+            products p
+        WHERE
+            p.is_active = TRUE AND
+            ($3::int IS NULL OR p.category_id IN (SELECT id FROM category_tree)) AND
+            ($4::uuid IS NULL OR p.supplier_id = $4::uuid)
+    )
+"""
+
+
+def _repricing_args(rule: RepricingRequest) -> tuple:
+    return (rule.mode.value, rule.percent, rule.category_id, rule.supplier_id)
+
+
+async def preview_repricing(rule: RepricingRequest, conn: Connection) -> list[RepricingItem]:
+    rows = await conn.fetch(
+        REPRICING_TARGETS_CTE + """
+            SELECT
+                product_id, name, sku,
+                old_purchase_price, new_purchase_price,
+                old_sale_price, new_sale_price
+            FROM
+                targets
+            ORDER BY
+                name
+        """,
+        *_repricing_args(rule)
+    )
+    return [RepricingItem(**dict(row)) for row in rows]
+
+
+async def apply_repricing(rule: RepricingRequest, changed_by: Optional[UUID], conn: Connection) -> Record:
+    # Nada é gravado se qualquer produto violar sale_price >= purchase_price
+    return await conn.fetchrow(
+        REPRICING_TARGETS_CTE + """
+            , violations AS (
+                SELECT product_id FROM targets
+                WHERE new_sale_price < new_purchase_price
+            ),
+            changed AS (
+                UPDATE products p
+                SET
+                    purchase_price = t.new_purchase_price,
+                    sale_price = t.new_sale_price
+                FROM
+                    targets t
+                WHERE
+                    p.id = t.product_id AND
+                    NOT EXISTS (SELECT 1 FROM violations) AND
+                    (t.old_purchase_price, t.old_sale_price)
+                        IS DISTINCT FROM (t.new_purchase_price, t.new_sale_price)
+                RETURNING p.id
+            ),
+            audits AS (
+                INSERT INTO price_audits (
+                    product_id,
+                    old_purchase_price,
+                    new_purchase_price,
+                    old_sale_price,
+                    new_sale_price,
+                    changed_by
+                )
+                SELECT
+                    t.product_id,
+                    t.old_purchase_price,
+                    t.new_purchase_price,
+                    t.old_sale_price,
+                    t.new_sale_price,
+                    $5
+                FROM
+                    changed c
+                    INNER JOIN targets t ON t.product_id = c.id
+                RETURNING product_id
+            )
+            SELECT
+                (SELECT COUNT(*) FROM targets) AS total,
+                (SELECT COUNT(*) FROM violations) AS violations,
+                (SELECT COUNT(*) FROM audits) AS applied
+        """,
+        *_repricing_args(rule),
+        changed_by
+    )
+
+
+async def search_products(
+    term: str,
+    prefix_pattern: str,
+    limit: int,
+    conn: Connection
+) -> list[ProductSearchResult]:
+    # term já vem normalizado (util.normalize_search_term) para casar com
+    # as expressões indexadas f_search_normalize(...)
+    rows = await conn.fetch(
+        """
+            SELECT
+                id, name, sku, gtin, sale_price, stock_quantity,
+                measure_unit, needs_preparation,
+                (
+                    CASE WHEN f_search_normalize(name::text) LIKE $2 THEN 1.0 ELSE 0.0 END
+                    + word_similarity($1, f_search_normalize(name::text))
+                    + similarity(f_search_normalize(name::text), $1) * 0.5
+                    + COALESCE(word_similarity($1, f_search_normalize(description)), 0) * 0.25
+                )::float AS rank
+            FROM
+                products
+            WHERE
+                is_active = TRUE AND (
+                    f_search_normalize(name::text) LIKE $2
+                    OR $1 <% f_search_normalize(name::text)
+                    OR $1 <% f_search_normalize(description)
+                )
+            ORDER BY
+                rank DESC, name
+            LIMIT $3
+        """,
+        term,
+        prefix_pattern,
+        limit
+    )
+    return [ProductSearchResult(**dict(row)) for row in rows]
+
+
+async def get_name_initials(conn: Connection) -> list[str]:
+    rows = await conn.fetch(
+        """
+            SELECT DISTINCT
+                left(f_search_normalize(name::text), 1) AS initial
+            FROM
+                products
+            WHERE
+                is_active = TRUE
+        """
+    )
+    return [row['initial'] for row in rows]
+
+
+PRODUCT_COLUMNS = """
+    id, name, sku, description, category_id, image_url,
+    gtin, ncm, cest, cfop_default, origin, tax_group_id, supplier_id,
+    stock_quantity, min_stock_quantity, max_stock_quantity, average_weight,
+    purchase_price, sale_price, profit_margin, measure_unit,
+    is_active, needs_preparation, created_at, updated_at
+"""
+
+
+async def get_product(product_id: UUID, conn: Connection) -> Optional[ProductResponse]:
+    row = await conn.fetchrow(
+        f"SELECT {PRODUCT_COLUMNS} FROM products WHERE id = $1",
+        product_id
+    )
+    return ProductResponse(**dict(row)) if row else None
+
+
+async def list_products(
+    category_id: Optional[int],
+    supplier_id: Optional[UUID],
+    include_inactive: bool,
+    limit: int,
+    offset: int,
+    conn: Connection
+) -> list[ProductResponse]:
+    rows = await conn.fetch(
+        f"""
+            SELECT
+                {PRODUCT_COLUMNS}
+            FROM
+                products
+            WHERE
+                ($1::int IS NULL OR category_id = $1::int) AND
+                ($2::uuid IS NULL OR supplier_id = $2::uuid) AND
+                ($3::bool OR is_active = TRUE)
+            ORDER BY
+                name
+            LIMIT $4 OFFSET $5
+        """,
+        category_id,
+        supplier_id,
+        include_inactive,
+        limit,
+        offset
+    )
+    return [ProductResponse(**dict(row)) for row in rows]
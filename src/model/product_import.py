@@ -0,0 +1,206 @@
+from src.schemas.product_import import ProductImportResponse
+from src.schemas.enums import ImportStatus
+from asyncpg import Connection, Record
+from typing import Iterable, Optional
+from uuid import UUID
+import json
+
+
+# Colunas de ProductCreate, na ordem do COPY (depois de `line`)
+IMPORT_COLUMNS = (
+    "name", "sku", "description", "category_id", "image_url",
+    "gtin", "ncm", "cest", "cfop_default", "origin", "tax_group_id", "supplier_id",
+    "stock_quantity", "min_stock_quantity", "max_stock_quantity", "average_weight",
+    "purchase_price", "sale_price", "measure_unit", "is_active", "needs_preparation"
+)
+
+# Estoque de produto existente só muda por movimentação, nunca pela planilha
+UPDATE_COLUMNS = tuple(c for c in IMPORT_COLUMNS if c not in ("sku", "stock_quantity"))
+
+
+async def create_job(file_name: str, total_rows: int, created_by: Optional[UUID], conn: Connection) -> UUID:
+    return await conn.fetchval(
+        """
+            INSERT INTO product_imports (file_name, total_rows, created_by)
+            VALUES ($1, $2, $3)
+            RETURNING id
+        """,
+        file_name,
+        total_rows,
+        created_by
+    )
+
+
+async def get_job(job_id: UUID, conn: Connection) -> Optional[ProductImportResponse]:
+    row = await conn.fetchrow(
+        """
+            SELECT
+                id, file_name, status, total_rows, processed_rows,
+                inserted, updated, failed, errors::text AS errors,
+                detail, created_at, finished_at
+            FROM
+                product_imports
+            WHERE
+                id = $1
+        """,
+        job_id
+    )
+    if row is None: return None
+    return ProductImportResponse(**{**dict(row), "errors": json.loads(row["errors"])})
+
+
+async def stage_rows(records: list[tuple], conn: Connection) -> None:
+    # Some no commit do lote; LIKE traz os mesmos tipos (citext, enum) da tabela final
+    await conn.execute(
+        """
+            CREATE TEMP TABLE product_import_stage (line INT PRIMARY KEY, LIKE products INCLUDING DEFAULTS)
+            ON COMMIT DROP
+        """
+    )
+    await conn.copy_records_to_table(
+        "product_import_stage",
+        records=records,
+        columns=("line", *IMPORT_COLUMNS)
+    )
+
+
+async def reject_staged(conn: Connection) -> list[Record]:
+    """Tira da staging as linhas que quebrariam o upsert (FKs e únicos de outro SKU, sempre na loja da sessão)."""
+    return await conn.fetch(
+        """
+            WITH checked AS (
+                SELECT
+                    s.line,
+                    s.sku::text AS sku,
+                    CASE
+                        WHEN NOT EXISTS (SELECT 1 FROM categories c WHERE c.id = s.category_id AND c.tenant_id = auth_tenant())
+                            THEN 'Categoria não encontrada: ' || s.category_id
+                        WHEN s.tax_group_id IS NOT NULL AND NOT EXISTS (SELECT 1 FROM tax_groups t WHERE t.id = s.tax_group_id AND t.tenant_id = auth_tenant())
+                            THEN 'Grupo tributário não encontrado: ' || s.tax_group_id
+                        WHEN s.supplier_id IS NOT NULL AND NOT EXISTS (SELECT 1 FROM suppliers f WHERE f.id = s.supplier_id AND f.tenant_id = auth_tenant())
+                            THEN 'Fornecedor não encontrado: ' || s.supplier_id
+                        WHEN EXISTS (SELECT 1 FROM products p WHERE p.tenant_id = auth_tenant() AND p.name = s.name AND p.sku <> s.sku)
+                            THEN 'Nome já usado por outro produto'
+                        WHEN s.gtin IS NOT NULL AND EXISTS (SELECT 1 FROM products p WHERE p.tenant_id = auth_tenant() AND p.gtin = s.gtin AND p.sku <> s.sku)
+                            THEN 'GTIN já usado por outro produto'
+                    END AS message
+                FROM
+                    product_import_stage s
+            )
+            DELETE FROM product_import_stage s
+            USING checked c
+            WHERE s.line = c.line AND c.message IS NOT NULL
+            RETURNING c.line, c.sku, c.message
+        """
+    )
+
+
+async def upsert_staged(line: Optional[int], changed_by: Optional[UUID], conn: Connection) -> Record:
+    """
+    Upsert por SKU de toda a staging (ou só de `line`); conta inseridos e
+    atualizados. Preço alterado vai para price_audits na mesma instrução,
+    como no reajuste em lote.
+    """
+    columns = ", ".join(IMPORT_COLUMNS)
+    updates = ", ".join(f"{c} = EXCLUDED.{c}" for c in UPDATE_COLUMNS)
+    return await conn.fetchrow(
+        f"""
+            WITH previous AS (
+                -- Todos os CTEs leem o snapshot do início da instrução: aqui
+                -- ainda estão os preços de antes do upsert
+                SELECT p.id, p.purchase_price, p.sale_price
+                FROM products p
+                INNER JOIN product_import_stage s ON s.sku = p.sku
+                WHERE p.tenant_id = auth_tenant() AND ($1::int IS NULL OR s.line = $1::int)
+            ),
+            upserted AS (
+                INSERT INTO products ({columns})
+                SELECT {columns}
+                FROM product_import_stage
+                WHERE $1::int IS NULL OR line = $1::int
+                ORDER BY line
+                ON CONFLICT (tenant_id, sku) DO UPDATE SET {updates}
+                RETURNING id, (xmax = 0) AS inserted, purchase_price, sale_price
+            ),
+            audits AS (
+                INSERT INTO price_audits (
+                    product_id,
+                    old_purchase_price,
+                    new_purchase_price,
+                    old_sale_price,
+                    new_sale_price,
+                    changed_by
+                )
+                SELECT
+                    u.id,
+                    p.purchase_price,
+                    u.purchase_price,
+                    p.sale_price,
+                    u.sale_price,
+                    $2
+                FROM
+                    upserted u
+                    INNER JOIN previous p ON p.id = u.id
+                WHERE
+                    (p.purchase_price, p.sale_price) IS DISTINCT FROM (u.purchase_price, u.sale_price)
+            )
+            SELECT
+                COUNT(*) FILTER (WHERE inserted) AS inserted,
+                COUNT(*) FILTER (WHERE NOT inserted) AS updated
+            FROM
+                upserted
+        """,
+        line,
+        changed_by
+    )
+
+
+async def get_staged_lines(conn: Connection) -> list[Record]:
+    return await conn.fetch("SELECT line, sku::text AS sku FROM product_import_stage ORDER BY line")
+
+
+async def add_progress(
+    job_id: UUID,
+    processed: int,
+    inserted: int,
+    updated: int,
+    failed: int,
+    errors: Iterable[dict],
+    conn: Connection
+) -> None:
+    await conn.execute(
+        """
+            UPDATE product_imports SET
+                status = 'PROCESSANDO',
+                processed_rows = processed_rows + $2,
+                inserted = inserted + $3,
+                updated = updated + $4,
+                failed = failed + $5,
+                errors = errors || $6::jsonb
+            WHERE
+                id = $1
+        """,
+        job_id,
+        processed,
+        inserted,
+        updated,
+        failed,
+        json.dumps(list(errors))
+    )
+
+
+async def finish_job(job_id: UUID, status: ImportStatus, detail: Optional[str], conn: Connection) -> None:
+    await conn.execute(
+        """
+            UPDATE product_imports SET
+                status = $2::varchar,
+                detail = $3,
+                total_rows = CASE WHEN $2::varchar = 'CONCLUIDA' THEN processed_rows ELSE total_rows END,
+                finished_at = CURRENT_TIMESTAMP
+            WHERE
+                id = $1
+        """,
+        job_id,
+        status.value,
+        detail
+    )
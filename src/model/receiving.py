@@ -0,0 +1,135 @@
+from src.schemas.receiving import ReceivingCreate
+from asyncpg import Connection, Record
+from typing import Optional
+from uuid import UUID
+
+
+async def apply_receipt(receipt: ReceivingCreate, received_by: Optional[UUID], conn: Connection) -> Record:
+    # Uma única instrução para a nota inteira. Nada é gravado se faltar produto
+    # ou fornecedor, se a nota já tiver entrado, ou se o novo custo médio
+    # passar do preço de venda de algum produto.
+    return await conn.fetchrow(
+        """
+            WITH lines AS (
+                SELECT * FROM unnest($4::uuid[], $5::numeric[], $6::numeric[], $7::text[], $8::date[])
+                    AS l(product_id, quantity, unit_cost, batch_code, expiration_date)
+            ),
+            totals AS (
+                SELECT product_id, SUM(quantity) AS quantity, SUM(quantity * unit_cost) AS cost
+                FROM lines
+                GROUP BY product_id
+            ),
+            missing AS (
+                SELECT t.product_id
+                FROM totals t
+                LEFT JOIN products p ON p.id = t.product_id
+                WHERE p.id IS NULL
+            ),
+            -- Custo médio ponderado; estoque zerado ou negativo assume o custo da nota.
+            -- Linhas travadas em ordem de id: duas notas com os mesmos produtos não entram em deadlock
+            targets AS (
+                SELECT
+                    p.id AS product_id,
+                    p.sale_price,
+                    p.purchase_price AS old_purchase_price,
+                    ROUND(
+                        CASE WHEN p.stock_quantity > 0
+                            THEN (p.stock_quantity * p.purchase_price + t.cost) / (p.stock_quantity + t.quantity)
+                            ELSE t.cost / t.quantity
+                        END, 2
+                    ) AS new_purchase_price,
+                    t.quantity
+                FROM
+                    totals t
+                    INNER JOIN products p ON p.id = t.product_id
+                ORDER BY
+                    p.id
+                FOR UPDATE OF p
+            ),
+            violations AS (
+                SELECT product_id, new_purchase_price, sale_price
+                FROM targets
+                WHERE new_purchase_price > sale_price
+            ),
+            receipt AS (
+                INSERT INTO supplier_receipts (supplier_id, invoice_number, total_cost, received_by)
+                SELECT s.id, $2, ROUND((SELECT SUM(cost) FROM totals), 2), $3
+                FROM suppliers s
+                WHERE
+                    s.id = $1 AND
+                    NOT EXISTS (SELECT 1 FROM missing) AND
+                    NOT EXISTS (SELECT 1 FROM violations)
+                ON CONFLICT (supplier_id, invoice_number) DO NOTHING
+                RETURNING id, total_cost, received_at
+            ),
+            changed AS (
+                UPDATE products p
+                SET
+                    stock_quantity = p.stock_quantity + t.quantity,
+                    purchase_price = t.new_purchase_price
+                FROM
+                    targets t
+                    CROSS JOIN receipt r
+                WHERE
+                    p.id = t.product_id
+                RETURNING p.id
+            ),
+            movements AS (
+                INSERT INTO stock_movements (product_id, type, quantity, reference_id, reason, created_by)
+                SELECT l.product_id, 'COMPRA', l.quantity, r.id, 'NF ' || $2, $3
+                FROM lines l
+                CROSS JOIN receipt r
+                RETURNING id
+            ),
+            new_batches AS (
+                INSERT INTO batches (product_id, batch_code, expiration_date, quantity)
+                SELECT l.product_id, l.batch_code, l.expiration_date, l.quantity
+                FROM lines l
+                CROSS JOIN receipt r
+                WHERE l.expiration_date IS NOT NULL
+                RETURNING id
+            ),
+            audits AS (
+                INSERT INTO price_audits (
+                    product_id,
+                    old_purchase_price,
+                    new_purchase_price,
+                    old_sale_price,
+                    new_sale_price,
+                    changed_by
+                )
+                SELECT
+                    t.product_id,
+                    t.old_purchase_price,
+                    t.new_purchase_price,
+                    t.sale_price,
+                    t.sale_price,
+                    $3
+                FROM
+                    targets t
+                    CROSS JOIN receipt r
+                WHERE
+                    t.new_purchase_price <> t.old_purchase_price
+                RETURNING product_id, old_purchase_price, new_purchase_price
+            )
+            SELECT
+                (SELECT id FROM receipt) AS receipt_id,
+                (SELECT total_cost FROM receipt) AS total_cost,
+                (SELECT received_at FROM receipt) AS received_at,
+                EXISTS (SELECT 1 FROM suppliers WHERE id = $1) AS supplier_found,
+                ARRAY(SELECT product_id FROM missing) AS missing_products,
+                (SELECT json_agg(v)::text FROM violations v) AS violations,
+                (SELECT COUNT(*) FROM changed) AS changed,
+                (SELECT COUNT(*) FROM movements) AS movements,
+                (SELECT COUNT(*) FROM new_batches) AS batches,
+                (SELECT json_agg(a)::text FROM audits a) AS cost_changes
+        """,
+        receipt.supplier_id,
+        receipt.invoice_number,
+        received_by,
+        [i.product_id for i in receipt.items],
+        [i.quantity for i in receipt.items],
+        [i.unit_cost for i in receipt.items],
+        [i.batch_code for i in receipt.items],
+        [i.expiration_date for i in receipt.items]
+    )
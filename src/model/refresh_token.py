@@ -1,17 +1,111 @@
+from src.schemas.session import SessionResponse
 from asyncpg import Connection
+from typing import Optional
 from uuid import UUID
 
 
-async def create_refresh_token(id: UUID, user_id: UUID, conn: Connection) -> None:
+async def create_refresh_token(
+    id: UUID,
+    user_id: UUID,
+    expire_days: int,
+    user_agent: Optional[str],
+    ip_address: Optional[str],
+    conn: Connection
+) -> None:
     await conn.execute(
         """
             INSERT INTO refresh_tokens (
                 id,
-                user_id
+                user_id,
+                expires_at,
+                user_agent,
+                ip_address
             )
             VALUES
-                ($1, $2)
+                ($1, $2, CURRENT_TIMESTAMP + make_interval(days => $3), $4, $5)
         """,
         id,
+        user_id,
+        expire_days,
+        user_agent,
+        ip_address
+    )
+
+
+async def get_active_sessions(user_id: UUID, conn: Connection) -> list[SessionResponse]:
+    rows = await conn.fetch(
+        """
+            SELECT
+                id,
+                created_at,
+                expires_at,
+                user_agent,
+                ip_address
+            FROM
+                refresh_tokens
+            WHERE
+                user_id = $1
+                AND NOT revoked
+                AND (expires_at IS NULL OR expires_at > CURRENT_TIMESTAMP)
+            ORDER BY
+                created_at DESC
+        """,
         user_id
-    )
\ No newline at end of file
+    )
+    return [SessionResponse(**dict(r)) for r in rows]
+
+
+async def revoke_session(session_id: UUID, user_id: Optional[UUID], revocation_hours: int, conn: Connection) -> bool:
+    """
+    Revoga o refresh token e registra a sessão em session_revocations, cujo
+    NOTIFY derruba os access tokens dela em todos os workers. Com user_id,
+    só revoga se a sessão for desse usuário.
+    """
+    revoked = await conn.fetchval(
+        """
+            WITH revoked AS (
+                UPDATE refresh_tokens
+                SET revoked = TRUE, revoked_at = CURRENT_TIMESTAMP
+                WHERE id = $1 AND NOT revoked AND ($2::uuid IS NULL OR user_id = $2)
+                RETURNING id, user_id
+            )
+            INSERT INTO session_revocations (user_id, session_id, expires_at)
+            SELECT user_id, id, CURRENT_TIMESTAMP + make_interval(hours => $3)
+            FROM revoked
+            RETURNING session_id
+        """,
+        session_id,
+        user_id,
+        revocation_hours
+    )
+    return revoked is not None
+
+
+async def revoke_all_sessions(user_id: UUID, revoked_at: float, revocation_hours: int, conn: Connection) -> int:
+    """
+    Revoga cada sessão aberta do usuário pelo id (o sid dos access tokens);
+    devolve quantas eram. Access tokens sem sid (anteriores ao controle de
+    sessões) caem pela marca `revoked_at`, em epoch do relógio da API: o
+    mesmo que carimba o iat, nunca o do banco.
+    """
+    return await conn.fetchval(
+        """
+            WITH revoked AS (
+                UPDATE refresh_tokens
+                SET revoked = TRUE, revoked_at = CURRENT_TIMESTAMP
+                WHERE user_id = $1 AND NOT revoked
+                RETURNING id
+            ),
+            sessions AS (
+                INSERT INTO session_revocations (user_id, session_id, expires_at)
+                SELECT $1, id, CURRENT_TIMESTAMP + make_interval(hours => $3)
+                FROM revoked
+            )
+            INSERT INTO session_revocations (user_id, revoked_at, expires_at)
+            VALUES ($1, to_timestamp($2), CURRENT_TIMESTAMP + make_interval(hours => $3))
+            RETURNING (SELECT COUNT(*) FROM revoked)::int
+        """,
+        user_id,
+        revoked_at,
+        revocation_hours
+    )
@@ -0,0 +1,25 @@
+from src.schemas.sales import SaleCreate, SaleResponse
+from asyncpg import Connection
+from uuid import UUID
+
+
+async def create_sale(sale: SaleCreate, salesperson_id: UUID, conn: Connection) -> SaleResponse:
+    row = await conn.fetchrow(
+        """
+            INSERT INTO sales (
+                salesperson_id,
+                customer_id,
+                status
+            )
+            VALUES
+                ($1, $2, $3)
+            RETURNING
+                id, status, subtotal, total_discount, total_amount,
+                salesperson_id, customer_id, cancelled_by, cancelled_at,
+                cancellation_reason, created_at, finished_at
+        """,
+        salesperson_id,
+        sale.customer_id,
+        sale.status.value
+    )
+    return SaleResponse(**dict(row))
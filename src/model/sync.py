@@ -0,0 +1,232 @@
+from src.schemas.sync import (
+    SyncCategory,
+    SyncTaxGroup,
+    SyncProduct,
+    CatalogTombstone,
+    OfflineSale
+)
+from asyncpg import Connection, Record
+from uuid import UUID
+
+
+async def get_category_changes(since: int, limit: int, conn: Connection) -> list[SyncCategory]:
+    rows = await conn.fetch(
+        """
+            SELECT
+                id, name, parent_category_id, created_at, row_version
+            FROM
+                categories
+            WHERE
+                row_version > $1
+            ORDER BY
+                row_version
+            LIMIT $2
+        """,
+        since,
+        limit
+    )
+    return [SyncCategory(**dict(row)) for row in rows]
+
+
+async def get_tax_group_changes(since: int, limit: int, conn: Connection) -> list[SyncTaxGroup]:
+    rows = await conn.fetch(
+        """
+            SELECT
+                id, description, icms_cst, pis_cofins_cst,
+                icms_rate, pis_rate, cofins_rate, row_version
+            FROM
+                tax_groups
+            WHERE
+                row_version > $1
+            ORDER BY
+                row_version
+            LIMIT $2
+        """,
+        since,
+        limit
+    )
+    return [SyncTaxGroup(**dict(row)) for row in rows]
+
+
+async def get_product_changes(since: int, limit: int, conn: Connection) -> list[SyncProduct]:
+    rows = await conn.fetch(
+        """
+            SELECT
+                id, name, sku, description, category_id, image_url,
+                gtin, ncm, cest, cfop_default, origin, tax_group_id, supplier_id,
+                stock_quantity, min_stock_quantity, max_stock_quantity, average_weight,
+                purchase_price, sale_price, profit_margin, measure_unit,
+                is_active, needs_preparation, created_at, updated_at, row_version
+            FROM
+                products
+            WHERE
+                row_version > $1
+            ORDER BY
+                row_version
+            LIMIT $2
+        """,
+        since,
+        limit
+    )
+    return [SyncProduct(**dict(row)) for row in rows]
+
+
+async def get_tombstones(since: int, limit: int, conn: Connection) -> list[CatalogTombstone]:
+    rows = await conn.fetch(
+        """
+            SELECT
+                entity, entity_id, row_version
+            FROM
+                catalog_tombstones
+            WHERE
+                row_version > $1
+            ORDER BY
+                row_version
+            LIMIT $2
+        """,
+        since,
+        limit
+    )
+    return [CatalogTombstone(**dict(row)) for row in rows]
+
+
+async def apply_offline_sale(sale: OfflineSale, salesperson_id: UUID, conn: Connection) -> Record:
+    # Uma única instrução: nada é gravado se algum produto não existir,
+    # e ON CONFLICT torna o reenvio da mesma venda inofensivo (nem o estoque
+    # baixa de novo). Venda cancelada no caixa não tira nada do estoque.
+    return await conn.fetchrow(
+        """
+            WITH lines AS (
+                SELECT * FROM unnest($7::uuid[], $8::numeric[], $9::numeric[])
+                    AS l(product_id, quantity, unit_sale_price)
+            ),
+            totals AS (
+                SELECT product_id, SUM(quantity) AS quantity
+                FROM lines
+                GROUP BY product_id
+            ),
+            missing AS (
+                SELECT l.product_id
+                FROM lines l
+                LEFT JOIN products p ON p.id = l.product_id
+                WHERE p.id IS NULL
+            ),
+            -- Linhas travadas em ordem de id, como no recebimento: vendas e notas
+            -- com os mesmos produtos não entram em deadlock
+            targets AS (
+                SELECT p.id AS product_id, t.quantity
+                FROM
+                    totals t
+                    INNER JOIN products p ON p.id = t.product_id
+                ORDER BY
+                    p.id
+                FOR UPDATE OF p
+            ),
+            new_sale AS (
+                INSERT INTO sales (
+                    id,
+                    subtotal,
+                    total_discount,
+                    total_amount,
+                    status,
+                    salesperson_id,
+                    customer_id,
+                    created_at,
+                    finished_at
+                )
+                SELECT
+                    $1,
+                    SUM(ROUND(quantity * unit_sale_price, 2)),
+                    $2,
+                    SUM(ROUND(quantity * unit_sale_price, 2)) - $2,
+                    $3::sale_status_enum,
+                    $4,
+                    $5,
+                    $6::timestamptz,
+                    CASE WHEN $3 = 'CONCLUIDA' THEN $6::timestamptz END
+                FROM
+                    lines
+                HAVING
+                    NOT EXISTS (SELECT 1 FROM missing)
+                ON CONFLICT (id) DO NOTHING
+                RETURNING id
+            ),
+            items AS (
+                INSERT INTO sale_items (
+                    sale_id,
+                    product_id,
+                    quantity,
+                    unit_sale_price,
+                    unit_cost_price
+                )
+                SELECT
+                    s.id,
+                    l.product_id,
+                    l.quantity,
+                    l.unit_sale_price,
+                    p.purchase_price
+                FROM
+                    new_sale s
+                    CROSS JOIN lines l
+                    INNER JOIN products p ON p.id = l.product_id
+                RETURNING id
+            ),
+            payments AS (
+                INSERT INTO sale_payments (
+                    sale_id,
+                    method,
+                    total,
+                    created_at
+                )
+                SELECT
+                    s.id,
+                    m.method::payment_method_enum,
+                    m.total,
+                    $6::timestamptz
+                FROM
+                    new_sale s
+                    CROSS JOIN unnest($10::text[], $11::numeric[]) AS m(method, total)
+                RETURNING id
+            ),
+            changed AS (
+                UPDATE products p
+                SET
+                    stock_quantity = p.stock_quantity - t.quantity
+                FROM
+                    targets t
+                    CROSS JOIN new_sale s
+                WHERE
+                    p.id = t.product_id AND
+                    $3 <> 'CANCELADA'
+                RETURNING p.id
+            ),
+            movements AS (
+                INSERT INTO stock_movements (product_id, type, quantity, reference_id, reason, created_by)
+                SELECT l.product_id, 'VENDA', -l.quantity, s.id, 'Venda offline', $4
+                FROM new_sale s
+                CROSS JOIN lines l
+                WHERE $3 <> 'CANCELADA'
+                RETURNING id
+            )
+            SELECT
+                (SELECT id FROM new_sale) AS sale_id,
+                ARRAY(SELECT product_id FROM missing) AS missing_products,
+                ARRAY(
+                    SELECT DISTINCT l.product_id
+                    FROM lines l
+                    INNER JOIN products p ON p.id = l.product_id
+                    WHERE p.sale_price <> l.unit_sale_price
+                ) AS price_mismatches
+        """,
+        sale.id,
+        sale.total_discount,
+        sale.status.value,
+        salesperson_id,
+        sale.customer_id,
+        sale.created_at,
+        [i.product_id for i in sale.items],
+        [i.quantity for i in sale.items],
+        [i.unit_sale_price for i in sale.items],
+        [p.method.value for p in sale.payments],
+        [p.total for p in sale.payments]
+    )
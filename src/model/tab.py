@@ -0,0 +1,181 @@
+from src.schemas.tab_payment import (
+    TabPaymentCreate,
+    TabPaymentAllocate,
+    TabPaymentResponse,
+    CustomerTabResponse,
+    CustomerCreditResponse,
+    TabAgingResponse
+)
+from asyncpg import Connection
+from typing import Optional
+from uuid import UUID
+
+
+async def get_customer_credit(customer_id: UUID, conn: Connection) -> Optional[CustomerCreditResponse]:
+    row = await conn.fetchrow(
+        """
+            SELECT
+                id AS customer_id,
+                credit_limit,
+                invoice_amount
+            FROM
+                users
+            WHERE
+                id = $1
+        """,
+        customer_id
+    )
+    return CustomerCreditResponse(**dict(row)) if row else None
+
+
+async def get_open_tabs(customer_id: UUID, conn: Connection) -> list[CustomerTabResponse]:
+    rows = await conn.fetch(
+        """
+            SELECT
+                sale_id,
+                customer_id,
+                amount_due,
+                amount_paid,
+                status,
+                created_at,
+                settled_at
+            FROM
+                customer_tabs
+            WHERE
+                customer_id = $1 AND
+                status <> 'FIADO-QUITADO'
+            ORDER BY
+                created_at, sale_id
+        """,
+        customer_id
+    )
+    return [CustomerTabResponse(**dict(row)) for row in rows]
+
+
+async def pay_sale_tab(
+    payment: TabPaymentCreate,
+    received_by: UUID,
+    conn: Connection
+) -> Optional[TabPaymentResponse]:
+    row = await conn.fetchrow(
+        """
+            WITH paid AS (
+                UPDATE customer_tabs
+                SET amount_paid = amount_paid + $2
+                WHERE sale_id = $1 AND status <> 'FIADO-QUITADO'
+                RETURNING sale_id
+            )
+            INSERT INTO tab_payments (
+                sale_id,
+                amount_paid,
+                payment_method,
+                received_by,
+                observation
+            )
+            SELECT
+                sale_id, $2, $3, $4, $5
+            FROM
+                paid
+            RETURNING
+                id, sale_id, amount_paid, payment_method,
+                received_by, observation, created_at
+        """,
+        payment.sale_id,
+        payment.amount_paid,
+        payment.payment_method.value,
+        received_by,
+        payment.observation
+    )
+    return TabPaymentResponse(**dict(row)) if row else None
+
+
+async def allocate_customer_payment(
+    customer_id: UUID,
+    payment: TabPaymentAllocate,
+    received_by: UUID,
+    conn: Connection
+) -> list[TabPaymentResponse]:
+    # Abate o valor das vendas mais antigas primeiro (running total via window).
+    # As linhas ficam travadas até o fim da transação, evitando alocação dupla.
+    rows = await conn.fetch(
+        """
+            WITH open_tabs AS (
+                SELECT
+                    sale_id,
+                    created_at,
+                    amount_due - amount_paid AS balance
+                FROM
+                    customer_tabs
+                WHERE
+                    customer_id = $1 AND
+                    status <> 'FIADO-QUITADO'
+                ORDER BY
+                    created_at, sale_id
+                FOR UPDATE
+            ),
+            allocation AS (
+                SELECT
+                    sale_id,
+                    LEAST(
+                        balance,
+                        GREATEST($2 - (SUM(balance) OVER w - balance), 0)
+                    ) AS amount
+                FROM
+                    open_tabs
+                WINDOW w AS (ORDER BY created_at, sale_id ROWS UNBOUNDED PRECEDING)
+            ),
+            paid AS (
+                UPDATE customer_tabs t
+                SET amount_paid = t.amount_paid + a.amount
+                FROM allocation a
+                WHERE t.sale_id = a.sale_id AND a.amount > 0
+                RETURNING t.sale_id, a.amount, t.created_at
+            )
+            INSERT INTO tab_payments (
+                sale_id,
+                amount_paid,
+                payment_method,
+                received_by,
+                observation
+            )
+            SELECT
+                sale_id, amount, $3, $4, $5
+            FROM
+                paid
+            ORDER BY
+                created_at, sale_id
+            RETURNING
+                id, sale_id, amount_paid, payment_method,
+                received_by, observation, created_at
+        """,
+        customer_id,
+        payment.amount_paid,
+        payment.payment_method.value,
+        received_by,
+        payment.observation
+    )
+    return [TabPaymentResponse(**dict(row)) for row in rows]
+
+
+async def get_tab_aging(conn: Connection, limit: int = 100, offset: int = 0) -> list[TabAgingResponse]:
+    rows = await conn.fetch(
+        """
+            SELECT
+                customer_id,
+                customer_name,
+                credit_limit,
+                total_open,
+                days_0_30,
+                days_31_60,
+                days_61_90,
+                days_over_90,
+                oldest_open_at
+            FROM
+                vw_tab_aging
+            LIMIT $1
+            OFFSET $2
+        """,
+        limit,
+        offset
+    )
+    return [TabAgingResponse(**dict(row)) for row in rows]
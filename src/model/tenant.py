@@ -0,0 +1,6 @@
+from asyncpg import Connection
+
+
+async def get_active_tenant_ids(conn: Connection) -> list[int]:
+    rows = await conn.fetch("SELECT id FROM tenants WHERE is_active ORDER BY id")
+    return [row['id'] for row in rows]
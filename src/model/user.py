@@ -1,4 +1,5 @@
-from src.schemas.user import UserLoginData
+from src.schemas.user import UserLoginData, CustomerLookupResult
+from src import util
 from asyncpg import Connection
 from typing import Optional
 import re
@@ -12,9 +13,11 @@ async def get_user_login_data(identifier: str, conn: Connection) -> Optional[Use
         SELECT 
             id, name, nickname, email, password_hash, notes,
             role, state_tax_indicator, credit_limit, 
-            invoice_amount, created_at, updated_at
+            invoice_amount, created_at, updated_at, tenant_id
         FROM users 
         WHERE is_active = TRUE AND 
+            -- Email e CPF são únicos na instalação: a loja vem do cadastro
+            EXISTS (SELECT 1 FROM tenants t WHERE t.id = users.tenant_id AND t.is_active) AND 
     """
     
     row = None
@@ -26,4 +29,124 @@ async def get_user_login_data(identifier: str, conn: Connection) -> Optional[Use
         query = base_query + "cpf = $1"        
         row = await conn.fetchrow(query, numeric) 
 
-    return UserLoginData(**dict(row)) if row else None
\ No newline at end of file
+    return UserLoginData(**dict(row)) if row else None
+
+
+LOOKUP_COLUMNS = "u.id, u.name, u.nickname, u.phone, u.cpf, u.credit_limit, u.invoice_amount"
+
+
+def _lookup_result(row) -> CustomerLookupResult:
+    # O CPF completo nunca sai daqui: o caixa só precisa conferir o miolo
+    return CustomerLookupResult(**{**dict(row), "cpf": util.mask_cpf(row["cpf"])})
+
+
+async def lookup_customers_by_text(
+    term: str,
+    prefix_pattern: str,
+    limit: int,
+    conn: Connection
+) -> list[CustomerLookupResult]:
+    # Prefixo primeiro, pelos índices btree e já na ordem: com poucas letras
+    # digitadas o trigram casaria com boa parte da base. O trigram só roda
+    # quando o prefixo não enche o limite (nome com erro de digitação, sobrenome).
+    rows = await conn.fetch(
+        f"""
+            WITH prefix AS (
+                (
+                    SELECT id, 2.0::float AS rank
+                    FROM users
+                    WHERE role = 'CLIENTE' AND is_active = TRUE AND f_search_normalize(name) LIKE $2
+                    ORDER BY f_search_normalize(name) USING ~<~
+                    LIMIT $3
+                )
+                UNION ALL
+                (
+                    SELECT id, 1.5::float AS rank
+                    FROM users
+                    WHERE role = 'CLIENTE' AND is_active = TRUE AND f_search_normalize(nickname) LIKE $2
+                    ORDER BY f_search_normalize(nickname) USING ~<~
+                    LIMIT $3
+                )
+            ),
+            fuzzy AS (
+                SELECT
+                    id,
+                    GREATEST(
+                        word_similarity($1, f_search_normalize(name)),
+                        COALESCE(word_similarity($1, f_search_normalize(nickname)), 0)
+                    )::float AS rank
+                FROM
+                    users
+                WHERE
+                    role = 'CLIENTE' AND is_active = TRUE AND
+                    ($1 <% f_search_normalize(name) OR $1 <% f_search_normalize(nickname)) AND
+                    (SELECT COUNT(DISTINCT id) FROM prefix) < $3
+                ORDER BY
+                    rank DESC
+                LIMIT $3
+            ),
+            matches AS (
+                SELECT id, MAX(rank) AS rank
+                FROM (SELECT * FROM prefix UNION ALL SELECT * FROM fuzzy) m
+                GROUP BY id
+            )
+            SELECT
+                {LOOKUP_COLUMNS}, m.rank
+            FROM
+                matches m
+                INNER JOIN users u ON u.id = m.id
+            ORDER BY
+                m.rank DESC, u.name
+            LIMIT $3
+        """,
+        term,
+        prefix_pattern,
+        limit
+    )
+    return [_lookup_result(row) for row in rows]
+
+
+async def lookup_customers_by_digits(digits: str, limit: int, conn: Connection) -> list[CustomerLookupResult]:
+    """Prefixo do CPF ou do telefone, com ou sem DDD."""
+    rows = await conn.fetch(
+        f"""
+            WITH matches AS (
+                (
+                    SELECT id, 3.0::float AS rank
+                    FROM users
+                    WHERE role = 'CLIENTE' AND is_active = TRUE AND f_only_digits(cpf) LIKE $1
+                    ORDER BY f_only_digits(cpf) USING ~<~
+                    LIMIT $2
+                )
+                UNION ALL
+                (
+                    SELECT id, 2.0::float AS rank
+                    FROM users
+                    WHERE role = 'CLIENTE' AND is_active = TRUE AND f_only_digits(phone) LIKE $1
+                    ORDER BY f_only_digits(phone) USING ~<~
+                    LIMIT $2
+                )
+                UNION ALL
+                (
+                    SELECT id, 1.0::float AS rank
+                    FROM users
+                    WHERE role = 'CLIENTE' AND is_active = TRUE AND substr(f_only_digits(phone), 3) LIKE $1
+                    ORDER BY substr(f_only_digits(phone), 3) USING ~<~
+                    LIMIT $2
+                )
+            )
+            SELECT
+                {LOOKUP_COLUMNS}, MAX(m.rank) AS rank
+            FROM
+                matches m
+                INNER JOIN users u ON u.id = m.id
+            GROUP BY
+                u.id
+            ORDER BY
+                rank DESC, u.name
+            LIMIT $2
+        """,
+        digits + '%',
+        limit
+    )
+    return [_lookup_result(row) for row in rows]
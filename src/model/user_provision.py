@@ -0,0 +1,94 @@
+from asyncpg import Connection, Record
+from typing import Optional
+from uuid import UUID
+
+
+# Colunas de users preenchidas pelo provisionamento, na ordem do COPY (depois de `line`)
+PROVISION_COLUMNS = (
+    "id", "name", "nickname", "email", "phone", "cpf", "notes",
+    "password_hash", "role", "credit_limit", "state_tax_indicator"
+)
+
+
+async def stage_users(records: list[tuple], conn: Connection) -> None:
+    await conn.execute(
+        """
+            CREATE TEMP TABLE user_provision_stage (line INT PRIMARY KEY, LIKE users INCLUDING DEFAULTS)
+            ON COMMIT DROP
+        """
+    )
+    await conn.copy_records_to_table(
+        "user_provision_stage",
+        records=records,
+        columns=("line", *PROVISION_COLUMNS)
+    )
+
+
+async def insert_staged(line: Optional[int], conn: Connection) -> list[Record]:
+    """
+    Insere a staging inteira (ou só `line`) de uma vez. Linhas que batem com
+    um email ou CPF já cadastrado voltam com o nome da constraint; as que
+    perderem a corrida para um insert concorrente voltam com inserted = FALSE.
+    """
+    columns = ", ".join(PROVISION_COLUMNS)
+    staged_columns = ", ".join(f"s.{c}" for c in PROVISION_COLUMNS)
+    return await conn.fetch(
+        f"""
+            WITH staged AS (
+                SELECT * FROM user_provision_stage WHERE $1::int IS NULL OR line = $1::int
+            ),
+            checked AS (
+                SELECT
+                    s.line,
+                    CASE
+                        WHEN s.email IS NOT NULL AND EXISTS (SELECT 1 FROM users u WHERE u.email = s.email)
+                            THEN 'users_email_unique_cstr'
+                        WHEN s.cpf IS NOT NULL AND EXISTS (SELECT 1 FROM users u WHERE u.cpf = s.cpf)
+                            THEN 'users_cpf_unique_cstr'
+                    END AS constraint_name
+                FROM
+                    staged s
+            ),
+            inserted AS (
+                INSERT INTO users ({columns})
+                SELECT {staged_columns}
+                FROM
+                    staged s
+                    INNER JOIN checked c ON c.line = s.line
+                WHERE
+                    c.constraint_name IS NULL
+                ORDER BY
+                    s.line
+                ON CONFLICT DO NOTHING
+                RETURNING id
+            )
+            SELECT
+                s.line,
+                s.id AS user_id,
+                c.constraint_name,
+                i.id IS NOT NULL AS inserted
+            FROM
+                staged s
+                INNER JOIN checked c ON c.line = s.line
+                LEFT JOIN inserted i ON i.id = s.id
+            ORDER BY
+                s.line
+        """,
+        line
+    )
+
+
+async def get_staged_lines(conn: Connection) -> list[int]:
+    return [r["line"] for r in await conn.fetch("SELECT line FROM user_provision_stage ORDER BY line")]
+
+
+async def set_role(email: str, role: str, conn: Connection) -> Optional[UUID]:
+    return await conn.fetchval(
+        """
+            UPDATE users SET role = $2
+            WHERE LOWER(email) = LOWER($1)
+            RETURNING id
+        """,
+        email,
+        role
+    )
@@ -0,0 +1,195 @@
+from collections import deque
+from functools import lru_cache
+from contextvars import ContextVar
+from typing import Any, Optional
+from datetime import datetime, timezone
+from src.constants import Constants
+from src.shutdown import coordinator
+from src.log import get_logger
+import asyncpg
+import asyncio
+import hashlib
+import random
+import json
+import time
+import re
+
+
+logger = get_logger("profiler")
+
+# Verdadeiro na task do EXPLAIN e no reset do pool, que não devem ser perfilados
+_paused: ContextVar[bool] = ContextVar("profiler_paused", default=False)
+
+# Configurações da transação RLS corrente (security._set_rls_context): o EXPLAIN
+# roda com o mesmo usuário, perfil e loja da consulta que o disparou
+rls_context: ContextVar[Optional[dict[str, str]]] = ContextVar("profiler_rls_context", default=None)
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|(?<![$\w])\d+(?:\.\d+)?\b")
+_WRITES = re.compile(r"\b(INSERT|UPDATE|DELETE|MERGE|TRUNCATE)\b", re.IGNORECASE)
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(query: str) -> tuple[str, str]:
+    """(id, texto normalizado): espaços colapsados e literais trocados por '?'."""
+    normalized = _LITERALS.sub("?", " ".join(query.split()))
+    return hashlib.sha1(normalized.encode()).hexdigest()[:12], normalized
+
+
+def _rows_from_status(status: str) -> int:
+    # "INSERT 0 3", "UPDATE 5", "DELETE 0", "SELECT 1"
+    last = status.rsplit(" ", 1)[-1]
+    return int(last) if last.isdigit() else 0
+
+
+class QueryStats:
+
+    __slots__ = ("fingerprint", "query", "calls", "total", "max", "rows", "samples", "plan", "plan_captured_at", "last_explain")
+
+    def __init__(self, fingerprint: str, query: str):
+        self.fingerprint = fingerprint
+        self.query = query
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        # Janela das últimas execuções para o p95
+        self.samples: deque[float] = deque(maxlen=512)
+        self.plan: Optional[Any] = None
+        self.plan_captured_at: Optional[datetime] = None
+        self.last_explain = 0.0
+
+    def add(self, elapsed: float, rows: int) -> None:
+        self.calls += 1
+        self.total += elapsed
+        self.rows += rows
+        if elapsed > self.max: self.max = elapsed
+        self.samples.append(elapsed)
+
+    @property
+    def p95(self) -> float:
+        if not self.samples: return 0.0
+        ordered = sorted(self.samples)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+
+class QueryProfiler:
+    """
+    Estatísticas por fingerprint de consulta, por worker. Consultas acima de
+    PROFILER_EXPLAIN_MS têm o plano capturado por amostragem, em segundo
+    plano e em outra conexão, no máximo um EXPLAIN por vez.
+    """
+
+    def __init__(self, max_fingerprints: int = 2000, explain_cooldown: float = 600.0):
+        self.max_fingerprints = max_fingerprints
+        self.explain_cooldown = explain_cooldown
+        self.stats: dict[str, QueryStats] = {}
+        self._explaining = False
+
+    def record(self, query: str, args: tuple, elapsed: float, rows: int) -> None:
+        if _paused.get(): return
+        key, normalized = fingerprint(query)
+        stats = self.stats.get(key)
+        if stats is None:
+            if len(self.stats) >= self.max_fingerprints: return
+            stats = self.stats[key] = QueryStats(key, normalized)
+        stats.add(elapsed, rows)
+
+        if elapsed * 1000 < Constants.PROFILER_EXPLAIN_MS or self._explaining: return
+        now = time.monotonic()
+        if now - stats.last_explain < self.explain_cooldown: return
+        if random.random() >= Constants.PROFILER_EXPLAIN_SAMPLE_RATE: return
+
+        stats.last_explain = now
+        self._explaining = True
+        task = self._explain(stats, query, args, rls_context.get())
+        coordinator.track(asyncio.get_running_loop().create_task(task))
+
+    @staticmethod
+    async def _plan(conn: asyncpg.Connection, options: str, query: str, args: tuple, settings: Optional[dict[str, str]]) -> Any:
+        # Somente leitura e sempre desfeita: o ANALYZE executa a consulta de verdade
+        tx = conn.transaction(readonly=True)
+        await tx.start()
+        try:
+            await conn.execute("SET LOCAL statement_timeout = '5s'")
+            if settings:
+                await conn.execute(
+                    "SELECT set_config(name, value, true) FROM unnest($1::text[], $2::text[]) AS s(name, value)",
+                    list(settings), list(settings.values())
+                )
+            return await conn.fetchval(f"EXPLAIN ({options}) {query}", *args)
+        finally:
+            await tx.rollback()
+
+    async def _explain(self, stats: QueryStats, query: str, args: tuple, settings: Optional[dict[str, str]]) -> None:
+        from src.db.db import db
+        _paused.set(True)
+        try:
+            if db.pool is None: return
+            async with db.pool.acquire(timeout=1) as conn:
+                # Escrita explícita nem tenta o ANALYZE. Nas demais, uma função que grave
+                # (ou um nextval) é barrada pela transação somente leitura: fica o plano estimado
+                plan = None
+                if not _WRITES.search(query):
+                    try:
+                        plan = await self._plan(conn, "ANALYZE, BUFFERS, FORMAT JSON", query, args, settings)
+                    except asyncpg.ReadOnlySQLTransactionError:
+                        pass
+                if plan is None:
+                    plan = await self._plan(conn, "FORMAT JSON", query, args, settings)
+            stats.plan = json.loads(plan) if isinstance(plan, str) else plan
+            stats.plan_captured_at = datetime.now(timezone.utc)
+        except Exception as e:
+            logger.warning("EXPLAIN falhou para %s | %s", stats.fingerprint, e)
+        finally:
+            self._explaining = False
+
+    def report(self, order: str = "total", limit: int = 20) -> list[QueryStats]:
+        keys = {
+            "total": lambda s: s.total,
+            "p95": lambda s: s.p95,
+            "calls": lambda s: s.calls,
+            "mean": lambda s: s.total / s.calls,
+            "rows": lambda s: s.rows,
+        }
+        return sorted(self.stats.values(), key=keys[order], reverse=True)[:limit]
+
+    def reset(self) -> None:
+        self.stats.clear()
+
+
+profiler = QueryProfiler()
+
+
+class ProfiledConnection(asyncpg.Connection):
+    """connection_class do pool: mede as chamadas públicas usadas pelos models."""
+
+    async def fetch(self, query, *args, **kwargs):
+        start = time.perf_counter()
+        result = await super().fetch(query, *args, **kwargs)
+        profiler.record(query, args, time.perf_counter() - start, len(result))
+        return result
+
+    async def fetchrow(self, query, *args, **kwargs):
+        start = time.perf_counter()
+        result = await super().fetchrow(query, *args, **kwargs)
+        profiler.record(query, args, time.perf_counter() - start, 0 if result is None else 1)
+        return result
+
+    async def fetchval(self, query, *args, **kwargs):
+        start = time.perf_counter()
+        result = await super().fetchval(query, *args, **kwargs)
+        profiler.record(query, args, time.perf_counter() - start, 0 if result is None else 1)
+        return result
+
+    async def reset(self, *, timeout=None):
+        token = _paused.set(True)
+        try:
+            await super().reset(timeout=timeout)
+        finally:
+            _paused.reset(token)
+
+    async def execute(self, query, *args, **kwargs):
+        start = time.perf_counter()
+        result = await super().execute(query, *args, **kwargs)
+        profiler.record(query, args, time.perf_counter() - start, _rows_from_status(result))
+        return result
@@ -0,0 +1,64 @@
+from typing import Optional
+from src.db.db import db
+from src.shutdown import coordinator
+from src.log import get_logger
+import asyncio
+
+
+logger = get_logger("pruner")
+
+
+class Pruner:
+    """
+    Tarefa de fundo que apaga periodicamente dados de vida curta
+    (eventos ao vivo, chaves expiradas, etc). Cada subsistema registra
+    o seu DELETE; todos rodam em lotes para não travar a tabela.
+    """
+
+    def __init__(self, interval: float = 60.0, batch_size: int = 5000):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.statements: dict[str, str] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, name: str, table: str, where: str) -> None:
+        self.statements[name] = f"""
+            DELETE FROM {table}
+            WHERE ctid = ANY(ARRAY(
+                SELECT ctid FROM {table} WHERE {where} LIMIT {self.batch_size}
+            ))
+        """
+
+    async def run_once(self) -> dict[str, int]:
+        removed: dict[str, int] = {}
+        if db.pool is None: return removed
+        for name, statement in self.statements.items():
+            try:
+                async with db.pool.acquire() as conn:
+                    result = await conn.execute(statement)
+                removed[name] = int(result.split()[-1])
+            except Exception:
+                logger.exception("Pruner [%s] falhou", name)
+        return removed
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            # Um DELETE em andamento termina antes do worker sair
+            await coordinator.track(asyncio.create_task(self.run_once()))
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+pruner = Pruner()
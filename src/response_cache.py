@@ -0,0 +1,265 @@
+from fastapi import Request, Response
+from urllib.parse import urlencode
+from typing import Any, Awaitable, Callable, Iterable, Optional
+from asyncpg import Connection
+from src.schemas.user import UserPayload
+from src.constants import Constants
+from src.cache import TTLCache
+from src.events import broker
+from src.log import get_logger
+from src import security
+from src import metrics
+import asyncio
+import hashlib
+
+
+logger = get_logger("response_cache")
+
+# Triggers do catálogo (notify_catalog_change) publicam aqui o nome da tabela alterada
+CATALOG_CHANGES_CHANNEL = "catalog_changes"
+
+REDIS_PREFIX = "rc:"
+
+
+class CachedResponse:
+
+    __slots__ = ("body", "media_type", "tags", "etag")
+
+    def __init__(self, body: bytes, media_type: str, tags: tuple[str, ...], etag: Optional[str] = None):
+        self.body = body
+        self.media_type = media_type
+        self.tags = tags
+        self.etag = etag or '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+    def encode(self) -> bytes:
+        header = "\n".join((self.media_type, ",".join(self.tags), self.etag))
+        return header.encode() + b"\n" + self.body
+
+    @classmethod
+    def decode(cls, raw: bytes) -> "CachedResponse":
+        media_type, tags, etag, body = raw.split(b"\n", 3)
+        return cls(body, media_type.decode(), tuple(tags.decode().split(",")), etag.decode())
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match: return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag: return True
+    return False
+
+
+class ResponseCache:
+    """
+    Respostas prontas (bytes + ETag) das leituras do catálogo. A chave junta
+    rota, query string, loja e perfil, porque o RLS faz o resultado depender
+    dos dois. Cada entrada leva tags (nomes das tabelas) e é descartada quando
+    um write path ou o NOTIFY dos triggers invalida uma delas.
+
+    Com várias requisições errando a mesma chave ao mesmo tempo, só a
+    primeira vai ao banco; as demais esperam o resultado dela.
+    """
+
+    def __init__(self, ttl: float = Constants.RESPONSE_CACHE_TTL, maxsize: int = Constants.RESPONSE_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.memory = TTLCache("responses", maxsize=maxsize, ttl=ttl)
+        self.tags: dict[str, set[str]] = {}
+        # Incrementado a cada invalidação: um preenchimento que começou antes dela não é guardado
+        self.epoch = 0
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._redis: Any = None
+        self._redis_ok = True
+
+    @staticmethod
+    def key(request: Request, user: UserPayload) -> str:
+        query = urlencode(sorted(request.query_params.multi_items()))
+        return f"{user.tenant_id}:{user.role}:{request.url.path}?{query}"
+
+    @staticmethod
+    def tenant_keys(tenant_id: int, path: str) -> list[str]:
+        # As mesmas chaves de key() para uma rota sem query string, uma por perfil
+        return [f"{tenant_id}:{role}:{path}?" for role in sorted(security.VALID_ROLES)]
+
+    def _get_redis(self) -> Any:
+        if not Constants.REDIS_URL: return None
+        if self._redis is None:
+            import redis.asyncio as redis
+            self._redis = redis.from_url(
+                Constants.REDIS_URL,
+                socket_timeout=Constants.REDIS_TIMEOUT,
+                socket_connect_timeout=Constants.REDIS_TIMEOUT
+            )
+        return self._redis
+
+    def _redis_failed(self, error: Exception) -> None:
+        # Redis fora do ar vira só um nível a menos de cache
+        if self._redis_ok: logger.warning("Redis indisponível para o cache de respostas | %s", error)
+        self._redis_ok = False
+
+    def _remember(self, key: str, entry: CachedResponse) -> None:
+        self.memory.set(key, entry)
+        for tag in entry.tags:
+            keys = self.tags.setdefault(tag, set())
+            keys.add(key)
+            # Chaves que o LRU já descartou só saem daqui na invalidação; limpa de vez em quando
+            if len(keys) > 2 * self.memory.maxsize:
+                self.tags[tag] = {k for k in keys if k in self.memory}
+
+    async def _load(self, key: str) -> Optional[CachedResponse]:
+        entry = self.memory.get(key)
+        if entry is not None:
+            metrics.response_cache_results.inc("memory")
+            return entry
+
+        redis = self._get_redis()
+        if redis is None: return None
+        try:
+            raw = await redis.get(REDIS_PREFIX + key)
+        except Exception as e:
+            self._redis_failed(e)
+            return None
+        self._redis_ok = True
+        if raw is None: return None
+
+        entry = CachedResponse.decode(raw)
+        self._remember(key, entry)
+        metrics.response_cache_results.inc("redis")
+        return entry
+
+    async def _store(self, key: str, entry: CachedResponse) -> None:
+        self._remember(key, entry)
+        redis = self._get_redis()
+        if redis is None: return
+        try:
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.set(REDIS_PREFIX + key, entry.encode(), ex=int(self.ttl))
+                for tag in entry.tags:
+                    pipe.sadd(f"{REDIS_PREFIX}tag:{tag}", REDIS_PREFIX + key)
+                    pipe.expire(f"{REDIS_PREFIX}tag:{tag}", int(self.ttl) * 2)
+                await pipe.execute()
+        except Exception as e:
+            self._redis_failed(e)
+
+    async def _fill(
+        self,
+        key: str,
+        tags: tuple[str, ...],
+        producer: Callable[[], Awaitable[bytes]],
+        media_type: str
+    ) -> CachedResponse:
+        waiting = self._inflight.get(key)
+        if waiting is not None:
+            entry = await asyncio.shield(waiting)
+            if entry is not None:
+                metrics.response_cache_results.inc("coalesced")
+                return entry
+            # A requisição que estava buscando falhou: esta tenta por conta própria, sem guardar
+            return CachedResponse(await producer(), media_type, tags)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        epoch = self.epoch
+        try:
+            body = await producer()
+        except BaseException:
+            future.set_result(None)
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        entry = CachedResponse(body, media_type, tags)
+        future.set_result(entry)
+        metrics.response_cache_results.inc("miss")
+        if self.epoch == epoch: await self._store(key, entry)
+        return entry
+
+    async def respond(
+        self,
+        request: Request,
+        user: UserPayload,
+        tags: Iterable[str],
+        producer: Callable[[Connection], Awaitable[bytes]],
+        media_type: str = "application/json"
+    ) -> Response:
+        """
+        Serve `request` do cache ou, na falta, de `producer`, que recebe uma
+        conexão com o RLS do usuário (aberta só quando precisa) e devolve o
+        corpo já serializado. O preenchimento lê do primário, como o prefill.
+        """
+        async def produce() -> bytes:
+            async with security.primary_read_connection(user) as conn:
+                return await producer(conn)
+
+        key = self.key(request, user)
+        entry = await self._load(key)
+        if entry is None:
+            entry = await self._fill(key, tuple(tags), produce, media_type)
+
+        # private: a resposta depende do perfil; o navegador sempre revalida pelo ETag
+        headers = {"ETag": entry.etag, "Cache-Control": "private, no-cache"}
+        if _etag_matches(request.headers.get("if-none-match"), entry.etag):
+            metrics.response_cache_results.inc("not_modified")
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, media_type=entry.media_type, headers=headers)
+
+    async def prefill(
+        self,
+        tenant_id: int,
+        path: str,
+        tags: Iterable[str],
+        producer: Callable[[Connection], Awaitable[bytes]],
+        media_type: str = "application/json"
+    ) -> None:
+        """
+        Aquecimento: guarda a resposta de `path` de uma loja para todos os
+        perfis, com uma única consulta sob o RLS da loja.
+        """
+        keys = [key for key in self.tenant_keys(tenant_id, path) if await self._load(key) is None]
+        if not keys: return
+
+        epoch = self.epoch
+        async with security.tenant_read_connection(tenant_id) as conn:
+            body = await producer(conn)
+        if self.epoch != epoch: return
+
+        entry = CachedResponse(body, media_type, tuple(tags))
+        for key in keys:
+            await self._store(key, entry)
+
+    def invalidate_local(self, tags: Iterable[str]) -> None:
+        self.epoch += 1
+        for tag in tags:
+            for key in self.tags.pop(tag, ()):
+                self.memory.pop(key)
+
+    async def _invalidate_redis(self, tags: Iterable[str]) -> None:
+        redis = self._get_redis()
+        if redis is None: return
+        try:
+            for tag in tags:
+                tag_key = f"{REDIS_PREFIX}tag:{tag}"
+                keys = await redis.smembers(tag_key)
+                await redis.delete(tag_key, *keys)
+        except Exception as e:
+            self._redis_failed(e)
+
+    async def invalidate(self, *tags: str) -> None:
+        """Chamado pelos write paths. O NOTIFY do trigger chega depois do commit e repete a limpeza."""
+        self.invalidate_local(tags)
+        await self._invalidate_redis(tags)
+
+    def on_catalog_change(self, payload: str) -> None:
+        tags = (payload,)
+        self.invalidate_local(tags)
+        if Constants.REDIS_URL:
+            from src.shutdown import coordinator
+            coordinator.track(asyncio.get_running_loop().create_task(self._invalidate_redis(tags)))
+
+    async def close(self) -> None:
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+
+response_cache = ResponseCache()
+broker.listen(CATALOG_CHANGES_CHANNEL, response_cache.on_catalog_change)
@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Depends
+from src.schemas.address import CepLookupResponse
+from src.schemas.user import UserPayload
+from src.controller import address
+from src import security
+
+
+router = APIRouter()
+
+
+@router.get("/cep/{zip_code}", response_model=CepLookupResponse)
+async def lookup_cep(
+    zip_code: str,
+    user: UserPayload = Depends(security.require_user)
+):
+    # Preenche cidade, código IBGE e UF no formulário de endereço, sem serviço externo
+    return await address.lookup_cep(zip_code)
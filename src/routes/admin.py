@@ -0,0 +1,61 @@
+from fastapi import APIRouter, Depends, File, Query, UploadFile, status
+from src.schemas.profiler import QueryStatsResponse
+from src.schemas.user_provision import UserProvisionResponse
+from src.schemas.session import SessionResponse, SessionRevokeResponse
+from src.schemas.user import UserPayload
+from src.controller import admin
+from src.controller import user_provision
+from src.controller import session
+from src import security
+from asyncpg import Connection
+from typing import Literal
+from uuid import UUID
+
+
+router = APIRouter()
+
+
+@router.get("/queries", response_model=list[QueryStatsResponse])
+async def get_query_report(
+    order: Literal["total", "p95", "mean", "calls", "rows"] = Query(default="total"),
+    limit: int = Query(default=20, ge=1, le=200),
+    include_plans: bool = Query(default=True),
+    user: UserPayload = Depends(security.require_roles('ADMIN'))
+):
+    # Estatísticas do worker que atendeu a requisição
+    return admin.get_query_report(order, limit, include_plans)
+
+
+@router.delete("/queries", status_code=status.HTTP_204_NO_CONTENT)
+async def reset_query_report(
+    user: UserPayload = Depends(security.require_roles('ADMIN'))
+):
+    admin.reset_query_report()
+
+
+@router.post("/users/provision", response_model=UserProvisionResponse)
+async def provision_users(
+    file: UploadFile = File(..., description="CSV ou JSON com os campos de UserCreate, um usuário por linha"),
+    user: UserPayload = Depends(security.require_roles('ADMIN'))
+):
+    # Resultado por linha: criados, conflitos (email/CPF já cadastrados) e inválidos
+    return await user_provision.provision_upload(file, user)
+
+
+@router.get("/users/{user_id}/sessions", response_model=list[SessionResponse])
+async def list_user_sessions(
+    user_id: UUID,
+    user: UserPayload = Depends(security.require_roles('ADMIN')),
+    conn: Connection = Depends(security.get_rls_read_connection)
+):
+    return await session.list_sessions(user_id, user, conn)
+
+
+@router.delete("/users/{user_id}/sessions", response_model=SessionRevokeResponse)
+async def revoke_user_sessions(
+    user_id: UUID,
+    user: UserPayload = Depends(security.require_roles('ADMIN')),
+    conn: Connection = Depends(security.get_rls_connection)
+):
+    # Desligamento de funcionário: todos os dispositivos caem em segundos, em todos os workers
+    return await session.revoke_all_sessions(user_id, conn)
@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, status, Response
+from fastapi import APIRouter, Depends, Request, status, Response
 from src.schemas.auth import LoginRequest
-from src.schemas.user import UserResponse
+from src.schemas.user import UserResponse, UserPayload
+from src.schemas.session import SessionResponse, SessionRevokeResponse
 from src.db.db import get_db_pool
 from src.controller import auth
-from asyncpg import Pool
+from src.controller import session
+from asyncpg import Connection, Pool
+from src import security
+from uuid import UUID
 
 
 router = APIRouter()
@@ -12,8 +16,48 @@ router = APIRouter()
 @router.post("/login", status_code=status.HTTP_200_OK, response_model=UserResponse)
 async def login(
     login_req: LoginRequest,
+    request: Request,
     response: Response,
     pool: Pool = Depends(get_db_pool)
 ):
     async with pool.acquire() as conn:
-        return await auth.login(login_req, response, conn)
\ No newline at end of file
+        return await auth.login(login_req, request, response, conn)
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    response: Response,
+    user: UserPayload = Depends(security.require_user),
+    conn: Connection = Depends(security.get_rls_connection)
+):
+    # Encerra a sessão atual no servidor, não só os cookies do navegador
+    await session.logout(user, response, conn)
+
+
+@router.get("/sessions", response_model=list[SessionResponse])
+async def list_sessions(
+    user: UserPayload = Depends(security.require_user),
+    conn: Connection = Depends(security.get_rls_read_connection)
+):
+    return await session.list_sessions(user.user_id, user, conn)
+
+
+@router.delete("/sessions/{session_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def revoke_session(
+    session_id: UUID,
+    user: UserPayload = Depends(security.require_user),
+    conn: Connection = Depends(security.get_rls_connection)
+):
+    await session.revoke_session(session_id, user, conn)
+
+
+@router.delete("/sessions", response_model=SessionRevokeResponse)
+async def revoke_all_sessions(
+    response: Response,
+    user: UserPayload = Depends(security.require_user),
+    conn: Connection = Depends(security.get_rls_connection)
+):
+    # Sair de todos os dispositivos, inclusive este
+    result = await session.revoke_all_sessions(user.user_id, conn)
+    security.unset_session_token_cookie(response)
+    return result
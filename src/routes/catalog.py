@@ -0,0 +1,52 @@
+from fastapi import APIRouter, Depends, Request
+from src.schemas.category import CategoryTreeResponse
+from src.schemas.supplier import SupplierResponse
+from src.schemas.tax_group import TaxGroupResponse
+from src.schemas.user import UserPayload
+from src.response_cache import response_cache
+from src.controller import catalog
+from src.model import tenant as tenant_model
+from src.startup import startup
+from src.db.db import db
+from src import security
+
+
+router = APIRouter()
+
+PREFIX = "/api/v1/catalog"
+
+
+@router.get("/categories", response_model=list[CategoryTreeResponse])
+async def get_category_tree(
+    request: Request,
+    user: UserPayload = Depends(security.require_user)
+):
+    return await response_cache.respond(request, user, ("categories",), catalog.get_category_tree)
+
+
+@router.get("/suppliers", response_model=list[SupplierResponse])
+async def get_suppliers(
+    request: Request,
+    user: UserPayload = Depends(security.require_roles('ADMIN', 'GERENTE', 'ESTOQUISTA', 'CONTADOR'))
+):
+    return await response_cache.respond(request, user, ("suppliers",), catalog.get_suppliers)
+
+
+@router.get("/tax-groups", response_model=list[TaxGroupResponse])
+async def get_tax_groups(
+    request: Request,
+    user: UserPayload = Depends(security.require_roles('ADMIN', 'GERENTE', 'CONTADOR', 'ESTOQUISTA', 'CAIXA'))
+):
+    return await response_cache.respond(request, user, ("tax_groups",), catalog.get_tax_groups)
+
+
+async def warm_cache() -> None:
+    # Categorias e grupos fiscais são lidos por todo PDV ao abrir: já prontos para cada loja
+    async with db.pool.acquire() as conn:
+        tenants = await tenant_model.get_active_tenant_ids(conn)
+    for tenant_id in tenants:
+        await response_cache.prefill(tenant_id, PREFIX + "/categories", ("categories",), catalog.get_category_tree)
+        await response_cache.prefill(tenant_id, PREFIX + "/tax-groups", ("tax_groups",), catalog.get_tax_groups)
+
+
+startup.register("catalog_cache", warm_cache)
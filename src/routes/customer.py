@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Depends, Request, Query
+from src.schemas.user import CustomerLookupResult, UserPayload
+from src.controller import customer
+from src import security
+
+
+router = APIRouter()
+
+
+@router.get("/lookup", response_model=list[CustomerLookupResult])
+async def lookup_customers(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=64, description="Parte do nome, apelido, telefone ou CPF"),
+    limit: int = Query(default=10, ge=1, le=50),
+    user: UserPayload = Depends(security.require_roles('ADMIN', 'GERENTE', 'CAIXA'))
+):
+    return await customer.lookup_customers(q, limit, request, user)
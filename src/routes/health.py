@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Response
+from src.startup import startup
+from src.health import prober
+
+
+router = APIRouter()
+
+
+@router.get("/live")
+async def live():
+    # Só diz que o processo e o event loop respondem; dependências ficam no /ready
+    return {"status": "alive"}
+
+
+@router.get("/ready")
+async def ready():
+    # Snapshot já serializado pelo prober: nenhuma consulta por chamada
+    return Response(content=prober.body, status_code=prober.status_code, media_type="application/json")
+
+
+@router.get("/startup")
+async def startup_report():
+    return startup.report()
@@ -0,0 +1,64 @@
+from fastapi import APIRouter, Depends, Header, Query, Request, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+from src.schemas.live import LiveSnapshot
+from src.schemas.user import UserPayload
+from src.controller import live
+from src.events import broker, allowed_channels
+from src import security
+from asyncpg import Connection
+from typing import Optional
+
+
+router = APIRouter()
+
+
+@router.get("/snapshot", response_model=LiveSnapshot)
+async def get_snapshot(
+    channels: Optional[str] = Query(default=None, description="Ex: sales,kitchen"),
+    user: UserPayload = Depends(security.require_user),
+    conn: Connection = Depends(security.get_rls_read_connection)
+):
+    return await live.get_snapshot(live.resolve_channels(user.role, channels), conn)
+
+
+@router.get("/stream")
+async def stream(
+    request: Request,
+    channels: Optional[str] = Query(default=None, description="Ex: sales,kitchen"),
+    last_event_id: Optional[int] = Header(default=None, alias="Last-Event-ID"),
+    user: UserPayload = Depends(security.require_user)
+):
+    subscription = await broker.subscribe(
+        live.resolve_channels(user.role, channels),
+        user.tenant_id,
+        last_event_id
+    )
+    return StreamingResponse(
+        live.sse_stream(request, subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.websocket("/ws")
+async def websocket_stream(
+    websocket: WebSocket,
+    channels: Optional[str] = Query(default=None),
+    last_event_id: Optional[int] = Query(default=None),
+    user: Optional[UserPayload] = Depends(security.extract_payload_optional)
+):
+    if user is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    allowed = allowed_channels(user.role, channels.split(",") if channels else None)
+    if not allowed:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    subscription = await broker.subscribe(allowed, user.tenant_id, last_event_id)
+    try:
+        await live.websocket_stream(websocket, subscription)
+    except WebSocketDisconnect:
+        pass
@@ -0,0 +1,80 @@
+from fastapi import APIRouter, Depends, File, Request, UploadFile, status, Query
+from src.schemas.pricing import RepricingRequest, RepricingResponse
+from src.schemas.product import ProductSearchResult, ProductResponse
+from src.schemas.product_import import ProductImportResponse
+from src.schemas.user import UserPayload
+from src.response_cache import response_cache
+from src.controller import product
+from src.controller import product_import
+from src import security
+from asyncpg import Connection
+from typing import Optional
+from uuid import UUID
+
+
+router = APIRouter()
+
+
+@router.get("/search", response_model=list[ProductSearchResult])
+async def search_products(
+    q: str = Query(..., min_length=1, max_length=128, description="Nome ou parte do nome do produto"),
+    limit: int = Query(default=product.DEFAULT_SEARCH_LIMIT, ge=1, le=100),
+    user: UserPayload = Depends(security.require_user),
+    conn: Connection = Depends(security.get_rls_read_connection)
+):
+    return await product.search_products(q, limit, user.tenant_id, conn)
+
+
+@router.get("", response_model=list[ProductResponse])
+async def list_products(
+    request: Request,
+    category_id: Optional[int] = Query(default=None),
+    supplier_id: Optional[UUID] = Query(default=None),
+    include_inactive: bool = Query(default=False),
+    limit: int = Query(default=100, ge=1, le=500),
+    offset: int = Query(default=0, ge=0),
+    user: UserPayload = Depends(security.require_user)
+):
+    return await response_cache.respond(
+        request,
+        user,
+        ("products",),
+        lambda conn: product.list_products(category_id, supplier_id, include_inactive, limit, offset, conn)
+    )
+
+
+@router.post("/import", status_code=status.HTTP_202_ACCEPTED, response_model=ProductImportResponse)
+async def import_products(
+    file: UploadFile = File(..., description="CSV com as colunas de ProductCreate (name, sku, category_id, ...)"),
+    user: UserPayload = Depends(security.require_roles('ADMIN', 'GERENTE', 'ESTOQUISTA'))
+):
+    # Processado em segundo plano; acompanhe por GET /import/{id}
+    return await product_import.start_import(file, user)
+
+
+@router.get("/import/{job_id}", response_model=ProductImportResponse)
+async def get_product_import(
+    job_id: UUID,
+    user: UserPayload = Depends(security.require_roles('ADMIN', 'GERENTE', 'ESTOQUISTA')),
+    # Primário: com réplica atrasada o progresso pareceria voltar
+    conn: Connection = Depends(security.get_rls_connection)
+):
+    return await product_import.get_import(job_id, conn)
+
+
+@router.get("/{product_id}", response_model=ProductResponse)
+async def get_product(
+    product_id: UUID,
+    request: Request,
+    user: UserPayload = Depends(security.require_user)
+):
+    return await response_cache.respond(request, user, ("products",), lambda conn: product.get_product(product_id, conn))
+
+
+@router.post("/reprice", status_code=status.HTTP_200_OK, response_model=RepricingResponse)
+async def reprice_products(
+    rule: RepricingRequest,
+    user: UserPayload = Depends(security.require_roles('ADMIN', 'GERENTE')),
+    conn: Connection = Depends(security.get_rls_connection)
+):
+    return await product.reprice_products(rule, user.user_id, conn)
@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Depends, status
+from src.schemas.receiving import ReceivingCreate, ReceivingResponse
+from src.schemas.user import UserPayload
+from src.controller import receiving
+from src import security
+from asyncpg import Connection
+
+
+router = APIRouter()
+
+
+@router.post("", status_code=status.HTTP_201_CREATED, response_model=ReceivingResponse)
+async def receive_delivery(
+    receipt: ReceivingCreate,
+    user: UserPayload = Depends(security.require_roles('ADMIN', 'GERENTE', 'ESTOQUISTA')),
+    conn: Connection = Depends(security.get_rls_connection)
+):
+    return await receiving.receive_delivery(receipt, user.user_id, conn)
@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends, Header, Request, status
+from src.schemas.sales import SaleCreate, SaleResponse
+from src.schemas.user import UserPayload
+from src.controller import sale
+from src.idempotency import run_idempotent, IDEMPOTENCY_HEADER
+from src import security
+from asyncpg import Connection
+from typing import Optional
+
+
+router = APIRouter()
+
+
+@router.post("/", status_code=status.HTTP_201_CREATED, response_model=SaleResponse)
+async def create_sale(
+    request: Request,
+    new_sale: SaleCreate,
+    idempotency_key: Optional[str] = Header(default=None, alias=IDEMPOTENCY_HEADER, max_length=128),
+    user: UserPayload = Depends(security.require_roles('ADMIN', 'GERENTE', 'CAIXA')),
+    conn: Connection = Depends(security.get_rls_connection)
+):
+    return await run_idempotent(
+        idempotency_key,
+        user.user_id,
+        request,
+        conn,
+        lambda: sale.create_sale(new_sale, user.user_id, conn)
+    )
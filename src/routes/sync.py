@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends, Query, Request, Response
+from src.schemas.sync import SyncSalesRequest, SyncSalesResponse
+from src.schemas.user import UserPayload
+from src.controller import sync
+from src import security
+from asyncpg import Connection
+
+
+router = APIRouter()
+
+REGISTER_ROLES = ('ADMIN', 'GERENTE', 'CAIXA')
+
+
+@router.get("/catalog", response_class=Response)
+async def get_catalog_delta(
+    since: int = Query(default=0, ge=0, description="Watermark recebido na última sincronização"),
+    limit: int = Query(default=5000, ge=1, le=20000),
+    user: UserPayload = Depends(security.require_roles(*REGISTER_ROLES)),
+    conn: Connection = Depends(security.get_rls_read_connection)
+):
+    body, watermark = await sync.get_catalog_delta(since, limit, conn)
+    return Response(
+        content=body,
+        media_type="application/x-ndjson",
+        headers={"X-Catalog-Version": str(watermark)}
+    )
+
+
+@router.post("/sales", response_model=SyncSalesResponse)
+async def upload_offline_sales(
+    batch: SyncSalesRequest,
+    request: Request,
+    user: UserPayload = Depends(security.require_roles(*REGISTER_ROLES))
+):
+    # Uma transação por venda (em vez da transação da requisição)
+    result = await sync.apply_offline_sales(batch, user)
+    if result.applied: await security.record_write_lsn(request)
+    return result
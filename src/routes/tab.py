@@ -0,0 +1,89 @@
+from fastapi import APIRouter, Depends, Header, Request, status, Query
+from src.schemas.tab_payment import (
+    TabPaymentCreate,
+    TabPaymentAllocate,
+    TabPaymentResponse,
+    CustomerTabResponse,
+    CustomerCreditResponse,
+    TabAgingResponse
+)
+from src.schemas.user import UserPayload
+from src.controller import tab
+from src.idempotency import run_idempotent, IDEMPOTENCY_HEADER
+from src import security
+from asyncpg import Connection
+from typing import Optional
+from uuid import UUID
+
+
+router = APIRouter()
+
+CASHIER_ROLES = ('ADMIN', 'GERENTE', 'CAIXA')
+REPORT_ROLES = ('ADMIN', 'GERENTE', 'CONTADOR')
+
+
+@router.get("/customers/{customer_id}/credit", response_model=CustomerCreditResponse)
+async def get_customer_credit(
+    customer_id: UUID,
+    user: UserPayload = Depends(security.require_roles(*CASHIER_ROLES, 'CONTADOR')),
+    conn: Connection = Depends(security.get_rls_read_connection)
+):
+    return await tab.get_customer_credit(customer_id, conn)
+
+
+@router.get("/customers/{customer_id}/open", response_model=list[CustomerTabResponse])
+async def get_open_tabs(
+    customer_id: UUID,
+    user: UserPayload = Depends(security.require_roles(*CASHIER_ROLES, 'CONTADOR')),
+    conn: Connection = Depends(security.get_rls_read_connection)
+):
+    return await tab.get_open_tabs(customer_id, conn)
+
+
+@router.post(
+    "/customers/{customer_id}/payments",
+    status_code=status.HTTP_201_CREATED,
+    response_model=list[TabPaymentResponse]
+)
+async def allocate_customer_payment(
+    request: Request,
+    customer_id: UUID,
+    payment: TabPaymentAllocate,
+    idempotency_key: Optional[str] = Header(default=None, alias=IDEMPOTENCY_HEADER, max_length=128),
+    user: UserPayload = Depends(security.require_roles(*CASHIER_ROLES)),
+    conn: Connection = Depends(security.get_rls_connection)
+):
+    return await run_idempotent(
+        idempotency_key,
+        user.user_id,
+        request,
+        conn,
+        lambda: tab.allocate_customer_payment(customer_id, payment, user.user_id, conn)
+    )
+
+
+@router.post("/payments", status_code=status.HTTP_201_CREATED, response_model=TabPaymentResponse)
+async def pay_sale_tab(
+    request: Request,
+    payment: TabPaymentCreate,
+    idempotency_key: Optional[str] = Header(default=None, alias=IDEMPOTENCY_HEADER, max_length=128),
+    user: UserPayload = Depends(security.require_roles(*CASHIER_ROLES)),
+    conn: Connection = Depends(security.get_rls_connection)
+):
+    return await run_idempotent(
+        idempotency_key,
+        user.user_id,
+        request,
+        conn,
+        lambda: tab.pay_sale_tab(payment, user.user_id, conn)
+    )
+
+
+@router.get("/aging", response_model=list[TabAgingResponse])
+async def get_tab_aging(
+    limit: int = Query(default=100, ge=1, le=500),
+    offset: int = Query(default=0, ge=0),
+    user: UserPayload = Depends(security.require_roles(*REPORT_ROLES)),
+    conn: Connection = Depends(security.get_rls_read_connection)
+):
+    return await tab.get_tab_aging(conn, limit, offset)
@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Request, Response
+from src.constants import Constants
+from src.keys import keyring
+
+
+router = APIRouter()
+
+
+@router.get("/jwks.json")
+async def jwks(request: Request):
+    # Documento montado na carga das chaves: cada chamada só devolve os bytes
+    headers = {"ETag": keyring.jwks_etag, "Cache-Control": f"public, max-age={Constants.JWKS_MAX_AGE}"}
+    if request.headers.get("if-none-match") == keyring.jwks_etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=keyring.jwks, media_type="application/json", headers=headers)
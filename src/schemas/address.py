@@ -1,7 +1,8 @@
-from pydantic import BaseModel, Field, ConfigDict, field_validator
+from pydantic import BaseModel, Field, ConfigDict, field_validator, model_validator
 from typing import Optional
 from uuid import UUID
-import re
+from src.cep import cep_index
+from src import validation
 
 
 class UserAddressBase(BaseModel):
@@ -33,12 +34,7 @@ class UserAddressBase(BaseModel):
     @classmethod
     def clean_zip_code(cls, v: str | None) -> str | None:
         if v is None: return v
-        numeric_zip = re.sub(r'\D', '', v)
-        
-        if len(numeric_zip) != 8:
-            raise ValueError('O CEP deve conter 8 dígitos.')
-            
-        return numeric_zip
+        return validation.validate_cep(v)
     
     @field_validator('state')
     @classmethod
@@ -46,6 +42,28 @@ class UserAddressBase(BaseModel):
         if v is None: return v
         return v.upper()
 
+    @model_validator(mode='after')
+    def fill_from_zip_code(self):
+        """
+        Completa código IBGE e UF pela base local de CEP e recusa os que não
+        batem com ela, que depois quebrariam a emissão da nota. CEP fora da
+        base passa como veio.
+        """
+        if self.zip_code is None: return self
+        entry = cep_index.lookup(self.zip_code)
+        if entry is None: return self
+
+        if self.ibge_city_code is None:
+            self.ibge_city_code = entry.ibge_city_code
+        elif self.ibge_city_code != entry.ibge_city_code:
+            raise ValueError(f'O CEP {self.zip_code} é de {entry.city}/{entry.state} (IBGE {entry.ibge_city_code}).')
+
+        if self.state is None:
+            self.state = entry.state
+        elif self.state != entry.state:
+            raise ValueError(f'O CEP {self.zip_code} é de {entry.city}/{entry.state}.')
+        return self
+
 
 class UserAddressUpdate(UserAddressBase):
     
@@ -54,4 +72,17 @@ class UserAddressUpdate(UserAddressBase):
 class UserAddressResponse(UserAddressBase):
     
     user_id: UUID
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+    @model_validator(mode='after')
+    def fill_from_zip_code(self):
+        # Leitura mostra o que está gravado, mesmo que a base de CEP discorde
+        return self
+
+
+class CepLookupResponse(BaseModel):
+
+    zip_code: str
+    city: str
+    ibge_city_code: str
+    state: str
\ No newline at end of file
@@ -43,4 +43,29 @@ class MeasureUnit(str, Enum):
     UN = 'UN'
     KG = 'KG'
     L = 'L'
-    CX = 'CX'
\ No newline at end of file
+    CX = 'CX'
+
+
+class RepricingMode(str, Enum):
+    MARKUP = 'MARKUP'
+    COST_INCREASE = 'COST_INCREASE'
+    TARGET_MARGIN = 'TARGET_MARGIN'
+
+
+class SyncSaleStatus(str, Enum):
+    APLICADA = 'APLICADA'
+    DUPLICADA = 'DUPLICADA'
+    CONFLITO = 'CONFLITO'
+
+
+class ImportStatus(str, Enum):
+    PENDENTE = 'PENDENTE'
+    PROCESSANDO = 'PROCESSANDO'
+    CONCLUIDA = 'CONCLUIDA'
+    FALHOU = 'FALHOU'
+
+
+class ProvisionStatus(str, Enum):
+    CRIADO = 'CRIADO'
+    CONFLITO = 'CONFLITO'
+    INVALIDO = 'INVALIDO'
@@ -0,0 +1,40 @@
+from pydantic import BaseModel, ConfigDict
+from src.schemas.enums import SaleStatus
+from typing import Optional
+from datetime import datetime
+from decimal import Decimal
+from uuid import UUID
+
+
+class LiveSaleBoardItem(BaseModel):
+    
+    sale_id: UUID
+    status: SaleStatus
+    total_amount: Decimal
+    customer_id: Optional[UUID]
+    customer_name: Optional[str]
+    salesperson_id: Optional[UUID]
+    created_at: datetime
+    model_config = ConfigDict(from_attributes=True)
+
+
+class KitchenQueueItem(BaseModel):
+    
+    sale_item_id: UUID
+    sale_id: UUID
+    product_id: UUID
+    product_name: str
+    quantity: Decimal
+    sale_status: SaleStatus
+    created_at: datetime
+    model_config = ConfigDict(from_attributes=True)
+
+
+class LiveSnapshot(BaseModel):
+    """
+    Estado inicial do painel. O cliente deve assinar o stream
+    informando last_event_id para não perder eventos entre as duas chamadas.
+    """
+    last_event_id: int
+    sales: list[LiveSaleBoardItem] = []
+    kitchen: list[KitchenQueueItem] = []
@@ -0,0 +1,72 @@
+from pydantic import BaseModel, Field, ConfigDict, model_validator
+from src.schemas.enums import RepricingMode
+from typing import Optional
+from decimal import Decimal
+from uuid import UUID
+
+
+class RepricingRequest(BaseModel):
+
+    mode: RepricingMode = Field(
+        ...,
+        description=(
+            "MARKUP: reajusta o preço de venda em percent%. "
+            "COST_INCREASE: reajusta custo e venda em percent% (mantém a margem). "
+            "TARGET_MARGIN: venda = custo + percent% de margem."
+        )
+    )
+
+    percent: Decimal = Field(
+        ...,
+        gt=-100,
+        le=1000,
+        decimal_places=2,
+        description="Percentual aplicado pela regra"
+    )
+
+    category_id: Optional[int] = Field(
+        default=None,
+        description="Restringe aos produtos da categoria (inclui subcategorias)"
+    )
+
+    supplier_id: Optional[UUID] = Field(
+        default=None,
+        description="Restringe aos produtos do fornecedor"
+    )
+
+    dry_run: bool = Field(
+        default=True,
+        description="Se True, apenas retorna a prévia sem gravar"
+    )
+
+    @model_validator(mode='after')
+    def validate_scope(self):
+        if self.category_id is None and self.supplier_id is None:
+            raise ValueError('Informe ao menos uma categoria ou fornecedor para o reajuste.')
+        if self.mode == RepricingMode.TARGET_MARGIN and self.percent < 0:
+            raise ValueError('A margem alvo não pode ser negativa.')
+        return self
+
+
+class RepricingItem(BaseModel):
+
+    product_id: UUID
+    name: str
+    sku: str
+    old_purchase_price: Decimal
+    new_purchase_price: Decimal
+    old_sale_price: Decimal
+    new_sale_price: Decimal
+    model_config = ConfigDict(from_attributes=True)
+
+
+class RepricingResponse(BaseModel):
+
+    dry_run: bool
+    total: int = Field(..., description="Produtos alcançados pela regra")
+    applied: int = Field(default=0, description="Produtos efetivamente alterados")
+    items: list[RepricingItem] = []
+    violations: list[RepricingItem] = Field(
+        default=[],
+        description="Produtos cujo preço de venda ficaria abaixo do custo"
+    )
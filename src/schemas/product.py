@@ -48,6 +48,8 @@ class ProductBase(BaseModel):
     )
     
     tax_group_id: Optional[UUID] = Field(default=None, description="Grupo tributário vinculado")
+    
+    supplier_id: Optional[UUID] = Field(default=None, description="Fornecedor principal")
 
     
     stock_quantity: Decimal = Field(default=Decimal('0.000'), decimal_places=3)
@@ -87,6 +89,7 @@ class ProductUpdate(BaseModel):
     cfop_default: Optional[str] = Field(default=None, max_length=4)
     origin: Optional[str] = Field(default=None, min_length=1, max_length=1)
     tax_group_id: Optional[UUID] = None
+    supplier_id: Optional[UUID] = None
 
     stock_quantity: Optional[Decimal] = None
     min_stock_quantity: Optional[Decimal] = None
@@ -118,4 +121,17 @@ class ProductResponse(ProductBase):
     profit_margin: Decimal 
     created_at: datetime
     updated_at: datetime
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class ProductSearchResult(BaseModel):
+    
+    id: UUID
+    name: str
+    sku: str
+    gtin: Optional[str]
+    sale_price: Decimal
+    stock_quantity: Decimal
+    measure_unit: MeasureUnit
+    needs_preparation: bool
+    rank: float = Field(..., description="Relevância do resultado (maior = melhor)")
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,29 @@
+from pydantic import BaseModel, ConfigDict
+from src.schemas.enums import ImportStatus
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+
+class ProductImportError(BaseModel):
+
+    line: int
+    sku: Optional[str] = None
+    message: str
+
+
+class ProductImportResponse(BaseModel):
+
+    id: UUID
+    file_name: str
+    status: ImportStatus
+    total_rows: int
+    processed_rows: int
+    inserted: int
+    updated: int
+    failed: int
+    errors: list[ProductImportError]
+    detail: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    model_config = ConfigDict(from_attributes=True)
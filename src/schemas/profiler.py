@@ -0,0 +1,17 @@
+from pydantic import BaseModel, Field
+from typing import Any, Optional
+from datetime import datetime
+
+
+class QueryStatsResponse(BaseModel):
+
+    fingerprint: str = Field(..., description="Identificador da consulta normalizada")
+    query: str = Field(..., description="SQL com literais trocados por '?'")
+    calls: int
+    total_ms: float
+    mean_ms: float
+    p95_ms: float = Field(..., description="p95 das últimas 512 execuções")
+    max_ms: float
+    rows: int = Field(..., description="Total de linhas retornadas ou afetadas")
+    plan: Optional[Any] = Field(default=None, description="Último EXPLAIN capturado (JSON)")
+    plan_captured_at: Optional[datetime] = None
@@ -0,0 +1,49 @@
+from pydantic import BaseModel, Field, ConfigDict
+from datetime import date, datetime
+from typing import Optional
+from decimal import Decimal
+from uuid import UUID
+
+
+class ReceivingItem(BaseModel):
+
+    product_id: UUID
+    quantity: Decimal = Field(..., gt=0, decimal_places=3)
+    unit_cost: Decimal = Field(..., ge=0, decimal_places=2, description="Custo unitário na nota")
+    batch_code: Optional[str] = Field(default=None, max_length=64)
+    expiration_date: Optional[date] = Field(
+        default=None,
+        description="Com validade informada a linha também gera um lote"
+    )
+
+
+class ReceivingCreate(BaseModel):
+
+    supplier_id: UUID
+    invoice_number: str = Field(
+        ...,
+        min_length=1,
+        max_length=64,
+        description="Número da nota fiscal; a mesma nota do mesmo fornecedor só entra uma vez"
+    )
+    items: list[ReceivingItem] = Field(..., min_length=1, max_length=2000)
+
+
+class ReceivingCostChange(BaseModel):
+
+    product_id: UUID
+    old_purchase_price: Decimal
+    new_purchase_price: Decimal
+
+
+class ReceivingResponse(BaseModel):
+
+    id: UUID
+    supplier_id: UUID
+    invoice_number: str
+    total_cost: Decimal
+    movements: int
+    batches: int
+    cost_changes: list[ReceivingCostChange]
+    received_at: datetime
+    model_config = ConfigDict(from_attributes=True)
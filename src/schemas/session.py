@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+
+class SessionResponse(BaseModel):
+
+    id: UUID
+    created_at: datetime
+    expires_at: Optional[datetime] = None
+    user_agent: Optional[str] = None
+    ip_address: Optional[str] = None
+    current: bool = False
+
+
+class SessionRevokeResponse(BaseModel):
+
+    revoked: int
@@ -2,7 +2,7 @@ from pydantic import BaseModel, Field, ConfigDict, field_validator
 from datetime import datetime
 from typing import Optional
 from uuid import UUID
-import re
+from src import validation
 
 
 class SupplierBase(BaseModel):
@@ -34,14 +34,14 @@ class SupplierBase(BaseModel):
     @classmethod
     def clean_phone(cls, v: str | None) -> str | None:
         if v is None: return v
-        numeric_phone = re.sub(r'\D', '', v)        
+        numeric_phone = validation.only_digits(v)        
         return numeric_phone
     
     @field_validator('cnpj')
     @classmethod
     def clean_cnpj(cls, v: str | None) -> str | None:
         if v is None: return v
-        return re.sub(r'[./-]', '', v)
+        return validation.validate_cnpj(v)
 
 
 
@@ -57,11 +57,17 @@ class SupplierUpdate(BaseModel):
     contact_name: Optional[str] = None
     address: Optional[str] = None    
     
+    @field_validator('cnpj')
+    @classmethod
+    def clean_cnpj(cls, v: str | None) -> str | None:
+        if v is None: return v
+        return validation.validate_cnpj(v)
+
     @field_validator('phone')
     @classmethod
     def clean_phone(cls, v: str | None) -> str | None:
         if v is None: return v
-        numeric_phone = re.sub(r'\D', '', v)
+        numeric_phone = validation.only_digits(v)
         if len(numeric_phone) != 11:
             raise ValueError('O telefone deve conter exatamente 11 dígitos')
         return numeric_phone
@@ -71,4 +77,10 @@ class SupplierResponse(SupplierBase):
     
     id: UUID
     created_at: datetime
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+    @field_validator('cnpj')
+    @classmethod
+    def clean_cnpj(cls, v: str | None) -> str | None:
+        # Leitura não revalida: cadastros antigos podem ter CNPJ sem dígito verificador correto
+        return v
\ No newline at end of file
@@ -0,0 +1,96 @@
+from pydantic import BaseModel, Field, model_validator
+from src.schemas.enums import PaymentMethod, SaleStatus, SyncSaleStatus
+from src.schemas.product import ProductResponse
+from src.schemas.tax_group import TaxGroupResponse
+from src.schemas.category import CategoryResponse
+from src.schemas.sales import SaleCreate
+from typing import Optional
+from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
+from uuid import UUID
+
+
+class SyncCategory(CategoryResponse):
+
+    row_version: int
+
+
+class SyncTaxGroup(TaxGroupResponse):
+
+    row_version: int
+
+
+class SyncProduct(ProductResponse):
+
+    row_version: int
+
+
+class CatalogTombstone(BaseModel):
+
+    entity: str
+    entity_id: str
+    row_version: int
+
+
+class OfflineSaleItem(BaseModel):
+
+    product_id: UUID
+    quantity: Decimal = Field(..., gt=0, decimal_places=3)
+    unit_sale_price: Decimal = Field(..., ge=0, decimal_places=2)
+
+
+class OfflinePayment(BaseModel):
+
+    method: PaymentMethod
+    total: Decimal = Field(..., gt=0, decimal_places=2)
+
+
+class OfflineSale(SaleCreate):
+    """
+    Venda registrada pelo caixa sem conexão. O id é gerado no caixa,
+    então reenviar o mesmo lote não duplica vendas.
+    """
+
+    id: UUID = Field(..., description="ID gerado no caixa")
+    status: SaleStatus = SaleStatus.CONCLUIDA
+    created_at: datetime = Field(..., description="Momento da venda no caixa")
+    total_discount: Decimal = Field(default=Decimal('0.00'), ge=0, decimal_places=2)
+    items: list[OfflineSaleItem] = Field(..., min_length=1, max_length=500)
+    payments: list[OfflinePayment] = Field(default_factory=list, max_length=20)
+
+    @model_validator(mode='after')
+    def validate_totals(self):
+        subtotal = sum(
+            (i.quantity * i.unit_sale_price).quantize(Decimal('0.01'), ROUND_HALF_UP)
+            for i in self.items
+        )
+        total = subtotal - self.total_discount
+        if total < 0:
+            raise ValueError("O desconto não pode ser maior que o subtotal.")
+        if self.status == SaleStatus.CONCLUIDA and sum(p.total for p in self.payments) != total:
+            raise ValueError(f"Pagamentos não fecham com o total da venda ({total}).")
+        return self
+
+
+class SyncSalesRequest(BaseModel):
+
+    sales: list[OfflineSale] = Field(..., min_length=1, max_length=500, description="Vendas na ordem em que foram feitas")
+
+
+class SyncSaleResult(BaseModel):
+
+    sale_id: UUID
+    status: SyncSaleStatus
+    detail: Optional[str] = None
+    price_mismatches: list[UUID] = Field(
+        default_factory=list,
+        description="Produtos vendidos com preço diferente do cadastro atual"
+    )
+
+
+class SyncSalesResponse(BaseModel):
+
+    applied: int
+    duplicates: int
+    conflicts: int
+    results: list[SyncSaleResult]
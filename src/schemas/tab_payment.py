@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, computed_field, field_validator
 from src.schemas.enums import PaymentMethod
 from typing import Optional
 from datetime import datetime
@@ -26,7 +26,21 @@ class TabPaymentBase(BaseModel):
     )
 
 
-class TabPaymentCreate(TabPaymentBase):
+class TabPaymentAllocate(TabPaymentBase):
+    """
+    Pagamento avulso do cliente: o valor é abatido das vendas
+    fiadas mais antigas primeiro.
+    """
+
+    @field_validator('payment_method')
+    @classmethod
+    def validate_payment_method(cls, v: PaymentMethod) -> PaymentMethod:
+        if v.value.startswith('FIADO'):
+            raise ValueError('Uma dívida não pode ser paga com fiado.')
+        return v
+
+
+class TabPaymentCreate(TabPaymentAllocate):
     
     sale_id: UUID = Field(
         ..., 
@@ -40,4 +54,41 @@ class TabPaymentResponse(TabPaymentBase):
     sale_id: UUID
     received_by: Optional[UUID]
     created_at: datetime
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+
+class CustomerTabResponse(BaseModel):
+    
+    sale_id: UUID
+    customer_id: UUID
+    amount_due: Decimal
+    amount_paid: Decimal
+    status: PaymentMethod
+    created_at: datetime
+    settled_at: Optional[datetime]
+    model_config = ConfigDict(from_attributes=True)
+
+
+class CustomerCreditResponse(BaseModel):
+    
+    customer_id: UUID
+    credit_limit: Decimal
+    invoice_amount: Decimal
+    
+    @computed_field
+    def available_credit(self) -> Decimal:
+        return self.credit_limit - self.invoice_amount
+
+
+class TabAgingResponse(BaseModel):
+    
+    customer_id: UUID
+    customer_name: str
+    credit_limit: Decimal
+    total_open: Decimal
+    days_0_30: Decimal
+    days_31_60: Decimal
+    days_61_90: Decimal
+    days_over_90: Decimal
+    oldest_open_at: datetime
+    model_config = ConfigDict(from_attributes=True)
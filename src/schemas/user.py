@@ -7,16 +7,18 @@ from pydantic import (
     field_validator
 )
 from src.schemas.enums import UserRole
+from src import validation
 from typing import Optional
 from datetime import datetime
 from decimal import Decimal
 from uuid import UUID
-import re
 
 class UserPayload(BaseModel):
     
     user_id: UUID
     role: str
+    tenant_id: int
+    session_id: Optional[UUID] = None
 
 class UserBase(BaseModel):
     
@@ -80,7 +82,13 @@ class UserCreate(UserBase):
         """
         if v is None: return None            
         if not v.strip(): return None        
-        return re.sub(r'\D', '', v)
+        return validation.only_digits(v)
+
+    @field_validator('cpf')
+    @classmethod
+    def check_cpf_digits(cls, v: str | None) -> str | None:
+        if v is None: return None
+        return validation.validate_cpf(v)
 
     @model_validator(mode='after')
     def validate_password_requirement(self):
@@ -127,7 +135,13 @@ class UserUpdate(BaseModel):
         """
         if v is None: return None            
         if not v.strip(): return None        
-        return re.sub(r'\D', '', v)
+        return validation.only_digits(v)
+
+    @field_validator('cpf')
+    @classmethod
+    def check_cpf_digits(cls, v: str | None) -> str | None:
+        if v is None: return None
+        return validation.validate_cpf(v)
 
 
 class UserResponse(UserBase):
@@ -142,4 +156,17 @@ class UserResponse(UserBase):
     
 class UserLoginData(UserResponse):
     
-    password_hash: str
\ No newline at end of file
+    password_hash: str
+    tenant_id: int
+
+class CustomerLookupResult(BaseModel):
+
+    id: UUID
+    name: str
+    nickname: Optional[str]
+    phone: Optional[str]
+    cpf: Optional[str] = Field(default=None, description="CPF mascarado (***.456.***-**)")
+    credit_limit: Decimal
+    invoice_amount: Decimal
+    rank: float = Field(..., description="Relevância do resultado (maior = melhor)")
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+from src.schemas.enums import ProvisionStatus
+from typing import Optional
+from uuid import UUID
+
+
+class UserProvisionRow(BaseModel):
+
+    line: int
+    email: Optional[str] = None
+    status: ProvisionStatus
+    user_id: Optional[UUID] = None
+    message: Optional[str] = None
+
+
+class UserProvisionResponse(BaseModel):
+
+    total: int
+    created: int
+    failed: int
+    rows: list[UserProvisionRow]
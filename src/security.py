@@ -1,4 +1,4 @@
-from fastapi import Depends, HTTPException, status, Cookie, Response
+from fastapi import Depends, HTTPException, Request, status, Cookie, Response
 from datetime import datetime, timedelta, timezone
 from src.schemas.user import UserPayload
 from src.schemas.token import SessionToken, Token
@@ -6,14 +6,29 @@ from src.constants import Constants
 from passlib.context import CryptContext
 from src.exceptions import DatabaseError
 from typing import Optional
-from asyncpg import Pool
-from src.db.db import get_db_pool
+from asyncpg import Connection
+from src.db.db import db, get_db_pool
+from src.db.replicas import LSN_COOKIE, parse_lsn
 from src import util
+from src import metrics
+from src.startup import startup
+from src.sessions import revocations
+from src.keys import keyring
+from src import profiler
+from src import log
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import contextlib
+import asyncio
 import uuid
+import time
 import jwt
+import os
 
 
 
+logger = log.get_logger("security")
+
 pwd_context = CryptContext(
     schemes=["argon2"],     
     deprecated="auto"
@@ -28,6 +43,9 @@ VALID_ROLES = {
     'CONTADOR'
 }
 
+# Papel criado em rls.sql: sem tabelas próprias, o RLS vale para ele (para o dono não)
+TENANT_ROLE = "tenant_user"
+
 CREDENTIALS_EXCEPTION = HTTPException(
     status_code=status.HTTP_401_UNAUTHORIZED,
     detail="Could not validate credentials",
@@ -40,26 +58,71 @@ USER_IS_NOT_ACTIVE_EXCEPTION = HTTPException(
     headers={"WWW-Authenticate": "Bearer"},
 )
 
+FORBIDDEN_EXCEPTION = HTTPException(
+    status_code=status.HTTP_403_FORBIDDEN,
+    detail="Acesso não permitido para este perfil."
+)
+
 INVALID_PASSWORD_EXCEPTION = HTTPException(
     status_code=status.HTTP_400_BAD_REQUEST,
     detail="Password must be at least 8 characters long"
 )
 
 
+async def warm_password_hashing() -> None:
+    # O passlib só carrega o backend argon2 no primeiro hash, que seria o do primeiro login
+    pwd_context.handler("argon2").get_backend()
+
+
+startup.register("argon2", warm_password_hashing)
+
+
 def hash_password(password: str) -> str:
     if not password or len(password) < 8:
         raise INVALID_PASSWORD_EXCEPTION
-    return pwd_context.hash(password)
+    start = time.perf_counter()
+    hashed = pwd_context.hash(password)
+    metrics.password_hash_duration.observe(time.perf_counter() - start, "hash")
+    return hashed
+
+
+def _hash_chunk(passwords: list[str]) -> list[str]:
+    return [pwd_context.hash(p) for p in passwords]
+
+
+async def hash_passwords(passwords: list[str]) -> list[str]:
+    """
+    Hashes em lote (provisionamento de usuários), na mesma ordem. O argon2 é
+    CPU puro: os lotes grandes vão para um pool de processos, um pedaço por
+    núcleo, e o worker segue atendendo enquanto isso.
+    """
+    for password in passwords:
+        if not password or len(password) < 8: raise INVALID_PASSWORD_EXCEPTION
+    if len(passwords) < 4: return await asyncio.to_thread(_hash_chunk, passwords)
+
+    workers = min(os.cpu_count() or 1, len(passwords))
+    size = -(-len(passwords) // workers)
+    chunks = [passwords[i:i + size] for i in range(0, len(passwords), size)]
+    start = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    # spawn: fork de um processo com event loop e threads pode herdar locks presos
+    with ProcessPoolExecutor(max_workers=len(chunks), mp_context=multiprocessing.get_context("spawn")) as pool:
+        results = await asyncio.gather(*(loop.run_in_executor(pool, _hash_chunk, chunk) for chunk in chunks))
+    metrics.password_hash_duration.observe((time.perf_counter() - start) / len(passwords), "hash_batch")
+    return [hashed for chunk in results for hashed in chunk]
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:    
+    start = time.perf_counter()
     try:      
         return pwd_context.verify(plain_password, hashed_password)
     except Exception:
         return False
+    finally:
+        metrics.password_hash_duration.observe(time.perf_counter() - start, "verify")
 
 
-def create_access_token(user_id: uuid.UUID | str, role: str) -> str:
+def create_access_token(user_id: uuid.UUID | str, role: str, tenant_id: int, session_id: Optional[str] = None) -> str:
     expires_at = datetime.now(timezone.utc) + timedelta(
         hours=Constants.ACCESS_TOKEN_EXPIRE_HOURS
     )
@@ -69,16 +132,16 @@ def create_access_token(user_id: uuid.UUID | str, role: str) -> str:
     payload = {
         "sub": str(user_id),
         "exp": expires_at,
+        # Tokens sem sid são revogados por uma marca em epoch do mesmo time.time()
+        "iat": round(time.time(), 3),
         "jti": token_id,
+        "sid": session_id,
         "role": role,
+        "tenant_id": tenant_id,
         "type": "access",
     }
     
-    token = jwt.encode(
-        payload,
-        Constants.SECRET_KEY,
-        algorithm=Constants.ALGORITHM
-    )    
+    token = keyring.sign(payload)
     
     return Token(id=token_id, token=token, expires_at=expires_at)
 
@@ -95,69 +158,177 @@ def create_refresh_token(user_id: uuid.UUID | str) -> str:
         "type": "refresh"
     }
     
-    token = jwt.encode(
-        payload,
-        Constants.SECRET_KEY,
-        algorithm=Constants.ALGORITHM
-    )
+    token = keyring.sign(payload)
     
     return Token(id=token_id, token=token, expires_at=expires_at)
     
 
 
-def create_session_token(user_id: uuid.UUID | str, role: str) -> SessionToken:
+def create_session_token(user_id: uuid.UUID | str, role: str, tenant_id: int) -> SessionToken:
+    # O id do refresh token identifica a sessão (dispositivo) nos access tokens
+    refresh_token = create_refresh_token(user_id)
     return SessionToken(
-        access_token=create_access_token(user_id, role),
-        refresh_token=create_refresh_token(user_id)
+        access_token=create_access_token(user_id, role, tenant_id, refresh_token.id),
+        refresh_token=refresh_token
     )
 
 
 async def extract_payload_optional(access_token: Optional[str] = Cookie(default=None)) -> Optional[UserPayload]:
     if access_token is None: return None
     try:
-        payload = jwt.decode(
-            access_token,
-            Constants.SECRET_KEY,
-            algorithms=[Constants.ALGORITHM]
-        )
+        payload = keyring.verify(access_token)
         
         user_id: Optional[str] = payload.get("sub")
         token_type: Optional[str] = payload.get("type")
         role: str = payload.get("role", "CLIENTE")
         if role not in VALID_ROLES: role = "CLIENTE"
+        tenant_id: Optional[int] = payload.get("tenant_id")
             
         if user_id is None or token_type != "access":
             return None
+
+        # Sem loja no token não há como escolher o RLS: recusa em vez de supor uma
+        if not isinstance(tenant_id, int): return None
+
+        # Logout e "sair de todos os dispositivos": só memória, sem consulta ao banco
+        session_id: Optional[str] = payload.get("sid")
+        if revocations.is_revoked(user_id, session_id, payload.get("iat", 0)):
+            return None
             
-        return UserPayload(user_id=user_id, role=role)
+        log.user_id_var.set(user_id)
+        log.tenant_id_var.set(tenant_id)
+        return UserPayload(user_id=user_id, role=role, tenant_id=tenant_id, session_id=session_id)
     except (jwt.ExpiredSignatureError, jwt.InvalidTokenError):
         return None
         
 
-async def get_rls_connection(
-    pool: Pool = Depends(get_db_pool),
+async def _set_rls_context(connection: Connection, user_payload: Optional[UserPayload]) -> None:
+    await _apply_rls_settings(connection, {
+        "app.current_user_id": str(user_payload.user_id) if user_payload else "",
+        "app.current_user_role": user_payload.role if user_payload else "",
+        "app.current_tenant_id": str(user_payload.tenant_id) if user_payload else ""
+    })
+
+
+async def _apply_rls_settings(connection: Connection, settings: dict[str, str]) -> None:
+    settings = {**settings, "role": TENANT_ROLE}
+    try:
+        await connection.execute(
+            "SELECT set_config('app.current_user_id', $1, true), "
+            "       set_config('app.current_user_role', $2, true), "
+            "       set_config('app.current_tenant_id', $3, true), "
+            "       set_config('role', $4, true)",
+            *settings.values()
+        )
+    except Exception as e:
+        logger.critical("Erro ao configurar sessão RLS: %s", e)
+        raise DatabaseError(code=500, detail="Security context failure.")
+    profiler.rls_context.set(settings)
+
+
+async def _primary_connection(
+    request: Request,
     user_payload: Optional[UserPayload] = Depends(extract_payload_optional)
 ):
+    pool = await get_db_pool()
+    start = time.perf_counter()
+    async with pool.acquire() as connection:
+        metrics.db_pool_acquire.observe(time.perf_counter() - start)
+        async with connection.transaction():
+            await _set_rls_context(connection, user_payload)
+            yield connection
+            wrote = bool(db.replicas) and await connection.fetchval(
+                "SELECT pg_current_xact_id_if_assigned() IS NOT NULL"
+            )
+
+        # Depois do commit: posição que as réplicas precisam alcançar para esta sessão ler dela
+        if wrote:
+            request.state.db_write_lsn = await connection.fetchval("SELECT pg_current_wal_lsn()::text")
+
+
+async def record_write_lsn(request: Request) -> None:
+    """Para rotas que escrevem em transações próprias, fora de get_rls_connection."""
+    if not db.replicas: return
+    pool = await get_db_pool()
+    async with pool.acquire() as connection:
+        request.state.db_write_lsn = await connection.fetchval("SELECT pg_current_wal_lsn()::text")
+
+
+@contextlib.asynccontextmanager
+async def rls_connection(user_payload: Optional[UserPayload]):
+    """Transação no primário fora de uma requisição (jobs em segundo plano)."""
+    pool = await get_db_pool()
     async with pool.acquire() as connection:
         async with connection.transaction():
-            try:
-                if user_payload:                    
-                    await connection.execute(
-                        "SELECT set_config('app.current_user_id', $1, true), "
-                        "       set_config('app.current_user_role', $2, true)",
-                        str(user_payload.user_id),
-                        user_payload.role
-                    )
-                else:
-                    await connection.execute(
-                        "SELECT set_config('app.current_user_id', '', true), "
-                        "       set_config('app.current_user_role', '', true)"
-                    )
-                
-                yield connection            
-            except Exception as e:
-                print(f"[CRITICAL] Erro ao configurar sessão RLS: {e}")
-                raise DatabaseError(status_code=500, detail="Security context failure.")
+            await _set_rls_context(connection, user_payload)
+            yield connection
+
+
+@contextlib.asynccontextmanager
+async def rls_read_connection(request: Request, user_payload: Optional[UserPayload]):
+    """Conexão de leitura aberta sob demanda (ex.: só quando o cache de respostas erra)."""
+    if db.pool is None:
+        raise RuntimeError("Database pool não foi inicializado. Verifique o startup.")
+    start = time.perf_counter()
+    pool, connection = await db.acquire_read(parse_lsn(request.cookies.get(LSN_COOKIE)))
+    metrics.db_pool_acquire.observe(time.perf_counter() - start)
+    try:
+        # Repeatable read: as consultas da requisição (ex.: as quatro do delta do
+        # catálogo) enxergam o mesmo snapshot, nunca um commit entre uma e outra
+        async with connection.transaction(isolation="repeatable_read", readonly=True):
+            await _set_rls_context(connection, user_payload)
+            yield connection
+    finally:
+        await pool.release(connection)
+
+
+@contextlib.asynccontextmanager
+async def primary_read_connection(user_payload: Optional[UserPayload]):
+    """
+    Leitura no primário com o RLS do usuário. Para o que vai a um cache
+    compartilhado: a invalidação chega pelo NOTIFY do primário, e uma réplica
+    atrasada guardaria de novo a versão antiga até o TTL.
+    """
+    pool = await get_db_pool()
+    start = time.perf_counter()
+    async with pool.acquire() as connection:
+        metrics.db_pool_acquire.observe(time.perf_counter() - start)
+        async with connection.transaction(isolation="repeatable_read", readonly=True):
+            await _set_rls_context(connection, user_payload)
+            yield connection
+
+
+@contextlib.asynccontextmanager
+async def tenant_read_connection(tenant_id: int):
+    """Leitura no primário com o RLS de uma loja e sem usuário (aquecimento dos caches)."""
+    pool = await get_db_pool()
+    async with pool.acquire() as connection:
+        async with connection.transaction(isolation="repeatable_read", readonly=True):
+            await _apply_rls_settings(connection, {
+                "app.current_user_id": "",
+                "app.current_user_role": "",
+                "app.current_tenant_id": str(tenant_id)
+            })
+            yield connection
+
+
+async def _read_connection(
+    request: Request,
+    user_payload: Optional[UserPayload] = Depends(extract_payload_optional)
+):
+    async with rls_read_connection(request, user_payload) as connection:
+        yield connection
+
+
+# Escopo "function": commit e devolução da conexão acontecem antes da resposta
+# ser enviada, então o cliente só vê sucesso depois do commit
+def get_rls_connection(connection: Connection = Depends(_primary_connection, scope="function")) -> Connection:
+    return connection
+
+
+def get_rls_read_connection(connection: Connection = Depends(_read_connection, scope="function")) -> Connection:
+    """Somente leitura: réplica em dia quando houver, senão o primário."""
+    return connection
 
 
 def require_user(payload: Optional[UserPayload] = Depends(extract_payload_optional)) -> UserPayload:
@@ -165,6 +336,16 @@ def require_user(payload: Optional[UserPayload] = Depends(extract_payload_option
     return payload
 
 
+def require_roles(*roles: str):
+    allowed = set(roles)
+
+    def dependency(payload: UserPayload = Depends(require_user)) -> UserPayload:
+        if payload.role not in allowed: raise FORBIDDEN_EXCEPTION
+        return payload
+
+    return dependency
+
+
 def set_session_token_cookie(response: Response, session_token: SessionToken):
     if Constants.IS_PRODUCTION:
         samesite_policy = "none"
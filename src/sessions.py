@@ -0,0 +1,93 @@
+from typing import Optional
+from src.db.db import db
+from src.events import broker
+from src.pruner import pruner
+from src.startup import startup
+from src.log import get_logger
+import json
+import time
+
+
+logger = get_logger("sessions")
+
+SESSION_REVOCATIONS_CHANNEL = "session_revocations"
+
+# Expiradas, as revogações não derrubam mais nenhum access token
+pruner.register("session_revocations", "session_revocations", "expires_at < now()")
+pruner.register("refresh_tokens", "refresh_tokens", "expires_at < CURRENT_TIMESTAMP")
+
+
+class RevocationSet:
+    """
+    Sessões revogadas cujos access tokens ainda não expiraram, replicadas
+    na memória de cada worker: por sessão, o id revogado (logout e sair de
+    todos os dispositivos) e, por usuário, a marca "emitidos antes de", que
+    só vale para tokens sem sid. Validar um token é uma consulta a dict, sem
+    ida ao banco. O NOTIFY do insert em session_revocations mantém os
+    workers em dia.
+    """
+
+    def __init__(self, purge_interval: float = 60.0):
+        self.purge_interval = purge_interval
+        # user_id -> (revoked_at, expires_at), em epoch
+        self.watermarks: dict[str, tuple[float, float]] = {}
+        # session_id -> expires_at
+        self.sessions: dict[str, float] = {}
+        self.last_id = 0
+        self._purged_at = 0.0
+
+    def __len__(self) -> int:
+        return len(self.watermarks) + len(self.sessions)
+
+    def add(self, id: int, user_id: str, session_id: Optional[str], revoked_at: float, expires_at: float) -> None:
+        self.last_id = max(self.last_id, id)
+        if session_id is not None:
+            self.sessions[session_id] = expires_at
+        else:
+            current = self.watermarks.get(user_id)
+            if current is None or current[0] < revoked_at: self.watermarks[user_id] = (revoked_at, expires_at)
+        self._purge()
+
+    def is_revoked(self, user_id: str, session_id: Optional[str], issued_at: float) -> bool:
+        # Com sid, só o id decide: nada de comparar o iat com um horário de outro relógio
+        if session_id is not None: return session_id in self.sessions
+        watermark = self.watermarks.get(user_id)
+        return watermark is not None and issued_at < watermark[0]
+
+    def _purge(self) -> None:
+        now = time.time()
+        if now - self._purged_at < self.purge_interval: return
+        self._purged_at = now
+        self.watermarks = {k: v for k, v in self.watermarks.items() if v[1] > now}
+        self.sessions = {k: v for k, v in self.sessions.items() if v > now}
+
+    def on_notify(self, payload: str) -> None:
+        raw = json.loads(payload)
+        self.add(raw["id"], raw["user_id"], raw["session_id"], raw["revoked_at"], raw["expires_at"])
+
+    async def sync(self) -> None:
+        """Carrega o que ainda não chegou por NOTIFY (subida do worker e reconexão do LISTEN)."""
+        if db.pool is None: return
+        async with db.pool.acquire() as conn:
+            rows = await conn.fetch(
+                """
+                    SELECT
+                        id,
+                        user_id::text AS user_id,
+                        session_id::text AS session_id,
+                        extract(epoch FROM revoked_at)::float8 AS revoked_at,
+                        extract(epoch FROM expires_at)::float8 AS expires_at
+                    FROM session_revocations
+                    WHERE id > $1 AND expires_at > now()
+                    ORDER BY id
+                """,
+                self.last_id
+            )
+        for r in rows:
+            self.add(r["id"], r["user_id"], r["session_id"], r["revoked_at"], r["expires_at"])
+        if rows: logger.info("Revogações de sessão carregadas: %d", len(rows))
+
+
+revocations = RevocationSet()
+broker.listen(SESSION_REVOCATIONS_CHANNEL, revocations.on_notify, resync=revocations.sync)
+startup.register("session_revocations", revocations.sync)
@@ -0,0 +1,136 @@
+from starlette.types import ASGIApp, Receive, Scope, Send
+from src.constants import Constants
+from src.log import get_logger
+import threading
+import asyncio
+import signal
+import time
+
+
+logger = get_logger("shutdown")
+
+
+class ShutdownCoordinator:
+    """
+    Encerramento do worker em duas etapas:
+
+    1. Sinal (SIGTERM/SIGINT): /health/ready passa a 503 e os streams ao vivo
+       são encerrados, mas o worker segue atendendo por SHUTDOWN_DRAIN_DELAY
+       para o balanceador tirá-lo de rotação. Só então o sinal chega ao
+       uvicorn, que para de aceitar conexões e espera as requisições abertas.
+    2. Lifespan: espera requisições e jobs de fundo até SHUTDOWN_TIMEOUT,
+       para as tarefas periódicas, fecha os pools (réplicas antes do
+       primário) e por último grava métricas e esvazia a fila de logs.
+    """
+
+    def __init__(self):
+        self.in_flight = 0
+        self.jobs: set[asyncio.Task] = set()
+        self.draining = False
+        self.stopping = False
+
+    def track(self, task: asyncio.Task) -> asyncio.Task:
+        """Job de fundo que o encerramento deve esperar em vez de cancelar."""
+        self.jobs.add(task)
+        task.add_done_callback(self.jobs.discard)
+        return task
+
+    def install_signal_handlers(self) -> None:
+        # Envolve os handlers do uvicorn; fora da thread principal (TestClient) não há sinais
+        if threading.current_thread() is not threading.main_thread(): return
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            previous = signal.getsignal(sig)
+            if not callable(previous): continue
+
+            def handler(signum, frame, previous=previous):
+                loop.call_soon_threadsafe(self._on_signal, previous, signum, frame)
+
+            signal.signal(sig, handler)
+
+    def _on_signal(self, previous, signum, frame) -> None:
+        # Segundo sinal: encerra sem esperar o balanceador
+        if self.draining:
+            previous(signum, frame)
+            return
+        self.begin_drain()
+        asyncio.get_running_loop().call_later(Constants.SHUTDOWN_DRAIN_DELAY, previous, signum, frame)
+
+    def begin_drain(self) -> None:
+        if self.draining: return
+        from src.health import prober
+        from src.events import broker
+        self.draining = True
+        prober.drain()
+        broker.close_subscriptions()
+        logger.warning(
+            "Encerramento iniciado",
+            extra={"in_flight": self.in_flight, "jobs": len(self.jobs), "drain_delay_s": Constants.SHUTDOWN_DRAIN_DELAY}
+        )
+
+    async def _wait_idle(self, deadline: float) -> bool:
+        while self.in_flight or self.jobs:
+            if time.monotonic() >= deadline: return False
+            await asyncio.sleep(0.05)
+        return True
+
+    async def shutdown(self) -> None:
+        from src.health import prober
+        from src.pruner import pruner
+        from src.response_cache import response_cache
+        from src.events import broker
+        from src.db.db import db
+        from src import metrics
+        from src import log
+
+        self.begin_drain()
+        self.stopping = True
+        started = time.monotonic()
+        deadline = started + Constants.SHUTDOWN_TIMEOUT
+
+        if not await self._wait_idle(deadline):
+            logger.error(
+                "Prazo de encerramento esgotado, cancelando jobs",
+                extra={"in_flight": self.in_flight, "jobs": len(self.jobs)}
+            )
+            for task in list(self.jobs):
+                task.cancel()
+
+        await prober.stop()
+        await pruner.stop()
+        await broker.stop()
+        await response_cache.close()
+        await db.disconnect(timeout=max(deadline - time.monotonic(), 1.0))
+        await metrics.exporter.stop()
+        logger.info("Worker encerrado", extra={"elapsed_s": round(time.monotonic() - started, 3)})
+        log.shutdown_logging()
+
+
+coordinator = ShutdownCoordinator()
+
+
+class DrainMiddleware:
+    """Conta as requisições HTTP em andamento; depois do início do encerramento recusa novas com 503."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if coordinator.stopping:
+            await send({
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [(b"retry-after", b"1"), (b"connection", b"close"), (b"content-length", b"0")]
+            })
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        coordinator.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            coordinator.in_flight -= 1
@@ -0,0 +1,83 @@
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Iterator, Optional
+from src.constants import Constants
+from src.log import get_logger
+from src import metrics
+import asyncio
+import psutil
+import time
+
+
+# Início do processo no relógio do perf_counter: o tempo de "imports" inclui a
+# subida do interpretador e tudo o que foi importado antes deste módulo
+_PROCESS_STARTED = time.perf_counter() - (time.time() - psutil.Process().create_time())
+
+logger = get_logger("startup")
+
+
+class StartupProfiler:
+    """
+    Tempo de cada fase da subida do worker (imports, pool, migração,
+    aquecimento). `ready` só fica verdadeiro depois de um aquecimento sem
+    falhas: até lá /health/ready responde 503 e o balanceador não manda tráfego.
+    """
+
+    def __init__(self):
+        self.phases: dict[str, float] = {}
+        self.warmers: dict[str, Callable[[], Awaitable[None]]] = {}
+        self.failed: set[str] = set()
+        self.total: Optional[float] = None
+        self.ready = False
+
+    def _record(self, name: str, seconds: float) -> None:
+        self.phases[name] = round(seconds, 4)
+        metrics.startup_phase_seconds.set(seconds, name)
+
+    def mark_imports(self) -> None:
+        self._record("imports", time.perf_counter() - _PROCESS_STARTED)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(name, time.perf_counter() - start)
+
+    def register(self, name: str, warmer: Callable[[], Awaitable[None]]) -> None:
+        self.warmers[name] = warmer
+
+    async def warmup(self) -> None:
+        """Roda os aquecedores registrados em paralelo; falha de um não impede os outros, mas segura o `ready`."""
+        async def run(name: str, warmer: Callable[[], Awaitable[None]]) -> None:
+            with self.phase(f"warmup:{name}"):
+                try:
+                    await warmer()
+                except Exception:
+                    self.failed.add(name)
+                    logger.exception("Aquecimento [%s] falhou", name)
+
+        with self.phase("warmup"):
+            await asyncio.gather(*(run(name, warmer) for name, warmer in self.warmers.items()))
+
+    def finish(self) -> None:
+        self.total = round(time.perf_counter() - _PROCESS_STARTED, 4)
+        self.ready = not self.failed
+        logger.info("startup", extra={"phases": self.phases, "total_s": self.total, "failed": sorted(self.failed)})
+
+    def report(self) -> dict:
+        return {"ready": self.ready, "total_s": self.total, "phases": self.phases, "failed": sorted(self.failed)}
+
+
+startup = StartupProfiler()
+
+
+def init_sentry() -> None:
+    # sentry_sdk e as integrações só são importados quando há DSN configurado
+    if not Constants.SENTRY_DSN: return
+    import sentry_sdk
+    sentry_sdk.init(
+        dsn=Constants.SENTRY_DSN,
+        traces_sample_rate=Constants.SENTRY_TRACES_SAMPLE_RATE,
+        environment="production" if Constants.IS_PRODUCTION else "development"
+    )
@@ -2,10 +2,11 @@ from fastapi import UploadFile
 from datetime import datetime, timezone
 from fastapi import Request
 from typing import Any
-from PIL import Image
+from starlette.routing import Match
+from src import validation
+import unicodedata
 import io
 import uuid
-import re
 
 
 def coalesce(a: Any, b: Any) -> Any:
@@ -15,41 +16,38 @@ def coalesce(a: Any, b: Any) -> Any:
 
 def validate_cpf(v: str) -> str:
     if not v: return v
-        
-    cpf = re.sub(r'[^0-9]', '', v)
-    
-    if len(cpf) != 11:
-        raise ValueError('CPF deve conter 11 dígitos')
-    
-    if cpf == cpf[0] * 11:
-        raise ValueError('CPF inválido')
-        
-    return cpf
+    return validation.validate_cpf(v)
 
 
 def sanitaze_phone(phone: str) -> str:
-    digits = ''
-    for x in phone:
-        if x.isdigit(): digits += x
+    digits = validation.only_digits(phone)
     if len(digits) == 10:
         digits = digits[0:2] + '9' + digits[2:]
-    return f"({digits[0]}{digits[1]}) {digits[2]} {digits[3:7]}-{digits[7:]}"
+    return validation.format_phone(digits)
 
 
 def sanitaze_cpf(cpf: str) -> str:
-    digits = ''
-    for x in cpf:
-        if x.isdigit(): digits += x
-    return f"{digits[0:3]}.{digits[3:6]}.{digits[6:9]}-{digits[9:]}"
+    return validation.format_cpf(validation.only_digits(cpf))
 
 
 def mask_cpf(cpf: str) -> str:
     if not cpf: return cpf
-    digits = ''.join(filter(str.isdigit, cpf))
+    digits = validation.only_digits(cpf)
     if len(digits) != 11: raise ValueError("CPF must contain exactly 11 digits")
     return f"***.{digits[3:6]}.***-**"
 
 
+def normalize_search_term(term: str) -> str:
+    # Mesmo resultado de f_search_normalize() no banco: minúsculo e sem acentos
+    decomposed = unicodedata.normalize('NFKD', term)
+    stripped = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return ' '.join(stripped.lower().split())
+
+
+def escape_like(term: str) -> str:
+    return term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
 def get_client_identifier(request: Request) -> str:
     forwarded_for = request.headers.get("X-Forwarded-For")
     if forwarded_for:
@@ -75,6 +73,9 @@ def generate_uuid() -> str:
 
 
 async def convert_upload_to_webp(file: UploadFile, quality: int = 80) -> io.BytesIO:
+    # Import tardio: o Pillow só é usado no upload de imagens e pesa na subida do worker
+    from PIL import Image
+
     contents = await file.read()
     image = Image.open(io.BytesIO(contents))
 
@@ -83,3 +84,20 @@ async def convert_upload_to_webp(file: UploadFile, quality: int = 80) -> io.Byte
     buffer.seek(0)
 
     return buffer
+
+
+def route_template(scope: dict) -> str:
+    """
+    Template da rota (/tabs/customers/{customer_id}/credit) e não o caminho
+    real, para não explodir a cardinalidade. Resolvido uma vez por requisição.
+    """
+    template = scope.get("route_template")
+    if template is None:
+        template = "<unmatched>"
+        for route in scope["app"].router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                template = route.path
+                break
+        scope["route_template"] = template
+    return template
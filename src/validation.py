@@ -0,0 +1,198 @@
+from typing import Callable, Optional, Sequence
+from itertools import product
+from operator import mul
+from string import ascii_uppercase, digits
+import re
+
+
+# Pontuação das máscaras comuns (000.000.000-00, 00.000.000/0000-00, (48) 9 9999-8888).
+# Uma tabela de translate remove tudo numa passada em C; o regex fica para o resto.
+_PUNCTUATION = str.maketrans("", "", " .-/()+\t\r")
+_NON_DIGITS = re.compile(r"[^0-9]")
+_NON_ALNUM = re.compile(r"[^0-9A-Z]")
+
+# Módulo 11 por tabela: cada pedaço de 2 ou 3 caracteres já vem com a sua
+# parte das duas somas (restos mod 11, empacotados em 6 bits cada). Somar os
+# pedaços dá um índice em _EXPECTED, que guarda os dois dígitos verificadores.
+# Um caractere vale ord(c) - 48, o que cobre também o CNPJ alfanumérico.
+_CPF_WEIGHTS = (tuple(range(10, 1, -1)), tuple(range(11, 2, -1)))
+_CNPJ_WEIGHTS = ((5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2), (6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3))
+
+
+def _chunk_tables(alphabet: str, weights: tuple[tuple[int, ...], tuple[int, ...]], size: int) -> tuple[dict[str, int], ...]:
+    tables = []
+    for start in range(0, len(weights[0]), size):
+        table = {}
+        for chars in product(alphabet, repeat=size):
+            values = [ord(c) - 48 for c in chars]
+            first = sum(map(mul, values, weights[0][start:start + size])) % 11
+            second = sum(map(mul, values, weights[1][start:start + size])) % 11
+            table["".join(chars)] = first | second << 6
+        tables.append(table)
+    return tuple(tables)
+
+
+def _digit(total: int) -> int:
+    rest = total % 11
+    return 0 if rest < 2 else 11 - rest
+
+
+def _expected(index: int) -> str:
+    first = _digit(index & 63)
+    # Na segunda soma o primeiro verificador entra com peso 2
+    return f"{first}{_digit((index >> 6) + 2 * first)}"
+
+
+_CPF_A, _CPF_B, _CPF_C = _chunk_tables(digits, _CPF_WEIGHTS, 3)
+_CNPJ_TABLES = _chunk_tables(digits + ascii_uppercase, _CNPJ_WEIGHTS, 2)
+_EXPECTED = tuple(_expected(i) for i in range(64 * 64))
+
+# DDDs válidos: 11 a 99, nenhum dos dois dígitos é zero
+_VALID_DDD = frozenset(f"{a}{b}" for a in range(1, 10) for b in range(1, 10))
+
+
+def only_digits(value: str) -> str:
+    digits = value.translate(_PUNCTUATION)
+    if digits.isascii() and digits.isdigit(): return digits
+    return _NON_DIGITS.sub("", digits)
+
+
+def _only_alnum(value: str) -> str:
+    cleaned = value.translate(_PUNCTUATION).upper()
+    if cleaned.isascii() and cleaned.isalnum(): return cleaned
+    return _NON_ALNUM.sub("", cleaned)
+
+
+def _cpf_ok(digits: str) -> bool:
+    if len(digits) != 11: return False
+    try:
+        index = _CPF_A[digits[0:3]] + _CPF_B[digits[3:6]] + _CPF_C[digits[6:9]]
+    except KeyError:
+        return False
+    # Dígitos todos iguais passam no módulo 11, mas não são CPF
+    return digits[9:] == _EXPECTED[index] and digits != digits[0] * 11
+
+
+def _cnpj_ok(value: str) -> bool:
+    # Desde 2026 a raiz e a ordem podem ter letras; os verificadores continuam numéricos
+    if len(value) != 14: return False
+    t = _CNPJ_TABLES
+    try:
+        index = (
+            t[0][value[0:2]] + t[1][value[2:4]] + t[2][value[4:6]] +
+            t[3][value[6:8]] + t[4][value[8:10]] + t[5][value[10:12]]
+        )
+    except KeyError:
+        return False
+    return value[12:] == _EXPECTED[index] and value != value[0] * 14
+
+
+def _phone_ok(digits: str) -> bool:
+    if not (digits.isascii() and digits.isdigit()) or digits[:2] not in _VALID_DDD: return False
+    if len(digits) == 11: return digits[2] == "9"
+    return len(digits) == 10
+
+
+def _cep_ok(digits: str) -> bool:
+    return len(digits) == 8 and digits.isascii() and digits.isdigit() and digits != "00000000"
+
+
+def is_valid_cpf(value: str) -> bool:
+    return _cpf_ok(only_digits(value))
+
+
+def is_valid_cnpj(value: str) -> bool:
+    return _cnpj_ok(_only_alnum(value))
+
+
+def validate_cpf(value: str) -> str:
+    digits = only_digits(value)
+    if len(digits) != 11: raise ValueError("CPF deve conter 11 dígitos")
+    if not _cpf_ok(digits): raise ValueError("CPF inválido")
+    return digits
+
+
+def validate_cnpj(value: str) -> str:
+    cleaned = _only_alnum(value)
+    if len(cleaned) != 14: raise ValueError("CNPJ deve conter 14 caracteres")
+    if not _cnpj_ok(cleaned): raise ValueError("CNPJ inválido")
+    return cleaned
+
+
+def validate_phone(value: str) -> str:
+    """Telefone com DDD: 10 dígitos (fixo) ou 11 (celular, começando por 9)."""
+    digits = only_digits(value)
+    if len(digits) not in (10, 11): raise ValueError("O telefone deve conter 10 ou 11 dígitos com DDD")
+    if not _phone_ok(digits): raise ValueError("Telefone inválido")
+    return digits
+
+
+def validate_cep(value: str) -> str:
+    digits = only_digits(value)
+    if len(digits) != 8: raise ValueError("O CEP deve conter 8 dígitos.")
+    if not _cep_ok(digits): raise ValueError("CEP inválido")
+    return digits
+
+
+def format_cpf(digits: str) -> str:
+    return f"{digits[0:3]}.{digits[3:6]}.{digits[6:9]}-{digits[9:]}"
+
+
+def format_cnpj(value: str) -> str:
+    return f"{value[0:2]}.{value[2:5]}.{value[5:8]}/{value[8:12]}-{value[12:]}"
+
+
+def format_phone(digits: str) -> str:
+    if len(digits) == 11: return f"({digits[0:2]}) {digits[2]} {digits[3:7]}-{digits[7:]}"
+    return f"({digits[0:2]}) {digits[2:6]}-{digits[6:]}"
+
+
+def _strip_column(values: Sequence[Optional[str]], upper: bool) -> list[str]:
+    # Uma passada de translate na coluna inteira em vez de uma chamada por valor
+    joined = "\n".join(v or "" for v in values).translate(_PUNCTUATION)
+    if upper: joined = joined.upper()
+    parts = joined.split("\n")
+    if len(parts) == len(values): return parts
+    # Algum valor trazia quebra de linha: cai para o caminho valor a valor
+    parts = [(v or "").translate(_PUNCTUATION) for v in values]
+    return [p.upper() for p in parts] if upper else parts
+
+
+def _clean_column(
+    values: Sequence[Optional[str]],
+    accepts: Callable[[str], bool],
+    validate: Callable[[str], str],
+    upper: bool = False
+) -> tuple[list[Optional[str]], dict[int, str]]:
+    parts = _strip_column(values, upper)
+    accepted = list(map(accepts, parts))
+    cleaned: list[Optional[str]] = [p if ok else None for p, ok in zip(parts, accepted)]
+    errors: dict[int, str] = {}
+    # Caminho lento só para o que não passou: separadores incomuns ou valor inválido
+    for i in [i for i, ok in enumerate(accepted) if not ok and parts[i]]:
+        try:
+            cleaned[i] = validate(parts[i])
+        except ValueError as e:
+            errors[i] = str(e)
+    return cleaned, errors
+
+
+def clean_cpf_column(values: Sequence[Optional[str]]) -> tuple[list[Optional[str]], dict[int, str]]:
+    """
+    Valida uma coluna inteira de CPFs (importações). Devolve os valores só
+    com dígitos, na mesma ordem, e os erros por posição; vazios e inválidos
+    viram None.
+    """
+    return _clean_column(values, _cpf_ok, validate_cpf)
+
+
+def clean_cnpj_column(values: Sequence[Optional[str]]) -> tuple[list[Optional[str]], dict[int, str]]:
+    return _clean_column(values, _cnpj_ok, validate_cnpj, upper=True)
+
+
+def clean_phone_column(values: Sequence[Optional[str]]) -> tuple[list[Optional[str]], dict[int, str]]:
+    return _clean_column(values, _phone_ok, validate_phone)
+
+
+def clean_cep_column(values: Sequence[Optional[str]]) -> tuple[list[Optional[str]], dict[int, str]]:
+    return _clean_column(values, _cep_ok, validate_cep)
@@ -0,0 +1,127 @@
+"""
+Os testes que usam o banco precisam de DATABASE_URL apontando para um
+Postgres só de testes, com o schema já aplicado (a subida da API aplica).
+Sem DATABASE_URL esses testes são pulados; os demais rodam sempre.
+"""
+import os
+
+os.environ.setdefault("SECRET_KEY", "chave-de-teste-com-pelo-menos-32-bytes")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_LOG_SAMPLE_RATE", "0")
+
+from fastapi.testclient import TestClient
+from typing import Any, Optional
+import asyncpg
+import asyncio
+import pytest
+import uuid
+
+
+PASSWORD = "senha-de-teste-1"
+
+
+def query(sql: str, *args: Any) -> list[asyncpg.Record]:
+    """Consulta numa conexão própria, como dono do schema (fora do RLS)."""
+    async def run() -> list[asyncpg.Record]:
+        conn = await asyncpg.connect(os.environ["DATABASE_URL"])
+        try:
+            return await conn.fetch(sql, *args)
+        finally:
+            await conn.close()
+    return asyncio.run(run())
+
+
+def unique(prefix: str) -> str:
+    return f"{prefix} {uuid.uuid4().hex[:10]}"
+
+
+class Session:
+    """Cookies de um usuário sobre o TestClient compartilhado."""
+
+    def __init__(self, client: TestClient):
+        self.client = client
+        self.cookies: dict[str, str] = {}
+
+    def request(self, method: str, url: str, **kwargs) -> Any:
+        self.client.cookies.clear()
+        self.client.cookies.update(self.cookies)
+        response = self.client.request(method, url, **kwargs)
+        self.cookies = {c.name: c.value for c in self.client.cookies.jar}
+        return response
+
+    def get(self, url: str, **kwargs) -> Any:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> Any:
+        return self.request("POST", url, **kwargs)
+
+
+@pytest.fixture(scope="session")
+def database_url() -> str:
+    url = os.getenv("DATABASE_URL")
+    if not url: pytest.skip("DATABASE_URL não definido: testes de banco pulados")
+    return url
+
+
+@pytest.fixture(scope="session")
+def client(database_url: str):
+    # Um único cliente (e event loop) para a sessão: o pool e os listeners são globais
+    import main
+    with TestClient(main.app) as client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+def password_hash(database_url: str) -> str:
+    from src import security
+    return security.hash_password(PASSWORD)
+
+
+@pytest.fixture
+def make_user(database_url: str, password_hash: str):
+    def make(role: str, tenant_id: int = 1, credit_limit: int = 0) -> asyncpg.Record:
+        email = f"{role.lower()}-{uuid.uuid4().hex[:10]}@example.com"
+        return query(
+            """
+                INSERT INTO users (tenant_id, name, email, password_hash, role, credit_limit)
+                VALUES ($1, $2, $3, $4, $5, $6)
+                RETURNING id, email, tenant_id
+            """,
+            tenant_id, unique(f"Teste {role}"), email, password_hash, role, credit_limit
+        )[0]
+    return make
+
+
+@pytest.fixture
+def make_product(database_url: str):
+    def make(tenant_id: int = 1, stock: int = 0, name: Optional[str] = None) -> asyncpg.Record:
+        return query(
+            """
+                WITH category AS (
+                    INSERT INTO categories (tenant_id, name) VALUES ($1, $2) RETURNING id
+                )
+                INSERT INTO products (tenant_id, name, sku, category_id, sale_price, purchase_price, stock_quantity)
+                SELECT $1, $3, $4, id, 10, 5, $5 FROM category
+                RETURNING id, name, tenant_id, category_id
+            """,
+            tenant_id, unique("Categoria teste"), name or unique("Produto teste"), uuid.uuid4().hex[:12], stock
+        )[0]
+    return make
+
+
+@pytest.fixture
+def make_tenant(database_url: str):
+    def make() -> int:
+        slug = uuid.uuid4().hex[:12]
+        return query("INSERT INTO tenants (slug, name) VALUES ($1, $2) RETURNING id", slug, f"Loja {slug}")[0]["id"]
+    return make
+
+
+@pytest.fixture
+def login(client: TestClient):
+    def login(email: str) -> Session:
+        session = Session(client)
+        response = session.post("/api/v1/auth/login", json={"identifier": email, "password": PASSWORD})
+        assert response.status_code == 200, response.text
+        return session
+    return login
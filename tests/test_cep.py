@@ -0,0 +1,97 @@
+from src.cep import CepIndex, SAMPLE_PATH, build_index, read_source, write_index
+import pytest
+import io
+import os
+
+
+def index_from(tmp_path, csv_text: str, name: str = "cep.idx") -> CepIndex:
+    path = tmp_path / name
+    write_index(path, build_index(read_source(io.StringIO(csv_text))))
+    return CepIndex(path, reload_interval=0)
+
+
+def city(index: CepIndex, zip_code: str):
+    entry = index.lookup(zip_code)
+    return entry and (entry.city, entry.ibge_city_code, entry.state)
+
+
+@pytest.fixture
+def sample_index(tmp_path) -> CepIndex:
+    with open(SAMPLE_PATH, encoding="utf-8") as f:
+        return index_from(tmp_path, f.read())
+
+
+def test_range_lookups_on_the_sample(sample_index):
+    assert city(sample_index, "01310-100") == ("São Paulo", "3550308", "SP")
+    assert city(sample_index, "88015600") == ("Florianópolis", "4205407", "SC")
+    # Limites das faixas, inclusive entre duas cidades vizinhas
+    assert city(sample_index, "88000-000") == ("Florianópolis", "4205407", "SC")
+    assert city(sample_index, "88099-999") == ("Florianópolis", "4205407", "SC")
+    assert city(sample_index, "88100-000") == ("São José", "4216602", "SC")
+
+
+def test_misses(sample_index):
+    assert sample_index.lookup("06000-000") is None    # buraco entre faixas
+    assert sample_index.lookup("00999-999") is None    # antes da primeira
+    assert sample_index.lookup("99999-999") is None    # depois da última
+    assert sample_index.lookup("1234") is None         # CEP inválido
+
+
+def test_missing_file_falls_back_to_the_sample(tmp_path):
+    index = CepIndex(tmp_path / "cep.idx")
+    assert city(index, "89201-000") == ("Joinville", "4209102", "SC")
+
+
+def test_single_ceps_are_exact_hits(tmp_path):
+    index = index_from(tmp_path, (
+        "cep;city;ibge_city_code;state\n"
+        "88010400;Florianópolis;4205407;sc\n"
+        "88010401;Florianópolis;4205407;sc\n"
+        "88010500;São José;4216602;sc\n"
+    ))
+    assert city(index, "88010-400") == ("Florianópolis", "4205407", "SC")
+    assert city(index, "88010-401") == ("Florianópolis", "4205407", "SC")
+    assert city(index, "88010-500") == ("São José", "4216602", "SC")
+    assert index.lookup("88010-402") is None
+    # CEPs seguidos da mesma cidade viram uma faixa só
+    assert list(index.starts) == [88010400, 88010500]
+
+
+def test_overlapping_ranges_are_rejected():
+    source = io.StringIO("cep_start,cep_end,city,ibge_city_code,state\n01000000,01999999,A,1,SP\n01500000,02000000,B,2,SP\n")
+    with pytest.raises(ValueError):
+        build_index(read_source(source))
+
+
+def test_reloads_when_the_file_changes(tmp_path):
+    header = "cep_start,cep_end,city,ibge_city_code,state\n"
+    index = index_from(tmp_path, header + "88000000,88099999,Florianópolis,4205407,SC\n")
+    assert city(index, "88015600") == ("Florianópolis", "4205407", "SC")
+    assert index.lookup("88100000") is None
+
+    path = index.path
+    mtime = path.stat().st_mtime
+    write_index(path, build_index(read_source(io.StringIO(
+        header + "88000000,88099999,Florianópolis,4205407,SC\n88100000,88123999,São José,4216602,SC\n"
+    ))))
+    # Garante mtime diferente mesmo em sistemas de arquivo com resolução de segundos
+    os.utime(path, (mtime + 10, mtime + 10))
+
+    assert city(index, "88100000") == ("São José", "4216602", "SC")
+    assert city(index, "88015600") == ("Florianópolis", "4205407", "SC")
+
+
+def test_does_not_recheck_within_the_interval(tmp_path):
+    header = "cep_start,cep_end,city,ibge_city_code,state\n"
+    path = tmp_path / "cep.idx"
+    write_index(path, build_index(read_source(io.StringIO(header + "88000000,88099999,Florianópolis,4205407,SC\n"))))
+    index = CepIndex(path, reload_interval=3600)
+    assert city(index, "88015600") == ("Florianópolis", "4205407", "SC")
+
+    mtime = path.stat().st_mtime
+    write_index(path, build_index(read_source(io.StringIO(header + "88000000,88099999,Desterro,4205407,SC\n"))))
+    os.utime(path, (mtime + 10, mtime + 10))
+
+    assert city(index, "88015600") == ("Florianópolis", "4205407", "SC")
+    index._checked_at = None
+    assert city(index, "88015600") == ("Desterro", "4205407", "SC")
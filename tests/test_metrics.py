@@ -0,0 +1,74 @@
+from src import metrics
+import asyncio
+import json
+import os
+
+
+def snapshot(requests: float, in_flight: float = 0) -> dict:
+    return {
+        "http_requests_total": {
+            "type": "counter", "help": "", "labels": ["route"], "buckets": [],
+            "samples": [[["/x"], requests]]
+        },
+        "http_requests_in_flight": {
+            "type": "gauge", "help": "", "labels": ["route"], "buckets": [],
+            "samples": [[["/x"], in_flight]]
+        }
+    }
+
+
+def make_exporter(directory) -> metrics.MetricsExporter:
+    exporter = metrics.MetricsExporter()
+    exporter.directory = directory
+    exporter.path = directory / f"{metrics._process_key(os.getpid())}.json"
+    return exporter
+
+
+def test_dead_workers_keep_their_counters_but_not_their_gauges(tmp_path):
+    live = metrics._process_key(os.getppid())
+    (tmp_path / f"{live}.json").write_text(json.dumps(snapshot(5, in_flight=1)))
+    # Worker morto sem apagar o arquivo, e pid reaproveitado por outro processo
+    (tmp_path / "4194303-1000.json").write_text(json.dumps(snapshot(100, in_flight=3)))
+    (tmp_path / f"{os.getppid()}-1000.json").write_text(json.dumps(snapshot(1000, in_flight=4)))
+    exporter = make_exporter(tmp_path)
+
+    for _ in range(2):
+        # A segunda coleta lê o acumulado: a soma não cai (sem reset no rate())
+        merged = exporter.collect(snapshot(2, in_flight=1))
+        assert merged["http_requests_total"]["samples"][("/x",)] == 1107
+        assert merged["http_requests_in_flight"]["samples"][("/x",)] == 2
+
+    assert sorted(p.name for p in tmp_path.glob("*.json")) == sorted([f"{live}.json", metrics.ACCUMULATED])
+
+
+def test_stop_accumulates_own_counters(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics.registry, "snapshot", lambda: snapshot(7, in_flight=2))
+    exporter = make_exporter(tmp_path)
+    exporter.flush()
+    assert exporter.path.exists()
+
+    asyncio.run(exporter.stop())
+    assert not exporter.path.exists()
+
+    merged = make_exporter(tmp_path).collect(snapshot(1))
+    assert merged["http_requests_total"]["samples"][("/x",)] == 8
+    assert merged["http_requests_in_flight"]["samples"][("/x",)] == 0
+
+
+def test_render_runs_off_the_event_loop(monkeypatch):
+    threads = []
+    original = metrics._render
+
+    def spy(snapshot: dict) -> str:
+        try:
+            asyncio.get_running_loop()
+            threads.append("loop")
+        except RuntimeError:
+            threads.append("worker")
+        return original(snapshot)
+
+    monkeypatch.setattr(metrics, "_render", spy)
+    text = asyncio.run(metrics.render())
+
+    assert "# TYPE http_requests_total counter" in text
+    assert threads == ["worker"]
@@ -0,0 +1,35 @@
+from conftest import query, unique
+import time
+
+
+def test_import_audits_changed_prices(client, make_user, make_product, login):
+    admin = make_user("ADMIN")
+    changed, kept = make_product(), make_product()
+    skus = {r["id"]: r["sku"] for r in query("SELECT id, sku FROM products WHERE id = ANY($1)", [changed["id"], kept["id"]])}
+
+    rows = [
+        "name,sku,category_id,purchase_price,sale_price",
+        f"{changed['name']},{skus[changed['id']]},{changed['category_id']},6,12",
+        f"{kept['name']},{skus[kept['id']]},{kept['category_id']},5,10",
+        f"{unique('Produto novo')},{unique('novo').replace(' ', '-')},{kept['category_id']},1,2",
+    ]
+    session = login(admin["email"])
+    response = session.post("/api/v1/products/import", files={"file": ("precos.csv", "\n".join(rows) + "\n", "text/csv")})
+    assert response.status_code == 202, response.text
+
+    job = response.json()
+    for _ in range(50):
+        if job["status"] == "CONCLUIDA": break
+        time.sleep(0.1)
+        job = session.get(f"/api/v1/products/import/{job['id']}").json()
+    assert (job["status"], job["inserted"], job["updated"]) == ("CONCLUIDA", 1, 2), job
+
+    # Só o produto com preço alterado entra no histórico, e com os valores de antes
+    audits = query(
+        """
+            SELECT product_id, old_purchase_price, new_purchase_price, old_sale_price, new_sale_price, changed_by
+            FROM price_audits WHERE product_id = ANY($1)
+        """,
+        [changed["id"], kept["id"]]
+    )
+    assert [tuple(a) for a in audits] == [(changed["id"], 5, 6, 10, 12, admin["id"])]
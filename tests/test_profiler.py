@@ -0,0 +1,35 @@
+from src.profiler import profiler, QueryStats, fingerprint
+from conftest import query
+
+
+def explain(client, sql: str, *args, settings=None) -> dict:
+    key, normalized = fingerprint(sql)
+    stats = QueryStats(key, normalized)
+    client.portal.call(profiler._explain, stats, sql, args, settings)
+    assert stats.plan is not None
+    return stats.plan[0]
+
+
+def test_select_calling_a_writing_function_is_not_executed(client):
+    # Nada no texto da consulta denuncia a escrita, e um nextval não é desfeito pelo rollback
+    query("CREATE SEQUENCE IF NOT EXISTS test_profiler_seq")
+    query("CREATE OR REPLACE FUNCTION test_profiler_touch() RETURNS bigint AS $$ SELECT nextval('test_profiler_seq') $$ LANGUAGE sql")
+    before = query("SELECT last_value, is_called FROM test_profiler_seq")[0]
+
+    plan = explain(client, "SELECT test_profiler_touch()")
+
+    assert "Actual Rows" not in plan["Plan"]
+    assert query("SELECT last_value, is_called FROM test_profiler_seq")[0] == before
+
+
+def test_plan_runs_with_the_request_rls_context(client, make_tenant, make_product):
+    tenant = make_tenant()
+    make_product(tenant_id=tenant)
+    make_product(tenant_id=tenant)
+    sql = "SELECT id FROM products WHERE tenant_id = auth_tenant()"
+
+    plan = explain(client, sql, settings={"app.current_tenant_id": str(tenant)})
+    assert plan["Plan"]["Actual Rows"] == 2
+
+    plan = explain(client, sql)
+    assert plan["Plan"]["Actual Rows"] == 0
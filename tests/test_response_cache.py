@@ -0,0 +1,38 @@
+from starlette.requests import Request
+from src.response_cache import ResponseCache
+from src.schemas.user import UserPayload
+from src import security
+import contextlib
+import asyncio
+import uuid
+
+
+def test_refill_after_invalidation_reads_from_the_primary(monkeypatch):
+    opened = []
+
+    def connection(name: str):
+        @contextlib.asynccontextmanager
+        async def connect(*args):
+            opened.append(name)
+            yield name
+        return connect
+
+    # Uma réplica atrasada guardaria de novo a versão que o NOTIFY acabou de invalidar
+    monkeypatch.setattr(security, "rls_read_connection", connection("replica"))
+    monkeypatch.setattr(security, "primary_read_connection", connection("primary"))
+
+    cache = ResponseCache()
+    request = Request({"type": "http", "method": "GET", "path": "/api/v1/catalog/categories", "query_string": b"", "headers": []})
+    user = UserPayload(user_id=uuid.uuid4(), role="CAIXA", tenant_id=1)
+
+    async def producer(conn) -> bytes:
+        return conn.encode()
+
+    async def scenario() -> bytes:
+        await cache.respond(request, user, ("categories",), producer)
+        cache.on_catalog_change("categories")
+        response = await cache.respond(request, user, ("categories",), producer)
+        return response.body
+
+    assert asyncio.run(scenario()) == b"primary"
+    assert opened == ["primary", "primary"]
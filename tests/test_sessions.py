@@ -0,0 +1,33 @@
+from src.sessions import RevocationSet
+import time
+
+
+def test_sessions_are_revoked_by_id_not_by_clock():
+    revocations = RevocationSet()
+    now = time.time()
+    # Marca carimbada por um relógio adiantado: não pode derrubar o login feito depois
+    revocations.add(1, "u1", None, now + 5, now + 3600)
+    revocations.add(2, "u1", "s1", now - 5, now + 3600)
+
+    assert revocations.is_revoked("u1", "s1", now)
+    assert not revocations.is_revoked("u1", "s2", now)
+    # Tokens sem sid (anteriores ao controle de sessões) seguem pela marca
+    assert revocations.is_revoked("u1", None, now)
+    assert not revocations.is_revoked("u1", None, now + 10)
+
+
+def test_sign_out_everywhere_drops_every_open_session(client, make_user, login):
+    email = make_user("CAIXA")["email"]
+    phone, desktop = login(email), login(email)
+
+    response = phone.request("DELETE", "/api/v1/auth/sessions")
+    assert response.status_code == 200, response.text
+    assert response.json()["revoked"] == 2
+
+    # O NOTIFY chega a este worker pelo LISTEN; espera um pouco por ele
+    for _ in range(50):
+        if desktop.get("/api/v1/auth/sessions").status_code == 401: break
+        time.sleep(0.1)
+    assert desktop.get("/api/v1/auth/sessions").status_code == 401
+    assert phone.get("/api/v1/auth/sessions").status_code == 401
+    assert login(email).get("/api/v1/auth/sessions").status_code == 200
@@ -0,0 +1,76 @@
+"""
+O encerramento mexe nos singletons do processo (pools, broker, logs), então
+o cenário roda num processo à parte para não derrubar o cliente da sessão.
+"""
+from pathlib import Path
+import subprocess
+import asyncio
+import json
+import sys
+import os
+
+
+async def scenario() -> dict:
+    from fastapi import FastAPI
+    from src.shutdown import coordinator, DrainMiddleware
+    import httpx
+
+    app = FastAPI()
+    release = asyncio.Event()
+
+    @app.get("/slow")
+    async def slow():
+        await release.wait()
+        return {"done": True}
+
+    @app.get("/fast")
+    async def fast():
+        return {"done": True}
+
+    transport = httpx.ASGITransport(app=DrainMiddleware(app))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        in_flight = asyncio.create_task(client.get("/slow"))
+        while coordinator.in_flight == 0: await asyncio.sleep(0.01)
+
+        stopping = asyncio.create_task(coordinator.shutdown())
+        while not coordinator.stopping: await asyncio.sleep(0.01)
+        rejected = await client.get("/fast")
+        waited = not stopping.done()
+
+        release.set()
+        finished = await in_flight
+        await stopping
+
+    return {
+        "rejected": rejected.status_code,
+        "retry_after": rejected.headers.get("retry-after"),
+        "waited": waited,
+        "finished": finished.status_code,
+        "body": finished.json()
+    }
+
+
+def test_in_flight_request_finishes_while_new_ones_get_503():
+    root = Path(__file__).resolve().parent.parent
+    result = subprocess.run(
+        [sys.executable, __file__],
+        capture_output=True,
+        text=True,
+        cwd=root,
+        env={**os.environ, "PYTHONPATH": str(root)},
+        timeout=60,
+        check=True
+    )
+    outcome = json.loads(result.stdout.strip().splitlines()[-1])
+
+    assert outcome["rejected"] == 503
+    assert outcome["retry_after"] == "1"
+    # O encerramento esperou a requisição aberta em vez de cortá-la
+    assert outcome["waited"]
+    assert outcome["finished"] == 200
+    assert outcome["body"] == {"done": True}
+
+
+if __name__ == "__main__":
+    os.environ.setdefault("SECRET_KEY", "chave-de-teste-com-pelo-menos-32-bytes")
+    print(json.dumps(asyncio.run(scenario())))
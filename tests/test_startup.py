@@ -0,0 +1,56 @@
+from src.controller import product as product_controller
+from src.response_cache import response_cache
+from src.routes import catalog as catalog_routes
+from src.startup import StartupProfiler, startup
+from conftest import unique
+import subprocess
+import asyncio
+import sys
+
+
+def test_imports_phase_counts_from_process_start():
+    # Tudo o que roda antes do src.startup ser importado entra no tempo de "imports"
+    code = "import time; time.sleep(0.5); import main; print(main.startup.phases['imports'])"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert float(result.stdout.strip().splitlines()[-1]) >= 0.5
+
+
+def test_warmup_fills_search_and_catalog_caches(client, make_tenant, make_product, make_user, login):
+    assert startup.report()["ready"]
+    assert "warmup:product_search" in startup.phases
+    assert "warmup:catalog_cache" in startup.phases
+
+    tenant = make_tenant()
+    name = unique("Zabumba")
+    make_product(tenant_id=tenant, name=name)
+    client.portal.call(product_controller.warm_search_cache)
+    client.portal.call(catalog_routes.warm_cache)
+
+    key = (tenant, "z", product_controller.DEFAULT_SEARCH_LIMIT)
+    assert name in [p.name for p in product_controller.search_cache.get(key)]
+
+    path = catalog_routes.PREFIX + "/categories"
+    assert all(key in response_cache.memory for key in response_cache.tenant_keys(tenant, path))
+
+    # A primeira requisição da loja já sai do cache aquecido
+    entry = response_cache.memory.get(f"{tenant}:CAIXA:{path}?")
+    cashier = login(make_user("CAIXA", tenant_id=tenant)["email"])
+    response = cashier.get(path)
+    assert response.status_code == 200, response.text
+    assert response.headers["ETag"] == entry.etag
+
+
+def test_failed_warmer_keeps_the_worker_out_of_rotation():
+    async def ok(): pass
+    async def broken(): raise ConnectionError("banco fora")
+
+    profiler = StartupProfiler()
+    profiler.register("ok", ok)
+    profiler.register("broken", broken)
+    asyncio.run(profiler.warmup())
+    profiler.finish()
+
+    # O aquecedor que funcionou rodou até o fim; o que falhou segura o ready
+    assert "warmup:ok" in profiler.phases
+    assert not profiler.ready
+    assert profiler.report()["failed"] == ["broken"]
@@ -0,0 +1,125 @@
+from src.model import sync as sync_model
+from src.db.db import db
+from conftest import query, unique
+import asyncpg
+import asyncio
+import json
+import uuid
+
+
+CATALOG = "/api/v1/sync/catalog"
+SALES = "/api/v1/sync/sales"
+
+
+def delta(session, since: int) -> tuple[list[dict], int]:
+    response = session.get(CATALOG, params={"since": since, "limit": 20000})
+    assert response.status_code == 200, response.text
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines[-1]["type"] == "watermark"
+    return lines[:-1], int(response.headers["X-Catalog-Version"])
+
+
+def test_change_committed_mid_delta_is_not_skipped(make_user, make_product, login, monkeypatch):
+    cashier = login(make_user("CAIXA")["email"])
+    product = make_product()
+    _, watermark = delta(cashier, 0)
+    category_name = unique("Categoria no meio")
+
+    original = sync_model.get_tax_group_changes
+
+    async def commit_between_queries(since, limit, conn):
+        # Categorias já foram lidas: uma categoria nova e depois uma alteração de
+        # produto confirmam antes da consulta de produtos
+        async with db.pool.acquire() as other:
+            await other.execute("INSERT INTO categories (tenant_id, name) VALUES (1, $1)", category_name)
+            await other.execute("UPDATE products SET description = $1 WHERE id = $2", unique("nova"), product["id"])
+        return await original(since, limit, conn)
+
+    monkeypatch.setattr(sync_model, "get_tax_group_changes", commit_between_queries)
+    changes, first = delta(cashier, watermark)
+    monkeypatch.setattr(sync_model, "get_tax_group_changes", original)
+
+    # A primeira página é um snapshot só: ou vê as duas alterações ou nenhuma
+    seen = {(c["type"], c["data"]["name"]) for c in changes if c["op"] == "upsert"}
+    assert (("category", category_name) in seen) == (("product", product["name"]) in seen)
+
+    changes, _ = delta(cashier, first)
+    seen |= {(c["type"], c["data"]["name"]) for c in changes if c["op"] == "upsert"}
+    assert ("category", category_name) in seen
+    assert ("product", product["name"]) in seen
+
+
+def offline_sale(product_id, quantity: str, status: str = "CONCLUIDA") -> dict:
+    total = f"{int(quantity) * 10}.00"
+    return {
+        "id": str(uuid.uuid4()),
+        "status": status,
+        "created_at": "2026-01-10T12:00:00-03:00",
+        "items": [{"product_id": str(product_id), "quantity": quantity, "unit_sale_price": "10.00"}],
+        "payments": [{"method": "DINHEIRO", "total": total}] if status == "CONCLUIDA" else []
+    }
+
+
+def stock_of(product_id) -> tuple:
+    stock = query("SELECT stock_quantity FROM products WHERE id = $1", product_id)[0]["stock_quantity"]
+    moved = query(
+        "SELECT COALESCE(SUM(quantity), 0) AS total FROM stock_movements WHERE product_id = $1 AND type = 'VENDA'",
+        product_id
+    )[0]["total"]
+    return stock, moved
+
+
+def test_offline_sale_moves_stock_once(make_user, make_product, login):
+    cashier = login(make_user("CAIXA")["email"])
+    product = make_product(stock=10)
+    sale = offline_sale(product["id"], "3")
+
+    response = cashier.post(SALES, json={"sales": [sale]})
+    assert response.status_code == 200, response.text
+    assert response.json()["applied"] == 1
+    assert stock_of(product["id"]) == (7, -3)
+
+    # Reenvio do mesmo lote: venda duplicada, estoque não baixa de novo
+    response = cashier.post(SALES, json={"sales": [sale]})
+    assert response.json()["duplicates"] == 1
+    assert stock_of(product["id"]) == (7, -3)
+
+
+def test_cancelled_offline_sale_keeps_stock(make_user, make_product, login):
+    cashier = login(make_user("CAIXA")["email"])
+    product = make_product(stock=10)
+
+    response = cashier.post(SALES, json={"sales": [offline_sale(product["id"], "2", status="CANCELADA")]})
+    assert response.json()["applied"] == 1
+    assert stock_of(product["id"]) == (10, 0)
+
+
+def test_catalog_writers_only_wait_for_their_own_store(database_url, make_tenant):
+    other_store = make_tenant()
+
+    async def scenario() -> tuple[bool, bool]:
+        holder, same, other = [await asyncpg.connect(database_url) for _ in range(3)]
+        try:
+            # Uma transação da loja 1 segura a trava das versões do catálogo
+            writing = holder.transaction()
+            await writing.start()
+            await holder.execute("INSERT INTO categories (tenant_id, name) VALUES (1, $1)", unique("Segura"))
+
+            async def blocked(conn, tenant_id: int) -> bool:
+                async with conn.transaction():
+                    await conn.execute("SET LOCAL lock_timeout = '300ms'")
+                    try:
+                        await conn.execute("INSERT INTO categories (tenant_id, name) VALUES ($1, $2)", tenant_id, unique("Espera"))
+                    except asyncpg.LockNotAvailableError:
+                        return True
+                return False
+
+            result = await blocked(same, 1), await blocked(other, other_store)
+            await writing.rollback()
+            return result
+        finally:
+            for conn in (holder, same, other): await conn.close()
+
+    same_store_blocked, other_store_blocked = asyncio.run(scenario())
+    assert same_store_blocked
+    assert not other_store_blocked
@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta, timezone
+from src.keys import keyring
+from conftest import Session, query, unique
+import pytest
+
+
+@pytest.fixture
+def store_one(client, make_user, make_product, login):
+    """Produto, cliente e venda da loja 1."""
+    product = make_product(name=unique("Rapadura"))
+    customer = make_user("CLIENTE")
+    name = query("SELECT name FROM users WHERE id = $1", customer["id"])[0]["name"]
+
+    cashier = login(make_user("CAIXA")["email"])
+    response = cashier.post("/api/v1/sales/", json={"customer_id": str(customer["id"])})
+    assert response.status_code == 201, response.text
+    return {"product": product, "customer": customer, "customer_name": name, "sale_id": response.json()["id"]}
+
+
+def visible(session, data) -> dict:
+    products = session.get("/api/v1/products/search", params={"q": data["product"]["name"]})
+    customers = session.get("/api/v1/customers/lookup", params={"q": data["customer_name"]})
+    snapshot = session.get("/api/v1/live/snapshot", params={"channels": "sales"})
+    assert products.status_code == customers.status_code == snapshot.status_code == 200
+    return {
+        "search": any(p["id"] == str(data["product"]["id"]) for p in products.json()),
+        "product": session.get(f"/api/v1/products/{data['product']['id']}").status_code == 200,
+        "lookup": any(c["id"] == str(data["customer"]["id"]) for c in customers.json()),
+        "credit": session.get(f"/api/v1/tabs/customers/{data['customer']['id']}/credit").status_code == 200,
+        "sale": any(s["sale_id"] == data["sale_id"] for s in snapshot.json()["sales"])
+    }
+
+
+def test_other_store_sees_nothing_from_store_one(store_one, make_tenant, make_user, login):
+    manager = login(make_user("GERENTE")["email"])
+    assert visible(manager, store_one) == dict.fromkeys(("search", "product", "lookup", "credit", "sale"), True)
+
+    other = login(make_user("GERENTE", tenant_id=make_tenant())["email"])
+    assert visible(other, store_one) == dict.fromkeys(("search", "product", "lookup", "credit", "sale"), False)
+
+
+def test_token_without_store_is_rejected(client, make_user):
+    user = make_user("GERENTE")
+    claims = {"sub": str(user["id"]), "role": "GERENTE", "type": "access", "exp": datetime.now(timezone.utc) + timedelta(hours=1)}
+
+    def search(claims: dict) -> int:
+        session = Session(client)
+        session.cookies = {"access_token": keyring.sign(claims)}
+        return session.get("/api/v1/products/search", params={"q": "a"}).status_code
+
+    assert search({**claims, "tenant_id": user["tenant_id"]}) == 200
+    # Antes caía na loja 1; agora o token sem loja não autentica
+    assert search(claims) == 401
+
+
+def as_user(user, role: str, sql: str, *args):
+    """Executa `sql` como uma requisição do usuário (tenant_user, com loja, id e perfil na sessão)."""
+    from src.schemas.user import UserPayload
+    from src import security
+    import asyncpg
+    import asyncio
+    import os
+
+    async def run():
+        conn = await asyncpg.connect(os.environ["DATABASE_URL"])
+        try:
+            async with conn.transaction():
+                payload = UserPayload(user_id=user["id"], role=role, tenant_id=user["tenant_id"])
+                await security._set_rls_context(conn, payload)
+                return await conn.execute(sql, *args)
+        finally:
+            await conn.close()
+    return asyncio.run(run())
+
+
+def test_price_audits_are_append_only(make_user, make_product):
+    admin = make_user("ADMIN")
+    product = make_product()
+    audit = query(
+        "INSERT INTO price_audits (tenant_id, product_id, old_sale_price, new_sale_price) VALUES (1, $1, 10, 12) RETURNING id",
+        product["id"]
+    )[0]["id"]
+
+    # Nem ADMIN edita ou apaga o histórico: o RLS não deixa a linha aparecer para o UPDATE/DELETE
+    assert as_user(admin, "ADMIN", "UPDATE price_audits SET new_sale_price = 1 WHERE id = $1", audit) == "UPDATE 0"
+    assert as_user(admin, "ADMIN", "DELETE FROM price_audits WHERE id = $1", audit) == "DELETE 0"
+    assert query("SELECT new_sale_price FROM price_audits WHERE id = $1", audit)[0]["new_sale_price"] == 12
+
+
+def test_users_cannot_escalate_themselves(make_user):
+    import asyncpg
+    manager = make_user("GERENTE")
+    cashier = make_user("CAIXA")
+    query("UPDATE users SET credit_limit = 100, invoice_amount = 30 WHERE id = $1", manager["id"])
+
+    for change in ("role = 'ADMIN'", "credit_limit = 1000", "invoice_amount = 0"):
+        with pytest.raises(asyncpg.InsufficientPrivilegeError):
+            as_user(manager, "GERENTE", f"UPDATE users SET {change} WHERE id = $1", manager["id"])
+
+    # Alterar outro usuário segue permitido (o perfil é conferido na rota)
+    assert as_user(manager, "GERENTE", "UPDATE users SET credit_limit = 50 WHERE id = $1", cashier["id"]) == "UPDATE 1"
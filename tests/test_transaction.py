@@ -0,0 +1,72 @@
+from src.db import transaction
+from src.db.transaction import RetryBudget, run_transaction
+from src.exceptions import DatabaseError
+import asyncpg
+import asyncio
+import pytest
+import uuid
+
+
+class FakeConnection:
+    """Conta transações abertas e desfeitas; `errors` sai uma por tentativa."""
+
+    def __init__(self, *errors: Exception):
+        self.errors = list(errors)
+        self.started = 0
+        self.rolled_back = 0
+
+    def transaction(self): return self
+
+    async def __aenter__(self):
+        self.started += 1
+        return self
+
+    async def __aexit__(self, exc_type, *exc):
+        if exc_type is not None: self.rolled_back += 1
+        return False
+
+    async def operation(self) -> str:
+        if self.errors: raise self.errors.pop(0)
+        return "ok"
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(transaction, "backoff", lambda attempt: 0)
+
+
+def run(conn: FakeConnection, route: str = "", attempts: int = 4) -> str:
+    route = route or f"/test/{uuid.uuid4().hex}"
+    return asyncio.run(run_transaction(conn.operation, conn, route, attempts))
+
+
+def test_deadlock_is_retried_in_a_new_transaction():
+    conn = FakeConnection(asyncpg.DeadlockDetectedError("deadlock"), asyncpg.SerializationError("serialização"))
+    assert run(conn) == "ok"
+    assert (conn.started, conn.rolled_back) == (3, 2)
+
+
+def test_gives_up_after_the_last_attempt():
+    conn = FakeConnection(*[asyncpg.DeadlockDetectedError("deadlock") for _ in range(3)])
+    with pytest.raises(DatabaseError) as error:
+        run(conn, attempts=3)
+    assert (error.value.code, error.value.sqlstate) == (409, "40P01")
+    assert conn.started == 3
+
+
+def test_empty_budget_stops_retries():
+    route = f"/test/{uuid.uuid4().hex}"
+    transaction.budgets[route] = RetryBudget(ratio=0, capacity=0)
+    conn = FakeConnection(asyncpg.DeadlockDetectedError("deadlock"))
+    with pytest.raises(DatabaseError) as error:
+        run(conn, route)
+    assert error.value.code == 409
+    assert conn.started == 1
+
+
+def test_other_errors_are_translated_without_retry():
+    conn = FakeConnection(asyncpg.CheckViolationError("check"), asyncpg.DeadlockDetectedError("deadlock"))
+    with pytest.raises(DatabaseError) as error:
+        run(conn)
+    assert (error.value.code, error.value.sqlstate) == (400, "23514")
+    assert conn.started == 1
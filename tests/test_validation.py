@@ -0,0 +1,204 @@
+"""
+Os validadores rápidos de src.validation contra os modelos pydantic de antes
+deles (validators copiados abaixo). A única diferença aceita é a regra nova:
+dígito verificador de CPF e CNPJ (conferido pela implementação direta do
+módulo 11 do benchmark) e CEP 00000000.
+"""
+from hypothesis import given, settings, strategies as st
+from pydantic import ValidationError, field_validator
+from scripts.bench_validation import reference_check, reference_cpf, reference_cnpj
+from src.schemas.supplier import SupplierCreate, SupplierUpdate
+from src.schemas.user import UserCreate, UserUpdate
+from src.schemas.address import UserAddressBase
+from src import validation
+import re
+
+
+class LegacyUserCreate(UserCreate):
+
+    @field_validator('phone', 'cpf', mode='before')
+    @classmethod
+    def sanitize_numeric_fields(cls, v: str | None) -> str | None:
+        if v is None: return None
+        if not v.strip(): return None
+        return re.sub(r'\D', '', v)
+
+    @field_validator('cpf')
+    @classmethod
+    def check_cpf_digits(cls, v: str | None) -> str | None:
+        return v
+
+
+class LegacyUserUpdate(UserUpdate):
+
+    @field_validator('phone', 'cpf', mode='before')
+    @classmethod
+    def sanitize_numeric_fields(cls, v: str | None) -> str | None:
+        if v is None: return None
+        if not v.strip(): return None
+        return re.sub(r'\D', '', v)
+
+    @field_validator('cpf')
+    @classmethod
+    def check_cpf_digits(cls, v: str | None) -> str | None:
+        return v
+
+
+class LegacySupplierCreate(SupplierCreate):
+
+    @field_validator('phone')
+    @classmethod
+    def clean_phone(cls, v: str | None) -> str | None:
+        if v is None: return v
+        return re.sub(r'\D', '', v)
+
+    @field_validator('cnpj')
+    @classmethod
+    def clean_cnpj(cls, v: str | None) -> str | None:
+        if v is None: return v
+        return re.sub(r'[./-]', '', v)
+
+
+class LegacySupplierUpdate(SupplierUpdate):
+
+    @field_validator('cnpj')
+    @classmethod
+    def clean_cnpj(cls, v: str | None) -> str | None:
+        if v is None: return v
+        return re.sub(r'[./-]', '', v)
+
+    @field_validator('phone')
+    @classmethod
+    def clean_phone(cls, v: str | None) -> str | None:
+        if v is None: return v
+        numeric_phone = re.sub(r'\D', '', v)
+        if len(numeric_phone) != 11:
+            raise ValueError('O telefone deve conter exatamente 11 dígitos')
+        return numeric_phone
+
+
+class LegacyAddress(UserAddressBase):
+
+    @field_validator('zip_code')
+    @classmethod
+    def clean_zip_code(cls, v: str | None) -> str | None:
+        if v is None: return v
+        numeric_zip = re.sub(r'\D', '', v)
+        if len(numeric_zip) != 8:
+            raise ValueError('O CEP deve conter 8 dígitos.')
+        return numeric_zip
+
+
+USER = {"name": "Cliente Teste"}
+USER_UPDATE = {"role": "CLIENTE", "state_tax_indicator": 9, "credit_limit": 0}
+SUPPLIER = {"name": "Fornecedor Teste"}
+
+
+def outcome(model, field: str, value: str, **fields) -> tuple:
+    try:
+        return ("ok", getattr(model(**fields, **{field: value}), field))
+    except ValidationError:
+        return ("error", None)
+
+
+def with_check_digits(body: list[int], first: list[int], second: list[int]) -> list[int]:
+    body = body + [reference_check(body, first)]
+    return body + [reference_check(body, second)]
+
+
+def masked(draw, value: str, mask) -> str:
+    return mask(value) if draw(st.booleans()) else value
+
+
+@st.composite
+def cpfs(draw) -> str:
+    digits = with_check_digits(
+        draw(st.lists(st.integers(0, 9), min_size=9, max_size=9)),
+        list(range(10, 1, -1)),
+        list(range(11, 1, -1))
+    )
+    if draw(st.booleans()): digits[draw(st.integers(0, 10))] = draw(st.integers(0, 9))
+    return masked(draw, "".join(map(str, digits)), validation.format_cpf)
+
+
+@st.composite
+def cnpjs(draw) -> str:
+    first = [5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2]
+    chars = draw(st.lists(st.sampled_from("0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"), min_size=12, max_size=12))
+    values = with_check_digits([ord(c) - 48 for c in chars], first, [6] + first)
+    value = "".join(chars) + f"{values[12]}{values[13]}"
+    if draw(st.booleans()): value = value[:13] + str(draw(st.integers(0, 9)))
+    return masked(draw, value, validation.format_cnpj)
+
+
+# Só ASCII: os modelos antigos usavam \D, que também aceita dígitos de outras escritas
+noise = st.text(alphabet="0123456789 .-/()+\tabcXYZ", max_size=20)
+phones = st.one_of(noise, st.from_regex(r"\(?[0-9]{2}\)? ?9? ?[0-9]{4}-?[0-9]{4}", fullmatch=True))
+ceps = st.one_of(noise, st.from_regex(r"[0-9]{5}-?[0-9]{3}", fullmatch=True), st.just("00000-000"))
+
+
+@given(st.one_of(cpfs(), noise))
+def test_user_cpf_is_the_previous_rule_plus_check_digits(value):
+    for model, legacy, fields in ((UserCreate, LegacyUserCreate, USER), (UserUpdate, LegacyUserUpdate, USER_UPDATE)):
+        before = outcome(legacy, "cpf", value, **fields)
+        if before[1] is not None and not reference_cpf(before[1]): before = ("error", None)
+        assert outcome(model, "cpf", value, **fields) == before
+
+
+@given(phones)
+def test_user_phone_matches_previous_models(value):
+    assert outcome(UserCreate, "phone", value, **USER) == outcome(LegacyUserCreate, "phone", value, **USER)
+    assert outcome(UserUpdate, "phone", value, **USER_UPDATE) == outcome(LegacyUserUpdate, "phone", value, **USER_UPDATE)
+
+
+@given(phones)
+def test_supplier_phone_matches_previous_models(value):
+    assert outcome(SupplierCreate, "phone", value, **SUPPLIER) == outcome(LegacySupplierCreate, "phone", value, **SUPPLIER)
+    assert outcome(SupplierUpdate, "phone", value) == outcome(LegacySupplierUpdate, "phone", value)
+
+
+# Máscara antiga: só . / - eram removidos, e o CNPJ chegava em maiúsculas
+@given(st.one_of(cnpjs(), st.text(alphabet="0123456789ABCXYZ./-", max_size=20)))
+def test_supplier_cnpj_is_the_previous_rule_plus_check_digits(value):
+    for model, legacy, fields in ((SupplierCreate, LegacySupplierCreate, SUPPLIER), (SupplierUpdate, LegacySupplierUpdate, {})):
+        before = outcome(legacy, "cnpj", value, **fields)
+        if before[1] is not None and not reference_cnpj(before[1]): before = ("error", None)
+        assert outcome(model, "cnpj", value, **fields) == before
+
+
+@settings(deadline=None)
+@given(ceps)
+def test_cep_is_the_previous_rule_without_zeros(value):
+    before = outcome(LegacyAddress, "zip_code", value)
+    if before[1] == "00000000": before = ("error", None)
+    assert outcome(UserAddressBase, "zip_code", value) == before
+
+
+def column_reference(values: list, validate) -> tuple[list, dict]:
+    cleaned, errors = [], {}
+    for i, value in enumerate(values):
+        cleaned.append(None)
+        if not (value or "").translate(validation._PUNCTUATION): continue
+        try:
+            cleaned[i] = validate(value)
+        except ValueError as e:
+            errors[i] = str(e)
+    return cleaned, errors
+
+
+column_values = st.lists(st.one_of(st.none(), st.text(max_size=20), cpfs(), cnpjs(), phones, ceps), max_size=30)
+
+
+@given(column_values)
+def test_columns_match_the_single_value_validators(values):
+    # Caminho rápido (translate na coluna + tabelas) contra a validação valor a valor
+    assert validation.clean_cpf_column(values) == column_reference(values, validation.validate_cpf)
+    assert validation.clean_cnpj_column(values) == column_reference(values, validation.validate_cnpj)
+    assert validation.clean_phone_column(values) == column_reference(values, validation.validate_phone)
+    assert validation.clean_cep_column(values) == column_reference(values, validation.validate_cep)
+
+
+def test_digits_from_other_scripts_are_dropped():
+    # Os modelos antigos guardavam "٤٨٩٩٩٩٩٨٨٨٨" como telefone; agora não sobra dígito nenhum
+    assert validation.only_digits("٤٨٩٩٩٩٩٨٨٨٨") == ""
+    assert outcome(UserCreate, "phone", "٤٨٩٩٩٩٩٨٨٨٨", **USER) == ("error", None)